@@ -0,0 +1,36 @@
+"""Add checkpoint field to parsing_jobs
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+This migration adds:
+- checkpoint JSONB field to parsing_jobs, holding the last committed
+  position of a running job so it can resume after a crash or time limit
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'parsing_jobs',
+        sa.Column(
+            'checkpoint',
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default='{}',
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('parsing_jobs', 'checkpoint')
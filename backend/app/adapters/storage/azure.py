@@ -3,6 +3,7 @@
 Provides storage operations using Microsoft Azure Blob Storage.
 """
 
+import asyncio
 import hashlib
 import logging
 from collections.abc import AsyncIterator
@@ -265,6 +266,21 @@ class AzureBlobStorageAdapter(StorageAdapter):
             for i in range(0, len(chunk), chunk_size):
                 yield chunk[i : i + chunk_size]
 
+    async def download_range(self, key: str, start: int, length: int) -> bytes:
+        """Download a byte range of a blob."""
+        if not self._container_client:
+            raise RuntimeError("Azure client not connected")
+        if length <= 0:
+            return b""
+
+        blob_client = self._container_client.get_blob_client(key)
+
+        def read_range() -> bytes:
+            return blob_client.download_blob(offset=start, length=length).readall()
+
+        # The blob client blocks, so keep the request off the event loop
+        return await asyncio.to_thread(read_range)
+
     async def get_download_url(
         self,
         key: str,
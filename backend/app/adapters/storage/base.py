@@ -9,6 +9,7 @@ from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 from typing import Any, BinaryIO
 from uuid import UUID
 
@@ -261,6 +262,46 @@ class StorageAdapter(ABC):
         # Yield statement makes this an async generator
         yield b""  # pragma: no cover
 
+    async def download_range(self, key: str, start: int, length: int) -> bytes:
+        """Download a byte range of a file.
+
+        This default implementation streams from the start of the file and
+        discards everything before the range. Subclasses should override it
+        with a native ranged read.
+
+        Args:
+            key: Source key/path.
+            start: Offset of the first byte.
+            length: Number of bytes to read.
+
+        Returns:
+            Up to length bytes starting at start.
+        """
+        end = start + length
+        offset = 0
+        parts = []
+
+        async for chunk in self.stream_download(key, chunk_size=1024 * 1024):
+            chunk_end = offset + len(chunk)
+            if chunk_end > start:
+                parts.append(chunk[max(start - offset, 0) : end - offset])
+            offset = chunk_end
+            if offset >= end:
+                break
+
+        return b"".join(parts)
+
+    def local_path(self, key: str) -> Path | None:
+        """Get a local filesystem path for a file, if the backend has one.
+
+        Args:
+            key: Key/path of file.
+
+        Returns:
+            Path to the file, or None for remote backends.
+        """
+        return None
+
     @abstractmethod
     async def get_download_url(
         self,
@@ -3,6 +3,7 @@
 Provides storage operations using Google Cloud Storage.
 """
 
+import asyncio
 import hashlib
 import logging
 from collections.abc import AsyncIterator
@@ -235,6 +236,17 @@ class GCSStorageAdapter(StorageAdapter):
             yield chunk
             offset = end + 1
 
+    async def download_range(self, key: str, start: int, length: int) -> bytes:
+        """Download a byte range of a blob."""
+        if not self._bucket:
+            raise RuntimeError("GCS client not connected")
+        if length <= 0:
+            return b""
+
+        blob = self._bucket.blob(key)
+        # The GCS client blocks, so keep the request off the event loop
+        return await asyncio.to_thread(blob.download_as_bytes, start=start, end=start + length - 1)
+
     async def get_download_url(
         self,
         key: str,
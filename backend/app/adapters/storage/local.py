@@ -10,6 +10,7 @@ import os
 import shutil
 from collections.abc import AsyncIterator
 from datetime import datetime
+from pathlib import Path
 from typing import Any, BinaryIO
 
 import aiofiles
@@ -212,6 +213,22 @@ class LocalStorageAdapter(StorageAdapter):
             while chunk := await f.read(chunk_size):
                 yield chunk
 
+    async def download_range(self, key: str, start: int, length: int) -> bytes:
+        """Read a byte range of a file."""
+        full_path = self._full_path(key)
+
+        if not os.path.exists(full_path):
+            raise FileNotFoundError(f"File not found: {key}")
+
+        async with aiofiles.open(full_path, "rb") as f:
+            await f.seek(start)
+            return await f.read(length)
+
+    def local_path(self, key: str) -> Path | None:
+        """Get the filesystem path of a stored file."""
+        full_path = Path(self._full_path(key))
+        return full_path if full_path.exists() else None
+
     async def get_download_url(
         self,
         key: str,
@@ -4,6 +4,7 @@ Provides storage operations using Amazon S3 or S3-compatible storage
 (MinIO, DigitalOcean Spaces, Wasabi, etc.).
 """
 
+import asyncio
 import hashlib
 import logging
 from collections.abc import AsyncIterator
@@ -296,6 +297,24 @@ class S3StorageAdapter(StorageAdapter):
         while chunk := body.read(chunk_size):
             yield chunk
 
+    async def download_range(self, key: str, start: int, length: int) -> bytes:
+        """Download a byte range of an object."""
+        if not self._client:
+            raise RuntimeError("S3 client not connected")
+        if length <= 0:
+            return b""
+
+        def read_range() -> bytes:
+            response = self._client.get_object(
+                Bucket=self.config.bucket,
+                Key=key,
+                Range=f"bytes={start}-{start + length - 1}",
+            )
+            return response["Body"].read()
+
+        # boto3 blocks, so keep the request off the event loop
+        return await asyncio.to_thread(read_range)
+
     async def get_download_url(
         self,
         key: str,
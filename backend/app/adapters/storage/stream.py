@@ -0,0 +1,301 @@
+"""Reading stored evidence without a full local copy.
+
+RangeReader exposes a stored file as a seekable binary stream backed by
+ranged reads, fetching a few blocks ahead of the reader so sequential parsers
+can start as soon as the first block arrives. EvidenceCache keeps whole local
+copies of stored files, bounded in total size with least-recently-used
+eviction, for parsers that need random access or a real file path.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import io
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from app.adapters.storage.base import StorageAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+DEFAULT_READ_AHEAD = 2
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable, read-ahead stream over a file in storage.
+
+    Ranged reads are scheduled on the event loop that owns the storage
+    adapter, and reads block until their block arrives, so the reader must
+    be used from a worker thread (as ParserExecutor runs sync parsers), never
+    from the loop itself. Wrap it in io.BufferedReader for readline() and
+    small reads; open_range_stream() does this.
+    """
+
+    def __init__(
+        self,
+        storage: StorageAdapter,
+        key: str,
+        size: int,
+        loop: asyncio.AbstractEventLoop,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        read_ahead: int = DEFAULT_READ_AHEAD,
+        name: str | None = None,
+    ):
+        super().__init__()
+        self.storage = storage
+        self.key = key
+        self.size = size
+        self.block_size = block_size
+        self.read_ahead = read_ahead
+        self.name = name or key
+        self.blocks_fetched = 0
+
+        self._loop = loop
+        self._position = 0
+        self._blocks: OrderedDict[int, Future] = OrderedDict()
+        # Current block, the read-ahead window, and one block behind for small seeks back
+        self._max_blocks = read_ahead + 2
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self.size:
+            return 0
+
+        index, offset = divmod(self._position, self.block_size)
+        block = self._block(index)
+        chunk = memoryview(block)[offset : offset + len(buffer)]
+
+        count = len(chunk)
+        buffer[:count] = chunk
+        self._position += count
+        return count
+
+    def close(self) -> None:
+        for future in self._blocks.values():
+            future.cancel()
+        self._blocks.clear()
+        super().close()
+
+    def _block(self, index: int) -> bytes:
+        """Get a block, scheduling the read-ahead window behind it."""
+        future = self._fetch(index)
+
+        last_block = (self.size - 1) // self.block_size
+        for ahead in range(index + 1, min(index + self.read_ahead, last_block) + 1):
+            self._fetch(ahead)
+
+        while len(self._blocks) > self._max_blocks:
+            _, evicted = self._blocks.popitem(last=False)
+            evicted.cancel()
+
+        return future.result()
+
+    def _fetch(self, index: int) -> Future:
+        """Schedule the ranged read for a block unless it is already held."""
+        future = self._blocks.get(index)
+        if future is not None:
+            self._blocks.move_to_end(index)
+            return future
+
+        start = index * self.block_size
+        length = min(self.block_size, self.size - start)
+        future = asyncio.run_coroutine_threadsafe(
+            self.storage.download_range(self.key, start, length), self._loop
+        )
+        self._blocks[index] = future
+        self.blocks_fetched += 1
+        return future
+
+
+def open_range_stream(
+    storage: StorageAdapter,
+    key: str,
+    size: int,
+    loop: asyncio.AbstractEventLoop,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    read_ahead: int = DEFAULT_READ_AHEAD,
+    name: str | None = None,
+) -> io.BufferedReader:
+    """Open a buffered binary stream over a file in storage.
+
+    Args:
+        storage: Storage adapter holding the file
+        key: Storage key of the file
+        size: File size in bytes
+        loop: Event loop the storage adapter runs on
+        block_size: Size of each ranged read
+        read_ahead: Blocks fetched ahead of the reader
+        name: Name reported by the stream (defaults to the key)
+
+    Returns:
+        Seekable buffered reader
+    """
+    raw = RangeReader(storage, key, size, loop, block_size, read_ahead, name)
+    return io.BufferedReader(raw, buffer_size=min(block_size, 1024 * 1024))
+
+
+def _lock_shared(path: Path) -> int | None:
+    """Open a cached copy and take a shared lock on it.
+
+    Returns:
+        The locked descriptor, or None if the copy is not cached
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    fcntl.flock(fd, fcntl.LOCK_SH)
+    try:
+        # The copy may have been evicted while we waited for the lock
+        if os.stat(path).st_ino == os.fstat(fd).st_ino:
+            return fd
+    except FileNotFoundError:
+        pass
+    os.close(fd)
+    return None
+
+
+class EvidenceCache:
+    """Local copies of stored files, bounded in total size.
+
+    Files are keyed by storage key and version (etag, falling back to size)
+    and keep the original file extension, since some parsers check it. The
+    least recently used copies are deleted to make room for new ones.
+
+    A leased copy holds a shared flock until the lease ends, and eviction
+    skips locked copies, so a job in any worker process never loses the
+    file it is parsing. While copies are in use the cache may exceed its
+    bound.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _cache_path(self, key: str, version: str) -> Path:
+        digest = hashlib.sha256(f"{key}\0{version}".encode()).hexdigest()
+        return self.directory / f"{digest}{Path(key).suffix.lower()}"
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        storage: StorageAdapter,
+        key: str,
+        size: int,
+        etag: str | None = None,
+    ) -> AsyncIterator[Path]:
+        """Get a local copy of a stored file, downloading it if needed.
+
+        The copy is kept from eviction until the context exits.
+
+        Args:
+            storage: Storage adapter holding the file
+            key: Storage key of the file
+            size: File size in bytes
+            etag: Version of the file, if the backend reports one
+
+        Yields:
+            Path to the cached copy
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._cache_path(key, etag or str(size))
+
+        fd = _lock_shared(path)
+        if fd is not None:
+            os.utime(path)  # Mark as recently used
+            logger.debug(f"Evidence cache hit for {key}")
+        else:
+            fd = await self._download(storage, key, size, path)
+
+        try:
+            yield path
+        finally:
+            os.close(fd)
+
+    async def _download(self, storage: StorageAdapter, key: str, size: int, path: Path) -> int:
+        """Download a file into the cache.
+
+        Returns:
+            Descriptor holding a shared lock on the new copy
+        """
+        self._evict(size)
+
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.part")
+        try:
+            with open(partial, "wb") as f:
+                async for chunk in storage.stream_download(key, chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            # Lock before the copy becomes visible to eviction
+            fd = os.open(partial, os.O_RDONLY)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                os.replace(partial, path)
+            except BaseException:
+                os.close(fd)
+                raise
+        finally:
+            partial.unlink(missing_ok=True)
+
+        logger.info(f"Cached {key} ({size} bytes) at {path}")
+        return fd
+
+    def _evict(self, incoming: int) -> None:
+        """Delete least recently used copies not in use until incoming bytes fit."""
+        entries = []
+        for entry in self.directory.iterdir():
+            if entry.suffix == ".part" or not entry.is_file():
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total + incoming <= self.max_bytes:
+                break
+            try:
+                fd = os.open(entry, os.O_RDONLY)
+            except FileNotFoundError:
+                total -= size
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.debug(f"Kept {entry.name} in evidence cache while in use")
+                continue
+            else:
+                entry.unlink(missing_ok=True)
+                total -= size
+                logger.debug(f"Evicted {entry.name} from evidence cache")
+            finally:
+                os.close(fd)
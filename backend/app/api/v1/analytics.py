@@ -6,11 +6,12 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
+from redis.asyncio import Redis
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.auth import get_current_user
-from app.database import get_db
+from app.database import get_db, get_redis
 from app.models.analytics import (
     DetectionRule,
     RuleExecution,
@@ -24,6 +25,7 @@ from app.services.correlation_engine import get_correlation_engine
 from app.services.detection_engine import get_detection_engine
 from app.services.event_buffer import EVENT_STREAM, get_event_buffer
 from app.services.realtime_processor import get_realtime_processor
+from app.services.rule_cache import notify_rules_changed
 
 router = APIRouter()
 
@@ -357,6 +359,7 @@ async def create_rule(
     rule_data: RuleCreate,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
+    redis: Annotated[Redis, Depends(get_redis)],
 ) -> RuleResponse:
     """Create a new detection rule."""
     rule = DetectionRule(
@@ -390,6 +393,7 @@ async def create_rule(
     db.add(rule)
     await db.commit()
     await db.refresh(rule)
+    await notify_rules_changed(redis, rule.id, "created")
 
     return RuleResponse(
         id=rule.id,
@@ -430,6 +434,7 @@ async def update_rule(
     updates: RuleUpdate,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
+    redis: Annotated[Redis, Depends(get_redis)],
 ) -> RuleResponse:
     """Update a detection rule."""
     query = select(DetectionRule).where(DetectionRule.id == rule_id)
@@ -454,6 +459,7 @@ async def update_rule(
 
     await db.commit()
     await db.refresh(rule)
+    await notify_rules_changed(redis, rule.id, "updated")
 
     return RuleResponse(
         id=rule.id,
@@ -493,6 +499,7 @@ async def delete_rule(
     rule_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
+    redis: Annotated[Redis, Depends(get_redis)],
 ) -> None:
     """Delete a detection rule."""
     query = select(DetectionRule).where(DetectionRule.id == rule_id)
@@ -507,6 +514,7 @@ async def delete_rule(
 
     await db.delete(rule)
     await db.commit()
+    await notify_rules_changed(redis, rule_id, "deleted")
 
 
 @router.post("/rules/{rule_id}/enable", response_model=RuleResponse)
@@ -514,6 +522,7 @@ async def enable_rule(
     rule_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
+    redis: Annotated[Redis, Depends(get_redis)],
 ) -> RuleResponse:
     """Enable a detection rule."""
     query = select(DetectionRule).where(DetectionRule.id == rule_id)
@@ -529,6 +538,7 @@ async def enable_rule(
     rule.status = RuleStatus.ENABLED
     await db.commit()
     await db.refresh(rule)
+    await notify_rules_changed(redis, rule.id, "enabled")
 
     return RuleResponse(
         id=rule.id,
@@ -568,6 +578,7 @@ async def disable_rule(
     rule_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
+    redis: Annotated[Redis, Depends(get_redis)],
 ) -> RuleResponse:
     """Disable a detection rule."""
     query = select(DetectionRule).where(DetectionRule.id == rule_id)
@@ -583,6 +594,7 @@ async def disable_rule(
     rule.status = RuleStatus.DISABLED
     await db.commit()
     await db.refresh(rule)
+    await notify_rules_changed(redis, rule.id, "disabled")
 
     return RuleResponse(
         id=rule.id,
@@ -1080,6 +1092,7 @@ async def create_rule_from_template(
     name: str = Query(..., min_length=1, max_length=255),
     db: Annotated[AsyncSession, Depends(get_db)] = None,
     current_user: Annotated[User, Depends(get_current_user)] = None,
+    redis: Annotated[Redis, Depends(get_redis)] = None,
 ) -> RuleResponse:
     """Create a correlation rule from a template."""
     # Find template
@@ -1108,6 +1121,7 @@ async def create_rule_from_template(
     db.add(rule)
     await db.commit()
     await db.refresh(rule)
+    await notify_rules_changed(redis, rule.id, "created")
 
     return RuleResponse(
         id=rule.id,
@@ -19,6 +19,7 @@ from app.database import get_db
 from app.models.evidence import Evidence
 from app.models.parsing_job import ParsingJob, ParsingJobStatus
 from app.models.user import User
+from app.parsers.filtering import EventFilter
 from app.parsers.registry import get_registry, load_builtin_parsers
 
 logger = logging.getLogger(__name__)
@@ -114,6 +115,14 @@ async def submit_parsing_job(
             detail=f"Evidence {request.evidence_id} not found",
         )
 
+    try:
+        EventFilter.from_config(request.config or {})
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid event filter: {e}",
+        ) from e
+
     # Ensure parsers are loaded
     load_builtin_parsers()
 
@@ -370,6 +379,69 @@ async def cancel_parsing_job(
     )
 
 
+@router.post("/jobs/{job_id}/resume", response_model=ParsingJobResponse)
+async def resume_parsing_job(
+    job_id: UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> ParsingJobResponse:
+    """Re-queue a failed or cancelled parsing job.
+
+    The job continues from its last checkpoint, so events that were already
+    indexed are not parsed into the index again.
+    """
+    job = await db.get(ParsingJob, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Parsing job {job_id} not found",
+        )
+
+    if job.status not in (ParsingJobStatus.FAILED, ParsingJobStatus.CANCELLED):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot resume job in {job.status.value} status",
+        )
+
+    from app.tasks.parsing import parse_evidence
+
+    task = parse_evidence.apply_async(
+        kwargs={
+            "job_id": str(job.id),
+            "evidence_id": str(job.evidence_id),
+            "case_id": str(job.case_id),
+            "parser_hint": job.parser_hint,
+            "config": job.config or {},
+        },
+    )
+    job.mark_queued(task.id)
+    job.error_message = None
+    await db.commit()
+
+    logger.info(
+        f"Resumed parsing job {job_id} from record {(job.checkpoint or {}).get('records', 0)}"
+    )
+
+    return ParsingJobResponse(
+        id=job.id,
+        evidence_id=job.evidence_id,
+        case_id=job.case_id,
+        celery_task_id=job.celery_task_id,
+        parser_type=job.parser_type,
+        status=job.status,
+        events_parsed=job.events_parsed,
+        events_indexed=job.events_indexed,
+        events_failed=job.events_failed,
+        progress_percent=job.progress_percent,
+        error_message=job.error_message,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        duration_seconds=job.duration_seconds,
+        results_summary=job.results_summary,
+    )
+
+
 @router.get("/parsers", response_model=ParsersListResponse)
 async def list_parsers(
     current_user: Annotated[User, Depends(get_current_user)],
@@ -252,6 +252,41 @@ class Settings(BaseSettings):
     wef_use_https: bool = False
     wef_https_port: int = 5986
 
+    # ==========================================================================
+    # Evidence Parsing
+    # ==========================================================================
+
+    # Split parsing of large line-oriented files across a process pool
+    parsing_split_enabled: bool = True
+    parsing_split_min_bytes: int = 256 * 1024 * 1024  # Smaller files are parsed serially
+    parsing_split_range_bytes: int = 32 * 1024 * 1024  # Target size of each parsed range
+    parsing_split_workers: int = 0  # 0 = one worker per CPU
+
+    # Bulk indexing of parsed events
+    parsing_bulk_concurrency: int = 4  # Bulk requests in flight per job
+    parsing_bulk_max_docs: int = 5000  # Upper bound for the adaptive batch size
+    parsing_bulk_max_bytes: int = 10 * 1024 * 1024  # Serialized size limit per request
+    parsing_bulk_max_retries: int = 5  # Retries for rejected (429) documents
+    parsing_checkpoint_batches: int = 20  # Bulk batches between resumable checkpoints
+
+    # Parsing evidence held in object storage (S3, Azure, GCS)
+    parsing_stream_block_bytes: int = 8 * 1024 * 1024  # Size of each ranged read
+    parsing_stream_read_ahead: int = 2  # Blocks fetched ahead of the parser
+    parsing_cache_dir: str = "/tmp/eleanor-evidence-cache"  # Copies for random-access parsers
+    parsing_cache_max_bytes: int = 20 * 1024 * 1024 * 1024  # LRU bound for cached copies
+
+    # Evidence archives (triage collections) parsed member by member
+    parsing_archive_enabled: bool = True
+    parsing_archive_workers: int = 4  # Members parsed concurrently
+    parsing_archive_spool_bytes: int = 64 * 1024 * 1024  # Tar/7z members held in memory
+    parsing_archive_processes: bool = True  # Parse members in worker processes
+
+    # Disk images triaged through dissect.target, artifact by artifact
+    parsing_image_enabled: bool = True
+    parsing_image_workers: int = 4  # Artifacts parsed concurrently
+    parsing_image_spool_bytes: int = 64 * 1024 * 1024  # Artifacts held in memory
+    parsing_image_processes: bool = True  # Parse artifacts in worker processes
+
     # ==========================================================================
     # Detection Engines
     # ==========================================================================
@@ -265,6 +300,13 @@ class Settings(BaseSettings):
     sigma_enabled: bool = True
     sigma_rules_path: str = "/app/sigma-rules"
     sigma_pipeline: str = "ecs_windows"
+    sigma_cache_path: str = ""  # Parsed and compiled rules cache file
+    sigma_load_workers: int = 4  # Processes parsing rule files on a cold load
+
+    # Real-time processing
+    realtime_rule_cache_ttl: int = 300  # Seconds before cached rules are reloaded
+    correlation_state_backend: str = "redis"  # Open correlation windows: redis or memory
+    correlation_state_max_events: int = 100  # Event references retained per window
 
 
 @lru_cache
@@ -0,0 +1,116 @@
+"""On-disk cache of parsed and compiled Sigma rules.
+
+Parsing and compiling a full Sigma rule repository takes seconds, and
+every worker does it at startup. SigmaEngine keeps the parsed rules and
+compiled matcher trees of each rule file, keyed by the file's path, size
+and modification time, and saves them to a cache file. A (re)load then
+only parses files that were added or changed since: files whose stat
+changed are re-read, and are only re-parsed if their content digest
+changed too.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.detection.sigma_compiler import CompiledRule
+    from app.detection.sigma_engine import SigmaRule
+
+logger = logging.getLogger(__name__)
+
+# Bump when SigmaRule or the compiled matcher classes change shape
+CACHE_VERSION = 1
+
+RULE_FILE_SUFFIXES = (".yml", ".yaml")
+
+
+@dataclass
+class RuleFile:
+    """Rules parsed from one rule file, with the file state they came from."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    digest: str
+    rules: list[tuple["SigmaRule", "CompiledRule | None"]] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def stat(self) -> tuple[int, int]:
+        """Size and modification time of the file when it was parsed."""
+        return self.size, self.mtime_ns
+
+
+def scan_rule_files(rules_path: Path) -> dict[str, tuple[int, int]]:
+    """Find the rule files under a directory.
+
+    Args:
+        rules_path: Rules directory
+
+    Returns:
+        Size and modification time per file path, .yml files first
+    """
+    files: dict[str, tuple[int, int]] = {}
+    for suffix in RULE_FILE_SUFFIXES:
+        for rule_file in sorted(rules_path.rglob(f"*{suffix}")):
+            try:
+                stat = rule_file.stat()
+            except OSError:
+                continue
+            files[str(rule_file)] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def file_digest(content: bytes) -> str:
+    """Digest identifying a rule file's content."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def load_rule_cache(cache_path: Path, rules_path: Path) -> dict[str, RuleFile]:
+    """Load cached rule files.
+
+    Args:
+        cache_path: Cache file
+        rules_path: Rules directory the cache must have been built from
+
+    Returns:
+        Cached rule files by path, empty if there is no usable cache
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            data: dict[str, Any] = pickle.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable Sigma rule cache {cache_path}: {e}")
+        return {}
+
+    if data.get("version") != CACHE_VERSION or data.get("rules_path") != str(rules_path):
+        return {}
+    return data["files"]
+
+
+def save_rule_cache(cache_path: Path, rules_path: Path, files: dict[str, RuleFile]) -> None:
+    """Write rule files to the cache, replacing it atomically.
+
+    Args:
+        cache_path: Cache file
+        rules_path: Rules directory the files were loaded from
+        files: Rule files by path
+    """
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"version": CACHE_VERSION, "rules_path": str(rules_path), "files": files}
+    fd, temp_name = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_name, cache_path)
+    except Exception:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,740 @@
+"""Compilation of Sigma rules into matcher trees.
+
+SigmaEngine compiles every rule once, when it is loaded, into a tree of
+small matcher objects: field matchers with their path, modifiers and
+pre-lowered literals or compiled regexes, selections built from them, and
+the parsed condition on top. Matching an event then only walks that tree;
+nothing is re-parsed, re-lowered or re-compiled per event.
+
+An EventContext wraps the event being matched and caches each field's
+stringified, lowered values, so a field tested by many rules is looked up
+and converted once per event.
+
+An EventBatch does the same for a block of events, column by column: each
+referenced field is extracted once into its distinct values and the rows
+holding each of them, value matchers run once per distinct value, and
+selections and conditions combine row bitmaps (Python ints, bit i for the
+i-th event) with &, | and ~.
+
+Matchers are plain slotted classes rather than closures so that compiled
+rules can be pickled.
+"""
+
+import ipaddress
+import re
+from typing import Any
+
+# Modifiers that rewrite a value into a pattern
+_PATTERN_MODIFIERS = ("contains", "startswith", "endswith")
+# Modifiers written in front of the value ("endswith|.exe"), as accepted by
+# earlier versions of the engine
+_LEGACY_VALUE_MODIFIERS = ("contains", "startswith", "endswith", "re")
+_NUMERIC_MODIFIERS = {
+    "lt": lambda value, bound: value < bound,
+    "lte": lambda value, bound: value <= bound,
+    "gt": lambda value, bound: value > bound,
+    "gte": lambda value, bound: value >= bound,
+}
+
+_CONDITION_TOKEN = re.compile(r"\(|\)|\|[^\n]*|[^\s()|]+")
+
+
+class SigmaCompileError(ValueError):
+    """Raised when a rule uses a construct the compiler does not support."""
+
+
+class EventContext:
+    """An event being matched, with per-field value caches.
+
+    Field values are looked up by their full name first (flattened ECS
+    documents) and then as a dotted path. Values are returned as a list of
+    strings, one per element for list values, lowered unless cased.
+    """
+
+    __slots__ = ("event", "_values", "_keywords")
+
+    def __init__(self, event: dict[str, Any]):
+        self.event = event
+        self._values: dict[tuple[str, bool], list[str] | None] = {}
+        self._keywords: list[str] | None = None
+
+    def raw(self, field: "FieldPath") -> Any:
+        """Get a field's value as stored in the event, or None."""
+        event = self.event
+        if field.name in event:
+            return event[field.name]
+        value: Any = event
+        for part in field.parts:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+            if value is None:
+                return None
+        return value
+
+    def values(self, field: "FieldPath", cased: bool = False) -> list[str] | None:
+        """Get a field's values as strings, or None if the field is missing."""
+        key = (field.name, cased)
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        value = self.raw(field)
+        if value is None:
+            strings = None
+        else:
+            items = value if isinstance(value, list) else [value]
+            strings = [_to_string(item) for item in items if item is not None]
+            if not cased:
+                strings = [item.lower() for item in strings]
+        self._values[key] = strings
+        return strings
+
+    def keywords(self) -> list[str]:
+        """Lowered string values of every field, for keyword selections."""
+        if self._keywords is None:
+            self._keywords = []
+            _collect_strings(self.event, self._keywords)
+        return self._keywords
+
+
+def _to_string(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _collect_strings(value: Any, out: list[str]) -> None:
+    if isinstance(value, dict):
+        for item in value.values():
+            _collect_strings(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_strings(item, out)
+    elif value is not None:
+        out.append(_to_string(value).lower())
+
+
+class FieldPath:
+    """A field name with its dotted path split once."""
+
+    __slots__ = ("name", "parts")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.parts = tuple(name.split("."))
+
+    def __getstate__(self) -> tuple[str, tuple[str, ...]]:
+        return self.name, self.parts
+
+    def __setstate__(self, state: tuple[str, tuple[str, ...]]) -> None:
+        self.name, self.parts = state
+
+
+class EventBatch:
+    """A block of events matched together, column by column.
+
+    Columns map each distinct value of a field to the bitmap of rows
+    holding it. Value matcher results are cached per column, so matchers
+    shared by many rules (the same EventID, the same image name) are run
+    once per batch.
+    """
+
+    __slots__ = ("events", "size", "all_rows", "_contexts", "_columns", "_results")
+
+    def __init__(self, events: list[dict[str, Any]]):
+        self.events = events
+        self.size = len(events)
+        self.all_rows = (1 << self.size) - 1
+        self._contexts = [EventContext(event) for event in events]
+        self._columns: dict[tuple[str | None, bool], tuple[dict[str, int], int]] = {}
+        self._results: dict[tuple[Any, ...], int] = {}
+
+    def column(self, field: "FieldPath | None", cased: bool = False) -> tuple[dict[str, int], int]:
+        """Extract a field into a column.
+
+        Args:
+            field: Field to extract, or None for keyword search over all values
+            cased: Keep values in their original case
+
+        Returns:
+            Rows bitmap per distinct value, and bitmap of rows having the field
+        """
+        key = (field.name if field is not None else None, cased)
+        column = self._columns.get(key)
+        if column is None:
+            rows: dict[str, list[int]] = {}
+            present: list[int] = []
+            for row, context in enumerate(self._contexts):
+                values = context.keywords() if field is None else context.values(field, cased)
+                if values is None:
+                    continue
+                present.append(row)
+                for value in set(values):
+                    rows.setdefault(value, []).append(row)
+            column = (
+                {value: self._bitmap(value_rows) for value, value_rows in rows.items()},
+                self._bitmap(present),
+            )
+            self._columns[key] = column
+        return column
+
+    def value_rows(self, field: "FieldPath | None", cased: bool, matcher: Any) -> int:
+        """Get the rows of a column matched by a value matcher."""
+        key = (
+            field.name if field is not None else None,
+            cased,
+            type(matcher),
+            matcher.__getstate__(),
+        )
+        result = self._results.get(key)
+        if result is None:
+            result = 0
+            values, _ = self.column(field, cased)
+            for value, rows in values.items():
+                if matcher.match(value):
+                    result |= rows
+            self._results[key] = result
+        return result
+
+    def _bitmap(self, rows: list[int]) -> int:
+        if len(rows) < 64:
+            result = 0
+            for row in rows:
+                result |= 1 << row
+            return result
+        buffer = bytearray((self.size + 7) // 8)
+        for row in rows:
+            buffer[row >> 3] |= 1 << (row & 7)
+        return int.from_bytes(buffer, "little")
+
+
+def bitmap_rows(bitmap: int) -> list[int]:
+    """List the rows set in a match bitmap."""
+    return [row for row, bit in enumerate(reversed(bin(bitmap)[2:])) if bit == "1"]
+
+
+# Value matchers: match(value) tests one string, already lowered unless the
+# field matcher is cased.
+
+
+class _Slotted:
+    """Pickling support for slotted matchers."""
+
+    __slots__ = ()
+
+    def __getstate__(self) -> tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        for name, value in zip(self.__slots__, state, strict=True):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        args = ", ".join(repr(getattr(self, name)) for name in self.__slots__)
+        return f"{type(self).__name__}({args})"
+
+
+class Equals(_Slotted):
+    __slots__ = ("literal",)
+
+    def __init__(self, literal: str):
+        self.literal = literal
+
+    def match(self, value: str) -> bool:
+        return value == self.literal
+
+
+class Contains(_Slotted):
+    __slots__ = ("literal",)
+
+    def __init__(self, literal: str):
+        self.literal = literal
+
+    def match(self, value: str) -> bool:
+        return self.literal in value
+
+
+class StartsWith(_Slotted):
+    __slots__ = ("literal",)
+
+    def __init__(self, literal: str):
+        self.literal = literal
+
+    def match(self, value: str) -> bool:
+        return value.startswith(self.literal)
+
+
+class EndsWith(_Slotted):
+    __slots__ = ("literal",)
+
+    def __init__(self, literal: str):
+        self.literal = literal
+
+    def match(self, value: str) -> bool:
+        return value.endswith(self.literal)
+
+
+class Pattern(_Slotted):
+    """Compiled regex; search for re values, full match for wildcards.
+
+    anchor is a substring every match contains, the longest literal run of
+    a wildcard value, or empty if there is none.
+    """
+
+    __slots__ = ("regex", "full", "anchor")
+
+    def __init__(self, regex: re.Pattern, full: bool, anchor: str = ""):
+        self.regex = regex
+        self.full = full
+        self.anchor = anchor
+
+    def match(self, value: str) -> bool:
+        if self.full:
+            return self.regex.fullmatch(value) is not None
+        return self.regex.search(value) is not None
+
+
+class Numeric(_Slotted):
+    __slots__ = ("op", "bound")
+
+    def __init__(self, op: str, bound: float):
+        self.op = op
+        self.bound = bound
+
+    def match(self, value: str) -> bool:
+        try:
+            return _NUMERIC_MODIFIERS[self.op](float(value), self.bound)
+        except ValueError:
+            return False
+
+
+class Cidr(_Slotted):
+    __slots__ = ("network",)
+
+    def __init__(self, network: ipaddress.IPv4Network | ipaddress.IPv6Network):
+        self.network = network
+
+    def match(self, value: str) -> bool:
+        try:
+            return ipaddress.ip_address(value) in self.network
+        except ValueError:
+            return False
+
+
+# Selection matchers: matches(ctx) evaluates against an EventContext, and
+# matches_batch(batch) returns the bitmap of matching rows of an EventBatch.
+
+
+class FieldMatcher(_Slotted):
+    """One "field|modifiers: values" entry of a selection.
+
+    Matches if any event value matches any of the values, or every value
+    with the all modifier. A null value matches a missing field; exists
+    tests presence only.
+    """
+
+    __slots__ = ("field", "matchers", "match_all", "cased", "null", "exists")
+
+    def __init__(
+        self,
+        field: FieldPath,
+        matchers: list[Any],
+        match_all: bool = False,
+        cased: bool = False,
+        null: bool = False,
+        exists: bool | None = None,
+    ):
+        self.field = field
+        self.matchers = tuple(matchers)
+        self.match_all = match_all
+        self.cased = cased
+        self.null = null
+        self.exists = exists
+
+    def matches(self, ctx: EventContext) -> bool:
+        values = ctx.values(self.field, self.cased)
+        if self.exists is not None:
+            return (values is not None) == self.exists
+        if values is None:
+            return self.null
+        if self.match_all:
+            return all(any(m.match(value) for value in values) for m in self.matchers)
+        for matcher in self.matchers:
+            for value in values:
+                if matcher.match(value):
+                    return True
+        return False
+
+    def matches_batch(self, batch: EventBatch) -> int:
+        _, present = batch.column(self.field, self.cased)
+        if self.exists is not None:
+            return present if self.exists else batch.all_rows & ~present
+        rows = batch.all_rows & ~present if self.null else 0
+        if self.match_all:
+            matched = present
+            for matcher in self.matchers:
+                if not matched:
+                    break
+                matched &= batch.value_rows(self.field, self.cased, matcher)
+            return rows | matched
+        for matcher in self.matchers:
+            rows |= batch.value_rows(self.field, self.cased, matcher)
+        return rows
+
+
+class Keywords(_Slotted):
+    """Keyword list: any value matches any string anywhere in the event."""
+
+    __slots__ = ("matchers",)
+
+    def __init__(self, matchers: list[Any]):
+        self.matchers = tuple(matchers)
+
+    def matches(self, ctx: EventContext) -> bool:
+        strings = ctx.keywords()
+        return any(m.match(value) for m in self.matchers for value in strings)
+
+    def matches_batch(self, batch: EventBatch) -> int:
+        rows = 0
+        for matcher in self.matchers:
+            rows |= batch.value_rows(None, False, matcher)
+        return rows
+
+
+class AllOf(_Slotted):
+    __slots__ = ("children",)
+
+    def __init__(self, children: list[Any]):
+        self.children = tuple(children)
+
+    def matches(self, ctx: EventContext) -> bool:
+        for child in self.children:
+            if not child.matches(ctx):
+                return False
+        return True
+
+    def matches_batch(self, batch: EventBatch) -> int:
+        rows = batch.all_rows
+        for child in self.children:
+            if not rows:
+                break
+            rows &= child.matches_batch(batch)
+        return rows
+
+
+class AnyOf(_Slotted):
+    __slots__ = ("children",)
+
+    def __init__(self, children: list[Any]):
+        self.children = tuple(children)
+
+    def matches(self, ctx: EventContext) -> bool:
+        for child in self.children:
+            if child.matches(ctx):
+                return True
+        return False
+
+    def matches_batch(self, batch: EventBatch) -> int:
+        rows = 0
+        for child in self.children:
+            if rows == batch.all_rows:
+                break
+            rows |= child.matches_batch(batch)
+        return rows
+
+
+class Not(_Slotted):
+    __slots__ = ("child",)
+
+    def __init__(self, child: Any):
+        self.child = child
+
+    def matches(self, ctx: EventContext) -> bool:
+        return not self.child.matches(ctx)
+
+    def matches_batch(self, batch: EventBatch) -> int:
+        return batch.all_rows & ~self.child.matches_batch(batch)
+
+
+class Never(_Slotted):
+    __slots__ = ()
+
+    def matches(self, ctx: EventContext) -> bool:
+        return False
+
+    def matches_batch(self, batch: EventBatch) -> int:
+        return 0
+
+
+class CompiledRule(_Slotted):
+    """A rule's condition tree, plus the fields its selections read."""
+
+    __slots__ = ("rule_id", "condition", "selections", "fields")
+
+    def __init__(
+        self,
+        rule_id: str,
+        condition: Any,
+        selections: dict[str, Any],
+        fields: list[FieldPath],
+    ):
+        self.rule_id = rule_id
+        self.condition = condition
+        self.selections = selections
+        self.fields = tuple(fields)
+
+    def matches(self, ctx: EventContext) -> bool:
+        return self.condition.matches(ctx)
+
+    def matches_batch(self, batch: EventBatch) -> int:
+        return self.condition.matches_batch(batch)
+
+
+def compile_rule(rule_id: str, detection: dict[str, Any]) -> CompiledRule:
+    """Compile a rule's detection section.
+
+    Args:
+        rule_id: ID of the rule
+        detection: The rule's detection mapping, with its condition
+
+    Returns:
+        Compiled rule
+
+    Raises:
+        SigmaCompileError: If the detection uses unsupported constructs
+    """
+    condition = detection.get("condition")
+    if isinstance(condition, list):
+        condition = " or ".join(f"({part})" for part in condition)
+    if not condition or not isinstance(condition, str):
+        raise SigmaCompileError("Rule has no condition")
+
+    fields: dict[str, FieldPath] = {}
+    selections = {
+        name: _compile_selection(value, fields)
+        for name, value in detection.items()
+        if name != "condition"
+    }
+    tree = _ConditionParser(condition, selections).parse()
+    return CompiledRule(rule_id, tree, selections, list(fields.values()))
+
+
+def _compile_selection(value: Any, fields: dict[str, FieldPath]) -> Any:
+    if isinstance(value, dict):
+        return AllOf([_compile_field(key, item, fields) for key, item in value.items()])
+    if isinstance(value, list):
+        maps = [item for item in value if isinstance(item, dict)]
+        keywords = [item for item in value if not isinstance(item, (dict, list))]
+        children = [_compile_selection(item, fields) for item in maps]
+        if keywords:
+            children.append(
+                Keywords([m for item in keywords for m in _compile_value(item, [], False)])
+            )
+        return AnyOf(children)
+    if isinstance(value, (str, int, float)):
+        return Keywords(_compile_value(value, [], False))
+    return Never()
+
+
+def _compile_field(key: str, value: Any, fields: dict[str, FieldPath]) -> FieldMatcher:
+    name, *modifiers = str(key).split("|")
+    field = fields.setdefault(name, FieldPath(name))
+
+    match_all = "all" in modifiers
+    cased = "cased" in modifiers
+    modifiers = [m for m in modifiers if m not in ("all", "cased")]
+
+    if "exists" in modifiers:
+        return FieldMatcher(field, [], exists=bool(value))
+
+    values = value if isinstance(value, list) else [value]
+    null = any(item is None for item in values)
+    matchers = []
+    for item in values:
+        if item is not None:
+            matchers.extend(_compile_value(item, modifiers, cased))
+    return FieldMatcher(field, matchers, match_all=match_all, cased=cased, null=null)
+
+
+def _compile_value(value: Any, modifiers: list[str], cased: bool) -> list[Any]:
+    """Compile one value of a field into value matchers."""
+    text = _to_string(value)
+    text_lower = text if cased else text.lower()
+
+    if not modifiers and "|" in text_lower:
+        prefix, rest = text_lower.split("|", 1)
+        if prefix in _LEGACY_VALUE_MODIFIERS:
+            modifiers = [prefix]
+            text = text.split("|", 1)[1]
+            text_lower = rest
+
+    if not modifiers:
+        return [_wildcard_matcher(text_lower, "", "")]
+
+    modifier = modifiers[0]
+    if len(modifiers) > 1:
+        raise SigmaCompileError(f"Unsupported modifier chain: {'|'.join(modifiers)}")
+
+    if modifier == "contains":
+        return [_wildcard_matcher(text_lower, "*", "*")]
+    if modifier == "startswith":
+        return [_wildcard_matcher(text_lower, "", "*")]
+    if modifier == "endswith":
+        return [_wildcard_matcher(text_lower, "*", "")]
+    if modifier == "re":
+        flags = 0 if cased else re.IGNORECASE
+        try:
+            return [Pattern(re.compile(text, flags), full=False)]
+        except re.error as e:
+            raise SigmaCompileError(f"Invalid regex {text!r}: {e}") from e
+    if modifier in _NUMERIC_MODIFIERS:
+        try:
+            return [Numeric(modifier, float(text))]
+        except ValueError as e:
+            raise SigmaCompileError(f"Invalid number for {modifier}: {text!r}") from e
+    if modifier == "cidr":
+        try:
+            return [Cidr(ipaddress.ip_network(text, strict=False))]
+        except ValueError as e:
+            raise SigmaCompileError(f"Invalid network {text!r}: {e}") from e
+    raise SigmaCompileError(f"Unsupported modifier: {modifier}")
+
+
+def _wildcard_matcher(text: str, prefix: str, suffix: str) -> Any:
+    """Build the cheapest matcher for a value with Sigma wildcards.
+
+    * and ? are wildcards unless escaped with a backslash. Values without
+    wildcards become plain string comparisons.
+    """
+    literal, regex, wild, anchor = _parse_wildcards(text)
+    if not wild:
+        if prefix and suffix:
+            return Contains(literal)
+        if suffix:
+            return StartsWith(literal)
+        if prefix:
+            return EndsWith(literal)
+        return Equals(literal)
+    regex = (".*" if prefix else "") + regex + (".*" if suffix else "")
+    return Pattern(re.compile(regex, re.DOTALL), full=True, anchor=anchor)
+
+
+def _parse_wildcards(text: str) -> tuple[str, str, bool, str]:
+    """Split a Sigma value into its unescaped literal, regex and wildcard flag.
+
+    Also returns the longest run of literal characters between wildcards.
+    """
+    literal: list[str] = []
+    regex: list[str] = []
+    wild = False
+    run: list[str] = []
+    anchor = ""
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text) and text[i + 1] in "*?\\":
+            literal.append(text[i + 1])
+            run.append(text[i + 1])
+            regex.append(re.escape(text[i + 1]))
+            i += 2
+            continue
+        if char in "*?":
+            wild = True
+            regex.append(".*" if char == "*" else ".")
+            if len(run) > len(anchor):
+                anchor = "".join(run)
+            run = []
+        else:
+            literal.append(char)
+            run.append(char)
+            regex.append(re.escape(char))
+        i += 1
+    if len(run) > len(anchor):
+        anchor = "".join(run)
+    return "".join(literal), "".join(regex), wild, anchor
+
+
+class _ConditionParser:
+    """Recursive-descent parser for Sigma condition expressions.
+
+    Supports and, or, not, parentheses, selection names, and "1 of",
+    "any of" and "all of" over "them" or a selection name pattern.
+    Aggregations ("| count() > 5") are rejected.
+    """
+
+    def __init__(self, condition: str, selections: dict[str, Any]):
+        self.tokens = _CONDITION_TOKEN.findall(condition)
+        self.pos = 0
+        self.selections = selections
+        self.by_lower = {name.lower(): name for name in selections}
+
+    def parse(self) -> Any:
+        if not self.tokens:
+            raise SigmaCompileError("Empty condition")
+        node = self._or()
+        if self.pos != len(self.tokens):
+            token = self.tokens[self.pos]
+            if token.startswith("|"):
+                raise SigmaCompileError(f"Unsupported aggregation: {token}")
+            raise SigmaCompileError(f"Unexpected token in condition: {token}")
+        return node
+
+    def _peek(self) -> str | None:
+        return self.tokens[self.pos].lower() if self.pos < len(self.tokens) else None
+
+    def _next(self) -> str:
+        if self.pos >= len(self.tokens):
+            raise SigmaCompileError("Unexpected end of condition")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _or(self) -> Any:
+        children = [self._and()]
+        while self._peek() == "or":
+            self.pos += 1
+            children.append(self._and())
+        return children[0] if len(children) == 1 else AnyOf(children)
+
+    def _and(self) -> Any:
+        children = [self._not()]
+        while self._peek() == "and":
+            self.pos += 1
+            children.append(self._not())
+        return children[0] if len(children) == 1 else AllOf(children)
+
+    def _not(self) -> Any:
+        if self._peek() == "not":
+            self.pos += 1
+            return Not(self._not())
+        return self._primary()
+
+    def _primary(self) -> Any:
+        token = self._next()
+        lower = token.lower()
+        if token == "(":
+            node = self._or()
+            if self._next() != ")":
+                raise SigmaCompileError("Unbalanced parentheses in condition")
+            return node
+        if lower in ("1", "any", "all") and self._peek() == "of":
+            self.pos += 1
+            targets = self._targets(self._next())
+            return AllOf(targets) if lower == "all" else AnyOf(targets)
+        return self.selections[self._name(token)]
+
+    def _name(self, token: str) -> str:
+        if token in self.selections:
+            return token
+        if token.lower() in self.by_lower:
+            return self.by_lower[token.lower()]
+        raise SigmaCompileError(f"Unknown selection in condition: {token}")
+
+    def _targets(self, pattern: str) -> list[Any]:
+        if pattern.lower() == "them":
+            return [sel for name, sel in self.selections.items() if not name.startswith("_")]
+        _, regex, _, _ = _parse_wildcards(pattern.lower())
+        compiled = re.compile(regex, re.DOTALL)
+        return [sel for name, sel in self.selections.items() if compiled.fullmatch(name.lower())]
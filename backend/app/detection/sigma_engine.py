@@ -10,14 +10,37 @@ Provides:
 - Detection result processing
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+from app.config import get_settings
+from app.detection.sigma_cache import (
+    RuleFile,
+    file_digest,
+    load_rule_cache,
+    save_rule_cache,
+    scan_rule_files,
+)
+from app.detection.sigma_compiler import (
+    CompiledRule,
+    EventBatch,
+    EventContext,
+    SigmaCompileError,
+    compile_rule,
+)
+from app.detection.sigma_index import SigmaRuleIndex
+from app.utils.process_pool import ProcessPool
+
 logger = logging.getLogger(__name__)
 
+# Below this many changed rule files, parsing in a process pool costs more
+# than it saves
+PARALLEL_LOAD_MIN_FILES = 64
+
 
 @dataclass
 class SigmaRule:
@@ -105,33 +128,50 @@ class SigmaEngine:
     Configuration:
         rules_path: Path to Sigma rules directory
         pipeline: Processing pipeline for field mapping
+        cache_path: File caching parsed and compiled rules across restarts
+        load_workers: Processes parsing rule files on a cold load
 
     DESIGN DECISION: Uses pySigma for rule parsing and conversion,
-    with custom matching logic for real-time detection.
+    with custom matching logic for real-time detection. Rules are compiled
+    into matcher trees when loaded (see sigma_compiler), so matching an
+    event does no parsing.
     """
 
     def __init__(
         self,
         rules_path: str | Path | None = None,
         pipeline: str = "ecs_windows",
+        cache_path: str | Path | None = None,
+        load_workers: int = 4,
     ):
         """Initialize Sigma engine.
 
         Args:
             rules_path: Path to Sigma rules directory
             pipeline: Field mapping pipeline name
+            cache_path: Optional file caching parsed and compiled rules
+            load_workers: Processes parsing rule files on a cold load
         """
         self.rules_path = Path(rules_path) if rules_path else None
         self.pipeline_name = pipeline
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.load_workers = load_workers
 
         self._rules: dict[str, SigmaRule] = {}
-        self._compiled_rules: dict[str, Any] = {}
+        self._compiled_rules: dict[str, CompiledRule | None] = {}
+        self._index: SigmaRuleIndex | None = None
+        self._files: dict[str, RuleFile] = {}
         self._pipeline = None
         self._last_loaded: datetime | None = None
 
     async def load_rules(self) -> int:
         """Load Sigma rules from directory.
 
+        Only rule files added or changed since the last load, or since the
+        rules were cached, are parsed and compiled; the rest are reused.
+        Files are read and parsed off the event loop, and in a process pool
+        when there are many.
+
         Returns:
             Number of rules loaded
         """
@@ -141,58 +181,81 @@ class SigmaEngine:
         if not self.rules_path.exists():
             raise ValueError(f"Rules path does not exist: {self.rules_path}")
 
+        current = await asyncio.to_thread(scan_rule_files, self.rules_path)
+        if not self._files and self.cache_path:
+            self._files = await asyncio.to_thread(load_rule_cache, self.cache_path, self.rules_path)
+
+        stale = [
+            (path, size, mtime_ns, self._files[path].digest if path in self._files else None)
+            for path, (size, mtime_ns) in current.items()
+            if path not in self._files or self._files[path].stat != (size, mtime_ns)
+        ]
+        removed = [path for path in self._files if path not in current]
+        for path in removed:
+            del self._files[path]
+
+        parsed = 0
+        for rule_file in await self._parse_rule_files(stale):
+            cached = self._files.get(rule_file.path)
+            if cached is not None and cached.digest == rule_file.digest:
+                # Touched but unchanged
+                cached.size, cached.mtime_ns = rule_file.size, rule_file.mtime_ns
+                continue
+            if rule_file.error:
+                logger.warning(f"Failed to load rule {rule_file.path}: {rule_file.error}")
+            self._files[rule_file.path] = rule_file
+            parsed += 1
+
         self._rules.clear()
         self._compiled_rules.clear()
-
-        # Load rules from YAML files
-        for rule_file in self.rules_path.rglob("*.yml"):
-            try:
-                rules = await self._load_rule_file(rule_file)
-                for rule in rules:
+        self._index = None
+        for path in current:
+            if path in self._files:
+                for rule, compiled in self._files[path].rules:
                     self._rules[rule.rule_id] = rule
-            except Exception as error:
-                logger.warning(f"Failed to load rule {rule_file}: {error}")
+                    self._compiled_rules[rule.rule_id] = compiled
 
-        for rule_file in self.rules_path.rglob("*.yaml"):
+        if self.cache_path and (stale or removed):
             try:
-                rules = await self._load_rule_file(rule_file)
-                for rule in rules:
-                    self._rules[rule.rule_id] = rule
+                await asyncio.to_thread(
+                    save_rule_cache, self.cache_path, self.rules_path, self._files
+                )
             except Exception as error:
-                logger.warning(f"Failed to load rule {rule_file}: {error}")
+                logger.warning(f"Failed to write Sigma rule cache {self.cache_path}: {error}")
 
         self._last_loaded = datetime.now(UTC)
 
-        logger.info(f"Loaded {len(self._rules)} Sigma rules from {self.rules_path}")
+        logger.info(
+            f"Loaded {len(self._rules)} Sigma rules from {self.rules_path} "
+            f"({parsed} of {len(current)} files parsed)"
+        )
         return len(self._rules)
 
-    async def _load_rule_file(self, file_path: Path) -> list[SigmaRule]:
-        """Load rules from a YAML file.
+    async def _parse_rule_files(
+        self, files: list[tuple[str, int, int, str | None]]
+    ) -> list[RuleFile]:
+        """Parse and compile rule files off the event loop.
 
         Args:
-            file_path: Path to YAML file
+            files: (path, size, mtime_ns, cached digest) of each file
 
         Returns:
-            List of parsed rules
+            Parsed rule files
         """
-        import yaml
-
-        with open(file_path, encoding="utf-8") as file_handle:
-            content = file_handle.read()
-
-        # Handle multiple YAML documents in one file
-        rules = []
-        for doc in yaml.safe_load_all(content):
-            if doc is None:
-                continue
-
-            rule = self._parse_rule_dict(doc, str(file_path))
-            if rule:
-                rules.append(rule)
-
-        return rules
-
-    def _parse_rule_dict(self, data: dict[str, Any], source_file: str) -> SigmaRule | None:
+        if not files:
+            return []
+        if len(files) < PARALLEL_LOAD_MIN_FILES or self.load_workers <= 1:
+            return await asyncio.to_thread(_parse_rule_files, files)
+
+        # Several chunks per worker so uneven files still spread evenly
+        chunk_count = min(len(files), self.load_workers * 4)
+        chunks = [files[i::chunk_count] for i in range(chunk_count)]
+        async with ProcessPool(self.load_workers) as pool:
+            results = await asyncio.gather(*(pool.submit(_parse_rule_files, c) for c in chunks))
+        return [rule_file for chunk in results for rule_file in chunk]
+
+    @staticmethod
+    def _parse_rule_dict(data: dict[str, Any], source_file: str) -> SigmaRule | None:
         """Parse rule from dictionary.
 
         Args:
@@ -202,7 +265,7 @@ class SigmaEngine:
         Returns:
             Parsed SigmaRule or None
         """
-        if "title" not in data or "detection" not in data:
+        if not isinstance(data, dict) or "title" not in data or "detection" not in data:
             return None
 
         from uuid import uuid4
@@ -227,283 +290,161 @@ class SigmaEngine:
         self,
         event: dict[str, Any],
         rules: list[str] | None = None,
+        logsource: dict[str, str] | None = None,
     ) -> list[SigmaMatch]:
         """Match an event against Sigma rules.
 
+        Only the candidate rules found by the prefilter index are evaluated.
+
         Args:
             event: Event to match
             rules: Optional list of rule IDs to check (None = all)
+            logsource: Optional logsource of the event (product, category,
+                service); rules for other logsources are skipped
 
         Returns:
             List of matching rules
         """
         matches = []
 
-        rules_to_check = (
-            [self._rules[rule_id] for rule_id in rules if rule_id in self._rules]
-            if rules
-            else list(self._rules.values())
-        )
-
-        for rule in rules_to_check:
-            if self._event_matches_rule(event, rule):
-                matched_fields = self._extract_matched_fields(event, rule)
+        # One context per event, so field values are converted once for all rules
+        context = EventContext(event)
+        index = self._get_index()
+        candidates = [
+            self._rules[index.rule_ids[position]]
+            for position in index.candidates_for(context, logsource)
+        ]
+        if rules:
+            wanted = set(rules)
+            candidates = [rule for rule in candidates if rule.rule_id in wanted]
+
+        for rule in candidates:
+            compiled = self._get_compiled(rule)
+            if compiled is not None and compiled.matches(context):
                 matches.append(
                     SigmaMatch(
                         rule=rule,
                         event=event,
-                        matched_fields=matched_fields,
+                        matched_fields=self._extract_matched_fields(context, compiled),
                     )
                 )
 
         return matches
 
-    def _event_matches_rule(self, event: dict[str, Any], rule: SigmaRule) -> bool:
-        """Check if event matches a rule.
+    async def match_batch(
+        self,
+        events: list[dict[str, Any]],
+        rules: list[str] | None = None,
+        logsource: dict[str, str] | None = None,
+    ) -> dict[str, int]:
+        """Match a block of events against Sigma rules, column by column.
 
-        DESIGN DECISION: Implements basic Sigma matching logic.
-        For production use, consider using pySigma's full implementation.
+        Meant for retro-hunting over stored events: each field the rules
+        reference is extracted from the block once, and every selection is
+        evaluated over the distinct values of its columns rather than event
+        by event. Use bitmap_rows() to list the matching events of a rule.
 
         Args:
-            event: Event to check
-            rule: Rule to match against
+            events: Events to match
+            rules: Optional list of rule IDs to check (None = all)
+            logsource: Optional logsource shared by the events
 
         Returns:
-            True if event matches
+            Match bitmap per rule ID with at least one match; bit i is set
+            if events[i] matched
         """
-        detection = rule.detection
-
-        # Get condition
-        condition = detection.get("condition", "")
-        if not condition:
-            return False
-
-        # Evaluate detection blocks
-        detection_results = {}
-        for key, value in detection.items():
-            if key == "condition":
+        results: dict[str, int] = {}
+        if not events:
+            return results
+
+        batch = EventBatch(events)
+        index = self._get_index()
+        wanted = set(rules) if rules else None
+        for position in index.candidates_for_batch(batch, logsource):
+            rule_id = index.rule_ids[position]
+            if wanted is not None and rule_id not in wanted:
                 continue
+            compiled = self._get_compiled(self._rules[rule_id])
+            if compiled is None:
+                continue
+            bitmap = compiled.matches_batch(batch)
+            if bitmap:
+                results[rule_id] = bitmap
 
-            if isinstance(value, list):
-                # List of alternative conditions
-                detection_results[key] = any(
-                    self._match_detection_item(event, item) for item in value
-                )
-            elif isinstance(value, dict):
-                detection_results[key] = self._match_detection_item(event, value)
-            else:
-                detection_results[key] = False
-
-        # Evaluate condition
-        return self._evaluate_condition(condition, detection_results)
-
-    def _match_detection_item(
-        self,
-        event: dict[str, Any],
-        detection_item: dict[str, Any],
-    ) -> bool:
-        """Match event against a single detection item.
-
-        Args:
-            event: Event to check
-            detection_item: Detection conditions
-
-        Returns:
-            True if all conditions match
-        """
-        for field_name, pattern in detection_item.items():
-            event_value = self._get_field_value(event, field_name)
-
-            if event_value is None:
-                return False
-
-            if not self._match_pattern(event_value, pattern):
-                return False
-
-        return True
+        return results
 
-    def _get_field_value(self, event: dict[str, Any], field: str) -> Any:
-        """Get field value from event, supporting nested fields.
+    @staticmethod
+    def _compile_rule(rule: SigmaRule) -> CompiledRule | None:
+        """Compile a rule's detection into a matcher tree.
 
         Args:
-            event: Event dictionary
-            field: Field name (supports dot notation)
+            rule: Rule to compile
 
         Returns:
-            Field value or None
+            Compiled rule, or None if the rule cannot be matched locally
         """
-        parts = field.split(".")
-        value = event
-
-        for part in parts:
-            if isinstance(value, dict):
-                value = value.get(part)
-            else:
-                return None
-
-            if value is None:
-                return None
-
-        return value
-
-    def _match_pattern(self, value: Any, pattern: Any) -> bool:
-        """Match a value against a pattern.
+        try:
+            return compile_rule(rule.rule_id, rule.detection)
+        except SigmaCompileError as error:
+            logger.debug(f"Sigma rule {rule.rule_id} cannot be matched: {error}")
+            return None
 
-        Supports:
-        - Exact match
-        - Wildcard patterns (* and ?)
-        - Lists of patterns (OR)
-        - Modifiers (|endswith, |startswith, |contains, |re)
+    def _get_compiled(self, rule: SigmaRule) -> CompiledRule | None:
+        """Get the compiled form of a rule, compiling it on first use.
 
         Args:
-            value: Value to check
-            pattern: Pattern to match
+            rule: Loaded rule
 
         Returns:
-            True if matches
+            Compiled rule, or None if the rule cannot be matched locally
         """
-        if isinstance(pattern, list):
-            return any(self._match_pattern(value, p) for p in pattern)
-
-        if pattern is None:
-            return value is None
-
-        # Convert to string for pattern matching
-        str_value = str(value).lower()
-        str_pattern = str(pattern).lower()
+        if rule.rule_id not in self._compiled_rules:
+            self._compiled_rules[rule.rule_id] = self._compile_rule(rule)
+        return self._compiled_rules[rule.rule_id]
 
-        # Handle modifiers in field name
-        if "|" in str_pattern:
-            modifier, pattern_value = str_pattern.rsplit("|", 1)
-            if modifier == "endswith":
-                return str_value.endswith(pattern_value)
-            elif modifier == "startswith":
-                return str_value.startswith(pattern_value)
-            elif modifier == "contains":
-                return pattern_value in str_value
-            elif modifier == "re":
-                import re
-
-                return bool(re.search(pattern_value, str_value, re.IGNORECASE))
-
-        # Wildcard matching
-        if "*" in str_pattern or "?" in str_pattern:
-            import fnmatch
-
-            return fnmatch.fnmatch(str_value, str_pattern)
-
-        # Exact match
-        return str_value == str_pattern
-
-    def _evaluate_condition(
-        self,
-        condition: str,
-        detection_results: dict[str, bool],
-    ) -> bool:
-        """Evaluate a Sigma condition expression.
-
-        Supports basic operators: and, or, not, all of, 1 of
-
-        Args:
-            condition: Condition expression
-            detection_results: Results of detection block evaluation
+    def _get_index(self) -> SigmaRuleIndex:
+        """Get the prefilter index, building it after rules have changed.
 
         Returns:
-            True if condition is satisfied
+            Index over the loaded rules
         """
-        # Normalize condition
-        condition = condition.lower().strip()
-
-        # Handle "all of them"
-        if condition == "all of them":
-            return all(detection_results.values())
-
-        # Handle "1 of them"
-        if condition == "1 of them":
-            return any(detection_results.values())
-
-        # Handle "all of <pattern>"
-        if condition.startswith("all of "):
-            pattern = condition[7:].strip()
-            matching_keys = [
-                key for key in detection_results if self._key_matches_pattern(key, pattern)
-            ]
-            return all(detection_results.get(key, False) for key in matching_keys)
-
-        # Handle "1 of <pattern>"
-        if condition.startswith("1 of "):
-            pattern = condition[5:].strip()
-            matching_keys = [
-                key for key in detection_results if self._key_matches_pattern(key, pattern)
-            ]
-            return any(detection_results.get(key, False) for key in matching_keys)
-
-        # Simple evaluation for single selection
-        if condition in detection_results:
-            return detection_results[condition]
-
-        # Handle basic and/or/not
-        # This is a simplified implementation
-        if " and " in condition:
-            parts = condition.split(" and ")
-            return all(self._evaluate_condition(part.strip(), detection_results) for part in parts)
-
-        if " or " in condition:
-            parts = condition.split(" or ")
-            return any(self._evaluate_condition(part.strip(), detection_results) for part in parts)
-
-        if condition.startswith("not "):
-            inner = condition[4:].strip()
-            return not self._evaluate_condition(inner, detection_results)
-
-        return False
-
-    def _key_matches_pattern(self, key: str, pattern: str) -> bool:
-        """Check if key matches pattern (for all of/1 of).
+        if self._index is None:
+            self._index = SigmaRuleIndex(
+                [
+                    (rule.rule_id, rule.logsource, self._get_compiled(rule))
+                    for rule in self._rules.values()
+                ]
+            )
+        return self._index
 
-        Args:
-            key: Detection block key
-            pattern: Pattern (supports * wildcard)
+    def get_index_stats(self) -> dict[str, Any]:
+        """Get prefilter index sizes and candidate-set statistics.
 
         Returns:
-            True if matches
+            Statistics dictionary
         """
-        import fnmatch
-
-        return fnmatch.fnmatch(key.lower(), pattern.lower())
+        return self._get_index().get_stats()
 
     def _extract_matched_fields(
         self,
-        event: dict[str, Any],
-        rule: SigmaRule,
+        context: EventContext,
+        compiled: CompiledRule,
     ) -> dict[str, Any]:
         """Extract fields that matched the rule.
 
         Args:
-            event: Matched event
-            rule: Matching rule
+            context: Context of the matched event
+            compiled: Compiled matching rule
 
         Returns:
             Dictionary of matched fields and values
         """
         matched = {}
 
-        for key, detection_item in rule.detection.items():
-            if key == "condition":
-                continue
-
-            if isinstance(detection_item, dict):
-                for field in detection_item.keys():
-                    value = self._get_field_value(event, field)
-                    if value is not None:
-                        matched[field] = value
-            elif isinstance(detection_item, list):
-                for item in detection_item:
-                    if isinstance(item, dict):
-                        for field in item.keys():
-                            value = self._get_field_value(event, field)
-                            if value is not None:
-                                matched[field] = value
+        for field_path in compiled.fields:
+            value = context.raw(field_path)
+            if value is not None:
+                matched[field_path.name] = value
 
         return matched
 
@@ -691,9 +632,12 @@ class SigmaEngine:
             "rules_path": str(self.rules_path) if self.rules_path else None,
             "pipeline": self.pipeline_name,
             "rules_loaded": len(self._rules),
+            "rule_files": len(self._files),
+            "cache_path": str(self.cache_path) if self.cache_path else None,
             "last_loaded": self._last_loaded.isoformat() if self._last_loaded else None,
             "level_counts": level_counts,
             "product_counts": product_counts,
+            "prefilter": self._index.get_stats() if self._index else None,
         }
 
 
@@ -701,13 +645,56 @@ class SigmaEngine:
 def create_sigma_engine(config: dict[str, Any]) -> SigmaEngine:
     """Create Sigma engine from dictionary configuration.
 
+    Keys missing from config fall back to the sigma_* settings.
+
     Args:
         config: Configuration dictionary
 
     Returns:
         Configured SigmaEngine instance
     """
+    settings = get_settings()
     return SigmaEngine(
-        rules_path=config.get("rules_path"),
-        pipeline=config.get("pipeline", "ecs_windows"),
+        rules_path=config.get("rules_path", settings.sigma_rules_path),
+        pipeline=config.get("pipeline", settings.sigma_pipeline),
+        cache_path=config.get("cache_path", settings.sigma_cache_path or None),
+        load_workers=config.get("load_workers", settings.sigma_load_workers),
     )
+
+
+def _parse_rule_files(files: list[tuple[str, int, int, str | None]]) -> list[RuleFile]:
+    """Parse and compile rule files; runs in a worker thread or process.
+
+    Files whose content digest equals their cached digest are returned
+    without rules, and the cached ones are kept.
+
+    Args:
+        files: (path, size, mtime_ns, cached digest) of each file
+
+    Returns:
+        Parsed rule files
+    """
+    import yaml
+
+    results = []
+    for path, size, mtime_ns, cached_digest in files:
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError as error:
+            results.append(RuleFile(path, size, mtime_ns, "", error=str(error)))
+            continue
+
+        rule_file = RuleFile(path, size, mtime_ns, file_digest(content))
+        if rule_file.digest != cached_digest:
+            try:
+                # Handle multiple YAML documents in one file
+                for doc in yaml.safe_load_all(content.decode("utf-8")):
+                    rule = SigmaEngine._parse_rule_dict(doc, path)
+                    if rule:
+                        rule_file.rules.append((rule, SigmaEngine._compile_rule(rule)))
+            except Exception as error:
+                rule_file.rules.clear()
+                rule_file.error = str(error)
+        results.append(rule_file)
+    return results
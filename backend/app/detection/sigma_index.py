@@ -0,0 +1,352 @@
+"""Prefilter index over compiled Sigma rules.
+
+Most rules of a large corpus cannot apply to a given event: they are for
+another product or log category, or require an EventID, image name or
+command line fragment the event does not have. SigmaRuleIndex finds the
+candidate rules for an event from literals that any match must contain,
+so SigmaEngine only evaluates those:
+
+- rules whose logsource contradicts the logsource given for the event are
+  dropped up front
+- each rule is anchored on values one of which must occur in the event: an
+  exact field value, looked up in a hash table, or a substring of a field,
+  found with one Aho-Corasick pass over the field's values
+- rules with no usable anchor (only regexes, negations, numeric ranges)
+  are always candidates
+
+Anchors are necessary conditions only; candidates are still fully matched.
+"""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from app.detection.sigma_compiler import (
+    AllOf,
+    AnyOf,
+    CompiledRule,
+    Contains,
+    EndsWith,
+    Equals,
+    EventBatch,
+    EventContext,
+    FieldMatcher,
+    FieldPath,
+    Keywords,
+    Never,
+    Pattern,
+    StartsWith,
+)
+
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Logsource keys used to narrow candidates
+LOGSOURCE_KEYS = ("product", "category", "service")
+
+# Anchor kinds
+EXACT = "exact"
+SUBSTRING = "substring"
+
+# An anchor: (kind, field name or None for keywords, lowered literal)
+Anchor = tuple[str, str | None, str]
+
+
+def rule_anchors(compiled: CompiledRule) -> list[Anchor] | None:
+    """Find literals of which any match of a rule must contain one.
+
+    Args:
+        compiled: Compiled rule
+
+    Returns:
+        Anchors, empty if the rule can never match, or None if the rule has
+        no usable anchors and must always be evaluated
+    """
+    return _anchors(compiled.condition)
+
+
+def _anchors(node: Any) -> list[Anchor] | None:
+    if isinstance(node, FieldMatcher):
+        return _field_anchors(node)
+    if isinstance(node, Keywords):
+        return _value_anchors(None, node.matchers)
+    if isinstance(node, AllOf):
+        # Every child must match, so any one child's anchors will do
+        options = [anchors for anchors in map(_anchors, node.children) if anchors is not None]
+        return min(options, key=_selectivity) if options else None
+    if isinstance(node, AnyOf):
+        # Any child may match, so all of their anchors are needed
+        anchors: list[Anchor] = []
+        for child in node.children:
+            child_anchors = _anchors(child)
+            if child_anchors is None:
+                return None
+            anchors.extend(child_anchors)
+        return anchors
+    if isinstance(node, Never):
+        return []
+    return None
+
+
+def _field_anchors(node: FieldMatcher) -> list[Anchor] | None:
+    if node.exists is not None or node.null:
+        return None
+    if node.match_all:
+        # All values must occur, so the most selective one is enough
+        options = [_value_anchors(node.field.name, [m]) for m in node.matchers]
+        options = [anchors for anchors in options if anchors]
+        return min(options, key=_selectivity) if options else None
+    return _value_anchors(node.field.name, node.matchers)
+
+
+def _value_anchors(field: str | None, matchers: Iterable[Any]) -> list[Anchor] | None:
+    anchors: list[Anchor] = []
+    for matcher in matchers:
+        if isinstance(matcher, Equals) and field is not None:
+            anchors.append((EXACT, field, matcher.literal.lower()))
+        elif isinstance(matcher, (Equals, Contains, StartsWith, EndsWith)) and matcher.literal:
+            anchors.append((SUBSTRING, field, matcher.literal.lower()))
+        elif isinstance(matcher, Pattern) and matcher.anchor:
+            anchors.append((SUBSTRING, field, matcher.anchor.lower()))
+        else:
+            return None
+    return anchors
+
+
+def _selectivity(anchors: list[Anchor]) -> tuple[int, int, int]:
+    """Sort key preferring exact anchors, then long substrings, then few anchors."""
+    exact = all(kind == EXACT for kind, _, _ in anchors)
+    shortest = min((len(literal) for _, _, literal in anchors), default=0)
+    return (0 if exact else 1, -shortest, len(anchors))
+
+
+class SubstringAutomaton:
+    """Aho-Corasick automaton mapping substrings to payload sets.
+
+    Uses pyahocorasick when it is installed, and a pure Python automaton
+    otherwise.
+    """
+
+    def __init__(self, words: dict[str, set[int]]):
+        self._native: Any = None
+        if AHOCORASICK_AVAILABLE:
+            self._native = ahocorasick.Automaton()
+            for word, payload in words.items():
+                self._native.add_word(word, frozenset(payload))
+            self._native.make_automaton()
+            return
+
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[frozenset[int]]] = [[]]
+        for word, payload in words.items():
+            node = 0
+            for char in word:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            self._out[node].append(frozenset(payload))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_node] = fail
+                self._out[next_node] = self._out[next_node] + self._out[fail]
+
+    def iter_matches(self, text: str) -> Iterator[frozenset[int]]:
+        """Yield the payload of every word occurring in a text."""
+        if self._native is not None:
+            for _, payload in self._native.iter(text):
+                yield payload
+            return
+
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            yield from out[node]
+
+
+class SigmaRuleIndex:
+    """Candidate rule lookup for events.
+
+    Rules are referred to by their position in the list the index was built
+    from, and candidates are returned in that order.
+    """
+
+    def __init__(self, rules: list[tuple[str, dict[str, str], CompiledRule | None]]):
+        """Build the index.
+
+        Args:
+            rules: (rule ID, logsource, compiled rule) for every rule, in
+                evaluation order; rules that failed to compile are never
+                candidates
+        """
+        self.rule_ids = [rule_id for rule_id, _, _ in rules]
+        self._always: set[int] = set()
+        self._exact: dict[str, dict[str, set[int]]] = {}
+        substrings: dict[str | None, dict[str, set[int]]] = {}
+        self._paths: dict[str, FieldPath] = {}
+
+        # Per logsource key: value -> rules, and rules that do not set the key
+        self._logsource: dict[str, dict[str, set[int]]] = {key: {} for key in LOGSOURCE_KEYS}
+        self._logsource_any: dict[str, set[int]] = {key: set() for key in LOGSOURCE_KEYS}
+        self._logsource_cache: dict[tuple[tuple[str, str], ...], set[int]] = {}
+
+        self.indexed_rules = 0
+        for position, (_, logsource, compiled) in enumerate(rules):
+            for key in LOGSOURCE_KEYS:
+                value = str(logsource.get(key) or "").lower()
+                if value:
+                    self._logsource[key].setdefault(value, set()).add(position)
+                else:
+                    self._logsource_any[key].add(position)
+
+            anchors = rule_anchors(compiled) if compiled is not None else []
+            if anchors is None:
+                self._always.add(position)
+                continue
+            if anchors:
+                self.indexed_rules += 1
+            for kind, field, literal in anchors:
+                if field is not None:
+                    self._paths.setdefault(field, FieldPath(field))
+                if kind == EXACT:
+                    self._exact.setdefault(field, {}).setdefault(literal, set()).add(position)
+                else:
+                    substrings.setdefault(field, {}).setdefault(literal, set()).add(position)
+
+        self._automata = {field: SubstringAutomaton(words) for field, words in substrings.items()}
+
+        self.events = 0
+        self.candidates = 0
+        self.batches = 0
+        self.batch_candidates = 0
+
+    def candidates_for(
+        self,
+        context: EventContext,
+        logsource: dict[str, str] | None = None,
+    ) -> list[int]:
+        """Find the rules that may match an event.
+
+        Args:
+            context: Context of the event
+            logsource: Logsource of the event, such as {"product": "windows"};
+                rules for another product, category or service are dropped
+
+        Returns:
+            Positions of candidate rules, in order
+        """
+        found = self._lookup(
+            lambda field: (
+                context.keywords() if field is None else context.values(self._paths[field])
+            ),
+            logsource,
+        )
+        self.events += 1
+        self.candidates += len(found)
+        return sorted(found)
+
+    def candidates_for_batch(
+        self,
+        batch: EventBatch,
+        logsource: dict[str, str] | None = None,
+    ) -> list[int]:
+        """Find the rules that may match any event of a batch.
+
+        Anchors are looked up once per distinct value of each column.
+
+        Args:
+            batch: Batch of events
+            logsource: Logsource shared by the events of the batch
+
+        Returns:
+            Positions of candidate rules, in order
+        """
+        found = self._lookup(
+            lambda field: batch.column(None if field is None else self._paths[field])[0],
+            logsource,
+        )
+        self.batches += 1
+        self.batch_candidates += len(found)
+        return sorted(found)
+
+    def _lookup(
+        self,
+        values_of: Callable[[str | None], Iterable[str] | None],
+        logsource: dict[str, str] | None,
+    ) -> set[int]:
+        """Collect the rules anchored on the given field values."""
+        found = set(self._always)
+        for field, table in self._exact.items():
+            values = values_of(field)
+            if values:
+                for value in values:
+                    hits = table.get(value)
+                    if hits:
+                        found.update(hits)
+        for field, automaton in self._automata.items():
+            values = values_of(field)
+            if values:
+                for value in values:
+                    for hits in automaton.iter_matches(value):
+                        found.update(hits)
+
+        if logsource:
+            found &= self._logsource_candidates(logsource)
+        return found
+
+    def _logsource_candidates(self, logsource: dict[str, str]) -> set[int]:
+        """Rules compatible with a logsource, cached per logsource."""
+        key = tuple(
+            sorted((k, str(v).lower()) for k, v in logsource.items() if k in LOGSOURCE_KEYS and v)
+        )
+        cached = self._logsource_cache.get(key)
+        if cached is None:
+            cached = set(range(len(self.rule_ids)))
+            for name, value in key:
+                cached &= self._logsource[name].get(value, set()) | self._logsource_any[name]
+            self._logsource_cache[key] = cached
+        return cached
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get index sizes and candidate-set statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            "rules": len(self.rule_ids),
+            "indexed_rules": self.indexed_rules,
+            "unindexed_rules": len(self._always),
+            "exact_fields": len(self._exact),
+            "substring_fields": len(self._automata),
+            "events": self.events,
+            "candidates": self.candidates,
+            "avg_candidates": self.candidates / self.events if self.events else 0.0,
+            "avg_candidate_ratio": (
+                self.candidates / (self.events * len(self.rule_ids))
+                if self.events and self.rule_ids
+                else 0.0
+            ),
+            "batches": self.batches,
+            "avg_batch_candidates": (self.batch_candidates / self.batches if self.batches else 0.0),
+        }
@@ -84,6 +84,9 @@ class ParsingJob(Base):
     # Results summary
     results_summary: Mapped[dict] = mapped_column(JSONBType(), default=dict)
 
+    # Last committed position, for resuming an interrupted job
+    checkpoint: Mapped[dict] = mapped_column(JSONBType(), default=dict)
+
     # User who submitted the job
     submitted_by: Mapped[UUID | None] = mapped_column(
         UUIDType(), ForeignKey("users.id"), nullable=True
@@ -131,6 +134,7 @@ class ParsingJob(Base):
         self.events_parsed = events_parsed
         self.events_indexed = events_indexed
         self.progress_percent = 100
+        self.checkpoint = {}
         if results_summary:
             self.results_summary = results_summary
 
@@ -157,3 +161,11 @@ class ParsingJob(Base):
         self.events_parsed = events_parsed
         self.events_indexed = events_indexed
         self.progress_percent = min(progress_percent, 100)
+
+    def save_checkpoint(self, checkpoint: dict) -> None:
+        """Record the position up to which events are durably indexed.
+
+        Args:
+            checkpoint: Record number, counters and optional parser position
+        """
+        self.checkpoint = {**checkpoint, "saved_at": datetime.utcnow().isoformat()}
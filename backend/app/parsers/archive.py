@@ -0,0 +1,642 @@
+"""Parsing of evidence archives member by member.
+
+Triage collections (KAPE targets, Velociraptor offline collectors) arrive as
+zip, tar or 7z archives holding thousands of event logs, prefetch files,
+registry hives and text logs. ArchiveReader walks their members without
+extracting the archive, and ArchiveParseRunner detects each member's parser
+through the registry and parses several members at once, yielding documents
+that keep the parent evidence's IDs and record the member path in _source.
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+from app.parsers.base import BaseParser
+from app.parsers.execution import ParserExecutor, is_async_parser
+from app.parsers.filtering import EventFilter
+from app.parsers.jsonl import GZIP_MAGIC, decompress_header
+from app.parsers.registry import get_parser
+from app.parsers.signatures import SNIFF_SIZE
+from app.utils.process_pool import ProcessPool
+
+if TYPE_CHECKING:
+    from app.parsers.image import ImageReader
+
+try:
+    import py7zr
+
+    PY7ZR_AVAILABLE = True
+except ImportError:
+    PY7ZR_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06")
+SEVEN_ZIP_MAGIC = b"7z\xbc\xaf\x27\x1c"
+TAR_MAGIC = b"ustar"
+TAR_MAGIC_OFFSET = 257
+
+DEFAULT_WORKERS = 4
+DEFAULT_SPOOL_BYTES = 64 * 1024 * 1024
+COPY_BUFFER_BYTES = 1024 * 1024
+OUTPUT_READ_BYTES = 1024 * 1024  # Encoded documents read back per batch
+
+_DONE = object()
+
+
+def detect_archive(header: bytes) -> str | None:
+    """Identify an archive from the first bytes of a file.
+
+    Args:
+        header: File header, at least 262 bytes to recognise tar
+
+    Returns:
+        "zip", "7z", "tar" (plain or gzip-compressed) or "gzip" for a single
+        gzip-compressed file, or None if the header is not an archive
+    """
+    if header.startswith(ZIP_MAGIC):
+        return "zip"
+    if header.startswith(SEVEN_ZIP_MAGIC):
+        return "7z"
+    if header.startswith(GZIP_MAGIC):
+        header = decompress_header(header)
+        if _is_tar(header):
+            return "tar"
+        return "gzip"
+    if _is_tar(header):
+        return "tar"
+    return None
+
+
+def _is_tar(header: bytes) -> bool:
+    return header[TAR_MAGIC_OFFSET : TAR_MAGIC_OFFSET + len(TAR_MAGIC)] == TAR_MAGIC
+
+
+@dataclass
+class ArchiveMember:
+    """A file inside an archive.
+
+    Zip members are opened from the archive on demand; members of archives
+    that can only be read in order carry a spooled copy of their content.
+    hint names the parser to try first when the member's format is known
+    from where it was found.
+    """
+
+    path: str
+    size: int
+    opener: Callable[[], BinaryIO] | None = None
+    spool: BinaryIO | None = None
+    hint: str | None = None
+
+    def open(self) -> BinaryIO:
+        """Open the member's content for reading from the start."""
+        if self.spool is not None:
+            self.spool.seek(0)
+            return self.spool
+        return self.opener()
+
+    def read_header(self, size: int = SNIFF_SIZE) -> bytes:
+        """Read the first bytes of the member for parser detection."""
+        if self.spool is not None:
+            self.spool.seek(0)
+            return self.spool.read(size)
+        with self.opener() as f:
+            return f.read(size)
+
+    def close(self) -> None:
+        """Release the spooled copy, if any."""
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+
+
+class ArchiveReader:
+    """Walks the file members of an evidence archive.
+
+    Zip archives are read through their central directory and members are
+    decompressed on demand, so several can be read at once. Tar (including
+    compressed tar), single gzip files and 7z archives are read in stream
+    order; each member is spooled, in memory up to spool_bytes and then to a
+    temporary file, so it can be parsed while the next one is read.
+
+    Zip members stay readable after iteration ends, until close() is called.
+    """
+
+    # _source field naming the container the members come from
+    container = "archive"
+
+    def __init__(
+        self,
+        source: Path | BinaryIO,
+        archive_type: str,
+        name: str = "",
+        spool_bytes: int = DEFAULT_SPOOL_BYTES,
+    ):
+        self.source = source
+        self.archive_type = archive_type
+        self.name = name or (source.name if isinstance(source, Path) else "archive")
+        self.spool_bytes = spool_bytes
+        self._resources = ExitStack()
+
+    def close(self) -> None:
+        """Close the archive once all members have been read."""
+        self._resources.close()
+
+    def iter_members(self, skip: set[str] | None = None) -> Iterator[ArchiveMember]:
+        """Yield the file members of the archive.
+
+        Args:
+            skip: Member paths to leave out without reading their content
+
+        Raises:
+            ValueError: If the archive type is unknown or needs a missing library
+        """
+        skip = skip or set()
+        readers = {
+            "zip": self._iter_zip,
+            "tar": self._iter_tar,
+            "gzip": self._iter_gzip,
+            "7z": self._iter_7z,
+        }
+        if self.archive_type not in readers:
+            raise ValueError(f"Unsupported archive type: {self.archive_type}")
+        yield from readers[self.archive_type](skip)
+
+    def _open_source(self) -> BinaryIO:
+        if isinstance(self.source, Path):
+            return open(self.source, "rb")
+        self.source.seek(0)
+        return _Unclosed(self.source)
+
+    def _spool(self, stream: BinaryIO) -> BinaryIO:
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes)
+        shutil.copyfileobj(stream, spool, COPY_BUFFER_BYTES)
+        return spool
+
+    def _iter_zip(self, skip: set[str]) -> Iterator[ArchiveMember]:
+        f = self._resources.enter_context(self._open_source())
+        archive = self._resources.enter_context(zipfile.ZipFile(f))
+        for info in archive.infolist():
+            if info.is_dir() or info.filename in skip:
+                continue
+            yield ArchiveMember(
+                path=info.filename,
+                size=info.file_size,
+                opener=lambda info=info: archive.open(info),
+            )
+
+    def _iter_tar(self, skip: set[str]) -> Iterator[ArchiveMember]:
+        with self._open_source() as f, tarfile.open(fileobj=f, mode="r|*") as archive:
+            for info in archive:
+                if not info.isfile() or info.name in skip:
+                    continue
+                content = archive.extractfile(info)
+                if content is None:
+                    continue
+                yield ArchiveMember(path=info.name, size=info.size, spool=self._spool(content))
+
+    def _iter_gzip(self, skip: set[str]) -> Iterator[ArchiveMember]:
+        path = Path(self.name)
+        member_path = path.stem if path.suffix.lower() in (".gz", ".gzip") else path.name
+        if member_path in skip:
+            return
+        with self._open_source() as f, gzip.GzipFile(fileobj=f, mode="rb") as content:
+            spool = self._spool(content)
+            size = spool.tell()
+            yield ArchiveMember(path=member_path, size=size, spool=spool)
+
+    def _iter_7z(self, skip: set[str]) -> Iterator[ArchiveMember]:
+        if not PY7ZR_AVAILABLE:
+            raise ValueError("7z archives require the py7zr package")
+
+        with self._open_source() as f, py7zr.SevenZipFile(f, mode="r") as archive:
+            files = [
+                info
+                for info in archive.list()
+                if not info.is_directory and info.filename not in skip
+            ]
+            # Solid archives decompress from the start of each block, so
+            # members are read in batches rather than one at a time
+            batch: list[Any] = []
+            batch_bytes = 0
+            for info in files + [None]:
+                if batch and (info is None or batch_bytes + info.uncompressed > self.spool_bytes):
+                    contents = self._read_7z(archive, [entry.filename for entry in batch])
+                    for entry in batch:
+                        content = contents.get(entry.filename)
+                        if content is not None:
+                            yield ArchiveMember(
+                                path=entry.filename,
+                                size=entry.uncompressed,
+                                spool=content,
+                            )
+                    batch, batch_bytes = [], 0
+                if info is not None:
+                    batch.append(info)
+                    batch_bytes += info.uncompressed
+
+    def _read_7z(self, archive: Any, names: list[str]) -> dict[str, BinaryIO]:
+        # py7zr < 1.0 reads members into BytesIO objects with read(); 1.0
+        # removed read() in favour of extract() into writers from a factory,
+        # which lets members spool to disk like the other archive types
+        if hasattr(archive, "read"):
+            contents = archive.read(names)
+        else:
+            factory = _SpoolWriterFactory(self.spool_bytes)
+            archive.extract(targets=names, factory=factory)
+            contents = {name: writer.spool for name, writer in factory.writers.items()}
+        archive.reset()
+        return contents
+
+
+class _SpoolWriter:
+    """py7zr (>= 1.0) writer for one 7z member, spooling its content."""
+
+    def __init__(self, spool_bytes: int):
+        self.spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+
+    def write(self, data: bytes) -> int:
+        return self.spool.write(data)
+
+    def read(self, size: int | None = None) -> bytes:
+        return self.spool.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.spool.seek(offset, whence)
+
+    def flush(self) -> None:
+        self.spool.flush()
+
+    def size(self) -> int:
+        position = self.spool.tell()
+        size = self.spool.seek(0, os.SEEK_END)
+        self.spool.seek(position)
+        return size
+
+    def close(self) -> None:
+        # Called once the member is written; the spool lives on in the
+        # ArchiveMember until it is parsed
+        pass
+
+
+class _SpoolWriterFactory:
+    """py7zr (>= 1.0) writer factory collecting spooled 7z members."""
+
+    def __init__(self, spool_bytes: int):
+        self.spool_bytes = spool_bytes
+        self.writers: dict[str, _SpoolWriter] = {}
+
+    def create(self, filename: str) -> _SpoolWriter:
+        writer = _SpoolWriter(self.spool_bytes)
+        self.writers[filename] = writer
+        return writer
+
+
+class _Unclosed:
+    """Context manager over a caller's stream that leaves it open."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+
+    def __enter__(self) -> BinaryIO:
+        return self.stream
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+@dataclass
+class _MemberDone:
+    path: str
+    records: int
+    failed: int = 0
+
+
+def _parse_member_file(
+    parser_class: type[BaseParser],
+    file_path: str,
+    member_path: str,
+    output_path: str,
+    case_id: str,
+    evidence_id: str,
+    source_meta: dict[str, Any],
+    event_filter: EventFilter | None = None,
+) -> tuple[int, int, int]:
+    """Parse a copied member in a pool worker, writing its encoded documents.
+
+    Documents are written to output_path one per line; encoded JSON never
+    holds a raw newline.
+
+    Returns:
+        Tuple of (documents written, events that failed conversion,
+        events filtered out)
+    """
+    executor = ParserExecutor(
+        parser_class(),
+        Path(file_path),
+        member_path,
+        case_id=case_id,
+        evidence_id=evidence_id,
+        encode=True,
+        source_meta=source_meta,
+        event_filter=event_filter,
+    )
+    records = 0
+    with open(output_path, "wb") as output:
+        for chunk in executor.iter_chunks():
+            output.write(b"\n".join(chunk) + b"\n")
+            records += len(chunk)
+    return records, executor.failed_events, executor.filtered_events
+
+
+@dataclass
+class ArchiveStats:
+    """Counts of the members of an archive parsing run."""
+
+    members: int = 0
+    parsed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    parsers: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "members": self.members,
+            "parsed": self.parsed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "parsers": dict(self.parsers),
+        }
+
+
+class ArchiveParseRunner:
+    """Parses the members of an archive concurrently.
+
+    Members are read in archive order; each gets its parser from the
+    registry (trying the member's or the job's parser hint first), up to
+    max_workers at a time. With processes set, members of sync parsers are
+    copied to a temporary file and parsed in a ProcessPool of max_workers
+    processes, which write the encoded documents to a second temporary file
+    that is read back in order; async parsers, and every parser when
+    processes is off, run in-process through a ParserExecutor, streaming
+    the member to parsers that support it. Documents are yielded as (member
+    path, record number within the member, encoded document), with the
+    archive name and member path added to _source.
+    Members no parser recognises are skipped, and a member that fails to
+    parse is logged and counted without failing the others. Any reader with
+    the same iter_members()/close() interface works, such as an ImageReader.
+
+    completed holds the members whose documents have all been yielded,
+    records_completed their document count (starting from first_record) and
+    failed_completed their conversion failures (starting from
+    failed_before). A resumed job passes completed back as skip_members;
+    failed_events continues from failed_before.
+    """
+
+    def __init__(
+        self,
+        reader: "ArchiveReader | ImageReader",
+        case_id: str,
+        evidence_id: str,
+        hint: str | None = None,
+        max_workers: int = DEFAULT_WORKERS,
+        skip_members: set[str] | None = None,
+        first_record: int = 0,
+        failed_before: int = 0,
+        event_filter: EventFilter | None = None,
+        processes: bool = True,
+    ):
+        self.reader = reader
+        self.case_id = case_id
+        self.evidence_id = evidence_id
+        self.hint = hint
+        self.max_workers = max(1, max_workers)
+        self.completed: set[str] = set(skip_members or ())
+        self.records_completed = first_record
+        self.failed_completed = failed_before
+        self.event_filter = event_filter
+        self.processes = processes
+        self.failed_events = failed_before
+        self.filtered_events = 0
+        self.stats = ArchiveStats()
+
+    async def iter_documents(self) -> AsyncIterator[tuple[str, int, bytes]]:
+        """Yield documents for every parsed member as they are produced."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_workers * 4)
+
+        with tempfile.TemporaryDirectory(prefix="eleanor-archive-") as temp_dir:
+            feeder = asyncio.ensure_future(self._feed(queue, Path(temp_dir)))
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is _DONE:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    if isinstance(item, _MemberDone):
+                        self.completed.add(item.path)
+                        self.records_completed += item.records
+                        self.failed_completed += item.failed
+                        continue
+                    yield item
+                await feeder
+            finally:
+                feeder.cancel()
+                # Unblock member tasks waiting on a full queue so they can stop
+                while not feeder.done():
+                    while not queue.empty():
+                        queue.get_nowait()
+                    await asyncio.wait({feeder}, timeout=0.05)
+
+    async def _feed(self, queue: asyncio.Queue, temp_dir: Path) -> None:
+        """Read members and parse them, in worker processes when enabled."""
+        members = self.reader.iter_members(skip=set(self.completed))
+        try:
+            if self.processes:
+                async with ProcessPool(self.max_workers) as pool:
+                    await self._feed_members(members, queue, temp_dir, pool)
+            else:
+                await self._feed_members(members, queue, temp_dir, None)
+            await queue.put(_DONE)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            try:
+                await asyncio.to_thread(members.close)
+            except ValueError:
+                # Still running in the thread of a cancelled read
+                pass
+            await asyncio.to_thread(self.reader.close)
+
+    async def _feed_members(
+        self,
+        members: Iterator[ArchiveMember],
+        queue: asyncio.Queue,
+        temp_dir: Path,
+        pool: ProcessPool | None,
+    ) -> None:
+        """Start a parse task for each member, max_workers at a time."""
+        slots = asyncio.Semaphore(self.max_workers)
+        tasks: set[asyncio.Task] = set()
+
+        try:
+            while True:
+                await slots.acquire()
+                member = await asyncio.to_thread(next, members, None)
+                if member is None:
+                    slots.release()
+                    break
+
+                self.stats.members += 1
+                task = asyncio.ensure_future(self._parse_member(member, queue, temp_dir, pool))
+                task.add_done_callback(lambda _: slots.release())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _parse_member(
+        self,
+        member: ArchiveMember,
+        queue: asyncio.Queue,
+        temp_dir: Path,
+        pool: ProcessPool | None,
+    ) -> None:
+        """Detect a member's parser and queue its documents."""
+        executor = None
+        stream = None
+        copy_path = None
+        try:
+            header = await asyncio.to_thread(member.read_header, SNIFF_SIZE)
+            parser = get_parser(
+                file_path=Path(member.path), content=header, hint=member.hint or self.hint
+            )
+            if parser is None:
+                logger.debug(f"No parser for archive member {member.path}")
+                self.stats.skipped += 1
+                await queue.put(_MemberDone(member.path, 0))
+                return
+
+            source_meta = {self.reader.container: self.reader.name, "member": member.path}
+            if pool is not None and not is_async_parser(parser):
+                copy_path = await asyncio.to_thread(self._copy_member, member, temp_dir)
+                records, failed = await self._parse_in_pool(
+                    pool, type(parser), copy_path, member.path, source_meta, queue
+                )
+            else:
+                if parser.supports_streaming and not is_async_parser(parser):
+                    source = stream = await asyncio.to_thread(member.open)
+                else:
+                    # Random-access and async parsers need a real file
+                    copy_path = await asyncio.to_thread(self._copy_member, member, temp_dir)
+                    source = copy_path
+
+                executor = ParserExecutor(
+                    parser,
+                    source,
+                    member.path,
+                    case_id=self.case_id,
+                    evidence_id=self.evidence_id,
+                    encode=True,
+                    source_meta=source_meta,
+                    event_filter=self.event_filter,
+                )
+                records = 0
+                async for doc in executor.iter_documents():
+                    await queue.put((member.path, records, doc))
+                    records += 1
+                failed = executor.failed_events
+
+            self.stats.parsed += 1
+            self.stats.parsers[parser.name] = self.stats.parsers.get(parser.name, 0) + 1
+            await queue.put(_MemberDone(member.path, records, failed))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to parse archive member {member.path}: {e}")
+            self.stats.failed += 1
+        finally:
+            if executor is not None:
+                self.failed_events += executor.failed_events
+                self.filtered_events += executor.filtered_events
+            if stream is not None and member.spool is None:
+                stream.close()
+            member.close()
+            if copy_path is not None:
+                copy_path.unlink(missing_ok=True)
+
+    async def _parse_in_pool(
+        self,
+        pool: ProcessPool,
+        parser_class: type[BaseParser],
+        copy_path: Path,
+        member_path: str,
+        source_meta: dict[str, Any],
+        queue: asyncio.Queue,
+    ) -> tuple[int, int]:
+        """Parse a copied member in a worker process and queue its documents.
+
+        Returns:
+            Tuple of (documents queued, events that failed conversion)
+        """
+        output_path = copy_path.with_name(f"{copy_path.name}.ndjson")
+        try:
+            written, failed, filtered = await pool.submit(
+                _parse_member_file,
+                parser_class,
+                str(copy_path),
+                member_path,
+                str(output_path),
+                self.case_id,
+                self.evidence_id,
+                source_meta,
+                self.event_filter,
+            )
+            self.failed_events += failed
+            self.filtered_events += filtered
+
+            records = 0
+            with open(output_path, "rb") as output:
+                while records < written:
+                    lines = await asyncio.to_thread(output.readlines, OUTPUT_READ_BYTES)
+                    if not lines:
+                        break
+                    for line in lines:
+                        await queue.put((member_path, records, line.rstrip(b"\n")))
+                        records += 1
+            return records, failed
+        finally:
+            output_path.unlink(missing_ok=True)
+
+    def _copy_member(self, member: ArchiveMember, temp_dir: Path) -> Path:
+        """Copy a member to a temporary file, keeping its file name."""
+        fd, name = tempfile.mkstemp(
+            dir=temp_dir, prefix="member-", suffix=f"-{Path(member.path).name}"
+        )
+        with os.fdopen(fd, "wb") as f:
+            content = member.open()
+            try:
+                shutil.copyfileobj(content, f, COPY_BUFFER_BYTES)
+            finally:
+                if member.spool is None:
+                    content.close()
+        return Path(name)
@@ -4,13 +4,25 @@ Defines the abstract interface that all parsers must implement,
 along with common data structures for parsed events.
 """
 
+import json
 from abc import ABC, abstractmethod
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, BinaryIO
+from typing import TYPE_CHECKING, Any, BinaryIO
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from app.parsers.filtering import EventFilter
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 
 class ParserCategory(str, Enum):
@@ -38,13 +50,43 @@ class ParserMetadata:
     mime_types: list[str] = field(default_factory=list)
     category: str = "artifacts"
     priority: int = 50  # Higher = more likely to be selected when multiple parsers match
+    magic: list[tuple[int, bytes]] = field(default_factory=list)  # (offset, bytes) signatures
 
 
-@dataclass
+def _json_default(value: Any) -> Any:
+    """Serialize values the JSON encoders do not handle."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def encode_document(doc: dict[str, Any]) -> bytes:
+    """Serialize a document to compact JSON bytes.
+
+    Uses orjson when installed, falling back to the stdlib encoder for
+    documents orjson rejects (e.g. integers wider than 64 bits).
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(doc, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(doc, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+@dataclass(slots=True)
 class ParsedEvent:
     """Represents a single parsed event/record.
 
     Fields follow Elastic Common Schema (ECS) conventions where applicable.
+    The class is slotted: events carry no per-instance __dict__, and
+    attributes outside the declared fields cannot be set.
     """
 
     # Core fields
@@ -111,6 +153,15 @@ class ParsedEvent:
     labels: dict[str, str] = field(default_factory=dict)
     tags: list[str] = field(default_factory=list)
 
+    # Pre-normalized output from parsers that build ECS documents directly
+    # (the get_metadata() pattern); merged over the flat fields in to_dict()
+    id: str | None = None
+    source: str | None = None
+    raw_data: dict[str, Any] = field(default_factory=dict)
+    normalized: dict[str, Any] = field(default_factory=dict)
+    case_id: str | None = None
+    evidence_id: str | None = None
+
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         result: dict[str, Any] = {
@@ -220,8 +271,15 @@ class ParsedEvent:
         if self.raw:
             result["_raw"] = self.raw
 
+        if self.normalized:
+            for key, value in self.normalized.items():
+                if value is not None:
+                    result[key] = value
+            if self.raw_data and "_raw" not in result:
+                result["_raw"] = self.raw_data
+
         source_meta: dict[str, Any] = {
-            "type": self.source_type,
+            "type": self.source_type or self.source or "",
             "file": self.source_file,
         }
         result["_source"] = source_meta
@@ -230,6 +288,32 @@ class ParsedEvent:
 
         return result
 
+    def to_json(
+        self, extra: dict[str, Any] | None = None, source: dict[str, Any] | None = None
+    ) -> bytes:
+        """Serialize to the JSON document indexed for this event.
+
+        The document is still built by to_dict(), with extra and source
+        merged into it in place; the saving over encoding that dict with the
+        stdlib is in the encoder (orjson, straight to bytes with no str in
+        between), not in fewer allocations.
+
+        Args:
+            extra: Top-level fields written into the document, such as
+                case_id and evidence_id
+            source: Fields added to the _source metadata, such as the
+                archive member the event was parsed from
+
+        Returns:
+            Compact JSON bytes, ready for a bulk request body
+        """
+        result = self.to_dict()
+        if extra:
+            result.update(extra)
+        if source:
+            result["_source"].update(source)
+        return encode_document(result)
+
 
 @dataclass
 class ParserResult:
@@ -258,6 +342,11 @@ class BaseParser(ABC):
 
     _metadata: ParserMetadata | None = None
 
+    # Ingest-time filter of the job running the parser. Parsers that can
+    # reject records cheaply before building events consult it; everything
+    # they yield is still checked by the caller.
+    event_filter: "EventFilter | None" = None
+
     @classmethod
     def get_metadata(cls) -> ParserMetadata | None:
         """Return parser metadata. Override in subclasses using metadata pattern."""
@@ -323,6 +412,28 @@ class BaseParser(ABC):
             return meta.mime_types
         return []
 
+    @property
+    def magic_signatures(self) -> list[tuple[int, bytes]]:
+        """Magic bytes identifying this parser's format, as (offset, bytes) pairs.
+
+        The registry indexes these so detection checks parsers whose
+        signature matches the file header before anything else.
+        """
+        meta = self._get_metadata()
+        if meta:
+            return meta.magic
+        return []
+
+    @property
+    def supports_streaming(self) -> bool:
+        """Whether parse() can read a file-like source front to back.
+
+        Such parsers can consume evidence straight from object storage. Parsers
+        that need random access or a real file path (EVTX, SQLite databases,
+        registry hives) are given a locally cached copy instead.
+        """
+        return False
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if this parser can handle the given input.
 
@@ -359,6 +470,76 @@ class BaseParser(ABC):
         """
         ...
 
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """Check whether a file can be split into byte ranges and parsed in parallel.
+
+        Line-oriented parsers whose records never span lines override this and
+        parse_lines(). The returned context must be picklable; it is handed to
+        every range worker along with the lines of its range.
+
+        Parsers of files made of fixed-size records instead put the record
+        size in the context as "record_size" and implement
+        parse_record_range(); ranges are then cut on record boundaries.
+
+        Args:
+            file_path: Path to the file that is about to be parsed
+
+        Returns:
+            Context dict for parse_lines(), or None if the file must be parsed serially
+        """
+        return None
+
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a contiguous run of lines taken from the middle of a file.
+
+        Args:
+            lines: Decoded lines of one record-aligned byte range
+            source_name: Name of the source file
+            first_line: Line number of the first line in the range
+            context: Context returned by get_split_context()
+
+        Yields:
+            ParsedEvent objects for each parsed record
+        """
+        raise NotImplementedError(f"Parser {self.name} does not support split parsing")
+
+    def parse_record_range(
+        self,
+        file_path: Path,
+        start: int,
+        end: int,
+        source_name: str,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse the fixed-size records in a byte range of a file.
+
+        Called in a pool worker, which opens the file itself.
+
+        Args:
+            file_path: Path to the file being parsed
+            start: Offset of the first record in the range
+            end: Offset just past the last record in the range
+            source_name: Name of the source file
+            context: Context returned by get_split_context()
+
+        Yields:
+            ParsedEvent objects for each parsed record
+        """
+        raise NotImplementedError(f"Parser {self.name} does not support record ranges")
+
+    def release_split_context(self, context: dict[str, Any]) -> None:
+        """Release resources held by a split context once parsing has finished.
+
+        Args:
+            context: Context returned by get_split_context()
+        """
+
     def parse_all(
         self,
         source: Path | BinaryIO,
@@ -0,0 +1,216 @@
+"""Parser execution layer for parsing jobs.
+
+Runs a parser without blocking the event loop and hands its output to the
+indexing stage through a bounded asyncio queue. Blocking sync parsers run in
+a worker thread; async parsers (MemoryParser and the get_metadata() family)
+run natively as a task on the loop. Either way the producer is throttled by
+the queue, so parsing and Elasticsearch bulk calls overlap without the parser
+racing ahead of indexing.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from app.parsers.base import BaseParser, ParsedEvent, encode_document
+from app.parsers.filtering import EventFilter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 8  # Chunks buffered between parser and indexer
+DEFAULT_CHUNK_SIZE = 500  # Documents per queued chunk
+
+_DONE = object()
+
+
+def is_async_parser(parser: BaseParser) -> bool:
+    """Check whether a parser implements parse() as an async generator."""
+    return inspect.isasyncgenfunction(parser.parse)
+
+
+class ParserExecutor:
+    """Runs one parser over one file and yields ECS documents.
+
+    Events are converted to documents on the producer side, so for sync
+    parsers the to_dict() work also stays off the event loop. With encode
+    set, documents are yielded as JSON bytes (ParsedEvent.to_json) with
+    case_id and evidence_id written in, ready for the bulk body, so JSON
+    encoding moves off the loop as well. source_meta is merged into each
+    document's _source. Events that fail conversion are skipped and counted
+    in failed_events.
+
+    With an event_filter, events it rejects are dropped before conversion
+    and counted in filtered_events, and the rest are projected to its
+    fields. The filter is also handed to the parser so it can skip records
+    early; records skipped that way are not counted.
+
+    evidence_sha256, when known, is passed on to async parsers so those
+    that key caches by content (MemoryParser) need not hash the file again.
+    """
+
+    def __init__(
+        self,
+        parser: BaseParser,
+        file_path: Path | BinaryIO,
+        source_name: str,
+        case_id: str | None = None,
+        evidence_id: str | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        encode: bool = False,
+        source_meta: dict[str, Any] | None = None,
+        event_filter: EventFilter | None = None,
+        evidence_sha256: str | None = None,
+    ):
+        self.parser = parser
+        self.file_path = file_path
+        self.source_name = source_name
+        self.case_id = case_id
+        self.evidence_id = evidence_id
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.encode = encode
+        self.source_meta = source_meta or {}
+        self.event_filter = event_filter
+        self.evidence_sha256 = evidence_sha256
+        self.failed_events = 0
+        self.filtered_events = 0
+
+        if event_filter is not None:
+            parser.event_filter = event_filter
+
+        self._extra: dict[str, str] = {}
+        if case_id is not None:
+            self._extra["case_id"] = str(case_id)
+        if evidence_id is not None:
+            self._extra["evidence_id"] = str(evidence_id)
+
+    def _convert(self, event: ParsedEvent) -> dict[str, Any] | bytes | None:
+        """Convert an event to a document, counting failures."""
+        event_filter = self.event_filter
+        try:
+            if event_filter is None:
+                if self.encode:
+                    return event.to_json(self._extra, self.source_meta)
+                doc = event.to_dict()
+            else:
+                if not event_filter.matches(event):
+                    self.filtered_events += 1
+                    return None
+                doc = event_filter.project(event.to_dict())
+            if self.source_meta:
+                doc["_source"].update(self.source_meta)
+            if self.encode:
+                doc.update(self._extra)
+                return encode_document(doc)
+            return doc
+        except Exception as e:
+            logger.warning(f"Failed to process event: {e}")
+            self.failed_events += 1
+            return None
+
+    async def iter_documents(self) -> AsyncIterator[dict[str, Any] | bytes]:
+        """Yield ECS documents for the file as the parser produces them."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        stopped = threading.Event()
+
+        if is_async_parser(self.parser):
+            producer = asyncio.ensure_future(self._produce_async(queue, stopped))
+        else:
+            producer = loop.run_in_executor(None, self._produce_sync, queue, stopped, loop)
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                for doc in item:
+                    yield doc
+            await producer
+        finally:
+            stopped.set()
+            if isinstance(producer, asyncio.Task):
+                producer.cancel()
+            # Unblock a producer waiting on a full queue so it can see the stop flag
+            while not producer.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.wait({producer}, timeout=0.05)
+
+    def _produce_sync(
+        self,
+        queue: asyncio.Queue,
+        stopped: threading.Event,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        """Drive a sync parser in a worker thread."""
+
+        def put(item: Any) -> None:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        try:
+            for chunk in self.iter_chunks():
+                if stopped.is_set():
+                    return
+                put(chunk)
+            put(_DONE)
+        except Exception as e:
+            if not stopped.is_set():
+                put(e)
+
+    def iter_chunks(self) -> Iterator[list[dict[str, Any] | bytes]]:
+        """Run a sync parser in the calling thread, yielding chunks of documents.
+
+        For callers already off the event loop, such as a pool worker.
+        """
+        yield from self._chunk(self.parser.parse(self.file_path, source_name=self.source_name))
+
+    async def _produce_async(self, queue: asyncio.Queue, stopped: threading.Event) -> None:
+        """Drive an async parser on the event loop."""
+        try:
+            chunk: list[dict[str, Any] | bytes] = []
+            kwargs: dict[str, Any] = {}
+            if self.evidence_sha256:
+                kwargs["evidence_sha256"] = self.evidence_sha256
+            events = self.parser.parse(
+                self.file_path,
+                case_id=self.case_id,
+                evidence_id=self.evidence_id,
+                source_name=self.source_name,
+                **kwargs,
+            )
+            async for event in events:
+                if stopped.is_set():
+                    return
+                doc = self._convert(event)
+                if doc is not None:
+                    chunk.append(doc)
+                if len(chunk) >= self.chunk_size:
+                    await queue.put(chunk)
+                    chunk = []
+            if chunk:
+                await queue.put(chunk)
+            await queue.put(_DONE)
+        except Exception as e:
+            if not stopped.is_set():
+                await queue.put(e)
+
+    def _chunk(self, events: Iterator[ParsedEvent]) -> Iterator[list[dict[str, Any] | bytes]]:
+        """Convert events to documents and group them into chunks."""
+        chunk = []
+        for event in events:
+            doc = self._convert(event)
+            if doc is not None:
+                chunk.append(doc)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -0,0 +1,156 @@
+"""Ingest-time event filtering and field projection.
+
+Some evidence (full Sysmon event logs, Zeek conn logs) yields hundreds of
+millions of low-value events. A parsing job can carry a "filter" entry in
+its config that keeps only some events and some of their fields:
+
+    {
+        "event_ids": ["4624", "4625"],        # keep only these event IDs
+        "exclude_event_ids": ["5156"],        # drop these event IDs
+        "categories": ["authentication"],     # keep events in any of these
+        "source_types": ["zeek:conn"],        # keep only these source types
+        "fields": ["host", "user.name"],      # document fields to index
+        "drop_raw": true                      # leave out _raw
+    }
+
+Events are checked against the filter before they are converted to
+documents, so dropped events cost no to_dict() or JSON encoding. Parsers
+that can reject records before building an event (EVTX by event ID, Zeek
+by log type) read the filter from BaseParser.event_filter and skip them
+while parsing.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.parsers.base import ParsedEvent
+
+# Document fields kept by every projection
+ALWAYS_KEPT = ("@timestamp", "_source", "case_id", "evidence_id")
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """Which events of a parsing job to index, and which of their fields.
+
+    Empty sets place no restriction. Event IDs are compared as strings and
+    read from the event's "event_id" label. fields lists dotted document
+    paths; a path keeps everything below it, and the fields in ALWAYS_KEPT
+    are always indexed.
+    """
+
+    event_ids: frozenset[str] = frozenset()
+    exclude_event_ids: frozenset[str] = frozenset()
+    categories: frozenset[str] = frozenset()
+    source_types: frozenset[str] = frozenset()
+    fields: tuple[str, ...] = ()
+    drop_raw: bool = False
+    _paths: tuple[tuple[str, ...], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_paths", tuple(tuple(path.split(".")) for path in self.fields))
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "EventFilter | None":
+        """Build the filter of a parsing job from its config.
+
+        Args:
+            config: Job config; the spec is read from its "filter" entry
+
+        Returns:
+            EventFilter, or None if the job has no filter
+
+        Raises:
+            ValueError: If the spec has unknown keys or values of the wrong type
+        """
+        spec = config.get("filter")
+        if not spec:
+            return None
+        if not isinstance(spec, dict):
+            raise ValueError("filter must be an object")
+
+        unknown = set(spec) - {
+            "event_ids",
+            "exclude_event_ids",
+            "categories",
+            "source_types",
+            "fields",
+            "drop_raw",
+        }
+        if unknown:
+            raise ValueError(f"Unknown filter keys: {', '.join(sorted(unknown))}")
+
+        def strings(key: str) -> list[str]:
+            values = spec.get(key) or []
+            if not isinstance(values, list):
+                raise ValueError(f"filter.{key} must be a list")
+            return [str(value) for value in values]
+
+        return cls(
+            event_ids=frozenset(strings("event_ids")),
+            exclude_event_ids=frozenset(strings("exclude_event_ids")),
+            categories=frozenset(strings("categories")),
+            source_types=frozenset(strings("source_types")),
+            fields=tuple(strings("fields")),
+            drop_raw=bool(spec.get("drop_raw", False)),
+        )
+
+    @property
+    def projects(self) -> bool:
+        """Whether documents are cut down before indexing."""
+        return bool(self.fields) or self.drop_raw
+
+    def accepts_event_id(self, event_id: str | None) -> bool:
+        """Check an event ID against the event ID lists."""
+        if self.event_ids and event_id not in self.event_ids:
+            return False
+        return event_id not in self.exclude_event_ids
+
+    def accepts_source_type(self, source_type: str) -> bool:
+        """Check a source type, such as "zeek:conn", against source_types."""
+        return not self.source_types or source_type in self.source_types
+
+    def accepts_categories(self, categories: list[str]) -> bool:
+        """Check whether any of an event's categories is wanted."""
+        return not self.categories or not self.categories.isdisjoint(categories)
+
+    def matches(self, event: ParsedEvent) -> bool:
+        """Check whether an event is kept."""
+        if (self.event_ids or self.exclude_event_ids) and not self.accepts_event_id(
+            event.labels.get("event_id")
+        ):
+            return False
+        if not self.accepts_source_type(event.source_type or event.source or ""):
+            return False
+        return self.accepts_categories(event.event_category)
+
+    def project(self, doc: dict[str, Any]) -> dict[str, Any]:
+        """Cut a document down to the indexed fields, in place where possible."""
+        if self.drop_raw:
+            doc.pop("_raw", None)
+        if not self._paths:
+            return doc
+
+        result = {key: doc[key] for key in ALWAYS_KEPT if key in doc}
+        for path in self._paths:
+            _copy_path(doc, result, path)
+        return result
+
+
+def _copy_path(src: dict[str, Any], dst: dict[str, Any], path: tuple[str, ...]) -> None:
+    """Copy the value at a dotted path from one document to another."""
+    key = path[0]
+    if key not in src:
+        return
+    if len(path) == 1:
+        dst[key] = src[key]
+        return
+    value = src[key]
+    if not isinstance(value, dict):
+        return
+    child = dst.get(key)
+    if not isinstance(child, dict):
+        child = dst[key] = {}
+    _copy_path(value, child, path[1:])
+    if not child:
+        del dst[key]
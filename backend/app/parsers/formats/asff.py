@@ -5,7 +5,6 @@ format used by AWS security services including GuardDuty, Inspector,
 Macie, IAM Access Analyzer, and third-party integrations.
 """
 
-import json
 import logging
 from collections.abc import Iterator
 from datetime import UTC, datetime
@@ -13,7 +12,9 @@ from pathlib import Path
 from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
+from app.parsers.jsonl import iter_json_records
 from app.parsers.registry import register_parser
+from app.parsers.signatures import inflate_header, json_lines
 
 logger = logging.getLogger(__name__)
 
@@ -100,28 +101,23 @@ class ASFFParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["application/json"]
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if content is ASFF format."""
         if content:
+            content = inflate_header(content)
             try:
-                text = content.decode("utf-8", errors="ignore")
-                lines = text.strip().split("\n")
-
-                for line in lines[:5]:
-                    if not line.strip():
-                        continue
-
-                    try:
-                        data = json.loads(line)
-                        # ASFF has specific required fields
-                        if all(f in data for f in ["SchemaVersion", "Id", "ProductArn"]):
+                for data in json_lines(content, max_lines=5):
+                    # ASFF has specific required fields
+                    if all(f in data for f in ["SchemaVersion", "Id", "ProductArn"]):
+                        return True
+                    # Check for Findings array (batch export)
+                    if "Findings" in data and isinstance(data["Findings"], list):
+                        if data["Findings"] and "SchemaVersion" in data["Findings"][0]:
                             return True
-                        # Check for Findings array (batch export)
-                        if "Findings" in data and isinstance(data["Findings"], list):
-                            if data["Findings"] and "SchemaVersion" in data["Findings"][0]:
-                                return True
-                    except json.JSONDecodeError:
-                        pass
 
             except Exception:
                 pass
@@ -136,53 +132,14 @@ class ASFFParser(BaseParser):
         """Parse ASFF file and yield events."""
         source_str = source_name or (str(source) if isinstance(source, Path) else "stream")
 
-        if isinstance(source, Path):
-            with open(source, encoding="utf-8", errors="replace") as f:
-                yield from self._parse_file(f, source_str)
-        else:
-            import io
-
-            text_stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
-            yield from self._parse_file(text_stream, source_str)
-
-    def _parse_file(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
-        """Parse file content."""
-        content = file_handle.read()
-
-        try:
-            data = json.loads(content)
-
-            # Handle batch export format
-            if "Findings" in data:
-                findings = data["Findings"]
-            elif isinstance(data, list):
-                findings = data
-            else:
-                findings = [data]
-
-            for i, finding in enumerate(findings):
-                try:
-                    event = self._parse_finding(finding, source_name, i + 1)
-                    if event:
-                        yield event
-                except Exception as e:
-                    logger.debug(f"Error parsing finding {i + 1}: {e}")
-
-        except json.JSONDecodeError:
-            # Try JSONL format
-            file_handle.seek(0)
-            for line_num, line in enumerate(file_handle, 1):
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    finding = json.loads(line)
-                    event = self._parse_finding(finding, source_name, line_num)
-                    if event:
-                        yield event
-                except Exception as e:
-                    logger.debug(f"Error parsing line {line_num}: {e}")
+        # Batch exports wrap findings in a "Findings" list
+        for number, finding in iter_json_records(source, wrappers=("Findings",)):
+            try:
+                event = self._parse_finding(finding, source_str, number)
+                if event:
+                    yield event
+            except Exception as e:
+                logger.debug(f"Error parsing finding {number}: {e}")
 
     def _parse_finding(
         self,
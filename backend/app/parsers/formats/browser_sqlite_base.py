@@ -3,7 +3,7 @@
 PATTERN: Template Method Pattern
 This module provides a base class for parsing browser SQLite databases,
 encapsulating common functionality:
-- Temporary file creation for stream-based inputs
+- Local file access for stream-based inputs (see app.parsers.sources)
 - Read-only SQLite connection setup
 - Domain extraction from URLs
 - Automatic resource cleanup via context manager
@@ -19,7 +19,6 @@ Usage:
 
 import logging
 import sqlite3
-import tempfile
 from abc import ABC
 from collections.abc import Generator
 from contextlib import contextmanager
@@ -28,44 +27,29 @@ from typing import BinaryIO
 from urllib.parse import urlparse
 
 from app.parsers.base import BaseParser
+from app.parsers.sources import source_path
 
 logger = logging.getLogger(__name__)
 
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
 
 class BrowserSQLiteParser(BaseParser, ABC):
     """Base class for browser SQLite database parsers.
 
     Provides common utility methods for:
-    - Creating temporary files from binary streams
+    - Opening binary streams as local database files
     - Establishing read-only SQLite connections
     - Extracting domains from URLs
     - Context manager for automatic cleanup
 
     Subclasses should use the _db_context() method to safely access
-    the database and ensure proper cleanup of temporary files.
+    the database and ensure proper cleanup of any local copy.
     """
 
-    @staticmethod
-    def _create_temp_file(stream: BinaryIO, suffix: str = ".db") -> Path:
-        """Create a temporary file from a binary stream.
-
-        SQLite requires file-based access, so streams must be written
-        to a temporary file before parsing.
-
-        Args:
-            stream: Binary stream containing SQLite database
-            suffix: File extension for the temp file (default: .db)
-
-        Returns:
-            Path to the created temporary file
-
-        Note:
-            Caller is responsible for cleanup. Use _db_context() for
-            automatic cleanup, or manually unlink the file.
-        """
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-            tmp.write(stream.read())
-            return Path(tmp.name)
+    @property
+    def magic_signatures(self) -> list[tuple[int, bytes]]:
+        return [(0, SQLITE_MAGIC)]
 
     @staticmethod
     def _connect_readonly(db_path: Path) -> sqlite3.Connection:
@@ -110,8 +94,8 @@ class BrowserSQLiteParser(BaseParser, ABC):
     ) -> Generator[sqlite3.Connection, None, None]:
         """Context manager for safe database access with automatic cleanup.
 
-        Handles both file paths and binary streams, creating temporary
-        files as needed and ensuring cleanup on exit.
+        Handles both file paths and binary streams, using streams over local
+        files in place and copying others only as needed.
 
         Args:
             source: Path to database file, or binary stream
@@ -129,30 +113,20 @@ class BrowserSQLiteParser(BaseParser, ABC):
             Any sqlite3.Error during connection is caught and logged.
             The generator will exit cleanly without yielding a connection.
         """
-        cleanup_path: Path | None = None
         conn: sqlite3.Connection | None = None
 
-        try:
-            # Handle stream vs path input
-            if isinstance(source, BinaryIO) or hasattr(source, "read"):
-                cleanup_path = self._create_temp_file(source)
-                db_path = cleanup_path
-            else:
-                db_path = Path(source)
-
-            conn = self._connect_readonly(db_path)
-            yield conn
-
-        except sqlite3.Error as e:
-            logger.error("SQLite error opening database: %s", e)
-            raise
-
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except Exception:
-                    pass  # Best effort close
-
-            if cleanup_path:
-                cleanup_path.unlink(missing_ok=True)
+        with source_path(source, suffix=".db", named=True) as db_path:
+            try:
+                conn = self._connect_readonly(db_path)
+                yield conn
+
+            except sqlite3.Error as e:
+                logger.error("SQLite error opening database: %s", e)
+                raise
+
+            finally:
+                if conn:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass  # Best effort close
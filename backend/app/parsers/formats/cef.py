@@ -6,13 +6,14 @@ CEF format: CEF:Version|Device Vendor|Device Product|Device Version|Signature ID
 
 import logging
 import re
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import BinaryIO
+from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
 from app.parsers.registry import register_parser
+from app.parsers.signatures import sniff_text
 
 logger = logging.getLogger(__name__)
 
@@ -138,11 +139,15 @@ class CEFParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["text/plain", "application/octet-stream"]
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if content contains CEF format logs."""
         if content:
             try:
-                text = content.decode("utf-8", errors="ignore")
+                text = sniff_text(content)
                 # Check for CEF header pattern
                 if "CEF:" in text and "|" in text:
                     lines = text.split("\n")
@@ -176,9 +181,25 @@ class CEFParser(BaseParser):
             text_stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
             yield from self._parse_lines(text_stream, source_str)
 
-    def _parse_lines(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """CEF records are one per line."""
+        return {}
+
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of CEF lines."""
+        yield from self._parse_lines(lines, source_name, first_line)
+
+    def _parse_lines(
+        self, file_handle, source_name: str, start_line: int = 1
+    ) -> Iterator[ParsedEvent]:
         """Parse lines from file handle."""
-        for line_num, line in enumerate(file_handle, 1):
+        for line_num, line in enumerate(file_handle, start_line):
             line = line.strip()
             if not line:
                 continue
@@ -7,15 +7,16 @@ including process executions, network connections, file events, and more.
 FDR data is delivered as JSON/JSONL files from S3 or Falcon LogScale.
 """
 
-import json
 import logging
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
+from app.parsers.jsonl import decode_lines, iter_json_records
 from app.parsers.registry import register_parser
+from app.parsers.signatures import inflate_header, json_lines
 
 logger = logging.getLogger(__name__)
 
@@ -109,36 +110,31 @@ class CrowdStrikeFDRParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["application/json", "application/x-ndjson"]
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if content is CrowdStrike FDR format."""
         if content:
+            content = inflate_header(content)
             try:
-                text = content.decode("utf-8", errors="ignore")
-                lines = text.strip().split("\n")
-
-                for line in lines[:5]:
-                    if not line.strip():
-                        continue
-
-                    try:
-                        data = json.loads(line)
-                        # FDR events have specific CrowdStrike fields
-                        if "event_simpleName" in data or "name" in data:
-                            # Check for FDR-specific fields
-                            if any(
-                                field in data
-                                for field in [
-                                    "aid",
-                                    "cid",
-                                    "ComputerName",
-                                    "ContextProcessId",
-                                    "ParentProcessId",
-                                    "fdr_event_type",
-                                ]
-                            ):
-                                return True
-                    except json.JSONDecodeError:
-                        pass
+                for data in json_lines(content, max_lines=5):
+                    # FDR events have specific CrowdStrike fields
+                    if "event_simpleName" in data or "name" in data:
+                        # Check for FDR-specific fields
+                        if any(
+                            field in data
+                            for field in [
+                                "aid",
+                                "cid",
+                                "ComputerName",
+                                "ContextProcessId",
+                                "ParentProcessId",
+                                "fdr_event_type",
+                            ]
+                        ):
+                            return True
 
             except Exception:
                 pass
@@ -153,45 +149,38 @@ class CrowdStrikeFDRParser(BaseParser):
         """Parse CrowdStrike FDR file and yield events."""
         source_str = source_name or (str(source) if isinstance(source, Path) else "stream")
 
-        if isinstance(source, Path):
-            with open(source, encoding="utf-8", errors="replace") as file_handle:
-                yield from self._parse_file(file_handle, source_str)
-        else:
-            import io
+        # FDR exports are either a JSON array, streamed element by element,
+        # or JSONL
+        for number, record in iter_json_records(source):
+            event = self._parse_record(record, source_str, number)
+            if event:
+                yield event
 
-            text_stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
-            yield from self._parse_file(text_stream, source_str)
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """FDR JSONL exports split on line boundaries; JSON arrays do not."""
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            first_char = f.read(1)
 
-    def _parse_file(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
-        """Parse file content."""
-        # Try to detect format
-        first_char = file_handle.read(1)
-        file_handle.seek(0)
+        return None if first_char == "[" else {}
 
-        if first_char == "[":
-            # JSON array
-            try:
-                data = json.load(file_handle)
-                for index, record in enumerate(data):
-                    event = self._parse_record(record, source_name, index + 1)
-                    if event:
-                        yield event
-            except json.JSONDecodeError:
-                pass
-        else:
-            # JSONL
-            for line_number, line in enumerate(file_handle, 1):
-                line = line.strip()
-                if not line:
-                    continue
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of FDR JSONL lines."""
+        yield from self._parse_jsonl(lines, source_name, first_line)
 
-                try:
-                    record = json.loads(line)
-                    event = self._parse_record(record, source_name, line_number)
-                    if event:
-                        yield event
-                except json.JSONDecodeError:
-                    logger.debug(f"JSON parse error at line {line_number}")
+    def _parse_jsonl(
+        self, lines: Iterable[str], source_name: str, start_line: int = 1
+    ) -> Iterator[ParsedEvent]:
+        """Parse JSONL content."""
+        for line_number, record in decode_lines(lines, start_line):
+            event = self._parse_record(record, source_name, line_number)
+            if event:
+                yield event
 
     def _parse_record(
         self,
@@ -239,7 +228,7 @@ class CrowdStrikeFDRParser(BaseParser):
 
         # Host information
         event.host_name = record.get("ComputerName", "")
-        event.host_id = record.get("aid", "")
+        event.labels["host_id"] = record.get("aid", "")
 
         # User information
         if record.get("UserName"):
@@ -355,7 +344,7 @@ class CrowdStrikeFDRParser(BaseParser):
         if record.get("HttpHost"):
             event.labels["http_host"] = record["HttpHost"]
         if record.get("HttpPath"):
-            event.url_path = record["HttpPath"]
+            event.labels["url_path"] = record["HttpPath"]
         if record.get("HttpMethod"):
             event.labels["http_method"] = record["HttpMethod"]
 
@@ -380,7 +369,7 @@ class CrowdStrikeFDRParser(BaseParser):
     def _parse_registry_fields(self, record: dict, event: ParsedEvent) -> None:
         """Extract registry-related fields."""
         if record.get("RegObjectName"):
-            event.registry_key = record["RegObjectName"]
+            event.labels["registry_key"] = record["RegObjectName"]
 
         if record.get("RegValueName"):
             event.labels["registry_value_name"] = record["RegValueName"]
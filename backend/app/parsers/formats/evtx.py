@@ -1,7 +1,9 @@
 """Windows Event Log (EVTX) parser.
 
 Parses Windows Event Log files using the python-evtx library.
-Extracts events and normalizes to ECS format.
+Extracts events and normalizes to ECS format. Records are decoded directly
+from their binary XML templates (see evtx_binxml), falling back to rendering
+XML and parsing it with ElementTree for records that path cannot handle.
 """
 
 import logging
@@ -12,6 +14,8 @@ from pathlib import Path
 from typing import TYPE_CHECKING, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
+from app.parsers.formats.evtx_binxml import ChunkDecoder, DecodedRecord
+from app.parsers.sources import source_mmap
 
 if TYPE_CHECKING:
     from evtx import PyEvtxParser
@@ -71,6 +75,9 @@ EVENT_CATEGORY_MAP = {
 class WindowsEvtxParser(BaseParser):
     """Parser for Windows Event Log (EVTX) files."""
 
+    # Decode records from their binary XML templates; False forces the XML path
+    fast_decode = True
+
     @property
     def name(self) -> str:
         return "windows_evtx"
@@ -91,6 +98,10 @@ class WindowsEvtxParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["application/x-ms-evtx"]
 
+    @property
+    def magic_signatures(self) -> list[tuple[int, bytes]]:
+        return [(0, EVTX_MAGIC)]
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check for EVTX magic bytes."""
         if content and len(content) >= 8:
@@ -124,23 +135,10 @@ class WindowsEvtxParser(BaseParser):
         source_str = source_name or (str(source) if isinstance(source, Path) else "stream")
 
         try:
-            if isinstance(source, Path):
-                with evtx.Evtx(str(source)) as log:
-                    yield from self._parse_log(log, source_str)
-            else:
-                # For file-like objects, we need to save to temp file
-                # as python-evtx requires file path
-                import tempfile
-
-                with tempfile.NamedTemporaryFile(suffix=".evtx", delete=False) as tmp:
-                    tmp.write(source.read())
-                    tmp_path = tmp.name
-
-                try:
-                    with evtx.Evtx(tmp_path) as log:
-                        yield from self._parse_log(log, source_str)
-                finally:
-                    Path(tmp_path).unlink(missing_ok=True)
+            # Map the source directly instead of copying streams to a
+            # temporary file for evtx.Evtx, which only accepts a path
+            with source_mmap(source) as buf:
+                yield from self._parse_log(evtx.FileHeader(buf, 0x0), source_str)
 
         except Exception as e:
             logger.error(f"Failed to parse EVTX: {e}")
@@ -148,14 +146,41 @@ class WindowsEvtxParser(BaseParser):
 
     def _parse_log(self, log: "PyEvtxParser", source_name: str) -> Iterator[ParsedEvent]:
         """Parse an open EVTX log."""
-        for record in log.records():
-            try:
-                xml_str = record.xml()
-                root = ET.fromstring(xml_str)
-                yield self._parse_record(root, source_name, record.record_num())
-            except Exception as e:
-                logger.debug(f"Failed to parse record: {e}")
-                continue
+        fallbacks = 0
+        # Records of unwanted event IDs are dropped before building events
+        event_filter = self.event_filter
+        if event_filter is not None and not (
+            event_filter.event_ids or event_filter.exclude_event_ids
+        ):
+            event_filter = None
+
+        for chunk in log.chunks():
+            decoder = ChunkDecoder() if self.fast_decode else None
+
+            for record in chunk.records():
+                event = None
+                if decoder is not None:
+                    try:
+                        decoded = decoder.decode(record)
+                        if event_filter and not event_filter.accepts_event_id(decoded.event_id):
+                            continue
+                        event = self._build_event(decoded, source_name, record.record_num())
+                    except Exception as e:
+                        logger.debug(f"Record {record.record_num()} uses the XML path: {e}")
+                        fallbacks += 1
+
+                if event is None:
+                    try:
+                        root = ET.fromstring(record.xml())
+                        event = self._parse_record(root, source_name, record.record_num())
+                    except Exception as e:
+                        logger.debug(f"Failed to parse record: {e}")
+                        continue
+
+                yield event
+
+        if fallbacks:
+            logger.debug(f"{fallbacks} records in {source_name} decoded via XML")
 
     def _parse_record(self, root: ET.Element, source_name: str, record_num: int) -> ParsedEvent:
         """Parse a single EVTX record from XML."""
@@ -163,34 +188,60 @@ class WindowsEvtxParser(BaseParser):
 
         # Extract System fields
         system = root.find("e:System", ns)
-        event_id = self._get_text(system, "e:EventID", ns, default="0")
-        event_id_int = int(event_id) if event_id.isdigit() else 0
-
         time_created = system.find("e:TimeCreated", ns)
-        timestamp_str = time_created.get("SystemTime") if time_created is not None else None
+        provider = system.find("e:Provider", ns)
 
-        if timestamp_str:
-            try:
-                # Handle various timestamp formats
-                timestamp_str = timestamp_str.replace("Z", "+00:00")
-                if "." in timestamp_str:
-                    # Truncate nanoseconds to microseconds
-                    parts = timestamp_str.split(".")
-                    frac = parts[1].split("+")[0].split("-")[0][:6]
-                    tz = "+" + parts[1].split("+")[1] if "+" in parts[1] else ""
-                    if "-" in parts[1] and "+" not in parts[1]:
-                        tz = "-" + parts[1].split("-")[1]
-                    timestamp_str = f"{parts[0]}.{frac}{tz}"
-                timestamp = datetime.fromisoformat(timestamp_str)
-            except Exception:
-                timestamp = datetime.now(UTC)
-        else:
-            timestamp = datetime.now(UTC)
+        # Extract EventData fields
+        event_data = root.find("e:EventData", ns)
+        data_fields = {}
+        if event_data is not None:
+            for data in event_data.findall("e:Data", ns):
+                name = data.get("Name", f"data_{len(data_fields)}")
+                data_fields[name] = data.text
 
-        computer = self._get_text(system, "e:Computer", ns)
-        channel = self._get_text(system, "e:Channel", ns)
-        provider = system.find("e:Provider", ns)
-        provider_name = provider.get("Name") if provider is not None else None
+        decoded = DecodedRecord(
+            event_id=self._get_text(system, "e:EventID", ns, default="0"),
+            system_time=time_created.get("SystemTime") if time_created is not None else None,
+            computer=self._get_text(system, "e:Computer", ns),
+            channel=self._get_text(system, "e:Channel", ns),
+            provider_name=provider.get("Name") if provider is not None else None,
+            data_fields=data_fields,
+        )
+        return self._build_event(decoded, source_name, record_num)
+
+    def _parse_timestamp(self, value: datetime | str | None) -> datetime:
+        """Convert a SystemTime value to a datetime."""
+        if isinstance(value, datetime):
+            return value if value.tzinfo else value.replace(tzinfo=UTC)
+        if not value:
+            return datetime.now(UTC)
+
+        try:
+            # Handle various timestamp formats
+            timestamp_str = value.replace("Z", "+00:00")
+            if "." in timestamp_str:
+                # Truncate nanoseconds to microseconds
+                parts = timestamp_str.split(".")
+                frac = parts[1].split("+")[0].split("-")[0][:6]
+                tz = "+" + parts[1].split("+")[1] if "+" in parts[1] else ""
+                if "-" in parts[1] and "+" not in parts[1]:
+                    tz = "-" + parts[1].split("-")[1]
+                timestamp_str = f"{parts[0]}.{frac}{tz}"
+            return datetime.fromisoformat(timestamp_str)
+        except Exception:
+            return datetime.now(UTC)
+
+    def _build_event(
+        self, decoded: DecodedRecord, source_name: str, record_num: int
+    ) -> ParsedEvent:
+        """Build a ParsedEvent from the fields of a decoded record."""
+        event_id = decoded.event_id
+        event_id_int = int(event_id) if event_id.isdigit() else 0
+        timestamp = self._parse_timestamp(decoded.system_time)
+
+        computer = decoded.computer
+        channel = decoded.channel
+        provider_name = decoded.provider_name
 
         # Get event category/type/action from mapping
         if event_id_int in EVENT_CATEGORY_MAP:
@@ -200,13 +251,7 @@ class WindowsEvtxParser(BaseParser):
             types = ["info"]
             action = f"event_{event_id}"
 
-        # Extract EventData fields
-        event_data = root.find("e:EventData", ns)
-        data_fields = {}
-        if event_data is not None:
-            for data in event_data.findall("e:Data", ns):
-                name = data.get("Name", f"data_{len(data_fields)}")
-                data_fields[name] = data.text
+        data_fields = decoded.data_fields
 
         # Build message from event data
         message = self._build_message(event_id_int, provider_name, data_fields)
@@ -0,0 +1,221 @@
+"""Direct decoding of EVTX binary XML records.
+
+Each EVTX record is an instance of a template stored in its chunk plus a
+list of substitution values. Rendering a record to XML text and parsing it
+again with ElementTree repeats the template walk for every record; instead,
+each template is compiled once per chunk into a TemplatePlan recording where
+the fields WindowsEvtxParser needs come from (template literals or
+substitution indexes), and records are decoded by reading just those
+substitutions.
+
+Templates or records that cannot be decoded this way raise UnsupportedRecordError
+so the caller can fall back to the XML path.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# A field value: template literals and substitution indexes, concatenated
+ValueParts = tuple[str | int, ...]
+
+SYSTEM_TEXT_FIELDS = {
+    ("Event", "System", "EventID"): "event_id",
+    ("Event", "System", "Computer"): "computer",
+    ("Event", "System", "Channel"): "channel",
+}
+
+SYSTEM_ATTRIBUTE_FIELDS = {
+    ("Event", "System", "TimeCreated", "SystemTime"): "system_time",
+    ("Event", "System", "Provider", "Name"): "provider_name",
+}
+
+EVENT_DATA_PATH = ("Event", "EventData", "Data")
+
+# Elements whose content must be fully understood for a plan to be complete
+_REQUIRED_CONTENT = {("Event",), ("Event", "System"), ("Event", "EventData")}
+
+
+class UnsupportedRecordError(Exception):
+    """Raised when a record must be decoded through the XML path."""
+
+
+@dataclass
+class TemplatePlan:
+    """Locations of the parser's fields within one template."""
+
+    event_id: ValueParts | None = None
+    system_time: ValueParts | None = None
+    computer: ValueParts | None = None
+    channel: ValueParts | None = None
+    provider_name: ValueParts | None = None
+    data: list[tuple[ValueParts | None, ValueParts]] = field(default_factory=list)
+
+
+@dataclass
+class DecodedRecord:
+    """Fields of one record, as the XML path would have extracted them."""
+
+    event_id: str
+    system_time: datetime | str | None
+    computer: str
+    channel: str
+    provider_name: str | None
+    data_fields: dict[str, str | None]
+
+
+def compile_template(template: Any) -> TemplatePlan:
+    """Compile a python-evtx TemplateNode into a TemplatePlan.
+
+    Raises:
+        UnsupportedRecordError: If a field the parser reads cannot be located
+    """
+    from Evtx import Nodes as e_nodes
+
+    plan = TemplatePlan()
+    for child in template.children():
+        if isinstance(child, e_nodes.OpenStartElementNode):
+            _compile_element(child, (), plan, e_nodes)
+    return plan
+
+
+def _compile_element(node: Any, path: tuple[str, ...], plan: TemplatePlan, e_nodes: Any) -> None:
+    """Record the fields of one element and its descendants in the plan."""
+    element_path = path + (node.tag_name(),)
+    attributes: dict[str, ValueParts] = {}
+    text: list[str | int] = []
+    text_supported = True
+
+    for child in node.children():
+        if isinstance(child, e_nodes.AttributeNode):
+            try:
+                attributes[child.attribute_name().string()] = _value_parts(
+                    child.attribute_value(), e_nodes
+                )
+            except UnsupportedRecordError:
+                if element_path[:2] == ("Event", "System") or element_path == EVENT_DATA_PATH:
+                    raise
+        elif isinstance(child, e_nodes.OpenStartElementNode):
+            _compile_element(child, element_path, plan, e_nodes)
+        elif isinstance(
+            child,
+            (
+                e_nodes.CloseStartElementNode,
+                e_nodes.CloseEmptyElementNode,
+                e_nodes.CloseElementNode,
+            ),
+        ):
+            continue
+        else:
+            try:
+                text.extend(_value_parts(child, e_nodes))
+            except UnsupportedRecordError:
+                text_supported = False
+
+    if not text_supported and (
+        element_path in _REQUIRED_CONTENT
+        or element_path in SYSTEM_TEXT_FIELDS
+        or element_path == EVENT_DATA_PATH
+    ):
+        raise UnsupportedRecordError(f"Unsupported content in {'/'.join(element_path)}")
+
+    if element_path in SYSTEM_TEXT_FIELDS:
+        setattr(plan, SYSTEM_TEXT_FIELDS[element_path], tuple(text))
+
+    for name, parts in attributes.items():
+        attribute_field = SYSTEM_ATTRIBUTE_FIELDS.get(element_path + (name,))
+        if attribute_field:
+            setattr(plan, attribute_field, parts)
+
+    if element_path == EVENT_DATA_PATH:
+        plan.data.append((attributes.get("Name"), tuple(text)))
+
+
+def _value_parts(node: Any, e_nodes: Any) -> ValueParts:
+    """Describe a value node as literal strings and substitution indexes."""
+    if isinstance(node, e_nodes.ValueNode):
+        return (node.children()[0].string(),)
+    if isinstance(node, (e_nodes.NormalSubstitutionNode, e_nodes.ConditionalSubstitutionNode)):
+        if node.type() == e_nodes.NODE_TYPES.BXML:
+            raise UnsupportedRecordError("Nested binary XML substitution")
+        return (node.index(),)
+    raise UnsupportedRecordError(f"Unsupported node {type(node).__name__}")
+
+
+class ChunkDecoder:
+    """Decodes the records of one chunk, compiling each template once.
+
+    Template offsets are only meaningful within a chunk, so a new decoder is
+    used for every chunk; this also bounds the plan cache to one chunk's
+    templates.
+    """
+
+    def __init__(self) -> None:
+        self._plans: dict[int, TemplatePlan | None] = {}
+        self.templates_compiled = 0
+
+    def decode(self, record: Any) -> DecodedRecord:
+        """Decode a python-evtx Record.
+
+        Raises:
+            UnsupportedRecordError: If the record needs the XML path
+        """
+        from Evtx import Nodes as e_nodes
+
+        root = record.root()
+        template_offset = root.template_instance().template_offset()
+
+        if template_offset in self._plans:
+            plan = self._plans[template_offset]
+        else:
+            try:
+                plan = compile_template(root.template())
+                self.templates_compiled += 1
+            except UnsupportedRecordError as e:
+                logger.debug(f"Template at {template_offset:#x} uses the XML path: {e}")
+                plan = None
+            self._plans[template_offset] = plan
+
+        if plan is None:
+            raise UnsupportedRecordError("Template not supported")
+
+        subs = root.substitutions()
+
+        def render(parts: ValueParts) -> str:
+            values = []
+            for part in parts:
+                if isinstance(part, str):
+                    values.append(part)
+                    continue
+                sub = subs[part]
+                if isinstance(sub, e_nodes.BXmlTypeNode):
+                    raise UnsupportedRecordError("Nested binary XML value")
+                values.append(sub.string())
+            return "".join(values)
+
+        system_time: datetime | str | None = None
+        if plan.system_time is not None:
+            parts = plan.system_time
+            if len(parts) == 1 and isinstance(parts[0], int):
+                sub = subs[parts[0]]
+                if isinstance(sub, e_nodes.FiletimeTypeNode):
+                    system_time = sub.filetime()
+            if system_time is None:
+                system_time = render(parts) or None
+
+        data_fields: dict[str, str | None] = {}
+        for name_parts, value_parts in plan.data:
+            name = render(name_parts) if name_parts is not None else f"data_{len(data_fields)}"
+            data_fields[name] = render(value_parts) or None
+
+        return DecodedRecord(
+            event_id=(render(plan.event_id) if plan.event_id is not None else "") or "0",
+            system_time=system_time,
+            computer=render(plan.computer) if plan.computer is not None else "",
+            channel=render(plan.channel) if plan.channel is not None else "",
+            provider_name=(render(plan.provider_name) if plan.provider_name is not None else None),
+            data_fields=data_fields,
+        )
@@ -7,7 +7,6 @@ Parses Google Cloud Platform audit logs including:
 - Policy Denied logs
 """
 
-import json
 import logging
 from collections.abc import Iterator
 from datetime import UTC, datetime
@@ -15,7 +14,9 @@ from pathlib import Path
 from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
+from app.parsers.jsonl import iter_json_records
 from app.parsers.registry import register_parser
+from app.parsers.signatures import inflate_header, json_lines
 
 logger = logging.getLogger(__name__)
 
@@ -88,35 +89,30 @@ class GCPAuditLogParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["application/json"]
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if content is GCP audit log format."""
         if content:
+            content = inflate_header(content)
             try:
-                text = content.decode("utf-8", errors="ignore")
-                lines = text.strip().split("\n")
-
-                for line in lines[:5]:
-                    if not line.strip():
-                        continue
-
-                    try:
-                        data = json.loads(line)
-                        # GCP audit logs have specific fields
-                        if "protoPayload" in data and "@type" in data.get("protoPayload", {}):
-                            type_url = data["protoPayload"]["@type"]
-                            if "AuditLog" in type_url:
-                                return True
-                        # Also check for Cloud Logging format
-                        if "resource" in data and data.get("resource", {}).get("type") in (
-                            "gce_instance",
-                            "gcs_bucket",
-                            "cloud_function",
-                            "k8s_cluster",
-                            "bigquery_dataset",
-                        ):
+                for data in json_lines(content, max_lines=5):
+                    # GCP audit logs have specific fields
+                    if "protoPayload" in data and "@type" in data.get("protoPayload", {}):
+                        type_url = data["protoPayload"]["@type"]
+                        if "AuditLog" in type_url:
                             return True
-                    except json.JSONDecodeError:
-                        pass
+                    # Also check for Cloud Logging format
+                    if "resource" in data and data.get("resource", {}).get("type") in (
+                        "gce_instance",
+                        "gcs_bucket",
+                        "cloud_function",
+                        "k8s_cluster",
+                        "bigquery_dataset",
+                    ):
+                        return True
 
             except Exception:
                 pass
@@ -131,29 +127,12 @@ class GCPAuditLogParser(BaseParser):
         """Parse GCP audit log file and yield events."""
         source_str = source_name or (str(source) if isinstance(source, Path) else "stream")
 
-        if isinstance(source, Path):
-            with open(source, encoding="utf-8", errors="replace") as f:
-                yield from self._parse_lines(f, source_str)
-        else:
-            import io
-
-            text_stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
-            yield from self._parse_lines(text_stream, source_str)
-
-    def _parse_lines(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
-        """Parse JSON lines."""
-        for line_num, line in enumerate(file_handle, 1):
-            line = line.strip()
-            if not line:
-                continue
-
+        # gcloud exports JSON arrays, log sinks write JSONL
+        for line_num, record in iter_json_records(source):
             try:
-                record = json.loads(line)
-                event = self._parse_record(record, source_name, line_num)
+                event = self._parse_record(record, source_str, line_num)
                 if event:
                     yield event
-            except json.JSONDecodeError as e:
-                logger.debug(f"JSON parse error at line {line_num}: {e}")
             except Exception as e:
                 logger.debug(f"Parse error at line {line_num}: {e}")
 
@@ -6,13 +6,15 @@ to ECS format. Supports common log formats like CloudTrail, Azure AD, etc.
 
 import json
 import logging
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import BinaryIO
+from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
+from app.parsers.jsonl import decode_lines, iter_json_records
 from app.parsers.registry import register_parser
+from app.parsers.signatures import inflate_header, sniff_text
 
 logger = logging.getLogger(__name__)
 
@@ -83,12 +85,16 @@ class GenericJSONParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["application/json", "application/x-ndjson"]
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if content is valid JSON/JSONL."""
         if content:
             try:
                 # Try to decode first line
-                text = content.decode("utf-8", errors="ignore").strip()
+                text = sniff_text(inflate_header(content)).strip()
                 if text.startswith("{") or text.startswith("["):
                     return True
             except Exception:
@@ -109,66 +115,42 @@ class GenericJSONParser(BaseParser):
         """Parse JSON/JSONL file and yield events."""
         source_str = source_name or (str(source) if isinstance(source, Path) else "stream")
 
-        if isinstance(source, Path):
-            with open(source, encoding="utf-8", errors="replace") as f:
-                yield from self._parse_file(f, source_str)
-        else:
-            # Handle binary stream
-            import io
-
-            text_stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
-            yield from self._parse_file(text_stream, source_str)
-
-    def _parse_file(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
-        """Parse an open file handle."""
-        # Read first line to detect format
-        first_line = file_handle.readline().strip()
-        if not first_line:
-            return
-
-        # Check if it's a JSON array or object
-        if first_line.startswith("[") or first_line.startswith("{"):
-            # Try to parse as complete JSON (array or object)
-            file_handle.seek(0)
+        # Arrays are streamed element by element; CloudTrail files wrap their
+        # events in a "Records" list
+        for number, record in iter_json_records(source, wrappers=("Records",), comments=True):
+            yield self._parse_record(record, source_str, number)
+
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """JSONL files split on line boundaries; whole JSON documents do not."""
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            first_line = f.readline().strip()
+
+        if first_line.startswith("["):
+            return None
+        if first_line.startswith("{"):
             try:
-                data = json.load(file_handle)
-                if isinstance(data, list):
-                    # Check for CloudTrail format
-                    if "Records" in data[0] if data else False:
-                        for item in data:
-                            for record in item.get("Records", []):
-                                yield self._parse_record(record, source_name, 0)
-                    else:
-                        for i, record in enumerate(data):
-                            yield self._parse_record(record, source_name, i + 1)
-                elif isinstance(data, dict):
-                    # Check for wrapped records (CloudTrail, etc.)
-                    if "Records" in data:
-                        for i, record in enumerate(data["Records"]):
-                            yield self._parse_record(record, source_name, i + 1)
-                    else:
-                        yield self._parse_record(data, source_name, 1)
+                json.loads(first_line)
             except json.JSONDecodeError:
-                # Failed to parse as complete JSON, try JSONL
-                file_handle.seek(0)
-                yield from self._parse_jsonl(file_handle, source_name)
-        else:
-            # JSONL format - parse line by line
-            file_handle.seek(0)
-            yield from self._parse_jsonl(file_handle, source_name)
+                # Pretty-printed document spanning many lines
+                return None
+        return {}
 
-    def _parse_jsonl(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of JSONL lines."""
+        yield from self._parse_jsonl(lines, source_name, first_line)
+
+    def _parse_jsonl(
+        self, lines: Iterable[str], source_name: str, start_line: int = 1
+    ) -> Iterator[ParsedEvent]:
         """Parse JSONL (JSON Lines) format."""
-        for line_num, line in enumerate(file_handle, 1):
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            try:
-                record = json.loads(line)
-                yield self._parse_record(record, source_name, line_num)
-            except json.JSONDecodeError as e:
-                logger.debug(f"Failed to parse line {line_num}: {e}")
-                continue
+        for line_num, record in decode_lines(lines, start_line, comments=True):
+            yield self._parse_record(record, source_name, line_num)
 
     def _parse_record(self, record: dict, source_name: str, line_num: int) -> ParsedEvent:
         """Parse a single JSON record to ParsedEvent."""
@@ -13,6 +13,7 @@ from typing import BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
 from app.parsers.registry import register_parser
+from app.parsers.signatures import sniff_text
 
 logger = logging.getLogger(__name__)
 
@@ -108,7 +109,7 @@ class LinuxAuthLogParser(BaseParser):
 
         if content:
             try:
-                text = content.decode("utf-8", errors="ignore")[:2000]
+                text = sniff_text(content)[:2000]
                 # Check for common auth log indicators
                 auth_indicators = [
                     "sshd[",
@@ -5,13 +5,14 @@ Parses Linux syslog, messages, and kern.log files.
 
 import logging
 import re
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import BinaryIO
+from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
 from app.parsers.registry import register_parser
+from app.parsers.signatures import sniff_text
 
 logger = logging.getLogger(__name__)
 
@@ -91,7 +92,7 @@ class LinuxSyslogParser(BaseParser):
 
         if content:
             try:
-                text = content.decode("utf-8", errors="ignore")[:2000]
+                text = sniff_text(content)[:2000]
                 # Check for syslog patterns
                 for pattern in SYSLOG_PATTERNS:
                     if pattern.search(text):
@@ -129,19 +130,41 @@ class LinuxSyslogParser(BaseParser):
                 opener = io.StringIO(text)
 
             with opener as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    event = self._parse_line(line, source_str, line_num)
-                    if event:
-                        yield event
+                yield from self._parse_lines(f, source_str)
 
         except Exception as e:
             logger.error(f"Failed to parse syslog {source_str}: {e}")
             raise
 
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """Plain syslog files are one message per line."""
+        if file_path.suffix == ".gz":
+            return None
+        return {}
+
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of syslog lines."""
+        yield from self._parse_lines(lines, source_name, first_line)
+
+    def _parse_lines(
+        self, lines: Iterable[str], source_name: str, start_line: int = 1
+    ) -> Iterator[ParsedEvent]:
+        """Parse syslog lines."""
+        for line_num, line in enumerate(lines, start_line):
+            line = line.strip()
+            if not line:
+                continue
+
+            event = self._parse_line(line, source_name, line_num)
+            if event:
+                yield event
+
     def _parse_line(self, line: str, source_name: str, line_num: int) -> ParsedEvent | None:
         """Parse a single syslog line."""
         for pattern in SYSLOG_PATTERNS:
@@ -49,6 +49,7 @@ class LnkParser(BaseParser):
             mime_types=["application/x-ms-shortcut"],
             category="windows",
             priority=75,
+            magic=[(0, LNK_SIGNATURE + LNK_GUID)],
         )
 
     async def parse(
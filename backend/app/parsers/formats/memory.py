@@ -17,11 +17,16 @@ Volatility 3 plugins used:
 """
 
 import asyncio
+import hashlib
 import json
 import logging
+import os
 import subprocess
+import tempfile
 from collections.abc import AsyncIterator
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from importlib import metadata
 from pathlib import Path
 from typing import Any
 from uuid import uuid4
@@ -31,16 +36,91 @@ from app.parsers.registry import register_parser
 
 logger = logging.getLogger(__name__)
 
+# Plugins run at once for one image
+DEFAULT_PLUGIN_WORKERS = 4
+# Plugin results and Volatility's symbol cache, shared by all plugin runs
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "eleanor-volatility"
+
+HASH_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class VolatilityPlugin:
+    """A Volatility 3 plugin run and the converter for its output rows.
+
+    convert names a MemoryParser method; converters shared by every OS take
+    the OS type as well, the Linux-style bash and lsof converters do not.
+    """
+
+    name: str
+    convert: str
+    args: tuple[str, ...] = ()
+    timeout: int = 300
+    takes_os: bool = True
+
+
+# Plugins run for each OS, in the order their events are yielded
+PLUGINS: dict[str, list[VolatilityPlugin]] = {
+    "windows": [
+        VolatilityPlugin("windows.pslist.PsList", "_process_to_event"),
+        VolatilityPlugin("windows.cmdline.CmdLine", "_cmdline_to_event"),
+        VolatilityPlugin("windows.dlllist.DllList", "_dll_to_event"),
+        VolatilityPlugin("windows.netscan.NetScan", "_network_to_event"),
+        VolatilityPlugin("windows.malfind.Malfind", "_malfind_to_event"),
+        VolatilityPlugin(
+            "windows.handles.Handles", "_handle_to_event", ("--type", "File"), timeout=600
+        ),
+        VolatilityPlugin(
+            "windows.handles.Handles", "_handle_to_event", ("--type", "Key"), timeout=600
+        ),
+        VolatilityPlugin("windows.svcscan.SvcScan", "_service_to_event"),
+        VolatilityPlugin("windows.driverscan.DriverScan", "_driver_to_event"),
+    ],
+    "linux": [
+        VolatilityPlugin("linux.pslist.PsList", "_process_to_event"),
+        VolatilityPlugin("linux.bash.Bash", "_bash_to_event", takes_os=False),
+        VolatilityPlugin("linux.lsof.Lsof", "_lsof_to_event", takes_os=False),
+        VolatilityPlugin("linux.sockstat.Sockstat", "_network_to_event"),
+        VolatilityPlugin("linux.malfind.Malfind", "_malfind_to_event"),
+        VolatilityPlugin("linux.lsmod.Lsmod", "_module_to_event"),
+    ],
+    "mac": [
+        VolatilityPlugin("mac.pslist.PsList", "_process_to_event"),
+        VolatilityPlugin("mac.bash.Bash", "_bash_to_event", takes_os=False),
+        VolatilityPlugin("mac.lsof.Lsof", "_lsof_to_event", takes_os=False),
+        VolatilityPlugin("mac.netstat.Netstat", "_network_to_event"),
+        VolatilityPlugin("mac.malfind.Malfind", "_malfind_to_event"),
+    ],
+}
+
+# OS probes, in order of preference
+OS_PROBES = [
+    ("windows", VolatilityPlugin("windows.info.Info", "", timeout=120)),
+    ("linux", VolatilityPlugin("linux.boottime.Boottime", "", timeout=120)),
+    ("mac", VolatilityPlugin("mac.pslist.PsList", "", timeout=120)),
+]
+
 
 @register_parser
 class MemoryParser(BaseParser):
-    """Parser for memory dumps using Volatility 3."""
+    """Parser for memory dumps using Volatility 3.
+
+    Plugins for an image run concurrently, up to max_workers Volatility
+    processes at a time, with one symbol cache shared between them. Plugin
+    output is cached on disk under the image's SHA-256, the plugin and its
+    arguments, and the Volatility version, so parsing the same image again
+    does not run Volatility at all.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, max_workers: int = DEFAULT_PLUGIN_WORKERS, cache_dir: Path | None = None):
         super().__init__()
         self.volatility_path = self._find_volatility()
+        self.volatility_version = self._volatility_version()
+        self.max_workers = max(1, max_workers)
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
         self._os_type: str | None = None
         self._os_info: dict[str, Any] = {}
+        self._slots: asyncio.Semaphore | None = None
 
     @classmethod
     def get_metadata(cls) -> ParserMetadata:
@@ -88,7 +168,14 @@ class MemoryParser(BaseParser):
         # Default - will be validated on parse
         return "vol"
 
-    def _run_volatility(
+    def _volatility_version(self) -> str:
+        """Get the installed Volatility 3 version, part of the result cache key."""
+        try:
+            return metadata.version("volatility3")
+        except metadata.PackageNotFoundError:
+            return "unknown"
+
+    async def _run_volatility(
         self,
         memory_file: str,
         plugin: str,
@@ -98,6 +185,8 @@ class MemoryParser(BaseParser):
         """Run a Volatility 3 plugin and return JSON output."""
         cmd = [
             self.volatility_path,
+            "--cache-path",
+            str(self.cache_dir / "symbols"),
             "-f",
             memory_file,
             "-r",
@@ -110,56 +199,132 @@ class MemoryParser(BaseParser):
 
         logger.debug(f"Running Volatility command: {' '.join(cmd)}")
 
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
 
-            if result.returncode != 0:
-                logger.warning(f"Volatility plugin {plugin} failed: {result.stderr}")
-                return {"error": result.stderr, "data": []}
+        async with self._slots:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except Exception as e:
+                logger.error(f"Failed to run Volatility plugin {plugin}: {e}")
+                return {"error": str(e), "data": []}
 
-            # Parse JSON output
             try:
-                return json.loads(result.stdout)
-            except json.JSONDecodeError:
-                # Some plugins output line-by-line JSON
-                lines = result.stdout.strip().split("\n")
-                data = []
-                for line in lines:
-                    try:
-                        data.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
-                return {"data": data}
-
-        except subprocess.TimeoutExpired:
-            logger.error(f"Volatility plugin {plugin} timed out after {timeout}s")
-            return {"error": "timeout", "data": []}
-        except Exception as e:
-            logger.error(f"Failed to run Volatility plugin {plugin}: {e}")
-            return {"error": str(e), "data": []}
-
-    def _detect_os(self, memory_file: str) -> str:
-        """Detect the OS type from the memory dump."""
-        # Try Windows info first
-        result = self._run_volatility(memory_file, "windows.info.Info", timeout=120)
-        if "data" in result and result["data"] and "error" not in result:
-            self._os_info = result.get("data", [{}])[0] if result.get("data") else {}
-            return "windows"
-
-        # Try Linux info
-        result = self._run_volatility(memory_file, "linux.boottime.Boottime", timeout=120)
-        if "data" in result and result["data"] and "error" not in result:
-            return "linux"
-
-        # Try Mac info
-        result = self._run_volatility(memory_file, "mac.pslist.PsList", timeout=120)
-        if "data" in result and result["data"] and "error" not in result:
-            return "mac"
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except TimeoutError:
+                process.kill()
+                await process.wait()
+                logger.error(f"Volatility plugin {plugin} timed out after {timeout}s")
+                return {"error": "timeout", "data": []}
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+
+        if process.returncode != 0:
+            error = stderr.decode("utf-8", errors="replace")
+            logger.warning(f"Volatility plugin {plugin} failed: {error}")
+            return {"error": error, "data": []}
+
+        # Parse JSON output
+        output = stdout.decode("utf-8", errors="replace")
+        try:
+            result = json.loads(output)
+        except json.JSONDecodeError:
+            # Some plugins output line-by-line JSON
+            lines = output.strip().split("\n")
+            data = []
+            for line in lines:
+                try:
+                    data.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+            return {"data": data}
+
+        # The JSON renderer writes a bare list of rows
+        if isinstance(result, list):
+            return {"data": result}
+        return result
+
+    async def _run_plugin(
+        self, memory_file: str, image_hash: str, plugin: VolatilityPlugin
+    ) -> dict[str, Any]:
+        """Run a plugin, or load its output cached for the same image."""
+        cache_path = self._result_path(image_hash, plugin)
+        cached = await asyncio.to_thread(_read_json, cache_path)
+        if cached is not None:
+            logger.info(f"Using cached {plugin.name} output for {Path(memory_file).name}")
+            return cached
+
+        logger.info(f"Running {plugin.name} {' '.join(plugin.args)}".rstrip())
+        result = await self._run_volatility(
+            memory_file,
+            plugin.name,
+            extra_args=list(plugin.args) or None,
+            timeout=plugin.timeout,
+        )
+        if "error" not in result:
+            await asyncio.to_thread(_write_json, cache_path, result)
+        return result
+
+    def _result_path(self, image_hash: str, plugin: VolatilityPlugin) -> Path:
+        """Cache file for a plugin's output on one image."""
+        key = "\x1f".join([plugin.name, *plugin.args, self.volatility_version])
+        digest = hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+        return self.cache_dir / "results" / image_hash / f"{plugin.name}-{digest}.json"
+
+    def _image_hash(self, memory_file: str) -> str:
+        """SHA-256 of the image, remembered per path, size and modification time."""
+        stat = os.stat(memory_file)
+        identity = f"{Path(memory_file).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        marker = (
+            self.cache_dir
+            / "images"
+            / f"{hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()}.sha256"
+        )
+        try:
+            return marker.read_text().strip()
+        except OSError:
+            pass
+
+        sha256 = hashlib.sha256()
+        with open(memory_file, "rb") as f:
+            while block := f.read(HASH_BLOCK_BYTES):
+                sha256.update(block)
+        image_hash = sha256.hexdigest()
+
+        try:
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.write_text(image_hash)
+        except OSError as e:
+            logger.debug(f"Could not remember image hash: {e}")
+        return image_hash
+
+    async def _detect_os(self, memory_file: str, image_hash: str) -> str:
+        """Detect the OS type from the memory dump.
+
+        The probes run concurrently; the first OS in order of preference
+        whose probe succeeds wins, and the remaining probes are cancelled.
+        """
+        probes = [
+            (os_type, asyncio.ensure_future(self._run_plugin(memory_file, image_hash, plugin)))
+            for os_type, plugin in OS_PROBES
+        ]
+        try:
+            for os_type, probe in probes:
+                result = await probe
+                if "data" in result and result["data"] and "error" not in result:
+                    if os_type == "windows":
+                        self._os_info = result["data"][0]
+                    return os_type
+        finally:
+            for _, probe in probes:
+                probe.cancel()
+            await asyncio.gather(*(probe for _, probe in probes), return_exceptions=True)
 
         # Default to windows as most common
         logger.warning("Could not detect OS type, defaulting to Windows")
@@ -172,191 +337,42 @@ class MemoryParser(BaseParser):
         evidence_id: str | None = None,
         **kwargs: Any,
     ) -> AsyncIterator[ParsedEvent]:
-        """Parse memory dump and yield normalized events."""
+        """Parse memory dump and yield normalized events.
+
+        The image's SHA-256, known for stored evidence, may be passed as
+        evidence_sha256; otherwise it is computed once and remembered for
+        the file.
+        """
         memory_file = str(file_path)
+        image_hash = kwargs.get("evidence_sha256") or await asyncio.to_thread(
+            self._image_hash, memory_file
+        )
 
         # Detect OS type
         logger.info(f"Detecting OS type for memory dump: {file_path.name}")
-        self._os_type = await asyncio.to_thread(self._detect_os, memory_file)
+        self._os_type = await self._detect_os(memory_file, image_hash)
         logger.info(f"Detected OS type: {self._os_type}")
 
-        # Run appropriate plugins based on OS
-        if self._os_type == "windows":
-            async for event in self._parse_windows(memory_file, case_id, evidence_id):
-                yield event
-        elif self._os_type == "linux":
-            async for event in self._parse_linux(memory_file, case_id, evidence_id):
-                yield event
-        elif self._os_type == "mac":
-            async for event in self._parse_mac(memory_file, case_id, evidence_id):
-                yield event
-
-    async def _parse_windows(
-        self,
-        memory_file: str,
-        case_id: str | None,
-        evidence_id: str | None,
-    ) -> AsyncIterator[ParsedEvent]:
-        """Parse Windows memory dump."""
-        # Process list
-        logger.info("Running windows.pslist.PsList")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "windows.pslist.PsList")
-        for proc in result.get("data", []):
-            yield self._process_to_event(proc, "windows", case_id, evidence_id)
-
-        # Command lines
-        logger.info("Running windows.cmdline.CmdLine")
-        result = await asyncio.to_thread(
-            self._run_volatility, memory_file, "windows.cmdline.CmdLine"
-        )
-        for cmdline in result.get("data", []):
-            yield self._cmdline_to_event(cmdline, "windows", case_id, evidence_id)
-
-        # DLL list
-        logger.info("Running windows.dlllist.DllList")
-        result = await asyncio.to_thread(
-            self._run_volatility, memory_file, "windows.dlllist.DllList"
-        )
-        for dll in result.get("data", []):
-            yield self._dll_to_event(dll, "windows", case_id, evidence_id)
-
-        # Network connections
-        logger.info("Running windows.netscan.NetScan")
-        result = await asyncio.to_thread(
-            self._run_volatility, memory_file, "windows.netscan.NetScan"
-        )
-        for conn in result.get("data", []):
-            yield self._network_to_event(conn, "windows", case_id, evidence_id)
-
-        # Malfind (suspicious memory regions)
-        logger.info("Running windows.malfind.Malfind")
-        result = await asyncio.to_thread(
-            self._run_volatility, memory_file, "windows.malfind.Malfind"
-        )
-        for mal in result.get("data", []):
-            yield self._malfind_to_event(mal, "windows", case_id, evidence_id)
-
-        # File handles
-        logger.info("Running windows.handles.Handles")
-        result = await asyncio.to_thread(
-            self._run_volatility,
-            memory_file,
-            "windows.handles.Handles",
-            extra_args=["--type", "File"],
-            timeout=600,
-        )
-        for handle in result.get("data", []):
-            yield self._handle_to_event(handle, "windows", case_id, evidence_id)
-
-        # Registry handles
-        logger.info("Running windows.handles.Handles (Registry)")
-        result = await asyncio.to_thread(
-            self._run_volatility,
-            memory_file,
-            "windows.handles.Handles",
-            extra_args=["--type", "Key"],
-            timeout=600,
-        )
-        for handle in result.get("data", []):
-            yield self._handle_to_event(handle, "windows", case_id, evidence_id)
-
-        # Services
-        logger.info("Running windows.svcscan.SvcScan")
-        result = await asyncio.to_thread(
-            self._run_volatility, memory_file, "windows.svcscan.SvcScan"
-        )
-        for svc in result.get("data", []):
-            yield self._service_to_event(svc, "windows", case_id, evidence_id)
-
-        # Drivers
-        logger.info("Running windows.driverscan.DriverScan")
-        result = await asyncio.to_thread(
-            self._run_volatility, memory_file, "windows.driverscan.DriverScan"
-        )
-        for drv in result.get("data", []):
-            yield self._driver_to_event(drv, "windows", case_id, evidence_id)
-
-    async def _parse_linux(
-        self,
-        memory_file: str,
-        case_id: str | None,
-        evidence_id: str | None,
-    ) -> AsyncIterator[ParsedEvent]:
-        """Parse Linux memory dump."""
-        # Process list
-        logger.info("Running linux.pslist.PsList")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "linux.pslist.PsList")
-        for proc in result.get("data", []):
-            yield self._process_to_event(proc, "linux", case_id, evidence_id)
-
-        # Bash history
-        logger.info("Running linux.bash.Bash")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "linux.bash.Bash")
-        for cmd in result.get("data", []):
-            yield self._bash_to_event(cmd, case_id, evidence_id)
-
-        # Open files
-        logger.info("Running linux.lsof.Lsof")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "linux.lsof.Lsof")
-        for fd in result.get("data", []):
-            yield self._lsof_to_event(fd, case_id, evidence_id)
-
-        # Network connections
-        logger.info("Running linux.sockstat.Sockstat")
-        result = await asyncio.to_thread(
-            self._run_volatility, memory_file, "linux.sockstat.Sockstat"
-        )
-        for sock in result.get("data", []):
-            yield self._network_to_event(sock, "linux", case_id, evidence_id)
-
-        # Malfind
-        logger.info("Running linux.malfind.Malfind")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "linux.malfind.Malfind")
-        for mal in result.get("data", []):
-            yield self._malfind_to_event(mal, "linux", case_id, evidence_id)
-
-        # Loaded kernel modules
-        logger.info("Running linux.lsmod.Lsmod")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "linux.lsmod.Lsmod")
-        for mod in result.get("data", []):
-            yield self._module_to_event(mod, "linux", case_id, evidence_id)
-
-    async def _parse_mac(
-        self,
-        memory_file: str,
-        case_id: str | None,
-        evidence_id: str | None,
-    ) -> AsyncIterator[ParsedEvent]:
-        """Parse macOS memory dump."""
-        # Process list
-        logger.info("Running mac.pslist.PsList")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "mac.pslist.PsList")
-        for proc in result.get("data", []):
-            yield self._process_to_event(proc, "mac", case_id, evidence_id)
-
-        # Bash history
-        logger.info("Running mac.bash.Bash")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "mac.bash.Bash")
-        for cmd in result.get("data", []):
-            yield self._bash_to_event(cmd, case_id, evidence_id)
-
-        # Open files
-        logger.info("Running mac.lsof.Lsof")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "mac.lsof.Lsof")
-        for fd in result.get("data", []):
-            yield self._lsof_to_event(fd, case_id, evidence_id)
-
-        # Network connections
-        logger.info("Running mac.netstat.Netstat")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "mac.netstat.Netstat")
-        for conn in result.get("data", []):
-            yield self._network_to_event(conn, "mac", case_id, evidence_id)
-
-        # Malfind
-        logger.info("Running mac.malfind.Malfind")
-        result = await asyncio.to_thread(self._run_volatility, memory_file, "mac.malfind.Malfind")
-        for mal in result.get("data", []):
-            yield self._malfind_to_event(mal, "mac", case_id, evidence_id)
+        # Start every plugin for the OS, then yield their events in plugin
+        # order as each finishes
+        plugins = PLUGINS.get(self._os_type, [])
+        runs = [
+            asyncio.ensure_future(self._run_plugin(memory_file, image_hash, plugin))
+            for plugin in plugins
+        ]
+        try:
+            for plugin, run in zip(plugins, runs, strict=True):
+                result = await run
+                convert = getattr(self, plugin.convert)
+                for row in result.get("data", []):
+                    if plugin.takes_os:
+                        yield convert(row, self._os_type, case_id, evidence_id)
+                    else:
+                        yield convert(row, case_id, evidence_id)
+        finally:
+            for run in runs:
+                run.cancel()
+            await asyncio.gather(*runs, return_exceptions=True)
 
     def _process_to_event(
         self,
@@ -983,3 +999,23 @@ class MemoryParser(BaseParser):
             case_id=case_id,
             evidence_id=evidence_id,
         )
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    try:
+        with open(path, "rb") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data: dict[str, Any]) -> None:
+    """Write a cache file atomically, so concurrent readers never see part of it."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_name, path)
+    except OSError as e:
+        logger.warning(f"Could not cache Volatility output at {path}: {e}")
@@ -1,11 +1,19 @@
-"""NTFS Master File Table (MFT) parser using Dissect.
+"""NTFS Master File Table (MFT) parser.
 
 Parses NTFS MFT files to extract filesystem metadata for timeline analysis.
+Records are decoded by this module rather than dissect, for serial parses
+and record ranges alike, so both emit the same documents.
 """
 
 import logging
+import os
+import pickle
+import struct
+import tempfile
 from collections.abc import Iterator
-from datetime import UTC, datetime
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any, BinaryIO
 
@@ -18,6 +26,249 @@ logger = logging.getLogger(__name__)
 # MFT entry signature
 MFT_SIGNATURE = b"FILE"
 
+DEFAULT_RECORD_SIZE = 1024
+ROOT_RECORD = 5
+
+# Record header flags
+FLAG_IN_USE = 0x01
+FLAG_DIRECTORY = 0x02
+
+# Attribute types
+ATTR_STANDARD_INFORMATION = 0x10
+ATTR_FILE_NAME = 0x30
+ATTR_DATA = 0x80
+ATTR_END = 0xFFFFFFFF
+
+# $FILE_NAME namespace of 8.3 short names
+NAMESPACE_DOS = 2
+
+# Records read at a time when scanning a range
+READ_RECORDS = 1024
+
+_REFERENCE_MASK = 0xFFFFFFFFFFFF
+_FILETIME_EPOCH = datetime(1601, 1, 1, tzinfo=UTC)
+
+_RECORD_HEADER = struct.Struct("<4sHH8sHHHHII8s")
+_ATTRIBUTE_HEADER = struct.Struct("<IIBBH")
+_TIMES = struct.Struct("<QQQQ")
+
+# Directory path maps loaded in this (worker) process, by map file
+_DIRECTORY_PATHS: dict[str, dict[int, str]] = {}
+
+
+@dataclass
+class MftTimes:
+    """Timestamps of a $STANDARD_INFORMATION or $FILE_NAME attribute."""
+
+    creation_time: datetime | None
+    modification_time: datetime | None
+    mft_modification_time: datetime | None
+    access_time: datetime | None
+
+
+@dataclass
+class MftFileName(MftTimes):
+    """A $FILE_NAME attribute."""
+
+    name: str = ""
+    parent: int = 0
+    namespace: int = 0
+
+
+@dataclass
+class MftHeader:
+    """Header fields of an MFT record."""
+
+    flags: int
+
+
+@dataclass
+class MftData:
+    """The unnamed $DATA attribute of an MFT record."""
+
+    size: int
+
+
+@dataclass
+class MftEntry:
+    """An MFT record decoded without dissect.
+
+    full_path is resolved from the directory path map.
+    """
+
+    segment: int
+    header: MftHeader
+    standard_information: MftTimes | None = None
+    filename: MftFileName | None = None
+    data: MftData | None = None
+    full_path: str = ""
+
+
+def read_mft_entry(record: bytearray, segment: int) -> MftEntry | None:
+    """Decode an MFT record, applying its update sequence fixups in place.
+
+    Returns:
+        MftEntry, or None for unused, extension and corrupt records
+    """
+    (
+        signature,
+        usa_offset,
+        usa_count,
+        _,
+        _,
+        _,
+        attribute_offset,
+        flags,
+        _,
+        _,
+        base_reference,
+    ) = _RECORD_HEADER.unpack_from(record)
+    if signature != MFT_SIGNATURE or not flags & FLAG_IN_USE:
+        return None
+    # Extension records carry attributes of their base record
+    if int.from_bytes(base_reference, "little") & _REFERENCE_MASK:
+        return None
+
+    # The last two bytes of every stride were replaced by the update
+    # sequence number when the record was written
+    if usa_count > 1:
+        stride = len(record) // (usa_count - 1)
+        check = record[usa_offset : usa_offset + 2]
+        for i in range(1, usa_count):
+            end = i * stride
+            if record[end - 2 : end] != check:
+                return None
+            record[end - 2 : end] = record[usa_offset + 2 * i : usa_offset + 2 * i + 2]
+
+    entry = MftEntry(segment=segment, header=MftHeader(flags=flags))
+    offset = attribute_offset
+    while offset + _ATTRIBUTE_HEADER.size <= len(record):
+        attr_type, length, non_resident, name_length, _ = _ATTRIBUTE_HEADER.unpack_from(
+            record, offset
+        )
+        if attr_type == ATTR_END or length == 0 or offset + length > len(record):
+            break
+
+        if not non_resident:
+            size, content_offset = struct.unpack_from("<IH", record, offset + 0x10)
+            content = offset + content_offset
+            if attr_type == ATTR_STANDARD_INFORMATION and size >= _TIMES.size:
+                entry.standard_information = MftTimes(*_times(_TIMES.unpack_from(record, content)))
+            elif attr_type == ATTR_FILE_NAME and size >= 0x42:
+                filename = _read_file_name(record, content)
+                # Prefer the long name over the 8.3 short name
+                if entry.filename is None or entry.filename.namespace == NAMESPACE_DOS:
+                    entry.filename = filename
+            elif attr_type == ATTR_DATA and not name_length:
+                entry.data = MftData(size=size)
+        elif attr_type == ATTR_DATA and not name_length:
+            entry.data = MftData(size=struct.unpack_from("<Q", record, offset + 0x30)[0])
+
+        offset += length
+
+    return entry
+
+
+def _read_file_name(record: bytearray, offset: int) -> MftFileName:
+    parent = struct.unpack_from("<Q", record, offset)[0] & _REFERENCE_MASK
+    created, modified, mft_modified, accessed = _times(_TIMES.unpack_from(record, offset + 8))
+    name_length, namespace = record[offset + 0x40], record[offset + 0x41]
+    name = bytes(record[offset + 0x42 : offset + 0x42 + name_length * 2])
+    return MftFileName(
+        creation_time=created,
+        modification_time=modified,
+        mft_modification_time=mft_modified,
+        access_time=accessed,
+        name=name.decode("utf-16-le", errors="replace"),
+        parent=parent,
+        namespace=namespace,
+    )
+
+
+def _times(filetimes: tuple[int, ...]) -> list[datetime | None]:
+    """Convert SI/FN FILETIMEs (created, modified, MFT modified, accessed)."""
+    times = []
+    for filetime in filetimes:
+        try:
+            times.append(
+                _FILETIME_EPOCH + timedelta(microseconds=filetime // 10) if filetime else None
+            )
+        except OverflowError:
+            times.append(None)
+    return times
+
+
+def iter_mft_entries(
+    fh: BinaryIO, record_size: int, start: int = 0, end: int | None = None
+) -> Iterator[MftEntry]:
+    """Decode the in-use base records in a byte range of an MFT."""
+    fh.seek(start)
+    segment = start // record_size
+    remaining = None if end is None else end - start
+    while remaining is None or remaining > 0:
+        size = READ_RECORDS * record_size
+        if remaining is not None:
+            size = min(size, remaining)
+            remaining -= size
+        block = fh.read(size)
+        if len(block) < record_size:
+            break
+        for offset in range(0, len(block) - record_size + 1, record_size):
+            entry = read_mft_entry(bytearray(block[offset : offset + record_size]), segment)
+            segment += 1
+            if entry:
+                yield entry
+
+
+def read_record_size(fh: BinaryIO) -> int | None:
+    """Read the record size from the first MFT record.
+
+    Returns:
+        Record size in bytes, or None if the file does not start with a record
+    """
+    fh.seek(0)
+    header = fh.read(0x20)
+    if header[:4] != MFT_SIGNATURE:
+        return None
+    return struct.unpack_from("<I", header, 0x1C)[0] or DEFAULT_RECORD_SIZE
+
+
+def resolve_full_path(entry: MftEntry, paths: dict[int, str]) -> None:
+    """Set an entry's full path from the directory path map."""
+    if entry.filename:
+        parent = paths.get(entry.filename.parent, "\\$OrphanFiles")
+        entry.full_path = f"{parent}\\{entry.filename.name}"
+
+
+def build_directory_paths(fh: BinaryIO, record_size: int) -> dict[int, str]:
+    """Resolve the full path of every directory in an MFT.
+
+    Only directories can be parents, so this map is all a range worker
+    needs to give any record its full path.
+    """
+    parents: dict[int, tuple[int, str]] = {}
+    for entry in iter_mft_entries(fh, record_size):
+        if entry.header.flags & FLAG_DIRECTORY and entry.filename:
+            parents[entry.segment] = (entry.filename.parent, entry.filename.name)
+
+    paths: dict[int, str] = {ROOT_RECORD: ""}
+
+    def resolve(segment: int) -> str:
+        chain = []
+        # Stop at cycles and at parents that are missing or reused
+        while segment not in paths and segment in parents and len(chain) < len(parents):
+            chain.append(segment)
+            segment = parents[segment][0]
+        path = paths.get(segment, "\\$OrphanFiles")
+        for child in reversed(chain):
+            path = f"{path}\\{parents[child][1]}"
+            paths[child] = path
+        return path
+
+    for segment in parents:
+        resolve(segment)
+    return paths
+
 
 @register_parser
 class NTFSMftParser(DissectParserAdapter):
@@ -39,6 +290,10 @@ class NTFSMftParser(DissectParserAdapter):
     def supported_extensions(self) -> list[str]:
         return [".$MFT", ".mft", ".MFT"]
 
+    @property
+    def magic_signatures(self) -> list[tuple[int, bytes]]:
+        return [(0, MFT_SIGNATURE)]
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check for MFT signature."""
         if content and len(content) >= 4:
@@ -53,35 +308,82 @@ class NTFSMftParser(DissectParserAdapter):
 
         return False
 
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """Split the MFT into record ranges, with a precomputed directory path map.
+
+        The map of directory paths is written to a temporary file that each
+        range worker loads once; release_split_context() removes it.
+        """
+        with open(file_path, "rb") as f:
+            record_size = read_record_size(f)
+            if record_size is None:
+                return None
+            paths = build_directory_paths(f, record_size)
+
+        fd, map_path = tempfile.mkstemp(prefix="mft-directories-", suffix=".pickle")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(paths, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.info(f"Resolved {len(paths)} directory paths in {file_path.name}")
+        return {"record_size": record_size, "directory_paths": map_path}
+
+    def parse_record_range(
+        self,
+        file_path: Path,
+        start: int,
+        end: int,
+        source_name: str,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of MFT records in a pool worker."""
+        map_path = context["directory_paths"]
+        paths = _DIRECTORY_PATHS.get(map_path)
+        if paths is None:
+            with open(map_path, "rb") as f:
+                paths = _DIRECTORY_PATHS[map_path] = pickle.load(f)
+
+        with open(file_path, "rb") as f:
+            for entry in iter_mft_entries(f, context["record_size"], start, end):
+                resolve_full_path(entry, paths)
+                try:
+                    event = self._parse_record(entry, source_name)
+                    if event:
+                        yield event
+                except Exception as e:
+                    logger.debug(f"Failed to parse MFT record {entry.segment}: {e}")
+
+    def release_split_context(self, context: dict[str, Any]) -> None:
+        """Remove the directory path map written for a split parse."""
+        try:
+            os.unlink(context["directory_paths"])
+        except OSError:
+            pass
+
     def _get_dissect_parser(self, source: Path | BinaryIO) -> Any:
-        """Get Dissect MFT parser."""
-        from dissect.ntfs import mft
+        """Return the source itself, for _iterate_records to decode.
 
-        if isinstance(source, Path):
-            return mft.MftParser(open(source, "rb"))
-        return mft.MftParser(source)
+        dissect's records expose names, paths and times differently from
+        MftEntry, so serial parses use the decoder the range workers use.
+        """
+        return source
 
     def _iterate_records(self, parser: Any) -> Iterator[Any]:
-        """Iterate over MFT records."""
-        try:
-            for record in parser.records():
-                if record and record.header.flags & 0x01:  # IN_USE flag
-                    yield record
-        except Exception as e:
-            logger.error(f"Error iterating MFT records: {e}")
+        """Decode the in-use base records, with their full paths resolved."""
+        opened = open(parser, "rb") if isinstance(parser, Path) else nullcontext(parser)
+        with opened as f:
+            record_size = read_record_size(f)
+            if record_size is None:
+                raise ValueError("Not an MFT: first record has no FILE signature")
+            paths = build_directory_paths(f, record_size)
+            for entry in iter_mft_entries(f, record_size):
+                resolve_full_path(entry, paths)
+                yield entry
 
     def _parse_record(self, record: Any, source_name: str) -> ParsedEvent | None:
         """Convert an MFT record to ParsedEvent."""
         try:
             # Get filename
-            filename = ""
-            file_path_full = ""
-            if hasattr(record, "filename") and record.filename:
-                fn_attr = record.filename
-                filename = fn_attr.name if hasattr(fn_attr, "name") else str(fn_attr)
-            elif hasattr(record, "get_full_path"):
-                file_path_full = record.get_full_path()
-                filename = Path(file_path_full).name if file_path_full else ""
+            filename = record.filename.name if record.filename else ""
+            file_path_full = record.full_path
 
             # Skip system files for cleaner output
             if filename.startswith("$") and len(filename) > 1:
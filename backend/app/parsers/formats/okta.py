@@ -4,7 +4,6 @@ Parses Okta System Log events for authentication, authorization,
 and administrative activities.
 """
 
-import json
 import logging
 from collections.abc import Iterator
 from datetime import UTC, datetime
@@ -12,7 +11,9 @@ from pathlib import Path
 from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
+from app.parsers.jsonl import iter_json_records
 from app.parsers.registry import register_parser
+from app.parsers.signatures import inflate_header, json_lines
 
 logger = logging.getLogger(__name__)
 
@@ -80,26 +81,21 @@ class OktaParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["application/json"]
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if content is Okta log format."""
         if content:
+            content = inflate_header(content)
             try:
-                text = content.decode("utf-8", errors="ignore")
-                lines = text.strip().split("\n")
-
-                for line in lines[:5]:
-                    if not line.strip():
-                        continue
-
-                    try:
-                        data = json.loads(line)
-                        # Okta events have specific fields
-                        if all(f in data for f in ["actor", "outcome", "eventType"]):
-                            return True
-                        if "uuid" in data and "published" in data and "actor" in data:
-                            return True
-                    except json.JSONDecodeError:
-                        pass
+                for data in json_lines(content, max_lines=5):
+                    # Okta events have specific fields
+                    if all(f in data for f in ["actor", "outcome", "eventType"]):
+                        return True
+                    if "uuid" in data and "published" in data and "actor" in data:
+                        return True
 
             except Exception:
                 pass
@@ -114,45 +110,12 @@ class OktaParser(BaseParser):
         """Parse Okta log file and yield events."""
         source_str = source_name or (str(source) if isinstance(source, Path) else "stream")
 
-        if isinstance(source, Path):
-            with open(source, encoding="utf-8", errors="replace") as f:
-                yield from self._parse_file(f, source_str)
-        else:
-            import io
-
-            text_stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
-            yield from self._parse_file(text_stream, source_str)
-
-    def _parse_file(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
-        """Parse file content."""
-        # Try to detect format
-        first_char = file_handle.read(1)
-        file_handle.seek(0)
-
-        if first_char == "[":
-            # JSON array
-            try:
-                data = json.load(file_handle)
-                for i, record in enumerate(data):
-                    event = self._parse_record(record, source_name, i + 1)
-                    if event:
-                        yield event
-            except json.JSONDecodeError:
-                pass
-        else:
-            # JSONL
-            for line_num, line in enumerate(file_handle, 1):
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    record = json.loads(line)
-                    event = self._parse_record(record, source_name, line_num)
-                    if event:
-                        yield event
-                except json.JSONDecodeError:
-                    logger.debug(f"JSON parse error at line {line_num}")
+        # Okta exports are either a JSON array, streamed element by element,
+        # or JSONL
+        for number, record in iter_json_records(source):
+            event = self._parse_record(record, source_str, number)
+            if event:
+                yield event
 
     def _parse_record(
         self,
@@ -4,15 +4,16 @@ Parses osquery result logs in JSON format, including scheduled query results,
 differential results, and snapshot results.
 """
 
-import json
 import logging
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
+from app.parsers.jsonl import decode_lines, iter_lines, open_source
 from app.parsers.registry import register_parser
+from app.parsers.signatures import inflate_header, json_lines
 
 logger = logging.getLogger(__name__)
 
@@ -109,30 +110,24 @@ class OsqueryParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["application/json", "text/plain"]
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if content is osquery log format."""
         if content:
+            content = inflate_header(content)
             try:
-                text = content.decode("utf-8", errors="ignore")
-                lines = text.strip().split("\n")
-
-                for line in lines[:10]:
-                    line = line.strip()
-                    if not line or not line.startswith("{"):
-                        continue
-
-                    try:
-                        data = json.loads(line)
-                        # osquery result logs have specific fields
-                        if "name" in data and any(
-                            k in data for k in ["columns", "snapshot", "diffResults"]
-                        ):
-                            return True
-                        # osquery status logs
-                        if "hostIdentifier" in data and "calendarTime" in data:
-                            return True
-                    except json.JSONDecodeError:
-                        pass
+                for data in json_lines(content, max_lines=10):
+                    # osquery result logs have specific fields
+                    if "name" in data and any(
+                        k in data for k in ["columns", "snapshot", "diffResults"]
+                    ):
+                        return True
+                    # osquery status logs
+                    if "hostIdentifier" in data and "calendarTime" in data:
+                        return True
 
             except Exception:
                 pass
@@ -152,28 +147,30 @@ class OsqueryParser(BaseParser):
         """Parse osquery log file and yield events."""
         source_str = source_name or (str(source) if isinstance(source, Path) else "stream")
 
-        if isinstance(source, Path):
-            with open(source, encoding="utf-8", errors="replace") as f:
-                yield from self._parse_lines(f, source_str)
-        else:
-            import io
+        with open_source(source) as stream:
+            yield from self._parse_lines(iter_lines(stream), source_str)
 
-            text_stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
-            yield from self._parse_lines(text_stream, source_str)
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """osquery results logs are one JSON record per line."""
+        return {}
 
-    def _parse_lines(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
-        """Parse JSON lines from file."""
-        for line_num, line in enumerate(file_handle, 1):
-            line = line.strip()
-            if not line:
-                continue
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of osquery result lines."""
+        yield from self._parse_lines(lines, source_name, first_line)
 
+    def _parse_lines(
+        self, lines: Iterable[bytes | str], source_name: str, start_line: int = 1
+    ) -> Iterator[ParsedEvent]:
+        """Parse JSON lines from file."""
+        for line_num, record in decode_lines(lines, start_line):
             try:
-                record = json.loads(line)
                 yield from self._parse_record(record, source_name, line_num)
-            except json.JSONDecodeError as e:
-                logger.debug(f"JSON parse error at line {line_num}: {e}")
-                continue
             except Exception as e:
                 logger.debug(f"Parse error at line {line_num}: {e}")
                 continue
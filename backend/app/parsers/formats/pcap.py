@@ -1,12 +1,15 @@
 """PCAP network capture parser.
 
 Parses PCAP and PCAPNG network capture files to extract connection metadata.
-Uses scapy for packet parsing.
+Uses scapy for packet parsing. Packets are read incrementally, and TCP flows
+are tracked in a bounded table: flows that go idle, or the oldest flows once
+the table is full, are emitted as connection summaries during the parse.
 """
 
 import logging
+from collections import OrderedDict
 from collections.abc import Iterator
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, BinaryIO
 
@@ -29,11 +32,20 @@ PCAP_MAGIC_NS_LE = b"\x4d\x3c\xb2\xa1"  # Nanosecond little endian
 PCAP_MAGIC_NS_BE = b"\xa1\xb2\x3c\x4d"  # Nanosecond big endian
 PCAPNG_MAGIC = b"\x0a\x0d\x0d\x0a"  # PCAPNG section header
 
+# Flow tracking bounds
+FLOW_IDLE_TIMEOUT_SECONDS = 300  # Capture time without packets before a flow is summarized
+MAX_TRACKED_FLOWS = 100_000  # Least recently active flows are summarized beyond this
+FLOW_SWEEP_INTERVAL = 10_000  # Packets between idle flow sweeps
+
 
 @register_parser
 class PcapParser(BaseParser):
     """Parser for PCAP and PCAPNG network capture files."""
 
+    # Flow tracking bounds, overridable per instance
+    flow_idle_timeout = FLOW_IDLE_TIMEOUT_SECONDS
+    max_tracked_flows = MAX_TRACKED_FLOWS
+
     @property
     def name(self) -> str:
         return "pcap"
@@ -59,6 +71,23 @@ class PcapParser(BaseParser):
             "application/x-pcapng",
         ]
 
+    @property
+    def magic_signatures(self) -> list[tuple[int, bytes]]:
+        return [
+            (0, magic)
+            for magic in (
+                PCAP_MAGIC_LE,
+                PCAP_MAGIC_BE,
+                PCAP_MAGIC_NS_LE,
+                PCAP_MAGIC_NS_BE,
+                PCAPNG_MAGIC,
+            )
+        ]
+
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check for PCAP/PCAPNG magic bytes."""
         if content and len(content) >= 4:
@@ -82,29 +111,27 @@ class PcapParser(BaseParser):
         source_str = source_name or (str(source) if isinstance(source, Path) else "stream")
 
         try:
-            from scapy.all import DNS, ICMP, IP, TCP, UDP, Ether, rdpcap
+            from scapy.all import PcapReader
 
-            # Read packets
-            if isinstance(source, Path):
-                packets = rdpcap(str(source))
-            else:
-                # Save to temp file for scapy
-                import tempfile
-
-                with tempfile.NamedTemporaryFile(suffix=".pcap", delete=False) as tmp:
-                    tmp.write(source.read())
-                    tmp_path = tmp.name
-                try:
-                    packets = rdpcap(tmp_path)
-                finally:
-                    Path(tmp_path).unlink(missing_ok=True)
+            # PcapReader reads one packet at a time and handles PCAPNG too;
+            # streams are read in place rather than copied to a temp file
+            reader = PcapReader(str(source) if isinstance(source, Path) else source)
+        except ImportError:
+            logger.error("scapy not installed. Install with: pip install scapy")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to parse PCAP {source_str}: {e}")
+            raise
 
-            logger.info(f"Parsing {len(packets)} packets from {source_str}")
+        logger.info(f"Streaming packets from {source_str}")
 
-            # Track connections for aggregation
-            connections = {}
+        # Track connections for aggregation, least recently active first
+        connections: OrderedDict[str, ConnectionInfo] = OrderedDict()
+        idle_timeout = timedelta(seconds=self.flow_idle_timeout)
+        pkt_num = 0
 
-            for pkt_num, pkt in enumerate(packets, 1):
+        try:
+            for pkt_num, pkt in enumerate(reader, 1):
                 try:
                     event = self._parse_packet(pkt, source_str, pkt_num, connections)
                     if event:
@@ -113,23 +140,39 @@ class PcapParser(BaseParser):
                     logger.debug(f"Failed to parse packet {pkt_num}: {e}")
                     continue
 
-            # Yield connection summary events
-            for conn_key, conn_info in connections.items():
-                yield self._create_connection_summary(conn_info, source_str)
-
-        except ImportError:
-            logger.error("scapy not installed. Install with: pip install scapy")
-            raise
+                # Summarize the least recently active flows once the table is full
+                while len(connections) > self.max_tracked_flows:
+                    _, conn_info = connections.popitem(last=False)
+                    yield self._create_connection_summary(conn_info, source_str, "flow_limit")
+
+                # Summarize flows that have gone idle, measured in capture time
+                if pkt_num % FLOW_SWEEP_INTERVAL == 0:
+                    cutoff = datetime.fromtimestamp(float(pkt.time), tz=UTC) - idle_timeout
+                    while connections:
+                        conn_info = next(iter(connections.values()))
+                        if conn_info["last_seen"] > cutoff:
+                            break
+                        connections.popitem(last=False)
+                        yield self._create_connection_summary(conn_info, source_str, "idle")
         except Exception as e:
             logger.error(f"Failed to parse PCAP {source_str}: {e}")
             raise
+        finally:
+            if isinstance(source, Path):
+                reader.close()
+
+        logger.info(f"Parsed {pkt_num} packets from {source_str}")
+
+        # Yield summaries for flows still open at the end of the capture
+        for conn_info in connections.values():
+            yield self._create_connection_summary(conn_info, source_str)
 
     def _parse_packet(
         self,
         pkt: "Packet",
         source_name: str,
         pkt_num: int,
-        connections: dict[ConnectionKey, ConnectionInfo],
+        connections: OrderedDict[str, ConnectionInfo],
     ) -> ParsedEvent | None:
         """Parse a single packet."""
         from scapy.all import DNS, ICMP, IP, TCP, UDP, Raw
@@ -287,8 +330,10 @@ class PcapParser(BaseParser):
         endpoints = sorted([(src_ip, src_port), (dst_ip, dst_port)])
         return f"{endpoints[0][0]}:{endpoints[0][1]}-{endpoints[1][0]}:{endpoints[1][1]}"
 
-    def _update_connection(self, connections: dict, key: str, pkt, timestamp: datetime) -> None:
-        """Update connection tracking info."""
+    def _update_connection(
+        self, connections: OrderedDict, key: str, pkt, timestamp: datetime
+    ) -> None:
+        """Update connection tracking info and mark the flow most recently active."""
         from scapy.all import IP, TCP
 
         if key not in connections:
@@ -303,14 +348,24 @@ class PcapParser(BaseParser):
                 "packet_count": 0,
                 "bytes_total": 0,
             }
+        else:
+            connections.move_to_end(key)
 
         conn = connections[key]
         conn["last_seen"] = timestamp
         conn["packet_count"] += 1
         conn["bytes_total"] += len(pkt)
 
-    def _create_connection_summary(self, conn_info: dict, source_name: str) -> ParsedEvent:
-        """Create a summary event for a connection."""
+    def _create_connection_summary(
+        self, conn_info: dict, source_name: str, reason: str = "end_of_capture"
+    ) -> ParsedEvent:
+        """Create a summary event for a connection.
+
+        Args:
+            conn_info: Tracked connection state
+            source_name: Source file name
+            reason: Why the flow was summarized (end_of_capture, idle, flow_limit)
+        """
         duration = (conn_info["last_seen"] - conn_info["first_seen"]).total_seconds()
 
         message = (
@@ -341,6 +396,7 @@ class PcapParser(BaseParser):
                 "bytes_total": conn_info["bytes_total"],
                 "first_seen": str(conn_info["first_seen"]),
                 "last_seen": str(conn_info["last_seen"]),
+                "summary_reason": reason,
             },
             labels={
                 "protocol": "tcp",
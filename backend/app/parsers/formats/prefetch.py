@@ -12,6 +12,7 @@ from typing import Any, BinaryIO
 from app.parsers.base import ParsedEvent, ParserCategory
 from app.parsers.formats.dissect_adapter import DissectParserAdapter
 from app.parsers.registry import register_parser
+from app.parsers.sources import source_path
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +48,10 @@ class WindowsPrefetchParser(DissectParserAdapter):
     def supported_mime_types(self) -> list[str]:
         return ["application/x-ms-prefetch"]
 
+    @property
+    def magic_signatures(self) -> list[tuple[int, bytes]]:
+        return [(0, MAM_MAGIC), (4, b"SCCA")]
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check for Prefetch magic bytes."""
         if content:
@@ -67,18 +72,8 @@ class WindowsPrefetchParser(DissectParserAdapter):
         """Get Dissect prefetch parser."""
         from dissect.target.plugins.os.windows.prefetch import Prefetch
 
-        if isinstance(source, Path):
-            return Prefetch.from_file(source)
-        # For file-like objects, we need to save to temp
-        import tempfile
-
-        with tempfile.NamedTemporaryFile(suffix=".pf", delete=False) as tmp:
-            tmp.write(source.read())
-            tmp_path = tmp.name
-        try:
-            return Prefetch.from_file(Path(tmp_path))
-        finally:
-            Path(tmp_path).unlink(missing_ok=True)
+        with source_path(source, suffix=".pf") as path:
+            return Prefetch.from_file(path)
 
     def _iterate_records(self, parser: Any) -> Iterator[Any]:
         """Yield the prefetch parser itself as a single record."""
@@ -199,18 +194,8 @@ class WindowsPrefetchParser(DissectParserAdapter):
             try:
                 from dissect.target.plugins.os.windows.prefetch import Prefetch
 
-                if isinstance(source, Path):
-                    pf = Prefetch.from_file(source)
-                else:
-                    import tempfile
-
-                    with tempfile.NamedTemporaryFile(suffix=".pf", delete=False) as tmp:
-                        tmp.write(source.read())
-                        tmp_path = tmp.name
-                    try:
-                        pf = Prefetch.from_file(Path(tmp_path))
-                    finally:
-                        Path(tmp_path).unlink(missing_ok=True)
+                with source_path(source, suffix=".pf") as path:
+                    pf = Prefetch.from_file(path)
 
                 # Parse main record
                 event = self._parse_record(pf, source_str)
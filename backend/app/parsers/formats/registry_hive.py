@@ -75,6 +75,10 @@ class WindowsRegistryParser(DissectParserAdapter):
     def supported_extensions(self) -> list[str]:
         return [".dat", ".SAM", ".SYSTEM", ".SOFTWARE", ".SECURITY", ".DEFAULT"]
 
+    @property
+    def magic_signatures(self) -> list[tuple[int, bytes]]:
+        return [(0, REGF_MAGIC)]
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check for registry hive magic bytes."""
         if content and len(content) >= 4:
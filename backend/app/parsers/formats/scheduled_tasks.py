@@ -12,6 +12,7 @@ from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
 from app.parsers.registry import register_parser
+from app.parsers.signatures import sniff_text
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +45,7 @@ class WindowsScheduledTasksParser(BaseParser):
         """Check for scheduled task XML structure."""
         if content:
             try:
-                content_str = content.decode("utf-8", errors="ignore")
+                content_str = sniff_text(content)
                 if "<Task" in content_str and "xmlns" in content_str:
                     if "schemas.microsoft.com/windows" in content_str:
                         return True
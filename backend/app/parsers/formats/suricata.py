@@ -4,15 +4,17 @@ Parses Suricata EVE JSON logs and fast.log alert format.
 EVE JSON is the primary format containing alerts, flows, HTTP, DNS, TLS, etc.
 """
 
-import json
 import logging
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
+from itertools import chain
 from pathlib import Path
 from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
+from app.parsers.jsonl import decode_lines, iter_lines, open_source
 from app.parsers.registry import register_parser
+from app.parsers.signatures import inflate_header, json_lines, sniff_text
 
 logger = logging.getLogger(__name__)
 
@@ -78,29 +80,28 @@ class SuricataParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["application/json", "text/plain"]
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if content is Suricata log format."""
         if content:
+            content = inflate_header(content)
             try:
-                text = content.decode("utf-8", errors="ignore")
-                lines = text.strip().split("\n")
+                # Check for EVE JSON format
+                for data in json_lines(content, max_lines=10):
+                    if "event_type" in data and "timestamp" in data:
+                        return True
+                    if data.get("event_type") in SURICATA_CATEGORY_MAP:
+                        return True
 
+                lines = sniff_text(content).strip().split("\n")
                 for line in lines[:10]:
                     line = line.strip()
                     if not line:
                         continue
 
-                    # Check for EVE JSON format
-                    if line.startswith("{"):
-                        try:
-                            data = json.loads(line)
-                            if "event_type" in data and "timestamp" in data:
-                                return True
-                            if data.get("event_type") in SURICATA_CATEGORY_MAP:
-                                return True
-                        except json.JSONDecodeError:
-                            pass
-
                     # Check for fast.log format
                     if "**" in line and "Priority:" in line and "Classification:" in line:
                         return True
@@ -127,45 +128,54 @@ class SuricataParser(BaseParser):
         """Parse Suricata log file and yield events."""
         source_str = source_name or (str(source) if isinstance(source, Path) else "stream")
 
-        if isinstance(source, Path):
-            with open(source, encoding="utf-8", errors="replace") as f:
-                yield from self._parse_file(f, source_str)
-        else:
-            import io
+        with open_source(source) as stream:
+            yield from self._parse_file(stream, source_str)
+
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """EVE JSON and fast.log are both one record per line."""
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            first_line = f.readline().strip()
 
-            text_stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
-            yield from self._parse_file(text_stream, source_str)
+        return {"format": "eve" if first_line.startswith("{") else "fast"}
 
-    def _parse_file(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of EVE JSON or fast.log lines."""
+        if context.get("format") == "eve":
+            yield from self._parse_eve_json(lines, source_name, first_line)
+        else:
+            yield from self._parse_fast_log(lines, source_name, first_line)
+
+    def _parse_file(self, stream: BinaryIO, source_name: str) -> Iterator[ParsedEvent]:
         """Detect format and parse file."""
-        first_line = file_handle.readline()
-        if not first_line:
+        lines = iter_lines(stream)
+        first_line = next(lines, None)
+        if first_line is None:
             return
 
-        first_line = first_line.strip()
-        file_handle.seek(0)
+        lines = chain((first_line,), lines)
 
         # Detect format
-        if first_line.startswith("{"):
-            yield from self._parse_eve_json(file_handle, source_name)
+        if first_line.strip().startswith(b"{"):
+            yield from self._parse_eve_json(lines, source_name)
         else:
-            yield from self._parse_fast_log(file_handle, source_name)
+            text_lines = (line.decode("utf-8", errors="replace") for line in lines)
+            yield from self._parse_fast_log(text_lines, source_name)
 
-    def _parse_eve_json(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
+    def _parse_eve_json(
+        self, lines: Iterable[bytes | str], source_name: str, start_line: int = 1
+    ) -> Iterator[ParsedEvent]:
         """Parse EVE JSON format."""
-        for line_num, line in enumerate(file_handle, 1):
-            line = line.strip()
-            if not line:
-                continue
-
+        for line_num, record in decode_lines(lines, start_line):
             try:
-                record = json.loads(line)
                 event = self._parse_eve_record(record, source_name, line_num)
                 if event:
                     yield event
-            except json.JSONDecodeError as e:
-                logger.debug(f"JSON parse error at line {line_num}: {e}")
-                continue
             except Exception as e:
                 logger.debug(f"Parse error at line {line_num}: {e}")
                 continue
@@ -599,7 +609,9 @@ class SuricataParser(BaseParser):
         if "layer" in anomaly:
             event.labels["anomaly_layer"] = anomaly["layer"]
 
-    def _parse_fast_log(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
+    def _parse_fast_log(
+        self, file_handle, source_name: str, start_line: int = 1
+    ) -> Iterator[ParsedEvent]:
         """Parse fast.log format."""
         import re
 
@@ -614,7 +626,7 @@ class SuricataParser(BaseParser):
             r"(\d+\.\d+\.\d+\.\d+):(\d+)\s+->\s+(\d+\.\d+\.\d+\.\d+):(\d+)"
         )
 
-        for line_num, line in enumerate(file_handle, 1):
+        for line_num, line in enumerate(file_handle, start_line):
             line = line.strip()
             if not line:
                 continue
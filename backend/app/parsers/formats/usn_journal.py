@@ -3,8 +3,13 @@
 Parses NTFS USN Journal ($UsnJrnl:$J) to extract filesystem change records.
 """
 
+import io
 import logging
-from collections.abc import Iterator
+import mmap
+import struct
+import time
+from collections.abc import Generator, Iterator
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, BinaryIO
@@ -42,11 +47,184 @@ USN_REASONS = {
     0x80000000: "CLOSE",
 }
 
+# Bytes read at a time when the journal cannot be memory-mapped
+BLOCK_SIZE = 4 * 1024 * 1024
+
+# Valid record lengths; records start on 8-byte boundaries
+MIN_RECORD_LENGTH = 60
+MAX_RECORD_LENGTH = 600
+RECORD_ALIGNMENT = 8
+
+# Strides used to step over zero-filled (sparse) regions, coarsest first
+SPARSE_STRIDES = (1024 * 1024, 4096, RECORD_ALIGNMENT)
+_ZEROS = {stride: bytes(stride) for stride in SPARSE_STRIDES}
+
+_RECORD_START = struct.Struct("<IH")
+# RecordLength, MajorVersion, MinorVersion, FileReferenceNumber,
+# ParentFileReferenceNumber, Usn, TimeStamp, Reason, SourceInfo, SecurityId,
+# FileAttributes, FileNameLength, FileNameOffset
+_RECORD_V2 = struct.Struct("<IHH8s8sQQIIIIHH")
+_RECORD_V3 = struct.Struct("<IHH16s16sQQIIIIHH")
+
+
+@dataclass
+class UsnScanStats:
+    """Counts and throughput of a USN journal scan."""
+
+    bytes_scanned: int = 0
+    sparse_bytes: int = 0
+    invalid_bytes: int = 0
+    records: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        if not self.seconds:
+            return 0.0
+        return self.bytes_scanned / self.seconds / (1024 * 1024)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "bytes_scanned": self.bytes_scanned,
+            "sparse_bytes": self.sparse_bytes,
+            "invalid_bytes": self.invalid_bytes,
+            "records": self.records,
+            "seconds": round(self.seconds, 3),
+            "mb_per_second": round(self.mb_per_second, 1),
+        }
+
+
+class UsnScanner:
+    """Finds USN records in a $J stream.
+
+    $J is mostly zeros: the journal is a sparse file whose deallocated head
+    reads back as gigabytes of zero bytes. The scanner memory-maps the file
+    when it can (reading large blocks otherwise), steps over zero-filled
+    regions with coarse-to-fine strides, and yields each record as a
+    memoryview into the mapping or block, so no bytes are copied per record.
+    Yielded views are released when the scan moves on, so callers must
+    decode a record before taking the next one.
+    """
+
+    def __init__(self, block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        self.stats = UsnScanStats()
+
+    def scan(self, fh: BinaryIO) -> Iterator[memoryview]:
+        """Yield the records of a journal, starting at the stream position."""
+        started = time.perf_counter()
+        try:
+            mapped = _map_file(fh)
+            if mapped is not None:
+                view = memoryview(mapped)
+                try:
+                    start = fh.tell()
+                    end = yield from self._scan_view(view, start, final=True)
+                    self.stats.bytes_scanned += end - start
+                finally:
+                    view.release()
+                    mapped.close()
+            else:
+                yield from self._scan_blocks(fh)
+        finally:
+            self.stats.seconds += time.perf_counter() - started
+
+    def _scan_blocks(self, fh: BinaryIO) -> Iterator[memoryview]:
+        buffer = bytearray()
+        final = False
+        while not final:
+            block = fh.read(self.block_size)
+            final = not block
+            buffer += block
+
+            view = memoryview(buffer)
+            try:
+                consumed = yield from self._scan_view(view, 0, final)
+            finally:
+                view.release()
+            self.stats.bytes_scanned += consumed
+            # A record cut off at the end of the block stays for the next one
+            del buffer[:consumed]
+
+    def _scan_view(
+        self, view: memoryview, pos: int, final: bool
+    ) -> Generator[memoryview, None, int]:
+        """Yield the records in a buffer, returning where scanning stopped."""
+        stats = self.stats
+        end = len(view)
+        while pos + _RECORD_START.size <= end:
+            length, major_version = _RECORD_START.unpack_from(view, pos)
+
+            if length == 0:
+                skipped = _skip_zeros(view, pos)
+                if skipped > pos:
+                    stats.sparse_bytes += skipped - pos
+                    pos = skipped
+                    continue
+
+            if (
+                length < MIN_RECORD_LENGTH
+                or length > MAX_RECORD_LENGTH
+                or major_version not in (2, 3)
+            ):
+                if pos + RECORD_ALIGNMENT > end:
+                    break
+                # Not a record header; resynchronise on the next boundary
+                stats.invalid_bytes += RECORD_ALIGNMENT
+                pos += RECORD_ALIGNMENT
+                continue
+
+            if pos + length > end:
+                if final:
+                    stats.invalid_bytes += end - pos
+                    return end
+                return pos
+
+            record = view[pos : pos + length]
+            try:
+                stats.records += 1
+                yield record
+            finally:
+                record.release()
+            pos += length
+
+        return pos if not final else end
+
+
+def _map_file(fh: BinaryIO) -> mmap.mmap | None:
+    """Memory-map a file object, or None if it is not a plain local file."""
+    # Decompressing readers expose the fileno of the file underneath them
+    if not isinstance(getattr(fh, "raw", fh), io.FileIO):
+        return None
+    try:
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Empty files cannot be mapped
+        return None
+
+
+def _skip_zeros(view: memoryview, pos: int) -> int:
+    """Step over whole strides of zeros, returning the next non-zero boundary.
+
+    Trailing zeros shorter than a record boundary are left in place, since
+    they may be the start of a record continued in the next block.
+    """
+    end = len(view)
+    for stride in SPARSE_STRIDES:
+        zeros = _ZEROS[stride]
+        # startswith compares the buffers without copying the slice
+        while pos + stride <= end and zeros.startswith(view[pos : pos + stride]):
+            pos += stride
+    return pos
+
 
 @register_parser
 class UsnJournalParser(BaseParser):
     """Parser for NTFS USN Journal files."""
 
+    # Stats of the last manual scan
+    scan_stats: UsnScanStats | None = None
+
     @property
     def name(self) -> str:
         return "usn_journal"
@@ -133,85 +311,77 @@ class UsnJournalParser(BaseParser):
 
     def _parse_manual(self, fh: BinaryIO, source_name: str) -> Iterator[ParsedEvent]:
         """Manual parsing of USN records."""
+        scanner = UsnScanner()
         record_num = 0
 
-        while True:
-            # Read record length
-            length_bytes = fh.read(4)
-            if len(length_bytes) < 4:
-                break
-
-            record_len = int.from_bytes(length_bytes, "little")
-
-            # Skip empty/invalid records
-            if record_len < 60 or record_len > 600:
-                # Try to find next valid record
-                fh.read(4)  # Skip 4 bytes
-                continue
-
-            # Read rest of record
-            record_data = length_bytes + fh.read(record_len - 4)
-            if len(record_data) < record_len:
-                break
-
+        for record in scanner.scan(fh):
             try:
                 record_num += 1
-                event = self._parse_usn_record(record_data, source_name, record_num)
+                event = self._parse_usn_record(record, source_name, record_num)
                 if event:
                     yield event
             except Exception as e:
                 logger.debug(f"Failed to parse USN record {record_num}: {e}")
 
+        stats = self.scan_stats = scanner.stats
+        logger.info(
+            f"Scanned USN journal {source_name}: {stats.records} records in "
+            f"{stats.bytes_scanned / (1024 * 1024):.1f} MB "
+            f"({stats.sparse_bytes / (1024 * 1024):.1f} MB sparse) "
+            f"at {stats.mb_per_second:.1f} MB/s"
+        )
+
     def _parse_usn_record(
-        self, data: bytes, source_name: str, record_num: int
+        self, data: bytes | memoryview, source_name: str, record_num: int
     ) -> ParsedEvent | None:
-        """Parse a single USN v2/v3 record."""
-        if len(data) < 60:
+        """Parse a single USN v2/v3 record.
+
+        V2 records start with a fixed 60-byte header (file reference numbers
+        are 8 bytes); V3 records use 16-byte file references, which moves the
+        fields after them along by 16 bytes. The file name follows at
+        FileNameOffset.
+        """
+        if len(data) < _RECORD_V2.size:
             return None
 
-        # USN_RECORD_V2 structure
-        # 0x00: RecordLength (4)
-        # 0x04: MajorVersion (2)
-        # 0x06: MinorVersion (2)
-        # 0x08: FileReferenceNumber (8)
-        # 0x10: ParentFileReferenceNumber (8)
-        # 0x18: Usn (8)
-        # 0x20: TimeStamp (8) - FILETIME
-        # 0x28: Reason (4)
-        # 0x2C: SourceInfo (4)
-        # 0x30: SecurityId (4)
-        # 0x34: FileAttributes (4)
-        # 0x38: FileNameLength (2)
-        # 0x3A: FileNameOffset (2)
-        # 0x3C: FileName (variable)
-
         major_version = int.from_bytes(data[4:6], "little")
-        minor_version = int.from_bytes(data[6:8], "little")
-
-        if major_version not in (2, 3):
+        if major_version == 2:
+            header = _RECORD_V2
+        elif major_version == 3 and len(data) >= _RECORD_V3.size:
+            header = _RECORD_V3
+        else:
             return None
 
+        (
+            _,
+            major_version,
+            minor_version,
+            _,
+            _,
+            usn,
+            filetime,
+            reason,
+            _,
+            _,
+            attributes,
+            filename_length,
+            filename_offset,
+        ) = header.unpack_from(data)
+
         # Parse timestamp (Windows FILETIME)
-        filetime = int.from_bytes(data[0x20:0x28], "little")
         timestamp = self._filetime_to_datetime(filetime)
 
         # Parse reason flags
-        reason = int.from_bytes(data[0x28:0x2C], "little")
         reason_strs = self._decode_reason(reason)
 
         # Parse file attributes
-        attributes = int.from_bytes(data[0x34:0x38], "little")
         is_directory = bool(attributes & 0x10)
 
-        # Parse filename
-        filename_length = int.from_bytes(data[0x38:0x3A], "little")
-        filename_offset = int.from_bytes(data[0x3A:0x3C], "little")
-
         if filename_offset + filename_length > len(data):
             return None
 
         try:
-            filename = data[filename_offset : filename_offset + filename_length].decode("utf-16-le")
+            filename = str(data[filename_offset : filename_offset + filename_length], "utf-16-le")
         except Exception:
             filename = "Unknown"
 
@@ -239,7 +409,7 @@ class UsnJournalParser(BaseParser):
 
         raw = {
             "record_number": record_num,
-            "usn": int.from_bytes(data[0x18:0x20], "little"),
+            "usn": usn,
             "reason_flags": reason,
             "reasons": reason_strs,
             "file_attributes": attributes,
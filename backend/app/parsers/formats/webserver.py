@@ -10,7 +10,7 @@ Critical for investigating web-based attacks and data exfiltration.
 
 import logging
 import re
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Iterable, Iterator
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
@@ -62,22 +62,48 @@ class ApacheAccessParser(BaseParser):
         """Parse Apache access log file."""
         try:
             with open(file_path, encoding="utf-8", errors="ignore") as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    match = self.COMBINED_PATTERN.match(line)
-                    if match:
-                        entry = self._parse_match(match)
-                        entry["log_file"] = str(file_path)
-                        entry["line_number"] = line_num
-                        yield self._create_event(entry, case_id, evidence_id)
+                for event in self._parse_lines(f, str(file_path), case_id, evidence_id):
+                    yield event
 
         except Exception as e:
             logger.error(f"Failed to parse Apache access log: {e}")
             raise
 
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """Access logs are one request per line."""
+        return {}
+
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of access log lines."""
+        yield from self._parse_lines(lines, source_name, None, None, first_line)
+
+    def _parse_lines(
+        self,
+        lines: Iterable[str],
+        log_file: str,
+        case_id: str | None,
+        evidence_id: str | None,
+        start_line: int = 1,
+    ) -> Iterator[ParsedEvent]:
+        """Parse access log lines."""
+        for line_num, line in enumerate(lines, start_line):
+            line = line.strip()
+            if not line:
+                continue
+
+            match = self.COMBINED_PATTERN.match(line)
+            if match:
+                entry = self._parse_match(match)
+                entry["log_file"] = log_file
+                entry["line_number"] = line_num
+                yield self._create_event(entry, case_id, evidence_id)
+
     def _parse_match(self, match: re.Match) -> dict[str, Any]:
         """Parse regex match into entry dict."""
         request = match.group(5)
@@ -233,32 +259,72 @@ class IISParser(BaseParser):
     ) -> AsyncIterator[ParsedEvent]:
         """Parse IIS W3C log file."""
         try:
-            fields = None
-
             with open(file_path, encoding="utf-8", errors="ignore") as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    # Parse header lines
-                    if line.startswith("#Fields:"):
-                        fields = line[8:].strip().split()
-                        continue
-                    elif line.startswith("#"):
-                        continue
-
-                    if fields:
-                        entry = self._parse_line(line, fields)
-                        if entry:
-                            entry["log_file"] = str(file_path)
-                            entry["line_number"] = line_num
-                            yield self._create_event(entry, case_id, evidence_id)
+                for event in self._parse_lines(f, str(file_path), case_id, evidence_id):
+                    yield event
 
         except Exception as e:
             logger.error(f"Failed to parse IIS log: {e}")
             raise
 
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """Capture the #Fields directive so every range can map its columns.
+
+        Every range is parsed with the first directive block. IIS repeats
+        the block on restart, and a later block only applies to the rest of
+        the range it falls in, so logs whose fields change on restart must
+        be parsed serially ("split_parsing": false).
+        """
+        with open(file_path, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("#Fields:"):
+                    return {"fields": line[8:].strip().split()}
+                if line and not line.startswith("#"):
+                    break
+        return None
+
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of W3C log lines."""
+        yield from self._parse_lines(
+            lines, source_name, None, None, first_line, fields=context.get("fields")
+        )
+
+    def _parse_lines(
+        self,
+        lines: Iterable[str],
+        log_file: str,
+        case_id: str | None,
+        evidence_id: str | None,
+        start_line: int = 1,
+        fields: list[str] | None = None,
+    ) -> Iterator[ParsedEvent]:
+        """Parse W3C log lines, tracking #Fields directives."""
+        for line_num, line in enumerate(lines, start_line):
+            line = line.strip()
+            if not line:
+                continue
+
+            # Parse header lines
+            if line.startswith("#Fields:"):
+                fields = line[8:].strip().split()
+                continue
+            elif line.startswith("#"):
+                continue
+
+            if fields:
+                entry = self._parse_line(line, fields)
+                if entry:
+                    entry["log_file"] = log_file
+                    entry["line_number"] = line_num
+                    yield self._create_event(entry, case_id, evidence_id)
+
     def _parse_line(self, line: str, fields: list[str]) -> dict[str, Any] | None:
         """Parse IIS log line using field headers."""
         values = line.split()
@@ -471,37 +537,63 @@ class ApacheErrorParser(BaseParser):
         """Parse Apache error log file."""
         try:
             with open(file_path, encoding="utf-8", errors="ignore") as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    match = self.ERROR_PATTERN.match(line)
-                    if match:
-                        entry = {
-                            "timestamp": self._parse_timestamp(match.group(1)),
-                            "module_level": match.group(2),
-                            "pid": int(match.group(3)),
-                            "client": match.group(4),
-                            "message": match.group(5),
-                            "log_file": str(file_path),
-                            "line_number": line_num,
-                        }
-
-                        # Parse module and level
-                        if ":" in entry["module_level"]:
-                            parts = entry["module_level"].split(":", 1)
-                            entry["module"] = parts[0]
-                            entry["level"] = parts[1]
-                        else:
-                            entry["level"] = entry["module_level"]
-
-                        yield self._create_event(entry, case_id, evidence_id)
+                for event in self._parse_lines(f, str(file_path), case_id, evidence_id):
+                    yield event
 
         except Exception as e:
             logger.error(f"Failed to parse Apache error log: {e}")
             raise
 
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """Error logs are one message per line."""
+        return {}
+
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of error log lines."""
+        yield from self._parse_lines(lines, source_name, None, None, first_line)
+
+    def _parse_lines(
+        self,
+        lines: Iterable[str],
+        log_file: str,
+        case_id: str | None,
+        evidence_id: str | None,
+        start_line: int = 1,
+    ) -> Iterator[ParsedEvent]:
+        """Parse error log lines."""
+        for line_num, line in enumerate(lines, start_line):
+            line = line.strip()
+            if not line:
+                continue
+
+            match = self.ERROR_PATTERN.match(line)
+            if match:
+                entry = {
+                    "timestamp": self._parse_timestamp(match.group(1)),
+                    "module_level": match.group(2),
+                    "pid": int(match.group(3)),
+                    "client": match.group(4),
+                    "message": match.group(5),
+                    "log_file": log_file,
+                    "line_number": line_num,
+                }
+
+                # Parse module and level
+                if ":" in entry["module_level"]:
+                    parts = entry["module_level"].split(":", 1)
+                    entry["module"] = parts[0]
+                    entry["level"] = parts[1]
+                else:
+                    entry["level"] = entry["module_level"]
+
+                yield self._create_event(entry, case_id, evidence_id)
+
     def _create_event(
         self,
         entry: dict[str, Any],
@@ -4,14 +4,16 @@ Parses Zeek log files in TSV format with the standard field definitions.
 Supports conn, dns, http, ssl, x509, files, notice, and other log types.
 """
 
+import itertools
 import logging
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import BinaryIO
+from typing import Any, BinaryIO
 
 from app.parsers.base import BaseParser, ParsedEvent, ParserCategory
 from app.parsers.registry import register_parser
+from app.parsers.signatures import sniff_text
 
 logger = logging.getLogger(__name__)
 
@@ -69,11 +71,15 @@ class ZeekParser(BaseParser):
     def supported_mime_types(self) -> list[str]:
         return ["text/plain", "application/octet-stream"]
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
     def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
         """Check if content is Zeek log format."""
         if content:
             try:
-                text = content.decode("utf-8", errors="ignore")
+                text = sniff_text(content)
                 lines = text.split("\n")
 
                 # Look for Zeek header markers
@@ -133,7 +139,42 @@ class ZeekParser(BaseParser):
             text_stream = io.TextIOWrapper(source, encoding="utf-8", errors="replace")
             yield from self._parse_file(text_stream, source_str)
 
-    def _parse_file(self, file_handle, source_name: str) -> Iterator[ParsedEvent]:
+    def get_split_context(self, file_path: Path) -> dict[str, Any] | None:
+        """Capture the leading header block so every range can decode its lines.
+
+        Every range is parsed with the header from the top of the file. A
+        header block appearing later in the file only applies to the rest of
+        the range it falls in, so logs whose fields change mid-file (such as
+        concatenated logs) must be parsed serially ("split_parsing": false).
+        """
+        header = []
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.startswith("#"):
+                    break
+                header.append(line)
+
+        if not header:
+            # JSON-format Zeek logs are handled by the JSON parsers
+            return None
+        return {"header": header}
+
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        source_name: str,
+        first_line: int,
+        context: dict[str, Any],
+    ) -> Iterator[ParsedEvent]:
+        """Parse a range of Zeek TSV lines using the file's header block."""
+        header = context.get("header", [])
+        yield from self._parse_file(
+            itertools.chain(header, lines), source_name, start_line=first_line - len(header)
+        )
+
+    def _parse_file(
+        self, file_handle, source_name: str, start_line: int = 1
+    ) -> Iterator[ParsedEvent]:
         """Parse Zeek log with header metadata."""
         separator = "\t"
         fields = []
@@ -142,8 +183,10 @@ class ZeekParser(BaseParser):
         set_separator = ","
         empty_field = "(empty)"
         unset_field = "-"
+        # Data lines of log types the job's filter rejects are skipped unsplit
+        skipping = False
 
-        line_num = 0
+        line_num = start_line - 1
         for line in file_handle:
             line_num += 1
             line = line.rstrip("\n\r")
@@ -168,6 +211,7 @@ class ZeekParser(BaseParser):
                     types = value.split(separator)
                 elif key == "path":
                     log_path = value
+                    skipping = self._skips_log_path(log_path)
                 elif key == "set_separator":
                     set_separator = value
                 elif key == "empty_field":
@@ -176,7 +220,7 @@ class ZeekParser(BaseParser):
                     unset_field = value
                 continue
 
-            if not fields:
+            if not fields or skipping:
                 continue
 
             # Parse data line
@@ -204,6 +248,16 @@ class ZeekParser(BaseParser):
                 logger.debug(f"Failed to parse line {line_num}: {e}")
                 continue
 
+    def _skips_log_path(self, log_path: str) -> bool:
+        """Check whether the job's filter rejects every record of a log type."""
+        event_filter = self.event_filter
+        if event_filter is None:
+            return False
+        return not (
+            event_filter.accepts_source_type(f"zeek:{log_path}")
+            and event_filter.accepts_categories(ZEEK_CATEGORY_MAP.get(log_path, ["network"]))
+        )
+
     def _parse_record(
         self,
         record: dict[str, str],
@@ -0,0 +1,217 @@
+"""Triage of whole disk images through dissect.target.
+
+Instead of carving event logs, hives and databases out of an image and
+uploading each one, a disk image (E01, VMDK, VHD/VHDX, QCOW2, VDI or raw)
+can be submitted as a single piece of evidence. ImageReader opens it once
+as a dissect Target and yields the well-known Windows artifacts on its
+system volume as members, each tagged with the Eleanor parser that handles
+it. The members go through the same ArchiveParseRunner as archive members,
+so they are parsed concurrently while the image is read in one place.
+"""
+
+import logging
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from app.parsers.archive import COPY_BUFFER_BYTES, DEFAULT_SPOOL_BYTES, ArchiveMember
+
+try:
+    from dissect.target import Target
+
+    DISSECT_TARGET_AVAILABLE = True
+except ImportError:
+    DISSECT_TARGET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EWF_MAGIC = (b"EVF\x09\x0d\x0a\xff\x00", b"EVF2\x0d\x0a\x81\x00")
+VMDK_MAGIC = (b"KDMV", b"COWD", b"# Disk DescriptorFile")
+VHDX_MAGIC = b"vhdxfile"
+VHD_MAGIC = b"conectix"
+QCOW2_MAGIC = b"QFI\xfb"
+VDI_MAGIC = b"<<< Oracle VM VirtualBox Disk Image >>>"
+GPT_MAGIC = b"EFI PART"
+GPT_MAGIC_OFFSET = 512
+NTFS_MAGIC = b"NTFS    "
+NTFS_MAGIC_OFFSET = 3
+MBR_SIGNATURE = b"\x55\xaa"
+MBR_SIGNATURE_OFFSET = 510
+MBR_PARTITION_TABLE_OFFSET = 446
+
+# Mount point dissect gives the Windows system volume
+SYSTEM_VOLUME = "sysvol"
+
+# Artifacts read from the system volume, as (glob pattern, parser name).
+# Small artifacts come first so they are parsing while $MFT and the USN
+# journal are still being read.
+WINDOWS_ARTIFACTS: list[tuple[str, str]] = [
+    ("Windows/System32/config/SYSTEM", "windows_registry"),
+    ("Windows/System32/config/SOFTWARE", "windows_registry"),
+    ("Windows/System32/config/SAM", "windows_registry"),
+    ("Windows/System32/config/SECURITY", "windows_registry"),
+    ("Windows/System32/config/DEFAULT", "windows_registry"),
+    ("Users/*/NTUSER.DAT", "windows_registry"),
+    ("Users/*/AppData/Local/Microsoft/Windows/UsrClass.dat", "windows_registry"),
+    ("Windows/AppCompat/Programs/Amcache.hve", "amcache"),
+    ("Windows/Prefetch/*.pf", "windows_prefetch"),
+    ("Users/*/AppData/Local/Google/Chrome/User Data/*/History", "chrome_history"),
+    ("Users/*/AppData/Local/Google/Chrome/User Data/*/Login Data", "chrome_logins"),
+    ("Users/*/AppData/Local/Microsoft/Edge/User Data/*/History", "edge_history"),
+    ("Users/*/AppData/Roaming/Mozilla/Firefox/Profiles/*/places.sqlite", "firefox_history"),
+    ("Windows/System32/sru/SRUDB.dat", "srum"),
+    ("Windows/System32/winevt/Logs/*.evtx", "windows_evtx"),
+    ("$MFT", "ntfs_mft"),
+    ("$Extend/$UsnJrnl:$J", "usn_journal"),
+]
+
+
+def detect_image(header: bytes) -> str | None:
+    """Identify a disk image from the first bytes of a file.
+
+    Args:
+        header: File header, at least 1024 bytes to recognise raw GPT disks
+
+    Returns:
+        "ewf", "vmdk", "vhdx", "vhd", "qcow2", "vdi" or "raw", or None if the
+        header is not a disk image
+    """
+    if header.startswith(EWF_MAGIC):
+        return "ewf"
+    if header.startswith(VMDK_MAGIC):
+        return "vmdk"
+    if header.startswith(VHDX_MAGIC):
+        return "vhdx"
+    # Dynamic and differencing VHDs keep a copy of their footer at the start
+    if header.startswith(VHD_MAGIC):
+        return "vhd"
+    if header.startswith(QCOW2_MAGIC):
+        return "qcow2"
+    if header.startswith(VDI_MAGIC):
+        return "vdi"
+    if header[GPT_MAGIC_OFFSET : GPT_MAGIC_OFFSET + len(GPT_MAGIC)] == GPT_MAGIC:
+        return "raw"
+    if header[NTFS_MAGIC_OFFSET : NTFS_MAGIC_OFFSET + len(NTFS_MAGIC)] == NTFS_MAGIC:
+        return "raw"
+    if _is_mbr(header):
+        return "raw"
+    return None
+
+
+def _is_mbr(header: bytes) -> bool:
+    """Check for a boot signature over a plausible MBR partition table."""
+    if header[MBR_SIGNATURE_OFFSET : MBR_SIGNATURE_OFFSET + 2] != MBR_SIGNATURE:
+        return False
+    entries = [
+        header[offset : offset + 16]
+        for offset in range(MBR_PARTITION_TABLE_OFFSET, MBR_SIGNATURE_OFFSET, 16)
+    ]
+    if any(entry[0] not in (0x00, 0x80) for entry in entries):
+        return False
+    return any(entry[4] != 0 for entry in entries)
+
+
+class ImageReader:
+    """Walks the forensic artifacts of a disk image.
+
+    The image is opened once, on first iteration, with dissect.target,
+    which needs a local path to find the right container and volume
+    loaders. Each artifact found on the system volume is copied into a
+    spool, in memory up to spool_bytes and then to a temporary file, so the
+    image is only ever read from the iterating thread while the artifacts
+    themselves are parsed concurrently. All-zero blocks are skipped rather
+    than written, keeping spooled copies of sparse files such as the USN
+    journal sparse.
+    """
+
+    # _source field naming the container the members come from
+    container = "image"
+
+    def __init__(
+        self,
+        path: Path,
+        name: str = "",
+        artifacts: list[tuple[str, str]] | None = None,
+        spool_bytes: int = DEFAULT_SPOOL_BYTES,
+    ):
+        self.path = path
+        self.name = name or path.name
+        self.artifacts = artifacts if artifacts is not None else WINDOWS_ARTIFACTS
+        self.spool_bytes = spool_bytes
+        self._target: Any = None
+
+    def close(self) -> None:
+        """Release the opened target."""
+        self._target = None
+
+    def open_target(self) -> Any:
+        """Open the image as a dissect Target, once.
+
+        Raises:
+            ValueError: If dissect.target is not installed
+        """
+        if self._target is None:
+            if not DISSECT_TARGET_AVAILABLE:
+                raise ValueError("Disk images require the dissect.target package")
+            self._target = Target.open(self.path)
+        return self._target
+
+    def iter_members(self, skip: set[str] | None = None) -> Iterator[ArchiveMember]:
+        """Yield the artifacts found in the image.
+
+        Args:
+            skip: Artifact paths to leave out without reading their content
+        """
+        skip = skip or set()
+        target = self.open_target()
+        if not target.fs.exists(SYSTEM_VOLUME):
+            logger.warning(f"No Windows system volume found in image {self.name}")
+            return
+
+        seen: set[str] = set()
+        for pattern, hint in self.artifacts:
+            for path, entry in self._entries(target.fs, f"{SYSTEM_VOLUME}/{pattern}"):
+                if path in skip or path in seen:
+                    continue
+                seen.add(path)
+                try:
+                    if not entry.is_file():
+                        continue
+                    with entry.open() as content:
+                        spool = self._spool(content)
+                except Exception as e:
+                    logger.warning(f"Failed to read {path} from image {self.name}: {e}")
+                    continue
+                yield ArchiveMember(path=path, size=spool.tell(), spool=spool, hint=hint)
+
+    @staticmethod
+    def _entries(fs: Any, pattern: str) -> Iterator[tuple[str, Any]]:
+        """Paths and filesystem entries matching a path or glob pattern."""
+        if any(char in pattern for char in "*?["):
+            for entry in fs.glob_ext(pattern):
+                yield entry.path, entry
+            return
+        # Literal paths are looked up as given, which keeps the name of an
+        # alternate data stream such as $UsnJrnl:$J in the member path
+        try:
+            yield pattern, fs.get(pattern)
+        except FileNotFoundError:
+            return
+
+    def _spool(self, stream: BinaryIO) -> BinaryIO:
+        """Copy an artifact into a spool, leaving holes for all-zero blocks."""
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes)
+        size = 0
+        written = 0
+        while block := stream.read(COPY_BUFFER_BYTES):
+            if block.count(0) != len(block):
+                spool.seek(size)
+                spool.write(block)
+                written = size + len(block)
+            size += len(block)
+        if written < size:
+            # Trailing zeros: extend the spool to the artifact's size
+            spool.seek(size - 1)
+            spool.write(b"\x00")
+        return spool
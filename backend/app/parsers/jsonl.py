@@ -0,0 +1,351 @@
+"""Shared JSON-lines reader for log parsers.
+
+JSON-based parsers used to open evidence in text mode and json.loads it one
+line at a time, or json.load whole documents into memory. This module reads
+the raw bytes instead: input is split into lines in large blocks, lines are
+decoded with orjson when it is installed, gzip and zstd input is decompressed
+on the fly, and top-level JSON arrays are decoded one element at a time so a
+multi-gigabyte export never has to be held at once.
+"""
+
+import codecs
+import gzip
+import json
+import logging
+import re
+import zlib
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import Any, BinaryIO
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the input at a time
+BLOCK_SIZE = 1024 * 1024
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Whitespace and separators between array elements
+_ELEMENT_GAP = re.compile(r"[\s,]*")
+# What must follow a complete array element
+_ELEMENT_END = re.compile(r"\s*[,\]]")
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode one JSON value.
+
+    Uses orjson when installed, falling back to the stdlib decoder for input
+    orjson rejects (invalid UTF-8, NaN).
+
+    Raises:
+        ValueError: If the data is not valid JSON
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", errors="replace")
+    return json.loads(data)
+
+
+def is_compressed(header: bytes) -> bool:
+    """Check whether a header starts with a gzip or zstd magic."""
+    return header.startswith(GZIP_MAGIC) or header.startswith(ZSTD_MAGIC)
+
+
+def decompress_header(header: bytes) -> bytes:
+    """Decompress as much of a compressed file header as possible.
+
+    Detection only reads the first few kilobytes of a file, so this inflates
+    a truncated stream; uncompressed headers are returned unchanged.
+    """
+    if header.startswith(GZIP_MAGIC):
+        try:
+            return zlib.decompressobj(zlib.MAX_WBITS | 16).decompress(header)
+        except zlib.error:
+            return b""
+    if header.startswith(ZSTD_MAGIC) and ZSTD_AVAILABLE:
+        try:
+            return zstandard.ZstdDecompressor().decompressobj().decompress(header)
+        except zstandard.ZstdError:
+            return b""
+    return header
+
+
+@contextmanager
+def open_source(source: Path | BinaryIO) -> Iterator[BinaryIO]:
+    """Open a parser source as a binary stream, decompressing it if needed.
+
+    Files are opened and closed here; streams passed in are left open for
+    the caller.
+
+    Raises:
+        ValueError: If the input is zstd-compressed and zstandard is missing
+    """
+    if isinstance(source, Path):
+        with open(source, "rb") as f:
+            with _decompressed(f) as stream:
+                yield stream
+    else:
+        with _decompressed(source) as stream:
+            yield stream
+
+
+@contextmanager
+def _decompressed(stream: BinaryIO) -> Iterator[BinaryIO]:
+    header = _peek(stream, 4)
+    if header.startswith(GZIP_MAGIC):
+        with gzip.GzipFile(fileobj=stream, mode="rb") as inflated:
+            yield inflated
+    elif header.startswith(ZSTD_MAGIC):
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd-compressed input requires the zstandard package")
+        with zstandard.ZstdDecompressor().stream_reader(stream, closefd=False) as inflated:
+            yield inflated
+    else:
+        yield stream
+
+
+def _peek(stream: BinaryIO, size: int) -> bytes:
+    if hasattr(stream, "peek"):
+        return stream.peek(size)[:size]
+    position = stream.tell()
+    header = stream.read(size)
+    stream.seek(position)
+    return header
+
+
+def iter_lines(
+    stream: BinaryIO, block_size: int = BLOCK_SIZE, head: bytes = b""
+) -> Iterator[bytes]:
+    """Split a binary stream into lines, reading it in large blocks.
+
+    Every line is yielded, blank ones included, so callers can number them.
+
+    Args:
+        stream: Binary stream to read
+        block_size: Bytes read at a time
+        head: Bytes already read from the start of the stream
+
+    Yields:
+        Lines without their trailing newline
+    """
+    blocks = chain((head,), iter(partial(stream.read, block_size), b""))
+    pending: list[bytes] = []
+    for block in blocks:
+        lines = block.split(b"\n")
+        if len(lines) == 1:
+            # A line longer than the block; join the parts once it ends
+            pending.append(block)
+            continue
+        pending.append(lines[0])
+        lines[0] = b"".join(pending)
+        pending = [lines.pop()]
+        yield from lines
+
+    tail = b"".join(pending)
+    if tail:
+        yield tail
+
+
+def decode_lines(
+    lines: Iterable[bytes | str], start_line: int = 1, comments: bool = False
+) -> Iterator[tuple[int, Any]]:
+    """Decode JSON lines, skipping blank and malformed ones.
+
+    Args:
+        lines: Raw lines, as bytes or text
+        start_line: Line number of the first line
+        comments: Also skip lines starting with "#"
+
+    Yields:
+        (line number, decoded value) tuples
+    """
+    for line_num, line in enumerate(lines, start_line):
+        line = line.strip()
+        if not line or (comments and line[:1] in (b"#", "#")):
+            continue
+        try:
+            record = loads(line)
+        except ValueError as e:
+            logger.debug(f"JSON parse error at line {line_num}: {e}")
+            continue
+        yield line_num, record
+
+
+def iter_json_lines(
+    source: Path | BinaryIO, start_line: int = 1, comments: bool = False
+) -> Iterator[tuple[int, Any]]:
+    """Read and decode a JSON-lines file.
+
+    Yields:
+        (line number, decoded value) tuples
+    """
+    with open_source(source) as stream:
+        yield from decode_lines(iter_lines(stream), start_line, comments)
+
+
+def iter_json_array(
+    stream: BinaryIO, block_size: int = BLOCK_SIZE, head: bytes = b""
+) -> Iterator[Any]:
+    """Decode the elements of a top-level JSON array one at a time.
+
+    Only the elements currently being decoded are held in memory, instead of
+    the whole document.
+
+    Args:
+        stream: Binary stream positioned at (or before) the opening bracket
+        block_size: Bytes read at a time
+        head: Bytes already read from the start of the stream
+
+    Yields:
+        Array elements in order
+
+    Raises:
+        ValueError: If the array is malformed or truncated
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    raw_decode = json.JSONDecoder().raw_decode
+    buffer = decoder.decode(head)
+    position = 0
+    eof = False
+
+    def fill() -> None:
+        nonlocal buffer, position, eof
+        block = stream.read(block_size)
+        eof = not block
+        buffer = buffer[position:] + decoder.decode(block, final=eof)
+        position = 0
+
+    while not buffer.lstrip() and not eof:
+        fill()
+    position = len(buffer) - len(buffer.lstrip())
+    if buffer[position : position + 1] != "[":
+        raise ValueError("Input is not a JSON array")
+    position += 1
+
+    while True:
+        position = _ELEMENT_GAP.match(buffer, position).end()
+        if position == len(buffer):
+            if eof:
+                raise ValueError("Unterminated JSON array")
+            fill()
+            continue
+        if buffer[position] == "]":
+            return
+
+        try:
+            value, end = raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        if not _ELEMENT_END.match(buffer, end):
+            # A number cut off at the end of the buffer decodes as a shorter
+            # number, so read on until the element is followed by a separator
+            if eof:
+                raise ValueError("Unexpected data after JSON array element")
+            fill()
+            continue
+
+        position = end
+        yield value
+
+
+def iter_json_records(
+    source: Path | BinaryIO,
+    wrappers: tuple[str, ...] = (),
+    comments: bool = False,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[tuple[int, Any]]:
+    """Read JSON records from a JSON-lines file, array, or single document.
+
+    Files starting with "[" are streamed as an array; files whose first line
+    is a complete JSON value are read as JSON lines; anything else is read
+    as one (pretty-printed) document, falling back to JSON lines if that
+    fails to decode.
+
+    Args:
+        source: File path or binary stream
+        wrappers: Keys holding the records of a wrapper object, e.g.
+            "Records" for CloudTrail; an object with a list under one of
+            them is replaced by the list's elements
+        comments: Skip JSON-lines lines starting with "#"
+        block_size: Bytes read at a time
+
+    Yields:
+        (number, record) tuples: the line number for JSON lines, the element
+        index for arrays, and the index within the wrapper for documents
+    """
+    with open_source(source) as stream:
+        head = stream.read(block_size)
+        start = head.lstrip()[:1]
+
+        if start == b"[":
+            index = 0
+            try:
+                for index, value in enumerate(iter_json_array(stream, block_size, head), 1):
+                    for record in _unwrap(value, wrappers):
+                        yield index, record
+            except ValueError as e:
+                logger.warning(f"Malformed JSON array after element {index}: {e}")
+            return
+
+        if start == b"{":
+            first_line = head.split(b"\n", 1)[0] if b"\n" in head else None
+            if first_line is None or not _decodes(first_line):
+                # A document spanning several lines, or one longer than a block
+                content = head + stream.read()
+                try:
+                    document = loads(content)
+                except ValueError:
+                    lines = content.split(b"\n")
+                else:
+                    yield from enumerate(_unwrap(document, wrappers), 1)
+                    return
+            else:
+                lines = iter_lines(stream, block_size, head)
+        else:
+            lines = iter_lines(stream, block_size, head)
+
+        for line_num, value in decode_lines(lines, comments=comments):
+            for record in _unwrap(value, wrappers):
+                yield line_num, record
+
+
+def _decodes(line: bytes) -> bool:
+    try:
+        loads(line)
+    except ValueError:
+        return False
+    return True
+
+
+def _unwrap(value: Any, wrappers: tuple[str, ...]) -> list[Any]:
+    if isinstance(value, dict):
+        for key in wrappers:
+            records = value.get(key)
+            if isinstance(records, list):
+                return records
+    return [value]
@@ -1,16 +1,23 @@
 """Parser registry for dynamic parser loading and selection.
 
 The registry maintains a collection of available parsers and provides
-methods to find the appropriate parser for a given input.
+methods to find the appropriate parser for a given input. Detection is
+driven by a signature index (magic bytes and extensions) and a shared sniff
+of the file header, and results are cached per evidence hash.
 """
 
 import logging
+from collections import OrderedDict
 from pathlib import Path
 
 from app.parsers.base import BaseParser, ParserCategory
+from app.parsers.signatures import HeaderSniff, SignatureTrie
 
 logger = logging.getLogger(__name__)
 
+# Detection results remembered by evidence hash
+DETECTION_CACHE_SIZE = 10_000
+
 
 class ParserRegistry:
     """Central registry for evidence parsers.
@@ -23,6 +30,10 @@ class ParserRegistry:
         self._parsers: dict[str, type[BaseParser]] = {}
         self._by_extension: dict[str, list[str]] = {}
         self._by_category: dict[ParserCategory, list[str]] = {}
+        # Instances used only for detection; find_parser() returns fresh ones
+        self._detectors: dict[str, BaseParser] = {}
+        self._signatures = SignatureTrie()
+        self._detected: OrderedDict[tuple[str, str | None], str | None] = OrderedDict()
 
     def register(self, parser_class: type[BaseParser]) -> None:
         """Register a parser class.
@@ -37,6 +48,12 @@ class ParserRegistry:
             logger.warning(f"Parser '{name}' already registered, overwriting")
 
         self._parsers[name] = parser_class
+        self._detectors[name] = parser
+        self._detected.clear()
+
+        # Index by magic bytes
+        for offset, magic in parser.magic_signatures:
+            self._signatures.add(offset, magic, name)
 
         # Index by extension
         for ext in parser.supported_extensions:
@@ -66,7 +83,9 @@ class ParserRegistry:
             return False
 
         parser_class = self._parsers.pop(name)
-        parser = parser_class()
+        parser = self._detectors.pop(name, None) or parser_class()
+        self._signatures.remove(name)
+        self._detected.clear()
 
         # Remove from extension index
         for ext in parser.supported_extensions:
@@ -123,44 +142,88 @@ class ParserRegistry:
         file_path: Path | None = None,
         content: bytes | None = None,
         hint: str | None = None,
+        evidence_hash: str | None = None,
     ) -> BaseParser | None:
         """Find the best parser for given input.
 
         Uses multiple strategies:
         1. If hint provided, try that parser first
-        2. Check parsers by file extension
-        3. Try all parsers with can_parse()
+        2. Check parsers whose magic bytes match the content
+        3. Check parsers by file extension
+        4. Try the remaining parsers with can_parse()
+
+        Every check shares one HeaderSniff of the content, so the header is
+        decoded and probed for JSON lines at most once. When evidence_hash
+        is given, the result is cached and identical evidence is not
+        detected again.
 
         Args:
             file_path: Path to file to parse
             content: File content or first N bytes for detection
             hint: Parser name hint
+            evidence_hash: Hash of the evidence content, used as cache key
 
         Returns:
             Best matching parser or None
         """
+        cache_key = (evidence_hash, hint) if evidence_hash else None
+        if cache_key and cache_key in self._detected:
+            self._detected.move_to_end(cache_key)
+            name = self._detected[cache_key]
+            return self.get(name) if name else None
+
+        if content is not None and not isinstance(content, HeaderSniff):
+            content = HeaderSniff(content)
+
+        name = self._detect(file_path, content, hint)
+
+        if cache_key:
+            self._detected[cache_key] = name
+            while len(self._detected) > DETECTION_CACHE_SIZE:
+                self._detected.popitem(last=False)
+
+        return self.get(name) if name else None
+
+    def _detect(
+        self,
+        file_path: Path | None,
+        content: HeaderSniff | None,
+        hint: str | None,
+    ) -> str | None:
+        """Run the detection strategies and return the matching parser name."""
+        tried: set[str] = set()
+
+        def matches(name: str) -> bool:
+            if name in tried or name not in self._detectors:
+                return False
+            tried.add(name)
+            try:
+                return self._detectors[name].can_parse(file_path, content)
+            except Exception as e:
+                logger.debug(f"Parser {name} check failed: {e}")
+                return False
+
         # Strategy 1: Use hint if provided
-        if hint:
-            parser = self.get(hint)
-            if parser and parser.can_parse(file_path, content):
-                return parser
+        if hint and matches(hint):
+            return hint
 
-        # Strategy 2: Check by extension
+        # Strategy 2: Check by magic bytes
+        if content:
+            for name in self._signatures.match(content):
+                if matches(name):
+                    return name
+
+        # Strategy 3: Check by extension
         if file_path:
             ext = file_path.suffix.lower().lstrip(".")
-            for parser in self.get_by_extension(ext):
-                if parser.can_parse(file_path, content):
-                    return parser
+            for name in list(self._by_extension.get(ext, [])):
+                if matches(name):
+                    return name
 
-        # Strategy 3: Try all parsers
-        for parser_class in self._parsers.values():
-            parser = parser_class()
-            try:
-                if parser.can_parse(file_path, content):
-                    return parser
-            except Exception as e:
-                logger.debug(f"Parser {parser.name} check failed: {e}")
-                continue
+        # Strategy 4: Try all parsers
+        for name in list(self._detectors):
+            if matches(name):
+                return name
 
         return None
 
@@ -210,6 +273,7 @@ def get_parser(
     file_path: Path | None = None,
     content: bytes | None = None,
     hint: str | None = None,
+    evidence_hash: str | None = None,
 ) -> BaseParser | None:
     """Find a parser for the given input.
 
@@ -219,11 +283,12 @@ def get_parser(
         file_path: Path to file to parse
         content: File content or first N bytes
         hint: Parser name hint
+        evidence_hash: Hash of the evidence content, used to cache the result
 
     Returns:
         Best matching parser or None
     """
-    return _registry.find_parser(file_path, content, hint)
+    return _registry.find_parser(file_path, content, hint, evidence_hash)
 
 
 def load_builtin_parsers() -> None:
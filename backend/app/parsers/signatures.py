@@ -0,0 +1,161 @@
+"""Signature index for parser auto-detection.
+
+Detection used to instantiate every registered parser and ask each one in
+turn, with several of them decoding the header and json-parsing its lines
+again. Instead, parsers declare magic bytes (an offset and a byte string)
+that are indexed in a prefix trie, so a binary header is matched against
+every signature in one walk. The header itself is wrapped in a HeaderSniff,
+a bytes object that caches its decoded text and JSON-line probe, so the
+text-based checks that remain share one decode and one json pass.
+"""
+
+import json
+from functools import cached_property
+from typing import Any
+
+from app.parsers.jsonl import decompress_header, is_compressed
+
+# Bytes read from the start of a file for detection
+SNIFF_SIZE = 4096
+
+
+class HeaderSniff(bytes):
+    """First bytes of a file, with cached decodings for can_parse checks.
+
+    It is a bytes object, so parsers that only look at raw bytes are
+    unaffected; text and JSON based checks go through sniff_text() and
+    json_lines(), which reuse the cached values.
+    """
+
+    @cached_property
+    def text(self) -> str:
+        """Header decoded as UTF-8, ignoring invalid bytes."""
+        return self.decode("utf-8", errors="ignore")
+
+    @cached_property
+    def lines(self) -> list[str]:
+        """Header text split into lines, surrounding whitespace removed."""
+        return self.text.strip().split("\n")
+
+    @cached_property
+    def json_objects(self) -> list[tuple[int, dict[str, Any]]]:
+        """JSON objects found on header lines, with their line index."""
+        return _probe_json(self.lines)
+
+    @cached_property
+    def inflated(self) -> "HeaderSniff":
+        """Header with gzip or zstd compression removed."""
+        return HeaderSniff(decompress_header(self)) if is_compressed(self) else self
+
+
+def inflate_header(content: bytes) -> bytes:
+    """Decompress a gzip or zstd compressed header for content checks.
+
+    Only parsers that read their input through app.parsers.jsonl accept
+    compressed files, so only they should look past the compression.
+    """
+    if isinstance(content, HeaderSniff):
+        return content.inflated
+    return decompress_header(content)
+
+
+def sniff_text(content: bytes) -> str:
+    """Decode a header as UTF-8, ignoring invalid bytes."""
+    if isinstance(content, HeaderSniff):
+        return content.text
+    return content.decode("utf-8", errors="ignore")
+
+
+def json_lines(content: bytes, max_lines: int = 5) -> list[dict[str, Any]]:
+    """Get the JSON objects among the first lines of a header.
+
+    Blank lines, lines that are not JSON, and JSON values other than objects
+    are skipped; a truncated last line simply fails to parse.
+
+    Args:
+        content: File header (a HeaderSniff reuses its cached probe)
+        max_lines: Number of leading lines to consider
+
+    Returns:
+        Decoded objects in line order
+    """
+    if isinstance(content, HeaderSniff):
+        objects = content.json_objects
+    else:
+        objects = _probe_json(sniff_text(content).strip().split("\n"))
+    return [obj for index, obj in objects if index < max_lines]
+
+
+def _probe_json(lines: list[str]) -> list[tuple[int, dict[str, Any]]]:
+    objects = []
+    for index, line in enumerate(lines):
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            objects.append((index, data))
+    return objects
+
+
+class SignatureTrie:
+    """Prefix trie of magic byte signatures, one trie per header offset.
+
+    Each node maps the next byte to a child node; parser names are stored on
+    the node where their signature ends. Matching walks the header once per
+    distinct offset, whatever the number of signatures.
+    """
+
+    def __init__(self) -> None:
+        self._roots: dict[int, dict] = {}
+
+    def add(self, offset: int, magic: bytes, name: str) -> None:
+        """Index a parser's signature."""
+        node = self._roots.setdefault(offset, {})
+        for byte in magic:
+            node = node.setdefault(byte, {})
+        names = node.setdefault(None, [])
+        if name not in names:
+            names.append(name)
+
+    def remove(self, name: str) -> None:
+        """Drop every signature of a parser."""
+
+        def prune(node: dict) -> None:
+            for key, child in node.items():
+                if key is None:
+                    if name in child:
+                        child.remove(name)
+                else:
+                    prune(child)
+
+        for root in self._roots.values():
+            prune(root)
+
+    def match(self, header: bytes) -> list[str]:
+        """Find the parsers whose signatures the header starts with.
+
+        Returns:
+            Parser names, those with the longest matching signature first
+        """
+        matches: list[tuple[int, str]] = []
+        for offset, node in self._roots.items():
+            length = 0
+            for byte in header[offset:]:
+                node = node.get(byte)
+                if node is None:
+                    break
+                length += 1
+                for name in node.get(None, ()):
+                    matches.append((length, name))
+
+        seen: set[str] = set()
+        ordered = []
+        for _, name in sorted(matches, key=lambda match: -match[0]):
+            if name not in seen:
+                seen.add(name)
+                ordered.append(name)
+        return ordered
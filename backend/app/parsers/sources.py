@@ -0,0 +1,169 @@
+"""Local file access for parsers whose libraries need a path or a mapping.
+
+SQLite, python-evtx and dissect's prefetch reader cannot read from an
+arbitrary stream, so parsers used to read a stream source whole with
+source.read() and write it to a named temporary file. The helpers here
+avoid that where they can:
+
+- Streams over a regular local file are used in place, through their file
+  name or /proc/self/fd.
+- Libraries that resolve the path rather than just open it (SQLite follows
+  /proc/self/fd links to a memfd or deleted file it cannot open) ask
+  source_path for a named path and get a temporary copy instead.
+- In-memory buffers (BytesIO) are written once to an anonymous memfd, from
+  the buffer itself rather than a copy of it, and never touch the disk.
+- Anything else (object storage, decompressing readers) is copied to a
+  temporary file in bounded chunks.
+"""
+
+import io
+import mmap
+import os
+import shutil
+import stat
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO
+
+# Bytes copied at a time when a stream has to be spooled to disk
+COPY_BUFFER_BYTES = 1024 * 1024
+
+MEMFD_AVAILABLE = hasattr(os, "memfd_create")
+PROC_FD_AVAILABLE = os.path.isdir("/proc/self/fd")
+
+
+@contextmanager
+def source_path(source: Path | BinaryIO, suffix: str = "", named: bool = False) -> Iterator[Path]:
+    """Get a filesystem path holding the content of a parser source.
+
+    Args:
+        source: File path or binary stream, read from its current position
+        suffix: File name suffix for a temporary copy, for libraries that
+            check the extension
+        named: Require a path naming a file, rather than a /proc/self/fd
+            link, for libraries that resolve the path before opening it
+
+    Yields:
+        Path valid until the context exits
+    """
+    if isinstance(source, Path):
+        yield source
+        return
+
+    name = _file_name(source)
+    if name is not None:
+        yield name
+        return
+
+    if PROC_FD_AVAILABLE and not named:
+        with source_fd(source) as fd:
+            yield Path(f"/proc/self/fd/{fd}")
+        return
+
+    fd, temp_name = tempfile.mkstemp(prefix="eleanor-source-", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            shutil.copyfileobj(source, f, COPY_BUFFER_BYTES)
+        yield Path(temp_name)
+    finally:
+        Path(temp_name).unlink(missing_ok=True)
+
+
+@contextmanager
+def source_fd(source: Path | BinaryIO) -> Iterator[int]:
+    """Get a read-only file descriptor of a regular file with the source's content.
+
+    Yields:
+        File descriptor, closed when the context exits unless it belongs
+        to the source stream
+    """
+    if isinstance(source, Path):
+        fd = os.open(source, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+    else:
+        fd = _regular_fileno(source)
+        if fd is not None:
+            yield fd
+            return
+        fd = _memfd_copy(source) if MEMFD_AVAILABLE else None
+        if fd is None:
+            fd = _spooled_copy(source)
+
+    try:
+        yield fd
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def source_mmap(source: Path | BinaryIO) -> Iterator[mmap.mmap]:
+    """Memory-map the content of a parser source read-only.
+
+    Raises:
+        ValueError: If the source is empty
+    """
+    with source_fd(source) as fd:
+        mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def _regular_fileno(stream: BinaryIO) -> int | None:
+    """File descriptor of a stream over a whole regular file, or None."""
+    # Decompressing and buffering wrappers expose the fileno of the file
+    # underneath them, whose content is not what the stream reads
+    if not isinstance(getattr(stream, "raw", stream), io.FileIO):
+        return None
+    try:
+        if stream.tell() != 0:
+            return None
+        fd = stream.fileno()
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            return None
+    except (OSError, ValueError):
+        return None
+    return fd
+
+
+def _file_name(stream: BinaryIO) -> Path | None:
+    """Path of the regular file a stream reads, if it still names that file."""
+    fd = _regular_fileno(stream)
+    name = getattr(stream, "name", None)
+    if fd is None or not isinstance(name, str):
+        return None
+    try:
+        if os.path.samestat(os.stat(name), os.fstat(fd)):
+            return Path(name)
+    except OSError:
+        pass
+    return None
+
+
+def _memfd_copy(stream: BinaryIO) -> int | None:
+    """Copy an in-memory buffer to an anonymous memfd, or None if not in memory."""
+    if not hasattr(stream, "getbuffer"):
+        return None
+    fd = os.memfd_create("eleanor-source", os.MFD_CLOEXEC)
+    try:
+        with stream.getbuffer() as buffer, open(fd, "wb", closefd=False) as f:
+            f.write(buffer[stream.tell() :])
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _spooled_copy(stream: BinaryIO) -> int:
+    """Copy a stream to an unlinked temporary file in bounded chunks."""
+    fd, name = tempfile.mkstemp(prefix="eleanor-source-")
+    os.unlink(name)
+    try:
+        with open(fd, "wb", closefd=False) as f:
+            shutil.copyfileobj(stream, f, COPY_BUFFER_BYTES)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
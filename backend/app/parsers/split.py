@@ -0,0 +1,370 @@
+"""Split parsing of large line-oriented evidence files.
+
+Divides a file into record-aligned byte ranges and parses the ranges in a
+process pool, so a single multi-GB log export is parsed on every core of the
+worker instead of one. Parsers opt in by implementing get_split_context()
+and parse_lines() (see BaseParser). Files of fixed-size records, such as an
+NTFS $MFT, are cut on record boundaries and parsed with parse_record_range().
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.parsers.base import BaseParser, encode_document
+from app.parsers.filtering import EventFilter
+from app.utils.process_pool import ProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Compressed inputs have no addressable line boundaries
+COMPRESSED_MAGIC = [
+    b"\x1f\x8b",  # gzip
+    b"\x28\xb5\x2f\xfd",  # zstd
+    b"BZh",  # bzip2
+    b"\xfd7zXZ\x00",  # xz
+]
+
+DEFAULT_RANGE_BYTES = 32 * 1024 * 1024
+
+
+@dataclass
+class SplitRange:
+    """A record-aligned byte range of a file."""
+
+    start: int
+    end: int
+
+
+@dataclass
+class SplitPlan:
+    """Ranges and parser context for parsing one file in parallel."""
+
+    file_path: Path
+    context: dict[str, Any]
+    ranges: list[SplitRange] = field(default_factory=list)
+
+
+class RangeLines:
+    """Iterate the decoded lines of a byte range, counting them as it goes."""
+
+    def __init__(self, file_path: Path, start: int, end: int):
+        self.file_path = file_path
+        self.start = start
+        self.end = end
+        self.line_count = 0
+
+    def __iter__(self) -> Iterator[str]:
+        with open(self.file_path, "rb") as f:
+            f.seek(self.start)
+            remaining = self.end - self.start
+            while remaining > 0:
+                raw = f.readline(remaining)
+                if not raw:
+                    break
+                remaining -= len(raw)
+                self.line_count += 1
+                yield raw.decode("utf-8", errors="replace")
+
+
+def find_range_boundaries(
+    file_path: Path,
+    range_bytes: int,
+    start: int = 0,
+) -> list[SplitRange]:
+    """Split a file into ranges of roughly range_bytes that start on a line.
+
+    Args:
+        file_path: File to split
+        range_bytes: Target size of each range
+        start: Offset of the first range, which must start a line
+
+    Returns:
+        Contiguous ranges covering the file from start to the end
+    """
+    size = file_path.stat().st_size
+    if start and start >= size:
+        return []
+    boundaries = [start]
+
+    with open(file_path, "rb") as f:
+        offset = start + range_bytes
+        while offset < size:
+            # Finish the line containing the byte before the target offset,
+            # so an offset that already starts a line is kept as-is
+            f.seek(offset - 1)
+            f.readline()
+            boundary = f.tell()
+            if boundary >= size:
+                break
+            boundaries.append(boundary)
+            offset = boundary + range_bytes
+
+    boundaries.append(size)
+    return [SplitRange(start, end) for start, end in zip(boundaries, boundaries[1:])]
+
+
+def find_record_boundaries(
+    file_path: Path,
+    record_size: int,
+    range_bytes: int,
+    start: int = 0,
+) -> list[SplitRange]:
+    """Split a file of fixed-size records into ranges of whole records.
+
+    Args:
+        file_path: File to split
+        record_size: Size of each record
+        range_bytes: Target size of each range, rounded down to whole records
+        start: Offset of the first range, which must start a record
+
+    Returns:
+        Contiguous ranges covering the whole records from start to the end
+    """
+    size = file_path.stat().st_size // record_size * record_size
+    step = max(range_bytes // record_size, 1) * record_size
+    return [SplitRange(offset, min(offset + step, size)) for offset in range(start, size, step)]
+
+
+def plan_split(
+    parser: BaseParser,
+    file_path: Path,
+    range_bytes: int = DEFAULT_RANGE_BYTES,
+    start: int = 0,
+) -> SplitPlan | None:
+    """Build a split plan for a file, if the parser and file allow it.
+
+    Args:
+        parser: Parser selected for the file
+        file_path: File to parse
+        range_bytes: Target size of each range
+        start: Line-aligned offset to start from when resuming a job; the
+            plan is then kept even if only one range remains
+
+    Returns:
+        SplitPlan, or None if the file must be parsed serially
+    """
+    with open(file_path, "rb") as f:
+        header = f.read(8)
+    if any(header.startswith(magic) for magic in COMPRESSED_MAGIC):
+        return None
+
+    try:
+        context = parser.get_split_context(file_path)
+    except Exception as e:
+        logger.debug(f"Parser {parser.name} split check failed: {e}")
+        return None
+    if context is None:
+        return None
+
+    if "record_size" in context:
+        ranges = find_record_boundaries(file_path, context["record_size"], range_bytes, start)
+    else:
+        ranges = find_range_boundaries(file_path, range_bytes, start)
+    if len(ranges) < (1 if start else 2):
+        parser.release_split_context(context)
+        return None
+
+    return SplitPlan(file_path=file_path, context=context, ranges=ranges)
+
+
+def count_lines(file_path: Path, start: int, end: int, block_size: int = 1024 * 1024) -> int:
+    """Count the lines of a byte range, as RangeLines would yield them.
+
+    Counting newlines is far cheaper than parsing, so the parent counts each
+    range before submitting the next and the workers number lines absolutely.
+    """
+    count = 0
+    last = b"\n"
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            count += block.count(b"\n")
+            last = block[-1:]
+    # A final line without a newline is a line too
+    return count + (last != b"\n")
+
+
+def _parse_range(
+    parser_class: type[BaseParser],
+    file_path: str,
+    start: int,
+    end: int,
+    first_line: int,
+    source_name: str,
+    context: dict[str, Any],
+    event_filter: EventFilter | None = None,
+    extra: dict[str, str] | None = None,
+) -> tuple[list[dict[str, Any]] | list[bytes], int, int]:
+    """Parse one range in a pool worker.
+
+    Lines are numbered from first_line; ranges of fixed-size records number
+    their records absolutely. Events the job's event_filter rejects never
+    leave the worker. With extra, documents are returned as JSON bytes with
+    extra's fields written in, so only bytes cross back to the parent.
+
+    Returns:
+        Tuple of (documents, events that failed conversion, events filtered out)
+    """
+    parser = parser_class()
+    parser.event_filter = event_filter
+    if "record_size" in context:
+        events = parser.parse_record_range(Path(file_path), start, end, source_name, context)
+    else:
+        lines = RangeLines(Path(file_path), start, end)
+        events = parser.parse_lines(lines, source_name, first_line, context)
+    documents: list[Any] = []
+    failed = 0
+    filtered = 0
+
+    for event in events:
+        if event_filter is not None and not event_filter.matches(event):
+            filtered += 1
+            continue
+        try:
+            if extra is not None and event_filter is None:
+                documents.append(event.to_json(extra))
+                continue
+            doc = event.to_dict()
+            if event_filter is not None:
+                doc = event_filter.project(doc)
+            if extra is not None:
+                doc.update(extra)
+                documents.append(encode_document(doc))
+            else:
+                documents.append(doc)
+        except Exception as e:
+            logger.warning(f"Failed to process event: {e}")
+            failed += 1
+
+    return documents, failed, filtered
+
+
+class SplitParseRunner:
+    """Parses the ranges of a SplitPlan in a process pool.
+
+    The pool is a ProcessPool, so it may start workers from a Celery prefork
+    worker.
+
+    Ranges are submitted with a bounded look-ahead and their documents are
+    yielded in file order, so memory stays proportional to the number of
+    workers rather than the size of the file. Events are converted in the
+    workers; with encode set, documents are yielded as JSON bytes
+    (ParsedEvent.to_json) with case_id and evidence_id written in, as
+    ParserExecutor does, so the parent only forwards bytes to the indexer.
+
+    position describes the range whose documents are being yielded: its
+    byte offset, the lines before it, and the number of documents and of
+    conversion failures before it (counting from first_record and
+    failed_before). A resumed job passes those values back as a plan
+    starting at that offset, line_offset, first_record and failed_before;
+    failed_events continues from failed_before.
+
+    An event_filter is applied in the workers; filtered_events counts the
+    events it dropped.
+    """
+
+    def __init__(
+        self,
+        parser: BaseParser,
+        plan: SplitPlan,
+        source_name: str,
+        max_workers: int | None = None,
+        line_offset: int = 0,
+        first_record: int = 0,
+        failed_before: int = 0,
+        event_filter: EventFilter | None = None,
+        case_id: str | None = None,
+        evidence_id: str | None = None,
+        encode: bool = False,
+    ):
+        self.parser = parser
+        self.plan = plan
+        self.source_name = source_name
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.line_offset = line_offset
+        self.first_record = first_record
+        self.event_filter = event_filter
+        self.encode = encode
+        self.failed_events = failed_before
+        self.filtered_events = 0
+        self.ranges_parsed = 0
+        self.position = {
+            "offset": plan.ranges[0].start if plan.ranges else 0,
+            "line_offset": line_offset,
+            "records": first_record,
+            "failed": failed_before,
+        }
+
+        self._extra: dict[str, str] = {}
+        if case_id is not None:
+            self._extra["case_id"] = str(case_id)
+        if evidence_id is not None:
+            self._extra["evidence_id"] = str(evidence_id)
+
+    async def iter_documents(self) -> AsyncIterator[dict[str, Any] | bytes]:
+        """Yield ECS documents for the whole file in file order."""
+        ranges = iter(self.plan.ranges)
+        pending: deque[tuple[SplitRange, int, asyncio.Future]] = deque()
+        counts_lines = "record_size" not in self.plan.context
+        next_line_offset = self.line_offset
+
+        async def submit_next(pool: ProcessPool) -> None:
+            nonlocal next_line_offset
+            split_range = next(ranges, None)
+            if split_range is None:
+                return
+            future = pool.submit(
+                _parse_range,
+                type(self.parser),
+                str(self.plan.file_path),
+                split_range.start,
+                split_range.end,
+                next_line_offset + 1,
+                self.source_name,
+                self.plan.context,
+                self.event_filter,
+                self._extra if self.encode else None,
+            )
+            pending.append((split_range, next_line_offset, future))
+            if counts_lines:
+                next_line_offset += await asyncio.to_thread(
+                    count_lines, self.plan.file_path, split_range.start, split_range.end
+                )
+
+        try:
+            async with ProcessPool(self.max_workers) as pool:
+                for _ in range(self.max_workers * 2):
+                    await submit_next(pool)
+
+                records = self.first_record
+                while pending:
+                    split_range, line_offset, future = pending.popleft()
+                    documents, failed, filtered = await future
+                    await submit_next(pool)
+
+                    self.ranges_parsed += 1
+                    self.position.update(
+                        offset=split_range.start,
+                        line_offset=line_offset,
+                        records=records,
+                        failed=self.failed_events,
+                    )
+                    records += len(documents)
+                    self.failed_events += failed
+                    self.filtered_events += filtered
+
+                    for doc in documents:
+                        yield doc
+        finally:
+            self.parser.release_split_context(self.plan.context)
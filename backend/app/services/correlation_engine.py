@@ -44,6 +44,12 @@ from app.models.analytics import (
     RuleExecution,
     RuleType,
 )
+from app.services.correlation_state import (
+    CorrelationStateStore,
+    InMemoryStateStore,
+    create_state_store,
+)
+from app.services.query_matcher import get_compiled_query
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -138,6 +144,11 @@ class CorrelationEngine:
     3. **Distributed Execution**: When running multiple engine instances,
        the database provides shared state coordination.
 
+    Real-time sequence rules instead keep their open windows in a
+    `CorrelationStateStore` (Redis or in-process), as they update them on
+    every matching event; only completed sequences are written to
+    `CorrelationState`, for audit.
+
     ## State Lifecycle
 
     States transition through the following statuses:
@@ -159,14 +170,23 @@ class CorrelationEngine:
     ```
     """
 
-    def __init__(self, es: AsyncElasticsearch):
+    def __init__(
+        self,
+        es: AsyncElasticsearch,
+        state_store: CorrelationStateStore | None = None,
+    ):
         """Initialize correlation engine.
 
         Args:
             es: Elasticsearch client
+            state_store: Store of open real-time correlation windows;
+                defaults to an in-process store
         """
         self.es = es
         self.index_prefix = settings.elasticsearch_index_prefix
+        self.state_store = state_store or InMemoryStateStore(
+            max_events=settings.correlation_state_max_events
+        )
 
     async def execute_correlation_rule(
         self,
@@ -865,29 +885,40 @@ class CorrelationEngine:
         self,
         event: dict[str, Any],
         db: AsyncSession,
+        rules: list[DetectionRule] | None = None,
+        message_id: str | None = None,
     ) -> list[dict[str, Any]]:
         """Process a single event for real-time correlation rules.
 
         Used by the real-time processor to update correlation states
-        and check for completed sequences.
+        and check for completed sequences. The windows of returned matches
+        are claimed but stay open: close them with close_realtime_windows()
+        once the alerts are committed, or reopen them with
+        release_realtime_windows() if that fails.
 
         Args:
             event: Event to process
             db: Database session
+            rules: Correlation rules to run, such as the real-time
+                processor's cached ones; queried when not given
+            message_id: ID of the stream message carrying the event, which
+                identifies it in correlation windows when it has no _id, so
+                a redelivered event is not counted twice
 
         Returns:
             List of correlation matches triggered by this event
         """
-        # Get active real-time correlation rules
-        query = select(DetectionRule).where(
-            and_(
-                DetectionRule.rule_type == RuleType.CORRELATION,
-                DetectionRule.status.in_(["enabled", "testing"]),
-                DetectionRule.correlation_config.isnot(None),
+        if rules is None:
+            # Get active real-time correlation rules
+            query = select(DetectionRule).where(
+                and_(
+                    DetectionRule.rule_type == RuleType.CORRELATION,
+                    DetectionRule.status.in_(["enabled", "testing"]),
+                    DetectionRule.correlation_config.isnot(None),
+                )
             )
-        )
-        result = await db.execute(query)
-        rules = result.scalars().all()
+            result = await db.execute(query)
+            rules = result.scalars().all()
 
         matches = []
 
@@ -900,7 +931,7 @@ class CorrelationEngine:
             if not config.get("realtime", False):
                 continue
 
-            match = await self._update_correlation_state(rule, event, db)
+            match = await self._update_correlation_state(rule, event, db, message_id)
             if match:
                 matches.append(match)
 
@@ -911,13 +942,18 @@ class CorrelationEngine:
         rule: DetectionRule,
         event: dict[str, Any],
         db: AsyncSession,
+        message_id: str | None = None,
     ) -> dict[str, Any] | None:
         """Update correlation state for a rule based on an event.
 
+        The event is counted in the entity's window in the state store;
+        only completed sequences are written to the database, for audit.
+
         Args:
             rule: Correlation rule
             event: New event
             db: Database session
+            message_id: Stream message ID, used when the event has no _id
 
         Returns:
             Match dict if correlation completes, None otherwise
@@ -957,54 +993,20 @@ class CorrelationEngine:
             return None
 
         entity_key = "|".join(key_parts)
-        now = datetime.utcnow()
 
-        # Get or create correlation state
-        state_query = select(CorrelationState).where(
-            and_(
-                CorrelationState.rule_id == rule.id,
-                CorrelationState.entity_key == entity_key,
-                CorrelationState.status == CorrelationStateStatus.ACTIVE,
-                CorrelationState.window_end >= now,
-            )
-        )
-        result = await db.execute(state_query)
-        state = result.scalar_one_or_none()
-
-        if not state:
-            # Create new state
-            state = CorrelationState(
-                rule_id=rule.id,
-                entity_key=entity_key,
-                state={
-                    "matched_events": [],
-                    "counts": {},
-                    "first_event_id": event.get("_id"),
-                },
-                window_start=now,
-                window_end=now + window,
-            )
-            db.add(state)
-
-        # Update counts
-        counts = state.state.get("counts", {})
-        counts[matched_event_id] = counts.get(matched_event_id, 0) + 1
-
-        # Add to matched events
-        matched_events = state.state.get("matched_events", [])
-        matched_events.append(
+        # Count the event in the entity's open window
+        state = await self.state_store.record(
+            str(rule.id),
+            entity_key,
+            matched_event_id,
             {
-                "event_id": event.get("_id"),
+                "event_id": event.get("_id") or message_id,
                 "step": matched_event_id,
                 "timestamp": event.get("@timestamp"),
-            }
+            },
+            window,
         )
-
-        state.state = {
-            **state.state,
-            "counts": counts,
-            "matched_events": matched_events,
-        }
+        counts = state.counts
 
         # Check if sequence is complete
         threshold_map = {}
@@ -1024,61 +1026,74 @@ class CorrelationEngine:
                 sequence_complete = False
                 break
 
-        if sequence_complete:
-            # Mark state as completed
-            state.status = CorrelationStateStatus.COMPLETED
+        if not sequence_complete:
+            return None
 
-            return {
-                "rule_id": str(rule.id),
-                "rule_name": rule.name,
-                "entity_key": entity_key,
-                "sequence": sequence_order,
-                "event_counts": counts,
-                "total_events": len(matched_events),
-                "window_start": state.window_start.isoformat(),
-                "window_end": state.window_end.isoformat(),
-            }
+        matched_events = await self.state_store.claim(str(rule.id), entity_key)
+        if matched_events is None:
+            # Another processor, or an earlier event, completed the window first
+            return None
 
-        return None
+        # Keep the completed state for audit
+        db.add(
+            CorrelationState(
+                rule_id=rule.id,
+                entity_key=entity_key,
+                state={
+                    "matched_events": matched_events,
+                    "counts": counts,
+                    "first_event_id": state.first_event_id,
+                },
+                window_start=state.window_start,
+                window_end=state.window_end,
+                status=CorrelationStateStatus.COMPLETED,
+            )
+        )
 
-    def _event_matches_query(self, event: dict[str, Any], query: str) -> bool:
-        """Simple check if event matches a query pattern.
+        return {
+            "rule_id": str(rule.id),
+            "rule_name": rule.name,
+            "entity_key": entity_key,
+            "sequence": sequence_order,
+            "event_counts": counts,
+            "total_events": sum(counts.values()),
+            "window_start": state.window_start.isoformat(),
+            "window_end": state.window_end.isoformat(),
+        }
 
-        This is a simplified matcher for real-time processing.
-        For complex queries, use Elasticsearch.
+    async def close_realtime_windows(self, matches: list[dict[str, Any]]) -> None:
+        """Close the windows of real-time matches whose alerts were committed.
 
         Args:
-            event: Event to check
-            query: Simple query string (field:value format)
-
-        Returns:
-            True if event matches
+            matches: Matches returned by process_realtime_event
         """
-        # Parse simple field:value patterns
-        parts = query.split(" AND ")
+        for match in matches:
+            await self.state_store.complete(match["rule_id"], match["entity_key"])
 
-        for part in parts:
-            part = part.strip()
-            if ":" not in part:
-                continue
+    async def release_realtime_windows(self, matches: list[dict[str, Any]]) -> None:
+        """Reopen the windows of real-time matches whose alerts were not committed.
 
-            field, value = part.split(":", 1)
-            field = field.strip()
-            value = value.strip().strip('"')
+        The windows can then complete again when their events are redelivered.
 
-            actual_value = self._get_nested_value(event, field)
-            if actual_value is None:
-                return False
+        Args:
+            matches: Matches returned by process_realtime_event
+        """
+        for match in matches:
+            await self.state_store.release(match["rule_id"], match["entity_key"])
 
-            # Handle wildcards
-            if "*" in value:
-                pattern = value.replace("*", ".*")
-                if not re.match(f"^{pattern}$", str(actual_value)):
-                    return False
-            elif str(actual_value) != value:
-                return False
+    def _event_matches_query(self, event: dict[str, Any], query: str) -> bool:
+        """Check if an event matches a query.
 
-        return True
+        Queries are compiled once and the compiled matcher is reused.
+
+        Args:
+            event: Event to check
+            query: Query string (Lucene syntax)
+
+        Returns:
+            True if event matches
+        """
+        return get_compiled_query(query).matches(event)
 
 
 # Global correlation engine instance
@@ -1093,8 +1108,13 @@ async def get_correlation_engine() -> CorrelationEngine:
     """
     global _correlation_engine
     if _correlation_engine is None:
-        from app.database import get_elasticsearch
+        from app.database import get_elasticsearch, get_redis
 
         es = await get_elasticsearch()
-        _correlation_engine = CorrelationEngine(es)
+        state_store = create_state_store(
+            settings.correlation_state_backend,
+            redis=await get_redis() if settings.correlation_state_backend == "redis" else None,
+            max_events=settings.correlation_state_max_events,
+        )
+        _correlation_engine = CorrelationEngine(es, state_store)
     return _correlation_engine
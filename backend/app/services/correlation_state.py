@@ -0,0 +1,384 @@
+"""Windowed state stores for real-time correlation.
+
+Real-time sequence rules track, per rule and entity (such as a user or a
+host), how many events of each step were seen within the rule's window.
+This state changes with every matching event, so it is kept out of
+Postgres in a CorrelationStateStore:
+
+- InMemoryStateStore keeps windows in the process, for single-process
+  deployments and tests
+- RedisStateStore keeps each window in a Redis hash of step counters, a
+  list of recent event references and a set of the recorded event IDs,
+  all expiring with the window, so processors on several hosts share
+  state and nothing needs sweeping
+
+A window opens with the first matching event for an entity and lasts for
+the rule's window; only the most recent event references are retained,
+while counters keep exact counts. An event is counted once per window:
+recording an event ID the window has already seen, as when a batch is
+redelivered after a failed commit, leaves the window unchanged. Postgres
+only receives an audit record when a sequence completes.
+
+A completed window is claimed, so only one processor alerts on it, and
+closed once the alert is committed; if the commit fails the claim is
+released and the window can complete again.
+"""
+
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Event references retained per window
+DEFAULT_MAX_EVENTS = 100
+
+REDIS_KEY_PREFIX = "eleanor:correlation"
+
+STATE_BACKENDS = ("memory", "redis")
+
+# Opens the window on its first event, counts the event's step and retains
+# its reference unless the window has seen the event ID; returns the
+# window's hash.
+# KEYS: counters hash, event list, seen event ID set
+# ARGV: now (ms), window (ms), step, event reference, event ID, max events
+_RECORD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('DEL', KEYS[2], KEYS[3])
+    redis.call('HSET', KEYS[1], 'window_start', ARGV[1], 'first_event_id', ARGV[5])
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+if ARGV[5] ~= '' then
+    if redis.call('SADD', KEYS[3], ARGV[5]) == 0 then
+        return redis.call('HGETALL', KEYS[1])
+    end
+    redis.call('PEXPIRE', KEYS[3], redis.call('PTTL', KEYS[1]))
+end
+redis.call('HINCRBY', KEYS[1], 'count:' .. ARGV[3], 1)
+redis.call('RPUSH', KEYS[2], ARGV[4])
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[6]), -1)
+redis.call('PEXPIRE', KEYS[2], redis.call('PTTL', KEYS[1]))
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# Claims an open window that is not claimed yet; returns its event list, or
+# false if the window is gone or claimed.
+# KEYS: counters hash, event list
+_CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 or redis.call('HSETNX', KEYS[1], 'claimed', 1) == 0 then
+    return false
+end
+return redis.call('LRANGE', KEYS[2], 0, -1)
+"""
+
+
+@dataclass
+class WindowState:
+    """Step counts of an entity's open correlation window."""
+
+    counts: dict[str, int]
+    window_start: datetime
+    window_end: datetime
+    first_event_id: str | None = None
+
+
+@dataclass
+class _Window:
+    """An open window held by InMemoryStateStore."""
+
+    window_start: datetime
+    window_end: datetime
+    first_event_id: str | None
+    events: deque
+    counts: dict[str, int] = field(default_factory=dict)
+    seen: set[str] = field(default_factory=set)
+    claimed: bool = False
+
+
+class CorrelationStateStore(ABC):
+    """Storage for open real-time correlation windows."""
+
+    name = "base"
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS):
+        """Initialize the store.
+
+        Args:
+            max_events: Event references retained per window
+        """
+        self.max_events = max_events
+
+    @abstractmethod
+    async def record(
+        self,
+        rule_id: str,
+        entity_key: str,
+        step: str,
+        event_ref: dict[str, Any],
+        window: timedelta,
+    ) -> WindowState:
+        """Record an event in an entity's window, opening it if needed.
+
+        An event whose ID the window has already recorded is not counted
+        again. Events without an ID are always counted.
+
+        Args:
+            rule_id: Correlation rule
+            entity_key: Entity the event belongs to
+            step: Sequence step the event matched
+            event_ref: Reference to the event (ID, step, timestamp)
+            window: Window length, used when the window opens
+
+        Returns:
+            State of the window including the event
+        """
+
+    @abstractmethod
+    async def claim(self, rule_id: str, entity_key: str) -> list[dict[str, Any]] | None:
+        """Claim an entity's window once its sequence completed.
+
+        The window stays open, counting further events, until complete()
+        or release() is called.
+
+        Args:
+            rule_id: Correlation rule
+            entity_key: Entity whose sequence completed
+
+        Returns:
+            Retained event references, or None if the window is closed or
+            already claimed (by another processor or an earlier event)
+        """
+
+    @abstractmethod
+    async def release(self, rule_id: str, entity_key: str) -> None:
+        """Release a claimed window whose alert could not be committed.
+
+        Args:
+            rule_id: Correlation rule
+            entity_key: Entity whose window was claimed
+        """
+
+    @abstractmethod
+    async def complete(self, rule_id: str, entity_key: str) -> list[dict[str, Any]] | None:
+        """Close an entity's window after its sequence completed.
+
+        Args:
+            rule_id: Correlation rule
+            entity_key: Entity whose sequence completed
+
+        Returns:
+            Retained event references, or None if the window was already
+            closed (by another processor)
+        """
+
+    async def cleanup(self) -> int:
+        """Drop expired windows.
+
+        Returns:
+            Number of windows dropped
+        """
+        return 0
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get store statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        return {"backend": self.name, "max_events": self.max_events}
+
+
+class InMemoryStateStore(CorrelationStateStore):
+    """Correlation windows held in the current process."""
+
+    name = "memory"
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS):
+        super().__init__(max_events)
+        self._windows: dict[tuple[str, str], _Window] = {}
+
+    async def record(
+        self,
+        rule_id: str,
+        entity_key: str,
+        step: str,
+        event_ref: dict[str, Any],
+        window: timedelta,
+    ) -> WindowState:
+        now = datetime.utcnow()
+        key = (rule_id, entity_key)
+        state = self._windows.get(key)
+        if state is None or state.window_end < now:
+            state = _Window(
+                window_start=now,
+                window_end=now + window,
+                first_event_id=event_ref.get("event_id"),
+                events=deque(maxlen=self.max_events),
+            )
+            self._windows[key] = state
+
+        event_id = event_ref.get("event_id")
+        if not event_id or event_id not in state.seen:
+            if event_id:
+                state.seen.add(event_id)
+            state.counts[step] = state.counts.get(step, 0) + 1
+            state.events.append(event_ref)
+        return WindowState(
+            counts=dict(state.counts),
+            window_start=state.window_start,
+            window_end=state.window_end,
+            first_event_id=state.first_event_id,
+        )
+
+    async def claim(self, rule_id: str, entity_key: str) -> list[dict[str, Any]] | None:
+        state = self._windows.get((rule_id, entity_key))
+        if state is None or state.claimed:
+            return None
+        state.claimed = True
+        return list(state.events)
+
+    async def release(self, rule_id: str, entity_key: str) -> None:
+        state = self._windows.get((rule_id, entity_key))
+        if state is not None:
+            state.claimed = False
+
+    async def complete(self, rule_id: str, entity_key: str) -> list[dict[str, Any]] | None:
+        state = self._windows.pop((rule_id, entity_key), None)
+        return list(state.events) if state is not None else None
+
+    async def cleanup(self) -> int:
+        now = datetime.utcnow()
+        expired = [key for key, state in self._windows.items() if state.window_end < now]
+        for key in expired:
+            del self._windows[key]
+        return len(expired)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {**super().get_stats(), "open_windows": len(self._windows)}
+
+
+class RedisStateStore(CorrelationStateStore):
+    """Correlation windows held in Redis, expiring with the window.
+
+    Each window is a hash of step counters (plus its start time and first
+    event), a capped list of event references and a set of recorded event
+    IDs, updated atomically by one script call per event.
+    """
+
+    name = "redis"
+
+    def __init__(self, redis: Redis, max_events: int = DEFAULT_MAX_EVENTS):
+        """Initialize the store.
+
+        Args:
+            redis: Redis client
+            max_events: Event references retained per window
+        """
+        super().__init__(max_events)
+        self.redis = redis
+        self._record_script = redis.register_script(_RECORD_SCRIPT)
+        self._claim_script = redis.register_script(_CLAIM_SCRIPT)
+
+    @staticmethod
+    def _keys(rule_id: str, entity_key: str) -> list[str]:
+        # The hash tag keeps both keys of a window on one cluster slot
+        base = f"{REDIS_KEY_PREFIX}:{{{rule_id}:{entity_key}}}"
+        return [f"{base}:counts", f"{base}:events", f"{base}:seen"]
+
+    async def record(
+        self,
+        rule_id: str,
+        entity_key: str,
+        step: str,
+        event_ref: dict[str, Any],
+        window: timedelta,
+    ) -> WindowState:
+        window_ms = max(int(window.total_seconds() * 1000), 1)
+        values = await self._record_script(
+            keys=self._keys(rule_id, entity_key),
+            args=[
+                int(time.time() * 1000),
+                window_ms,
+                step,
+                json.dumps(event_ref, default=str),
+                event_ref.get("event_id") or "",
+                self.max_events,
+            ],
+        )
+
+        fields = iter(_decode(value) for value in values)
+        state = dict(zip(fields, fields, strict=True))
+        window_start = datetime.fromtimestamp(int(state["window_start"]) / 1000, UTC).replace(
+            tzinfo=None
+        )
+        return WindowState(
+            counts={
+                name[len("count:") :]: int(count)
+                for name, count in state.items()
+                if name.startswith("count:")
+            },
+            window_start=window_start,
+            window_end=window_start + window,
+            first_event_id=state.get("first_event_id") or None,
+        )
+
+    async def claim(self, rule_id: str, entity_key: str) -> list[dict[str, Any]] | None:
+        events = await self._claim_script(keys=self._keys(rule_id, entity_key)[:2])
+        if events is None:
+            return None
+        return [json.loads(_decode(event)) for event in events]
+
+    async def release(self, rule_id: str, entity_key: str) -> None:
+        counts_key = self._keys(rule_id, entity_key)[0]
+        await self.redis.hdel(counts_key, "claimed")
+
+    async def complete(self, rule_id: str, entity_key: str) -> list[dict[str, Any]] | None:
+        counts_key, events_key, seen_key = self._keys(rule_id, entity_key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrange(events_key, 0, -1)
+            pipe.delete(counts_key, events_key, seen_key)
+            events, deleted = await pipe.execute()
+
+        if not deleted:
+            return None
+        return [json.loads(_decode(event)) for event in events]
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def create_state_store(
+    backend: str,
+    redis: Redis | None = None,
+    max_events: int = DEFAULT_MAX_EVENTS,
+) -> CorrelationStateStore:
+    """Create a correlation state store.
+
+    Args:
+        backend: "memory" or "redis"
+        redis: Redis client, required by the redis backend
+        max_events: Event references retained per window
+
+    Returns:
+        State store
+
+    Raises:
+        ValueError: If the backend is unknown or misses its client
+    """
+    if backend == "memory":
+        return InMemoryStateStore(max_events=max_events)
+    if backend == "redis":
+        if redis is None:
+            raise ValueError("The redis correlation state backend requires a Redis client")
+        return RedisStateStore(redis, max_events=max_events)
+    raise ValueError(
+        f"Unknown correlation state backend {backend!r}; expected one of {', '.join(STATE_BACKENDS)}"
+    )
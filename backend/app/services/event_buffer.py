@@ -309,6 +309,46 @@ class EventBuffer:
 
         return dlq_id
 
+    async def move_to_dlq_batch(
+        self,
+        failures: list[tuple[str, dict[str, Any], str]],
+        source_stream: str = EVENT_STREAM,
+    ) -> list[str]:
+        """Move failed messages to dead letter queue in a pipeline.
+
+        Args:
+            failures: (message ID, event, error message) per failed message
+            source_stream: Source stream name
+
+        Returns:
+            DLQ message IDs
+        """
+        if not failures:
+            return []
+
+        failed_at = datetime.utcnow().isoformat()
+        pipe = self.redis.pipeline()
+
+        for message_id, event, error in failures:
+            pipe.xadd(
+                DEAD_LETTER_STREAM,
+                {
+                    "original_message_id": message_id,
+                    "source_stream": source_stream,
+                    "error": error,
+                    "failed_at": failed_at,
+                    "event": json.dumps(event),
+                },
+                maxlen=10000,
+                approximate=True,
+            )
+
+        # Acknowledge original messages
+        pipe.xack(source_stream, CONSUMER_GROUP, *(message_id for message_id, _, _ in failures))
+
+        results = await pipe.execute()
+        return results[:-1]
+
     async def stream_events(
         self,
         stream: str = EVENT_STREAM,
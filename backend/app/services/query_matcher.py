@@ -0,0 +1,510 @@
+"""Compiled matching of rule queries against single events.
+
+Real-time rules and the event definitions of real-time correlation rules
+use the Lucene query string syntax that Elasticsearch runs for the
+scheduled rules. Rather than interpreting the query for every event, each
+query is compiled once into a predicate over events:
+
+- ``field:value`` and ``field:"quoted value"`` compare exactly
+- ``*`` and ``?`` are wildcards outside quotes (``field:*`` tests existence)
+- ``field:/regex/`` matches a regular expression against the whole value
+- ``field:[a TO b]``, ``field:{a TO b}`` and ``field:>=a`` are ranges,
+  numeric when both sides are numbers
+- ``field:(a OR b)`` applies the terms in parentheses to the field
+- ``_exists_:field`` tests existence
+- terms without a field search every value of the event
+- ``AND``/``&&``, ``OR``/``||`` and ``NOT``/``!``/``-`` combine terms, with
+  adjacent terms OR'ed as Elasticsearch does by default
+
+Field accessors split dotted paths once and are shared between queries.
+Array values match if any element matches.
+"""
+
+import logging
+import re
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Compiled queries kept by get_compiled_query
+MAX_COMPILED_QUERIES = 4096
+
+Predicate = Callable[[dict[str, Any]], bool]
+
+_FIELD_RE = re.compile(r"([\w@][\w.@\-]*):")
+_RANGE_RE = re.compile(r"([\[{])\s*(.*?)\s+TO\s+(.*?)\s*([\]}])", re.DOTALL)
+_OPERATORS = {"AND": "AND", "&&": "AND", "OR": "OR", "||": "OR", "NOT": "NOT"}
+_TERM_END = frozenset(" \t\r\n()")
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a query cannot be compiled."""
+
+
+class CompiledQuery:
+    """A query compiled into a predicate over events."""
+
+    __slots__ = ("query", "_predicate")
+
+    def __init__(self, query: str, predicate: Predicate):
+        self.query = query
+        self._predicate = predicate
+
+    def matches(self, event: dict[str, Any]) -> bool:
+        """Check whether an event matches the query.
+
+        Args:
+            event: Event to check
+
+        Returns:
+            True if the event matches
+        """
+        return self._predicate(event)
+
+    def __repr__(self) -> str:
+        return f"CompiledQuery({self.query!r})"
+
+
+def compile_query(query: str) -> CompiledQuery:
+    """Compile a query.
+
+    Args:
+        query: Query string; empty queries match every event
+
+    Returns:
+        Compiled query
+
+    Raises:
+        QuerySyntaxError: If the query is malformed
+    """
+    if not query or not query.strip():
+        return CompiledQuery(query, _always)
+    return CompiledQuery(query, _QueryParser(query).parse())
+
+
+@lru_cache(maxsize=MAX_COMPILED_QUERIES)
+def get_compiled_query(query: str) -> CompiledQuery:
+    """Compile a query, reusing earlier compilations of the same query.
+
+    Malformed queries are logged once and never match.
+
+    Args:
+        query: Query string
+
+    Returns:
+        Compiled query
+    """
+    try:
+        return compile_query(query)
+    except QuerySyntaxError as e:
+        logger.warning("Query %r never matches: %s", query, str(e))
+        return CompiledQuery(query, _never)
+
+
+# =============================================================================
+# Field access
+# =============================================================================
+
+
+@lru_cache(maxsize=MAX_COMPILED_QUERIES)
+def field_accessor(field: str) -> Callable[[dict[str, Any]], list[Any]]:
+    """Build a function extracting the values of a field from events.
+
+    Dotted fields are looked up as nested objects, falling back to a
+    literal dotted key. Arrays along the path are flattened.
+
+    Args:
+        field: Field name, such as "process.name"
+
+    Returns:
+        Function returning the field's values in an event, empty if absent
+    """
+    parts = tuple(field.split("."))
+
+    def values(event: dict[str, Any]) -> list[Any]:
+        current = [event]
+        for part in parts:
+            found = []
+            for obj in current:
+                if isinstance(obj, dict):
+                    value = obj.get(part)
+                    if isinstance(value, list):
+                        found.extend(value)
+                    elif value is not None:
+                        found.append(value)
+                elif isinstance(obj, list):
+                    for item in obj:
+                        if isinstance(item, dict) and item.get(part) is not None:
+                            found.append(item[part])
+            if not found:
+                break
+            current = found
+        else:
+            return [value for value in current if value is not None]
+
+        if len(parts) > 1:
+            value = event.get(field)
+            if isinstance(value, list):
+                return value
+            if value is not None:
+                return [value]
+        return []
+
+    return values
+
+
+def _all_values(event: dict[str, Any]) -> list[Any]:
+    """Every leaf value of an event, excluding top-level metadata fields."""
+    values: list[Any] = []
+    stack: list[Any] = [value for key, value in event.items() if not key.startswith("_")]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif value is not None:
+            values.append(value)
+    return values
+
+
+def _text(value: Any) -> str:
+    """String form of a value, as Elasticsearch indexes it."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _number(value: Any) -> float | None:
+    """Numeric form of a value, or None if it is not a number."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# =============================================================================
+# Predicates
+# =============================================================================
+
+
+def _always(event: dict[str, Any]) -> bool:
+    return True
+
+
+def _never(event: dict[str, Any]) -> bool:
+    return False
+
+
+def _values_of(field: str | None) -> Callable[[dict[str, Any]], list[Any]]:
+    return field_accessor(field) if field is not None else _all_values
+
+
+def _exists(field: str | None) -> Predicate:
+    if field is None:
+        return _always
+    values_of = field_accessor(field)
+    return lambda event: bool(values_of(event))
+
+
+def _value_predicate(field: str | None, test: Callable[[str], bool]) -> Predicate:
+    values_of = _values_of(field)
+
+    def predicate(event: dict[str, Any]) -> bool:
+        for value in values_of(event):
+            if not isinstance(value, dict) and test(_text(value)):
+                return True
+        return False
+
+    return predicate
+
+
+def _equals(field: str | None, literal: str) -> Predicate:
+    return _value_predicate(field, literal.__eq__)
+
+
+def _pattern(field: str | None, regex: str) -> Predicate:
+    try:
+        compiled = re.compile(regex, re.DOTALL)
+    except re.error as e:
+        raise QuerySyntaxError(f"Invalid regular expression /{regex}/: {e}") from e
+    return _value_predicate(field, lambda text: compiled.fullmatch(text) is not None)
+
+
+def _range(
+    field: str | None,
+    lower: str | None,
+    upper: str | None,
+    include_lower: bool,
+    include_upper: bool,
+) -> Predicate:
+    bounds = []
+    if lower is not None:
+        bounds.append((lower, _number(lower), include_lower, 1))
+    if upper is not None:
+        bounds.append((upper, _number(upper), include_upper, -1))
+    if not bounds:
+        return _exists(field)
+    values_of = _values_of(field)
+
+    def in_range(value: Any) -> bool:
+        number = _number(value)
+        text = None
+        for bound, bound_number, inclusive, sign in bounds:
+            if bound_number is not None and number is not None:
+                order = (number > bound_number) - (number < bound_number)
+            else:
+                if text is None:
+                    text = _text(value)
+                order = (text > bound) - (text < bound)
+            if order == -sign or (order == 0 and not inclusive):
+                return False
+        return True
+
+    def predicate(event: dict[str, Any]) -> bool:
+        for value in values_of(event):
+            if not isinstance(value, dict) and in_range(value):
+                return True
+        return False
+
+    return predicate
+
+
+def _any(children: list[Predicate]) -> Predicate:
+    if len(children) == 1:
+        return children[0]
+    return lambda event: any(child(event) for child in children)
+
+
+def _all(children: list[Predicate]) -> Predicate:
+    if len(children) == 1:
+        return children[0]
+    return lambda event: all(child(event) for child in children)
+
+
+def _not(child: Predicate) -> Predicate:
+    return lambda event: not child(event)
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+
+class _QueryParser:
+    """Recursive descent parser compiling a query into a predicate.
+
+    Grammar (AND binds tighter than OR, adjacent terms are OR'ed)::
+
+        or_expr  := and_expr ((OR | "||")? and_expr)*
+        and_expr := not_expr ((AND | "&&") not_expr)*
+        not_expr := (NOT | "!" | "-") not_expr | primary
+        primary  := "(" or_expr ")" | [field ":"] value
+        value    := "(" or_expr ")" | "/" regex "/" | range | comparison | term
+    """
+
+    def __init__(self, query: str):
+        self.text = query
+        self.pos = 0
+
+    def parse(self) -> Predicate:
+        predicate = self._or_expr(None)
+        self._skip_whitespace()
+        if self.pos < len(self.text):
+            raise self._error(f"unexpected {self.text[self.pos]!r}")
+        return predicate
+
+    def _error(self, message: str) -> QuerySyntaxError:
+        return QuerySyntaxError(f"{message} at position {self.pos}")
+
+    def _skip_whitespace(self) -> None:
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def _operator(self) -> str | None:
+        """The boolean operator at the current position, if any."""
+        for token, operator in _OPERATORS.items():
+            if self.text.startswith(token, self.pos):
+                end = self.pos + len(token)
+                if token.isalpha() and end < len(self.text) and self.text[end] not in _TERM_END:
+                    continue
+                return operator
+        return None
+
+    def _consume_operator(self) -> None:
+        for token in _OPERATORS:
+            if self.text.startswith(token, self.pos):
+                self.pos += len(token)
+                return
+
+    def _at_group_end(self) -> bool:
+        self._skip_whitespace()
+        return self.pos >= len(self.text) or self.text[self.pos] == ")"
+
+    def _or_expr(self, field: str | None) -> Predicate:
+        children = [self._and_expr(field)]
+        while not self._at_group_end():
+            if self._operator() == "OR":
+                self._consume_operator()
+            children.append(self._and_expr(field))
+        return _any(children)
+
+    def _and_expr(self, field: str | None) -> Predicate:
+        children = [self._not_expr(field)]
+        while True:
+            self._skip_whitespace()
+            if self._operator() != "AND":
+                break
+            self._consume_operator()
+            children.append(self._not_expr(field))
+        return _all(children)
+
+    def _not_expr(self, field: str | None) -> Predicate:
+        self._skip_whitespace()
+        if self._operator() == "NOT":
+            self._consume_operator()
+            return _not(self._not_expr(field))
+        if self.text.startswith(("!", "-"), self.pos):
+            next_pos = self.pos + 1
+            if next_pos < len(self.text) and not self.text[next_pos].isspace():
+                self.pos = next_pos
+                return _not(self._not_expr(field))
+        return self._primary(field)
+
+    def _primary(self, field: str | None) -> Predicate:
+        self._skip_whitespace()
+        if self.pos >= len(self.text):
+            raise self._error("expected a term")
+        if self._operator() in ("AND", "OR"):
+            raise self._error("expected a term before operator")
+
+        match = _FIELD_RE.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            name = match.group(1)
+            if name == "_exists_":
+                segments = self._term()
+                return _exists("".join(text for text, _ in segments))
+            return self._value(name)
+        return self._value(field)
+
+    def _group(self, field: str | None) -> Predicate:
+        self.pos += 1
+        predicate = self._or_expr(field)
+        if self.pos >= len(self.text) or self.text[self.pos] != ")":
+            raise self._error("expected ')'")
+        self.pos += 1
+        return predicate
+
+    def _value(self, field: str | None) -> Predicate:
+        if self.pos >= len(self.text):
+            raise self._error("expected a value")
+        char = self.text[self.pos]
+
+        if char == "(":
+            return self._group(field)
+
+        if char == "/":
+            end = self.pos + 1
+            while end < len(self.text) and self.text[end] != "/":
+                end += 2 if self.text[end] == "\\" else 1
+            if end >= len(self.text):
+                raise self._error("unterminated regular expression")
+            regex = self.text[self.pos + 1 : end].replace("\\/", "/")
+            self.pos = end + 1
+            return _pattern(field, regex)
+
+        if char in "[{":
+            match = _RANGE_RE.match(self.text, self.pos)
+            if not match:
+                raise self._error("malformed range")
+            self.pos = match.end()
+            opening, lower, upper, closing = match.groups()
+            return _range(
+                field,
+                None if lower == "*" else lower.strip('"'),
+                None if upper == "*" else upper.strip('"'),
+                opening == "[",
+                closing == "]",
+            )
+
+        for operator in (">=", "<=", ">", "<"):
+            if self.text.startswith(operator, self.pos):
+                self.pos += len(operator)
+                bound = "".join(text for text, _ in self._term())
+                if not bound:
+                    raise self._error(f"expected a value after {operator!r}")
+                if operator[0] == ">":
+                    return _range(field, bound, None, operator == ">=", False)
+                return _range(field, None, bound, False, operator == "<=")
+
+        segments = self._term()
+        if not segments:
+            raise self._error(f"unexpected {char!r}")
+        return self._term_predicate(field, segments)
+
+    def _term(self) -> list[tuple[str, bool]]:
+        """Read a term as (text, quoted) segments."""
+        segments: list[tuple[str, bool]] = []
+        plain: list[str] = []
+
+        def flush() -> None:
+            if plain:
+                segments.append(("".join(plain), False))
+                plain.clear()
+
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char == '"':
+                flush()
+                end = self.pos + 1
+                quoted: list[str] = []
+                while end < len(text) and text[end] != '"':
+                    if text[end] == "\\" and end + 1 < len(text):
+                        end += 1
+                    quoted.append(text[end])
+                    end += 1
+                if end >= len(text):
+                    raise self._error("unterminated quote")
+                segments.append(("".join(quoted), True))
+                self.pos = end + 1
+            elif char == "\\" and self.pos + 1 < len(text):
+                flush()
+                segments.append((text[self.pos + 1], True))
+                self.pos += 2
+            elif char in _TERM_END:
+                break
+            else:
+                plain.append(char)
+                self.pos += 1
+        flush()
+        return segments
+
+    @staticmethod
+    def _term_predicate(field: str | None, segments: list[tuple[str, bool]]) -> Predicate:
+        if segments == [("*", False)]:
+            return _exists(field)
+
+        if any(not quoted and ("*" in text or "?" in text) for text, quoted in segments):
+            regex = []
+            for text, quoted in segments:
+                if quoted:
+                    regex.append(re.escape(text))
+                    continue
+                for char in text:
+                    if char == "*":
+                        regex.append(".*")
+                    elif char == "?":
+                        regex.append(".")
+                    else:
+                        regex.append(re.escape(char))
+            return _pattern(field, "".join(regex))
+
+        return _equals(field, "".join(text for text, _ in segments))
@@ -11,16 +11,23 @@ Designed for high-throughput event processing with minimal latency.
 
 import asyncio
 import logging
-from datetime import UTC, datetime
+from collections import Counter
+from datetime import UTC, datetime, timedelta
 from typing import Any
+from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import and_, bindparam, delete, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.database import async_session_maker
 from app.models.alert import Alert, AlertSeverity, AlertStatus
-from app.models.analytics import DetectionRule, RuleStatus, RuleType
+from app.models.analytics import (
+    CorrelationState,
+    CorrelationStateStatus,
+    DetectionRule,
+    RuleType,
+)
 from app.services.correlation_engine import CorrelationEngine, get_correlation_engine
 from app.services.event_buffer import (
     ALERT_STREAM,
@@ -28,6 +35,9 @@ from app.services.event_buffer import (
     EventBuffer,
     get_event_buffer,
 )
+from app.services.query_matcher import get_compiled_query
+from app.services.rule_cache import RealtimeRuleCache
+from app.websocket import EventType, publish_alert
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -55,6 +65,7 @@ class RealtimeProcessor:
         self.correlation_engine = correlation_engine
         self._running = False
         self._tasks: list[asyncio.Task] = []
+        self.rule_cache = RealtimeRuleCache(ttl=settings.realtime_rule_cache_ttl)
 
         # Processing metrics
         self.events_processed = 0
@@ -86,6 +97,13 @@ class RealtimeProcessor:
             )
             self._tasks.append(task)
 
+        # Reload rules when they change through the analytics API
+        watch_task = asyncio.create_task(
+            self.rule_cache.watch(self.event_buffer.redis),
+            name="rule-cache-watch",
+        )
+        self._tasks.append(watch_task)
+
         # Start correlation state cleanup task
         cleanup_task = asyncio.create_task(
             self._cleanup_expired_states(),
@@ -144,35 +162,7 @@ class RealtimeProcessor:
                 if not events:
                     continue
 
-                # Process each event
-                message_ids_to_ack = []
-                async with async_session_maker() as db:
-                    for message_id, event in events:
-                        try:
-                            await self._process_single_event(event, db)
-                            message_ids_to_ack.append(message_id)
-                            self.events_processed += 1
-                        except Exception as e:
-                            logger.error(
-                                "Worker %s failed to process event %s: %s",
-                                worker_id,
-                                message_id,
-                                str(e),
-                            )
-                            self.errors += 1
-
-                            # Move to dead letter queue after 3 failures
-                            await self.event_buffer.move_to_dlq(
-                                message_id,
-                                event,
-                                str(e),
-                            )
-
-                    await db.commit()
-
-                # Acknowledge processed messages
-                if message_ids_to_ack:
-                    await self.event_buffer.acknowledge(message_ids_to_ack)
+                await self._process_batch(events, worker_id)
 
             except asyncio.CancelledError:
                 break
@@ -183,39 +173,118 @@ class RealtimeProcessor:
 
         logger.info("Worker %s stopped", worker_id)
 
+    async def _process_batch(
+        self,
+        messages: list[tuple[str, dict[str, Any]]],
+        worker_id: str,
+    ) -> None:
+        """Process a batch of stream messages.
+
+        Alerts raised by the batch are inserted together and published once
+        the batch's database changes are committed. Correlation windows that
+        completed are closed only after that commit; if it fails they are
+        released, so the batch's redelivered events can complete them again;
+        windows count each event once, so redelivered events are not counted
+        twice. Messages that fail are moved to the dead letter queue together.
+
+        Args:
+            messages: (message ID, event) pairs
+            worker_id: Identifier of the processing worker or task
+        """
+        message_ids_to_ack = []
+        failures: list[tuple[str, dict[str, Any], str]] = []
+        alerts: list[dict[str, Any]] = []
+        correlations: list[dict[str, Any]] = []
+
+        async with async_session_maker() as db:
+            for message_id, event in messages:
+                event_alerts: list[dict[str, Any]] = []
+                event_correlations: list[dict[str, Any]] = []
+                try:
+                    await self._process_single_event(
+                        event, db, event_alerts, event_correlations, message_id
+                    )
+                    message_ids_to_ack.append(message_id)
+                    alerts.extend(event_alerts)
+                    correlations.extend(event_correlations)
+                    self.events_processed += 1
+                except Exception as e:
+                    logger.error(
+                        "Worker %s failed to process event %s: %s",
+                        worker_id,
+                        message_id,
+                        str(e),
+                    )
+                    self.errors += 1
+                    failures.append((message_id, event, str(e)))
+
+            try:
+                await self._insert_alerts(alerts, db)
+                await db.commit()
+            except Exception:
+                await self.correlation_engine.release_realtime_windows(correlations)
+                raise
+
+        await self.correlation_engine.close_realtime_windows(correlations)
+
+        if alerts:
+            await self._publish_alerts(alerts)
+
+        # Acknowledge processed messages
+        if message_ids_to_ack:
+            await self.event_buffer.acknowledge(message_ids_to_ack)
+
+        if failures:
+            await self.event_buffer.move_to_dlq_batch(failures)
+
     async def _process_single_event(
         self,
         event: dict[str, Any],
         db: AsyncSession,
+        alerts: list[dict[str, Any]],
+        correlations: list[dict[str, Any]],
+        message_id: str | None = None,
     ) -> None:
         """Process a single event through detection rules.
 
         Args:
             event: Event to process
             db: Database session
+            alerts: List the alerts raised by the event are added to
+            correlations: List the correlation matches completed by the
+                event are added to; their windows are still open
+            message_id: Stream message ID of the event, which stays the same
+                when the event is redelivered
         """
         # Get real-time rules that should evaluate this event
         rules = await self._get_matching_rules(event, db)
 
+        # Correlation rules are run together, in one pass of the correlation engine
+        correlation_rules = [rule for rule in rules if rule.rule_type == RuleType.CORRELATION]
+        if correlation_rules:
+            try:
+                matches = await self.correlation_engine.process_realtime_event(
+                    event, db, rules=correlation_rules, message_id=message_id
+                )
+                rules_by_id = {str(rule.id): rule for rule in correlation_rules}
+
+                for match in matches:
+                    alerts.append(self._build_alert(rules_by_id[match["rule_id"]], match, event))
+                    correlations.append(match)
+                    self.correlations_matched += 1
+
+            except Exception as e:
+                logger.error(
+                    "Failed to process correlation rules for event: %s",
+                    str(e),
+                )
+
         for rule in rules:
+            if rule.rule_type != RuleType.REALTIME:
+                continue
             try:
-                if rule.rule_type == RuleType.CORRELATION:
-                    # Process through correlation engine
-                    matches = await self.correlation_engine.process_realtime_event(event, db)
-
-                    for match in matches:
-                        await self._generate_alert(rule, match, event, db)
-                        self.correlations_matched += 1
-
-                elif rule.rule_type == RuleType.REALTIME:
-                    # Simple pattern match rule
-                    if self._event_matches_rule(event, rule):
-                        await self._generate_alert(
-                            rule,
-                            {"event": event},
-                            event,
-                            db,
-                        )
+                if get_compiled_query(rule.query).matches(event):
+                    alerts.append(self._build_alert(rule, {"event": event}, event))
 
             except Exception as e:
                 logger.error(
@@ -233,151 +302,32 @@ class RealtimeProcessor:
 
         Args:
             event: Event to match
-            db: Database session
+            db: Database session, used if the rule cache needs loading
 
         Returns:
             List of applicable rules
         """
-        # Get enabled real-time and correlation rules
-        query = select(DetectionRule).where(
-            DetectionRule.status == RuleStatus.ENABLED,
-            DetectionRule.rule_type.in_([RuleType.REALTIME, RuleType.CORRELATION]),
+        rule_set = await self.rule_cache.get(db)
+        return rule_set.rules_for(
+            event.get("_index", ""),
+            event.get("event", {}).get("module", ""),
         )
-        result = await db.execute(query)
-        rules = result.scalars().all()
-
-        # Filter rules based on data source matching
-        matching_rules = []
-        event_index = event.get("_index", "")
-        event_source = event.get("event", {}).get("module", "")
-
-        for rule in rules:
-            # Check if event index matches rule indices
-            if rule.indices:
-                matched = False
-                for index_pattern in rule.indices:
-                    if self._match_pattern(event_index, index_pattern):
-                        matched = True
-                        break
-                if not matched:
-                    continue
-
-            # Check data sources if specified
-            if rule.data_sources:
-                if event_source not in rule.data_sources:
-                    continue
 
-            # For correlation rules, check if marked for real-time
-            if rule.rule_type == RuleType.CORRELATION:
-                config = rule.correlation_config or {}
-                if not config.get("realtime", False):
-                    continue
-
-            matching_rules.append(rule)
-
-        return matching_rules
-
-    def _event_matches_rule(
-        self,
-        event: dict[str, Any],
-        rule: DetectionRule,
-    ) -> bool:
-        """Check if event matches a simple rule query.
-
-        Args:
-            event: Event to check
-            rule: Detection rule
-
-        Returns:
-            True if event matches
-        """
-        # Simple field:value pattern matching
-        query = rule.query
-
-        # Handle AND conditions
-        conditions = query.split(" AND ")
-
-        for condition in conditions:
-            condition = condition.strip()
-
-            if ":" not in condition:
-                continue
-
-            field, value = condition.split(":", 1)
-            field = field.strip()
-            value = value.strip().strip('"')
-
-            # Get field value from event
-            actual_value = self._get_nested_value(event, field)
-
-            if actual_value is None:
-                return False
-
-            # Handle wildcards
-            if "*" in value:
-                import re
-
-                pattern = value.replace("*", ".*")
-                if not re.match(f"^{pattern}$", str(actual_value)):
-                    return False
-            elif str(actual_value) != value:
-                return False
-
-        return True
-
-    def _get_nested_value(self, obj: dict, path: str) -> Any:
-        """Get nested value using dot notation.
-
-        Args:
-            obj: Source dictionary
-            path: Dot-separated path
-
-        Returns:
-            Value at path or None
-        """
-        parts = path.split(".")
-        current = obj
-
-        for part in parts:
-            if isinstance(current, dict):
-                current = current.get(part)
-            else:
-                return None
-
-        return current
-
-    def _match_pattern(self, value: str, pattern: str) -> bool:
-        """Match string against wildcard pattern.
-
-        Args:
-            value: String to match
-            pattern: Pattern with * wildcards
-
-        Returns:
-            True if matches
-        """
-        import re
-
-        regex = pattern.replace("*", ".*")
-        return bool(re.match(f"^{regex}$", value))
-
-    async def _generate_alert(
+    def _build_alert(
         self,
         rule: DetectionRule,
         match: dict[str, Any],
         trigger_event: dict[str, Any],
-        db: AsyncSession,
-    ) -> Alert:
-        """Generate an alert from a rule match.
+    ) -> dict[str, Any]:
+        """Build the row of an alert for a rule match.
 
         Args:
             rule: Matched detection rule
             match: Match details
             trigger_event: Event that triggered the match
-            db: Database session
 
         Returns:
-            Created alert
+            Alert column values
         """
         # Map rule severity to alert severity
         severity_map = {
@@ -387,47 +337,87 @@ class RealtimeProcessor:
             "high": AlertSeverity.HIGH,
             "critical": AlertSeverity.CRITICAL,
         }
+        now = datetime.utcnow()
 
-        alert = Alert(
-            title=f"[{rule.name}] Detection Alert",
-            description=self._build_alert_description(rule, match),
-            severity=severity_map.get(rule.severity.value, AlertSeverity.MEDIUM),
-            status=AlertStatus.NEW,
-            source="realtime_processor",
-            rule_id=str(rule.id),
-            raw_event=trigger_event,
-            mitre_tactics=rule.mitre_tactics,
-            mitre_techniques=rule.mitre_techniques,
-            tags=rule.tags,
-        )
+        return {
+            "id": uuid4(),
+            "rule_id": rule.id,
+            "rule_name": rule.name,
+            "title": f"[{rule.name}] Detection Alert",
+            "description": self._build_alert_description(rule, match),
+            "severity": severity_map.get(rule.severity.value, AlertSeverity.MEDIUM),
+            "status": AlertStatus.OPEN,
+            "hit_count": 1,
+            "first_seen_at": now,
+            "last_seen_at": now,
+            "mitre_tactics": rule.mitre_tactics or [],
+            "mitre_techniques": rule.mitre_techniques or [],
+            "tags": rule.tags or [],
+            "events": [
+                {
+                    "timestamp": trigger_event.get("@timestamp", now.isoformat()),
+                    "data": trigger_event,
+                }
+            ],
+            "entities": {},
+        }
 
-        db.add(alert)
-        await db.flush()
+    async def _insert_alerts(self, alerts: list[dict[str, Any]], db: AsyncSession) -> None:
+        """Insert a batch of alerts and count their hits on the rules.
 
-        # Update rule hit count
-        rule.hit_count += 1
+        Args:
+            alerts: Alert rows built by _build_alert
+            db: Database session
+        """
+        if not alerts:
+            return
 
-        # Publish alert to stream for notifications
-        await self.event_buffer.publish_event(
-            {
-                "alert_id": str(alert.id),
-                "rule_id": str(rule.id),
-                "rule_name": rule.name,
-                "severity": alert.severity.value,
-                "title": alert.title,
-                "timestamp": datetime.utcnow().isoformat(),
-            },
-            stream=ALERT_STREAM,
+        await db.execute(insert(Alert), alerts)
+
+        # Update rule hit counts; cached rules are detached, so update the rows
+        hits = Counter(alert["rule_id"] for alert in alerts)
+        rules = DetectionRule.__table__
+        await db.execute(
+            update(rules)
+            .where(rules.c.id == bindparam("matched_rule_id"))
+            .values(hit_count=rules.c.hit_count + bindparam("hits")),
+            [{"matched_rule_id": rule_id, "hits": count} for rule_id, count in hits.items()],
         )
 
-        self.alerts_generated += 1
+        self.alerts_generated += len(alerts)
         logger.info(
-            "Generated alert for rule %s: %s",
-            rule.name,
-            alert.id,
+            "Generated %d alerts for %d rules",
+            len(alerts),
+            len(hits),
         )
 
-        return alert
+    async def _publish_alerts(self, alerts: list[dict[str, Any]]) -> None:
+        """Publish a batch of committed alerts for notifications.
+
+        Args:
+            alerts: Alert rows built by _build_alert
+        """
+        timestamp = datetime.utcnow().isoformat()
+        notifications = [
+            {
+                "alert_id": str(alert["id"]),
+                "rule_id": str(alert["rule_id"]),
+                "rule_name": alert["rule_name"],
+                "severity": alert["severity"].value,
+                "title": alert["title"],
+                "timestamp": timestamp,
+            }
+            for alert in alerts
+        ]
+
+        try:
+            await self.event_buffer.publish_events_batch(notifications, stream=ALERT_STREAM)
+            await publish_alert(
+                EventType.ALERT_CREATED,
+                {"count": len(notifications), "alerts": notifications},
+            )
+        except Exception as e:
+            logger.error("Failed to publish %d alerts: %s", len(notifications), str(e))
 
     def _build_alert_description(
         self,
@@ -480,36 +470,17 @@ class RealtimeProcessor:
         return "\n".join(lines)
 
     async def _cleanup_expired_states(self) -> None:
-        """Periodically clean up expired correlation states."""
+        """Periodically clean up expired correlation windows and old audit states."""
         while self._running:
             try:
-                async with async_session_maker() as db:
-                    from sqlalchemy import and_, delete
-
-                    from app.models.analytics import CorrelationState, CorrelationStateStatus
-
-                    now = datetime.utcnow()
-
-                    # Delete expired active states
-                    result = await db.execute(
-                        delete(CorrelationState).where(
-                            and_(
-                                CorrelationState.status == CorrelationStateStatus.ACTIVE,
-                                CorrelationState.window_end < now,
-                            )
-                        )
-                    )
-
-                    if result.rowcount > 0:
-                        logger.info(
-                            "Cleaned up %d expired correlation states",
-                            result.rowcount,
-                        )
+                # Drop expired windows; Redis expires them by itself
+                expired = await self.correlation_engine.state_store.cleanup()
+                if expired:
+                    logger.info("Cleaned up %d expired correlation windows", expired)
 
+                async with async_session_maker() as db:
                     # Delete old completed states (older than 24h)
-                    from datetime import timedelta
-
-                    old_threshold = now - timedelta(hours=24)
+                    old_threshold = datetime.utcnow() - timedelta(hours=24)
 
                     await db.execute(
                         delete(CorrelationState).where(
@@ -547,25 +518,7 @@ class RealtimeProcessor:
                 if claimed:
                     logger.info("Recovered %d pending messages", len(claimed))
 
-                    # Process recovered messages
-                    async with async_session_maker() as db:
-                        message_ids = []
-                        for message_id, event in claimed:
-                            try:
-                                await self._process_single_event(event, db)
-                                message_ids.append(message_id)
-                            except Exception as e:
-                                logger.error(
-                                    "Failed to process recovered message %s: %s",
-                                    message_id,
-                                    str(e),
-                                )
-                                await self.event_buffer.move_to_dlq(message_id, event, str(e))
-
-                        await db.commit()
-
-                        if message_ids:
-                            await self.event_buffer.acknowledge(message_ids)
+                    await self._process_batch(claimed, "recovery")
 
             except asyncio.CancelledError:
                 break
@@ -593,6 +546,8 @@ class RealtimeProcessor:
             "correlations_matched": self.correlations_matched,
             "errors": self.errors,
             "active_workers": len([t for t in self._tasks if not t.done()]),
+            "rule_cache": self.rule_cache.get_stats(),
+            "correlation_state": self.correlation_engine.state_store.get_stats(),
         }
 
 
@@ -0,0 +1,232 @@
+"""Cache of the detection rules evaluated by the real-time processor.
+
+The real-time processor needs the enabled real-time and correlation rules
+for every event it consumes. Rather than querying them per event, it keeps
+them in a RealtimeRuleCache, loaded once and reloaded when the analytics
+API announces a rule change on a Redis pub/sub channel (or, as a backstop
+for missed messages, after a TTL).
+
+Each loaded snapshot is a RuleSet that indexes the rules by index pattern
+and data source, and remembers the rules selected for each (index, data
+source) pair, so selecting the rules for an event is a dict lookup.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Any
+from uuid import UUID
+
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import DetectionRule, RuleStatus, RuleType
+
+logger = logging.getLogger(__name__)
+
+# Channel the analytics API publishes rule changes on
+RULE_CHANGES_CHANNEL = "eleanor:rules:changed"
+
+# Distinct (index, data source) selections remembered per snapshot
+MAX_CACHED_SELECTIONS = 4096
+
+
+async def notify_rules_changed(redis: Redis, rule_id: UUID | str, action: str) -> None:
+    """Announce a detection rule change to real-time processors.
+
+    Failures are logged rather than raised: the processors also reload
+    their rules periodically.
+
+    Args:
+        redis: Redis client
+        rule_id: Changed rule
+        action: What changed (created, updated, deleted, enabled, disabled)
+    """
+    try:
+        await redis.publish(
+            RULE_CHANGES_CHANNEL,
+            json.dumps({"rule_id": str(rule_id), "action": action}),
+        )
+    except Exception as e:
+        logger.warning("Failed to publish change of rule %s: %s", rule_id, str(e))
+
+
+class RuleSet:
+    """Snapshot of the real-time rules, indexed for per-event selection."""
+
+    def __init__(self, rules: list[DetectionRule]):
+        """Index rules.
+
+        Args:
+            rules: Enabled real-time and correlation rules, in evaluation order
+        """
+        self.rules = rules
+        self._any_source: set[int] = set()
+        self._by_source: dict[str, set[int]] = {}
+        self._any_index: set[int] = set()
+        self._by_index: dict[str, set[int]] = {}
+        self._index_patterns: list[tuple[re.Pattern, int]] = []
+
+        for position, rule in enumerate(rules):
+            if rule.data_sources:
+                for source in rule.data_sources:
+                    self._by_source.setdefault(source, set()).add(position)
+            else:
+                self._any_source.add(position)
+
+            if not rule.indices:
+                self._any_index.add(position)
+            for pattern in rule.indices or []:
+                if "*" in pattern:
+                    regex = ".*".join(re.escape(part) for part in pattern.split("*"))
+                    self._index_patterns.append((re.compile(regex), position))
+                else:
+                    self._by_index.setdefault(pattern, set()).add(position)
+
+        self._selections: dict[tuple[str, str], list[DetectionRule]] = {}
+
+    def rules_for(self, event_index: str, event_source: str) -> list[DetectionRule]:
+        """Select the rules that apply to events of an index and data source.
+
+        Args:
+            event_index: Index the event came from
+            event_source: Data source (event.module) of the event
+
+        Returns:
+            Applicable rules, in evaluation order
+        """
+        key = (event_index, event_source)
+        selected = self._selections.get(key)
+        if selected is None:
+            positions = self._any_index | self._by_index.get(event_index, set())
+            for regex, position in self._index_patterns:
+                if position not in positions and regex.fullmatch(event_index):
+                    positions.add(position)
+            positions &= self._any_source | self._by_source.get(event_source, set())
+
+            selected = [self.rules[position] for position in sorted(positions)]
+            if len(self._selections) >= MAX_CACHED_SELECTIONS:
+                self._selections.clear()
+            self._selections[key] = selected
+        return selected
+
+
+class RealtimeRuleCache:
+    """Enabled real-time and correlation rules, loaded once and shared.
+
+    The cached rules are detached from the session that loaded them, so
+    they can be read from any worker's session but must not be modified
+    through the ORM.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds after which the rules are reloaded even without a
+                change notification
+        """
+        self.ttl = ttl
+        self._rule_set: RuleSet | None = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._loaded_generation = -1
+        self._lock = asyncio.Lock()
+
+        self.loads = 0
+        self.invalidations = 0
+
+    def invalidate(self) -> None:
+        """Reload the rules before they are next used."""
+        self._generation += 1
+        self.invalidations += 1
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._rule_set is not None
+            and self._loaded_generation == self._generation
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    async def get(self, db: AsyncSession) -> RuleSet:
+        """Get the current rules, loading them if they are stale.
+
+        Args:
+            db: Database session used if the rules need loading
+
+        Returns:
+            Current rule set
+        """
+        if self._is_fresh():
+            return self._rule_set
+
+        async with self._lock:
+            if not self._is_fresh():
+                generation = self._generation
+                rules = await self._load(db)
+                self._rule_set = RuleSet(rules)
+                self._loaded_generation = generation
+                self._loaded_at = time.monotonic()
+                self.loads += 1
+                logger.info("Loaded %d real-time detection rules", len(rules))
+        return self._rule_set
+
+    async def _load(self, db: AsyncSession) -> list[DetectionRule]:
+        """Query the enabled real-time and correlation rules."""
+        query = select(DetectionRule).where(
+            DetectionRule.status == RuleStatus.ENABLED,
+            DetectionRule.rule_type.in_([RuleType.REALTIME, RuleType.CORRELATION]),
+        )
+        result = await db.execute(query)
+
+        rules = []
+        for rule in result.scalars().all():
+            # Keep the rule readable after the loading session is gone
+            db.expunge(rule)
+
+            # Correlation rules are only run in real time when marked so
+            if rule.rule_type == RuleType.CORRELATION:
+                config = rule.correlation_config or {}
+                if not config.get("realtime", False):
+                    continue
+
+            rules.append(rule)
+        return rules
+
+    async def watch(self, redis: Redis) -> None:
+        """Invalidate the cache on rule change notifications until cancelled.
+
+        Args:
+            redis: Redis client to subscribe with
+        """
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(RULE_CHANGES_CHANNEL)
+                # Changes may have been missed while not subscribed
+                self.invalidate()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Rule change subscription error: %s", str(e))
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.aclose()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Cache statistics
+        """
+        return {
+            "rules": len(self._rule_set.rules) if self._rule_set else 0,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+        }
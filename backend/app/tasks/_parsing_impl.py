@@ -4,17 +4,37 @@ Separates the async implementation from the Celery task definitions
 to allow proper async/await usage with database operations.
 """
 
+import asyncio
+import io
 import logging
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 from uuid import UUID
 
+from billiard.exceptions import WorkerLostError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.adapters.storage import (
+    StorageAdapter,
+    StorageFile,
+    get_storage_adapter,
+    init_storage_adapter,
+)
+from app.adapters.storage.stream import EvidenceCache, open_range_stream
 from app.config import get_settings
 from app.models.evidence import Evidence
 from app.models.parsing_job import ParsingJob
+from app.parsers.archive import ArchiveParseRunner, ArchiveReader, detect_archive
+from app.parsers.base import BaseParser
+from app.parsers.execution import ParserExecutor, is_async_parser
+from app.parsers.filtering import EventFilter
+from app.parsers.image import ImageReader, detect_image
 from app.parsers.registry import get_parser, load_builtin_parsers
+from app.parsers.signatures import SNIFF_SIZE
+from app.parsers.split import SplitParseRunner, plan_split
+from app.tasks.bulk_indexer import BulkIndexer, document_id
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -80,6 +100,9 @@ async def run_parsing_job(
 
     session_maker = get_task_session_maker()
     es = await get_elasticsearch_client()
+    stream = None
+    # Evidence cache leases, held until the job ends
+    leases = AsyncExitStack()
 
     try:
         async with session_maker() as session:
@@ -96,62 +119,188 @@ async def run_parsing_job(
             job.mark_running()
             await session.commit()
 
-            # Get file path
-            file_path = Path(evidence.file_path) if evidence.file_path else None
-            if not file_path or not file_path.exists():
-                raise FileNotFoundError(f"Evidence file not found: {evidence.file_path}")
+            # Locate the evidence: a local file, or an object in storage
+            file_path, storage = await _get_local_evidence_path(evidence)
+            remote_file = None
 
             # Find appropriate parser
-            with open(file_path, "rb") as f:
-                content = f.read(4096)  # Read first 4KB for detection
-
-            parser = get_parser(
-                file_path=file_path,
-                content=content,
-                hint=parser_hint,
-            )
-
-            if not parser:
+            if file_path:
+                with open(file_path, "rb") as f:
+                    content = f.read(SNIFF_SIZE)  # Read the header for detection
+            else:
+                remote_file = await storage.get_metadata(evidence.file_path)
+                content = await storage.download_range(evidence.file_path, 0, SNIFF_SIZE)
+
+            archive = None
+            if config.get("expand_archives", settings.parsing_archive_enabled):
+                archive = detect_archive(content)
+
+            image = None
+            if not archive and config.get("triage_images", settings.parsing_image_enabled):
+                image = detect_image(content)
+
+            parser = None
+            if archive in (None, "gzip") and not image:
+                # Parsers that read compressed input themselves take precedence
+                # over unpacking a single gzip-compressed file
+                parser = get_parser(
+                    file_path=file_path or Path(evidence.filename),
+                    content=content,
+                    hint=parser_hint,
+                    evidence_hash=evidence.sha256,
+                )
+                if parser:
+                    archive = None
+
+            if not parser and not archive and not image:
                 raise ValueError(f"No parser found for evidence: {evidence.filename}")
 
-            job.parser_type = parser.name
+            source = file_path
+            if remote_file:
+                if image:
+                    # dissect.target opens images by path
+                    source = await _cache_remote_evidence(storage, remote_file, leases)
+                elif archive:
+                    source = _open_range_stream(storage, remote_file)
+                else:
+                    source = await _open_remote_evidence(parser, storage, remote_file, leases)
+                stream = source if isinstance(source, io.IOBase) else None
+
+            parser_name = parser.name if parser else "image" if image else "archive"
+            job.parser_type = parser_name
+            checkpoint = _resume_checkpoint(job, parser_name, evidence, config)
             await session.commit()
 
-            logger.info(f"Parsing evidence {evidence.filename} with parser {parser.name}")
-
-            # Parse and index events
-            events_parsed = 0
-            events_indexed = 0
-            events_failed = 0
-            batch = []
-            batch_size = 500
+            if checkpoint:
+                logger.info(
+                    f"Resuming parsing of {evidence.filename} with parser {parser_name} "
+                    f"from record {checkpoint['records']}"
+                )
+            elif archive:
+                logger.info(f"Parsing members of {archive} archive {evidence.filename}")
+            elif image:
+                logger.info(f"Parsing artifacts of {image} disk image {evidence.filename}")
+            else:
+                logger.info(f"Parsing evidence {evidence.filename} with parser {parser.name}")
+
+            # Parse and index events, continuing the counters of a resumed job.
+            # Documents are numbered in parse order and indexed under IDs derived
+            # from that number, so records replayed after the last checkpoint
+            # overwrite their earlier copies instead of duplicating them.
+            events_parsed = checkpoint.get("records", 0)
+            events_failed = checkpoint.get("events_failed", 0)
+            indexed_before = checkpoint.get("events_indexed", 0)
+            progress_interval = 500
+            checkpoint_batches = settings.parsing_checkpoint_batches
+            next_checkpoint = checkpoint_batches
+
+            conversion_failures = {"count": 0}
+            cursor: dict[str, Any] = {"filtered": 0}
+            event_filter = EventFilter.from_config(config)
 
             index_name = f"{settings.elasticsearch_index_prefix}-events-{case_id}"
 
-            for event in parser.parse(file_path, source_name=evidence.filename):
-                events_parsed += 1
-
-                try:
-                    # Convert to dict and add metadata
-                    doc = event.to_dict()
-                    doc["case_id"] = str(case_id)
-                    doc["evidence_id"] = str(evidence_id)
-
-                    batch.append(
-                        {
-                            "_index": index_name,
-                            "_source": doc,
-                        }
+            runner = None
+            if archive or image:
+                if image:
+                    reader = ImageReader(
+                        source,
+                        evidence.filename,
+                        spool_bytes=settings.parsing_image_spool_bytes,
                     )
+                    workers = config.get("image_workers") or settings.parsing_image_workers
+                    processes = config.get("image_processes", settings.parsing_image_processes)
+                else:
+                    reader = ArchiveReader(
+                        source,
+                        archive,
+                        evidence.filename,
+                        spool_bytes=settings.parsing_archive_spool_bytes,
+                    )
+                    workers = config.get("archive_workers") or settings.parsing_archive_workers
+                    processes = config.get("archive_processes", settings.parsing_archive_processes)
+                runner = ArchiveParseRunner(
+                    reader,
+                    str(case_id),
+                    str(evidence_id),
+                    hint=parser_hint,
+                    max_workers=workers,
+                    skip_members=set(checkpoint.get("archive_members", [])),
+                    first_record=checkpoint.get("records", 0),
+                    failed_before=checkpoint.get("archive_failed", 0),
+                    event_filter=event_filter,
+                    processes=processes,
+                )
+                documents = runner.iter_documents()
+            else:
+                documents = _iter_documents(
+                    parser,
+                    source,
+                    evidence.filename,
+                    case_id,
+                    evidence_id,
+                    config,
+                    conversion_failures,
+                    checkpoint,
+                    cursor,
+                    event_filter,
+                    evidence.sha256,
+                )
+            indexer = BulkIndexer(
+                es,
+                index_name,
+                max_in_flight=settings.parsing_bulk_concurrency,
+                max_batch_docs=settings.parsing_bulk_max_docs,
+                max_batch_bytes=settings.parsing_bulk_max_bytes,
+                max_retries=settings.parsing_bulk_max_retries,
+            )
+            async with indexer:
+                async for item in documents:
+                    record = events_parsed
+                    events_parsed += 1
+
+                    if runner:
+                        # Archive members and image artifacts are parsed
+                        # concurrently, so their documents are numbered
+                        # within each member instead
+                        member, member_record, doc = item
+                        doc_id = document_id(evidence_id, member, member_record)
+                    else:
+                        doc, doc_id = item, document_id(evidence_id, record)
+
+                    try:
+                        await indexer.add(doc, doc_id=doc_id)
+                    except Exception as e:
+                        logger.warning(f"Failed to process event: {e}")
+                        events_failed += 1
+                        continue
+
+                    if checkpoint_batches and indexer.batches >= next_checkpoint:
+                        # Wait for in-flight batches so the checkpoint only
+                        # covers documents Elasticsearch has acknowledged
+                        next_checkpoint = indexer.batches + checkpoint_batches
+                        await indexer.drain()
+                        state = {
+                            "parser": parser_name,
+                            "evidence_sha256": evidence.sha256,
+                            "records": events_parsed,
+                            "events_indexed": indexed_before + indexer.indexed,
+                            "events_failed": events_failed + indexer.failed,
+                            "split": dict(cursor["split"]) if "split" in cursor else None,
+                            "filter": config.get("filter"),
+                        }
+                        if runner:
+                            # Resume skips whole members; partly parsed ones are
+                            # parsed again and overwrite their documents
+                            state["records"] = runner.records_completed
+                            state["archive_members"] = sorted(runner.completed)
+                            state["archive_failed"] = runner.failed_completed
+                        job.save_checkpoint(state)
+                        await session.commit()
 
-                    # Bulk index when batch is full
-                    if len(batch) >= batch_size:
-                        indexed = await _bulk_index(es, batch)
-                        events_indexed += indexed
-                        events_failed += len(batch) - indexed
-                        batch = []
-
+                    if events_parsed % progress_interval == 0:
                         # Update progress
+                        events_indexed = indexed_before + indexer.indexed
                         progress = min(int((events_parsed / max(events_parsed, 1000)) * 100), 99)
                         job.update_progress(events_parsed, events_indexed, progress)
                         await session.commit()
@@ -166,25 +315,30 @@ async def run_parsing_job(
                             },
                         )
 
-                except Exception as e:
-                    logger.warning(f"Failed to process event: {e}")
-                    events_failed += 1
-
-            # Index remaining batch
-            if batch:
-                indexed = await _bulk_index(es, batch)
-                events_indexed += indexed
-                events_failed += len(batch) - indexed
+            if runner:
+                conversion_failures["count"] += runner.failed_events
+                cursor["filtered"] += runner.filtered_events
+            events_indexed = indexed_before + indexer.indexed
+            events_failed += indexer.failed
+            events_parsed += conversion_failures["count"]
+            events_failed += conversion_failures["count"]
 
             # Build results summary
             results_summary = {
-                "parser": parser.name,
-                "category": parser.category.value,
+                "parser": parser_name,
+                "category": parser.category.value if parser else parser_name,
                 "total_events": events_parsed,
                 "indexed_events": events_indexed,
                 "failed_events": events_failed,
                 "index_name": index_name,
+                "bulk_stats": indexer.stats,
             }
+            if runner:
+                results_summary[parser_name] = {"type": archive or image, **runner.stats.to_dict()}
+            if event_filter:
+                results_summary["filtered_events"] = cursor["filtered"]
+            if checkpoint:
+                results_summary["resumed_from_record"] = checkpoint["records"]
 
             # Mark job as completed
             job.mark_completed(events_parsed, events_indexed, results_summary)
@@ -198,32 +352,298 @@ async def run_parsing_job(
             return results_summary
 
     finally:
+        if stream:
+            stream.close()
+        await leases.aclose()
         await es.close()
 
 
-async def _bulk_index(es, batch: list[dict]) -> int:
-    """Bulk index documents to Elasticsearch.
+def _resume_checkpoint(
+    job: ParsingJob,
+    parser_name: str,
+    evidence: Evidence,
+    config: dict,
+) -> dict[str, Any]:
+    """Get the checkpoint an interrupted job should resume from.
 
-    Args:
-        es: Elasticsearch client
-        batch: List of documents to index
+    A checkpoint is only reused for the same parser ("archive" or "image" for
+    archives and disk images parsed member by member), evidence content and
+    event filter, since the filter decides which documents the record
+    numbers count; the job config may set "resume" to False to always start
+    over.
 
     Returns:
-        Number of successfully indexed documents
+        The checkpoint, or an empty dict to parse from the first record
     """
-    from elasticsearch.helpers import async_bulk
+    checkpoint = job.checkpoint or {}
+    if not checkpoint.get("records"):
+        return {}
+
+    if not config.get("resume", True):
+        reason = "resume disabled in job config"
+    elif checkpoint.get("parser") != parser_name:
+        reason = f"checkpoint was written by parser {checkpoint.get('parser')}"
+    elif checkpoint.get("evidence_sha256") != evidence.sha256:
+        reason = "evidence content changed"
+    elif checkpoint.get("filter") != config.get("filter"):
+        reason = "event filter changed"
+    else:
+        return checkpoint
+
+    logger.info(f"Discarding checkpoint of parsing job {job.id}: {reason}")
+    job.checkpoint = {}
+    return {}
+
+
+async def _get_local_evidence_path(
+    evidence: Evidence,
+) -> tuple[Path | None, StorageAdapter | None]:
+    """Find a local path for evidence, or the storage adapter holding it.
+
+    Evidence records store either a local path (older uploads) or a storage
+    key. Keys on the local backend resolve to a path; keys on remote backends
+    return the adapter so the file can be read from storage.
+
+    Returns:
+        Tuple of (local path or None, storage adapter or None)
+    """
+    if not evidence.file_path:
+        raise FileNotFoundError(f"Evidence file not found: {evidence.file_path}")
+
+    file_path = Path(evidence.file_path)
+    if file_path.is_absolute() and file_path.exists():
+        return file_path, None
 
     try:
-        success, failed = await async_bulk(
-            es,
-            batch,
-            raise_on_error=False,
-            raise_on_exception=False,
+        storage = get_storage_adapter()
+    except RuntimeError:
+        storage = await init_storage_adapter(settings)
+
+    local_path = storage.local_path(evidence.file_path)
+    if local_path:
+        return local_path, None
+
+    if not await storage.exists(evidence.file_path):
+        raise FileNotFoundError(f"Evidence file not found: {evidence.file_path}")
+    return None, storage
+
+
+async def _open_remote_evidence(
+    parser: BaseParser,
+    storage: StorageAdapter,
+    remote_file: StorageFile,
+    leases: AsyncExitStack,
+) -> Path | io.BufferedReader:
+    """Open evidence held in object storage for a parser.
+
+    Sequential sync parsers read a ranged, read-ahead stream, so parsing
+    starts without waiting for a download. Parsers that need random access
+    or a real path get a copy from the on-disk evidence cache, leased
+    until leases is closed.
+    """
+    if parser.supports_streaming and not is_async_parser(parser):
+        return _open_range_stream(storage, remote_file)
+
+    return await _cache_remote_evidence(storage, remote_file, leases)
+
+
+async def _cache_remote_evidence(
+    storage: StorageAdapter, remote_file: StorageFile, leases: AsyncExitStack
+) -> Path:
+    """Get a local copy of evidence held in object storage from the evidence cache.
+
+    The copy is kept from eviction until leases is closed.
+    """
+    cache = EvidenceCache(Path(settings.parsing_cache_dir), settings.parsing_cache_max_bytes)
+    return await leases.enter_async_context(
+        cache.lease(storage, remote_file.key, remote_file.size, remote_file.etag)
+    )
+
+
+def _open_range_stream(storage: StorageAdapter, remote_file: StorageFile) -> io.BufferedReader:
+    """Open a ranged, read-ahead stream over a file in storage.
+
+    Archives are read through one as well: zip members are located through
+    the central directory with seeks, and tar and 7z archives are read in
+    order.
+    """
+    logger.info(f"Streaming {remote_file.key} from {storage.name} storage")
+    return open_range_stream(
+        storage,
+        remote_file.key,
+        remote_file.size,
+        asyncio.get_running_loop(),
+        block_size=settings.parsing_stream_block_bytes,
+        read_ahead=settings.parsing_stream_read_ahead,
+        name=Path(remote_file.key).name,
+    )
+
+
+def _get_split_runner(
+    parser: BaseParser,
+    file_path: Path,
+    source_name: str,
+    config: dict,
+    resume: dict[str, int] | None = None,
+    event_filter: EventFilter | None = None,
+    case_id: str | None = None,
+    evidence_id: str | None = None,
+) -> SplitParseRunner | None:
+    """Build a split parse runner when the file is large enough to benefit.
+
+    The job config may set "split_parsing" to force split mode on or off
+    and "split_workers" to override the pool size. A resumed job passes the
+    runner position from its checkpoint, and the runner starts at that range.
+    The runner's workers encode documents with case_id and evidence_id.
+    """
+    enabled = config.get("split_parsing", settings.parsing_split_enabled)
+    if not enabled:
+        return None
+
+    workers = config.get("split_workers") or settings.parsing_split_workers or None
+
+    if resume:
+        plan = plan_split(
+            parser, file_path, settings.parsing_split_range_bytes, start=resume["offset"]
+        )
+        if plan:
+            return SplitParseRunner(
+                parser,
+                plan,
+                source_name,
+                max_workers=workers,
+                line_offset=resume["line_offset"],
+                first_record=resume["records"],
+                failed_before=resume.get("failed", 0),
+                event_filter=event_filter,
+                case_id=case_id,
+                evidence_id=evidence_id,
+                encode=True,
+            )
+
+    if (
+        "split_parsing" not in config
+        and file_path.stat().st_size < settings.parsing_split_min_bytes
+    ):
+        return None
+
+    plan = plan_split(parser, file_path, settings.parsing_split_range_bytes)
+    if not plan:
+        return None
+
+    return SplitParseRunner(
+        parser,
+        plan,
+        source_name,
+        max_workers=workers,
+        event_filter=event_filter,
+        case_id=case_id,
+        evidence_id=evidence_id,
+        encode=True,
+    )
+
+
+async def _iter_documents(
+    parser: BaseParser,
+    source: Path | BinaryIO,
+    source_name: str,
+    case_id: str,
+    evidence_id: str,
+    config: dict,
+    conversion_failures: dict[str, int],
+    checkpoint: dict[str, Any] | None = None,
+    cursor: dict[str, Any] | None = None,
+    event_filter: EventFilter | None = None,
+    evidence_sha256: str | None = None,
+) -> AsyncIterator[bytes]:
+    """Yield encoded ECS documents, with case and evidence IDs, for an evidence file.
+
+    Uses split parsing across a process pool when the parser and file allow
+    it, otherwise runs the parser through a ParserExecutor so neither sync
+    nor async parsers block the event loop; either way documents are
+    encoded where they are parsed. Events that fail conversion are counted in
+    conversion_failures, including those before a checkpoint. Streams are
+    always parsed in-process.
+
+    When resuming from a checkpoint, split parsing seeks to the range the
+    checkpoint was taken in; serial parsing re-reads the evidence from the
+    start. Either way the documents before the checkpoint's record number
+    are dropped before indexing. The split runner's position is published
+    in cursor["split"] for the caller's next checkpoint.
+
+    Events rejected by event_filter are dropped before conversion and
+    counted in cursor["filtered"]. evidence_sha256 is handed to the parser
+    so it need not hash the evidence again.
+    """
+    checkpoint = checkpoint or {}
+    cursor = cursor if cursor is not None else {}
+    cursor.setdefault("filtered", 0)
+    skip = checkpoint.get("records", 0)
+
+    runner = None
+    if isinstance(source, Path):
+        runner = _get_split_runner(
+            parser,
+            source,
+            source_name,
+            config,
+            checkpoint.get("split"),
+            event_filter,
+            str(case_id),
+            str(evidence_id),
+        )
+
+    if runner:
+        logger.info(
+            f"Split parsing {source_name} into {len(runner.plan.ranges)} ranges "
+            f"with {runner.max_workers} workers"
         )
-        return success
-    except Exception as e:
-        logger.error(f"Bulk indexing failed: {e}")
-        return 0
+        cursor["split"] = runner.position
+        remaining = skip - runner.first_record
+        yielded = False
+        fell_back = False
+        try:
+            async for doc in runner.iter_documents():
+                if remaining > 0:
+                    remaining -= 1
+                    continue
+                yielded = True
+                yield doc
+            return
+        except (AssertionError, WorkerLostError, OSError) as e:
+            if yielded:
+                raise
+            # The serial parse below counts every failure again
+            fell_back = True
+            cursor.pop("split", None)
+            logger.warning(f"Split parsing unavailable, parsing in-process: {e}")
+        finally:
+            if not fell_back:
+                conversion_failures["count"] += runner.failed_events
+                cursor["filtered"] += runner.filtered_events
+
+    executor = ParserExecutor(
+        parser,
+        source,
+        source_name,
+        case_id=str(case_id),
+        evidence_id=str(evidence_id),
+        encode=True,
+        event_filter=event_filter,
+        evidence_sha256=evidence_sha256,
+    )
+    remaining = skip
+    try:
+        async for doc in executor.iter_documents():
+            if remaining > 0:
+                remaining -= 1
+                continue
+            yield doc
+    finally:
+        # The evidence is re-read from the start, so failures before the
+        # checkpoint are counted again rather than carried in it
+        conversion_failures["count"] += executor.failed_events
+        cursor["filtered"] += executor.filtered_events
 
 
 async def mark_job_failed(
@@ -0,0 +1,258 @@
+"""Pipelined bulk indexer for parsing jobs.
+
+Keeps several Elasticsearch bulk requests in flight while parsing continues,
+bounds each request by document count and by serialized size, and adapts
+the batch size to cluster feedback: rejections (429) and slow responses
+shrink it, fast responses grow it back. Documents rejected individually
+with a retryable status are resent on their own instead of being counted
+as failed.
+
+Documents given a deterministic ID (see document_id()) are overwritten
+rather than duplicated when a resumed job sends them again.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any
+
+from elasticsearch import ApiError, TransportError
+
+from app.parsers.base import encode_document
+
+logger = logging.getLogger(__name__)
+
+# Item and request statuses worth retrying (rejected or temporarily unavailable)
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+# Bulk round-trip time the batch size is steered towards
+TARGET_LATENCY_SECONDS = 2.0
+
+MIN_BATCH_DOCS = 50
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+
+
+def document_id(*parts: Any) -> str:
+    """Build a deterministic document ID from the parts identifying a record.
+
+    Re-indexing a record under the same ID overwrites it, which makes
+    replaying part of a parsing job idempotent.
+
+    Usage:
+        doc_id = document_id(evidence_id, record_number)
+    """
+    key = "\x1f".join(str(part) for part in parts)
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class BulkIndexer:
+    """Concurrent, adaptively sized bulk indexer for one target index.
+
+    Usage:
+        async with BulkIndexer(es, index_name) as indexer:
+            for doc in docs:
+                await indexer.add(doc)
+        print(indexer.indexed, indexer.failed)
+
+    add() only waits when max_in_flight requests are already outstanding,
+    which throttles the producer to the speed of the cluster.
+    """
+
+    def __init__(
+        self,
+        es: Any,
+        index_name: str,
+        max_in_flight: int = 4,
+        initial_batch_docs: int = 500,
+        max_batch_docs: int = 5000,
+        max_batch_bytes: int = 10 * 1024 * 1024,
+        max_retries: int = 5,
+    ):
+        self.es = es
+        self.index_name = index_name
+        self.max_in_flight = max_in_flight
+        self.max_batch_docs = max_batch_docs
+        self.max_batch_bytes = max_batch_bytes
+        self.max_retries = max_retries
+        self.batch_docs = min(initial_batch_docs, max_batch_docs)
+
+        self.indexed = 0
+        self.failed = 0
+        self.retried = 0
+        self.throttled = 0
+        self.requests = 0
+        self.batches = 0
+
+        self._action_line = encode_document({"index": {"_index": index_name}})
+        self._id_action_prefix = self._action_line[:-2] + b',"_id":'
+        self._batch: list[bytes] = []
+        self._batch_bytes = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tasks: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "BulkIndexer":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.cancel()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Indexing statistics for job summaries."""
+        return {
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "throttled": self.throttled,
+            "requests": self.requests,
+            "batches": self.batches,
+            "batch_docs": self.batch_docs,
+        }
+
+    async def add(self, doc: dict[str, Any] | bytes, doc_id: str | None = None) -> None:
+        """Queue a document, sending a bulk request when the batch is full.
+
+        Args:
+            doc: Document, or its already encoded JSON (see ParsedEvent.to_json)
+            doc_id: Optional document ID
+        """
+        if doc_id is None:
+            action = self._action_line
+        else:
+            action = self._id_action_prefix + json.dumps(doc_id).encode("utf-8") + b"}}"
+        source = doc if isinstance(doc, bytes) else encode_document(doc)
+
+        self._batch.append(action + b"\n" + source + b"\n")
+        self._batch_bytes += len(action) + len(source) + 2
+
+        if len(self._batch) >= self.batch_docs or self._batch_bytes >= self.max_batch_bytes:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Send the current batch without waiting for it to complete."""
+        if not self._batch:
+            return
+
+        batch = self._batch
+        self._batch = []
+        self._batch_bytes = 0
+        self.batches += 1
+
+        await self._slots.acquire()
+        task = asyncio.create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+
+    async def drain(self) -> None:
+        """Send any queued documents and wait until every request completes.
+
+        Once this returns, every document added so far is either indexed or
+        counted as failed, so the caller can record a checkpoint.
+        """
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def close(self) -> None:
+        """Send any remaining documents and wait for all requests."""
+        await self.drain()
+
+    async def cancel(self) -> None:
+        """Abandon queued documents and cancel in-flight requests."""
+        self._batch = []
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        self._slots.release()
+        if not task.cancelled() and task.exception():
+            logger.error(f"Bulk indexing task failed: {task.exception()}")
+
+    async def _send(self, items: list[bytes]) -> None:
+        """Send one batch, retrying rejected items with backoff."""
+        loop = asyncio.get_running_loop()
+        attempt = 0
+
+        while items:
+            started = loop.time()
+            self.requests += 1
+            try:
+                response = await self.es.bulk(operations=b"".join(items))
+            except ApiError as e:
+                status = e.meta.status
+                if status in RETRYABLE_STATUSES and attempt < self.max_retries:
+                    self._shrink(throttled=status == 429)
+                    attempt += 1
+                    self.retried += len(items)
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                logger.error(f"Bulk indexing failed with status {status}: {e}")
+                self.failed += len(items)
+                return
+            except TransportError as e:
+                if attempt < self.max_retries:
+                    attempt += 1
+                    self.retried += len(items)
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                logger.error(f"Bulk indexing failed: {e}")
+                self.failed += len(items)
+                return
+            except Exception as e:
+                # Anything else (a serialization or client bug) fails the
+                # batch rather than the task, so drain() still completes
+                logger.error(f"Bulk indexing failed unexpectedly: {e}", exc_info=True)
+                self.failed += len(items)
+                return
+
+            latency = loop.time() - started
+            retry = []
+            for item, result in zip(items, response.get("items", [])):
+                outcome = result.get("index") or result.get("create") or {}
+                status = outcome.get("status", 500)
+                if 200 <= status < 300:
+                    self.indexed += 1
+                elif status in RETRYABLE_STATUSES:
+                    retry.append(item)
+                else:
+                    self.failed += 1
+                    logger.debug(f"Document rejected ({status}): {outcome.get('error')}")
+
+            if not retry:
+                self._adapt(latency)
+                return
+
+            self._shrink(throttled=True)
+            if attempt >= self.max_retries:
+                logger.warning(f"Giving up on {len(retry)} documents after {attempt} retries")
+                self.failed += len(retry)
+                return
+
+            attempt += 1
+            self.retried += len(retry)
+            items = retry
+            await asyncio.sleep(self._backoff(attempt))
+
+    def _backoff(self, attempt: int) -> float:
+        return min(BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)), BACKOFF_MAX_SECONDS)
+
+    def _shrink(self, throttled: bool) -> None:
+        """Halve the batch size after a rejection."""
+        if throttled:
+            self.throttled += 1
+        self.batch_docs = max(MIN_BATCH_DOCS, self.batch_docs // 2)
+
+    def _adapt(self, latency: float) -> None:
+        """Grow the batch while the cluster keeps up, trim it when it slows."""
+        if latency > TARGET_LATENCY_SECONDS * 2:
+            self.batch_docs = max(MIN_BATCH_DOCS, int(self.batch_docs * 0.75))
+        elif latency < TARGET_LATENCY_SECONDS:
+            self.batch_docs = min(self.max_batch_docs, int(self.batch_docs * 1.1) + 1)
@@ -64,8 +64,8 @@ def parse_evidence(
         finally:
             loop.close()
 
-    except SoftTimeLimitExceeded:
-        logger.error(f"Parsing job {job_id} exceeded time limit")
+    except SoftTimeLimitExceeded as e:
+        logger.error(f"Parsing job {job_id} exceeded time limit, resuming from its checkpoint")
         # Update job status
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
@@ -75,7 +75,8 @@ def parse_evidence(
             loop.run_until_complete(mark_job_failed(job_id, "Task exceeded time limit (2 hours)"))
         finally:
             loop.close()
-        raise
+        # The retry continues from the last checkpoint instead of starting over
+        raise self.retry(exc=e, countdown=0)
 
     except Exception as e:
         logger.exception(f"Parsing job {job_id} failed: {e}")
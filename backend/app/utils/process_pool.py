@@ -0,0 +1,89 @@
+"""Process pool whose jobs are awaited from asyncio.
+
+The pool is billiard's (Celery's multiprocessing fork), which unlike
+multiprocessing or ProcessPoolExecutor may start workers from a daemonic
+process such as a Celery prefork worker.
+"""
+
+import asyncio
+import os
+import signal
+from collections.abc import Callable
+from typing import Any
+
+import billiard
+from billiard.einfo import ExceptionInfo
+
+
+def _resolve(future: asyncio.Future, result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _reject(future: asyncio.Future, exc: BaseException | ExceptionInfo) -> None:
+    if isinstance(exc, ExceptionInfo):
+        # A job's own exception arrives wrapped with its traceback
+        exc = exc.exception
+    if not future.done():
+        future.set_exception(exc)
+
+
+class ProcessPool:
+    """A spawn-context billiard pool used as an async context manager.
+
+    Each submit() is its own apply_async job: billiard credits all results
+    of a map job to a single worker, and the others then wait out its
+    message consumption timeout when the pool is terminated.
+
+    Leaving the context closes the pool and waits for the workers to exit
+    without blocking the event loop. If jobs are unfinished, their futures
+    are cancelled and the workers killed first.
+    """
+
+    def __init__(self, processes: int):
+        self.processes = processes
+        self._pool: Any = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._futures: set[asyncio.Future] = set()
+
+    async def __aenter__(self) -> "ProcessPool":
+        self._loop = asyncio.get_running_loop()
+        self._pool = billiard.get_context("spawn").Pool(processes=self.processes)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        unfinished = [future for future in self._futures if not future.done()]
+        for future in unfinished:
+            future.cancel()
+        self._futures.clear()
+
+        self._pool.close()
+        if unfinished:
+            # billiard's terminate() has workers exit cleanly, which
+            # deadlocks when one is stopped while holding a queue lock;
+            # killed workers leave nothing for the parent to wait on
+            for process in self._pool._pool:
+                try:
+                    os.kill(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        await asyncio.to_thread(self._pool.join)
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> asyncio.Future:
+        """Run func(*args) in a worker.
+
+        Returns:
+            Future resolved with the result, or rejected with the exception
+            the job raised
+        """
+        loop = self._loop
+        future = loop.create_future()
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        self._pool.apply_async(
+            func,
+            args,
+            callback=lambda result: loop.call_soon_threadsafe(_resolve, future, result),
+            error_callback=lambda exc: loop.call_soon_threadsafe(_reject, future, exc),
+        )
+        return future
@@ -0,0 +1,217 @@
+"""Unit tests for parsing evidence archives member by member.
+
+Tests archive detection, walking zip, tar, 7z and gzip members without
+extracting them, and the runner that parses members concurrently.
+"""
+
+import gzip
+import io
+import json
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _jsonl(prefix: str, count: int) -> bytes:
+    lines = [json.dumps({"user": f"{prefix}{i}", "action": "login"}) for i in range(count)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+@pytest.fixture
+def members() -> dict[str, bytes]:
+    """Contents of a small triage collection."""
+    return {
+        "C/logs/auth.jsonl": _jsonl("auth", 30),
+        "C/logs/app.jsonl": _jsonl("app", 20),
+        "C/notes.xyz": b"\x00\x01\x02 not evidence",
+    }
+
+
+@pytest.fixture
+def zip_path(tmp_path, members) -> Path:
+    path = tmp_path / "collection.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("C/logs/", "")
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return path
+
+
+@pytest.fixture
+def tar_path(tmp_path, members) -> Path:
+    path = tmp_path / "collection.tar.gz"
+    with tarfile.open(path, "w:gz") as archive:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return path
+
+
+@pytest.fixture
+def seven_zip_path(tmp_path, members) -> Path:
+    py7zr = pytest.importorskip("py7zr")
+    path = tmp_path / "collection.7z"
+    with py7zr.SevenZipFile(path, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(content, name)
+    return path
+
+
+class TestDetectArchive:
+    """Tests for detect_archive."""
+
+    def test_archive_types(self, zip_path, tar_path):
+        """Test that archives are told apart from their headers."""
+        from app.parsers.archive import detect_archive
+
+        plain_tar = io.BytesIO()
+        with tarfile.open(fileobj=plain_tar, mode="w") as archive:
+            info = tarfile.TarInfo("a.txt")
+            archive.addfile(info, io.BytesIO())
+
+        assert detect_archive(zip_path.read_bytes()[:4096]) == "zip"
+        assert detect_archive(tar_path.read_bytes()[:4096]) == "tar"
+        assert detect_archive(plain_tar.getvalue()[:4096]) == "tar"
+        assert detect_archive(gzip.compress(b"ElfFile\x00" * 100)) == "gzip"
+        assert detect_archive(b"7z\xbc\xaf\x27\x1c\x00\x04") == "7z"
+        assert detect_archive(b'{"a": 1}\n') is None
+
+
+class TestArchiveReader:
+    """Tests for walking archive members."""
+
+    @pytest.mark.parametrize("fixture", ["zip_path", "tar_path", "seven_zip_path"])
+    def test_members(self, fixture, members, request):
+        """Test that file members are listed with their content."""
+        from app.parsers.archive import ArchiveReader, detect_archive
+
+        path = request.getfixturevalue(fixture)
+        reader = ArchiveReader(path, detect_archive(path.read_bytes()[:4096]))
+
+        found = {}
+        for member in reader.iter_members(skip={"C/notes.xyz"}):
+            found[member.path] = member.open().read()
+            assert member.read_header(4) == found[member.path][:4]
+            member.close()
+
+        assert found == {name: content for name, content in members.items() if "logs" in name}
+
+    def test_7z_members_read_in_batches(self, seven_zip_path, members):
+        """Test that 7z members larger than the spool budget are read in several batches."""
+        from app.parsers.archive import ArchiveReader
+
+        reader = ArchiveReader(seven_zip_path, "7z", spool_bytes=256)
+        found = {member.path: member.open().read() for member in reader.iter_members()}
+
+        assert found == members
+
+    def test_gzip_member_name(self, tmp_path):
+        """Test that a single gzip file becomes one member without the suffix."""
+        from app.parsers.archive import ArchiveReader
+
+        stream = io.BytesIO(gzip.compress(b"content"))
+        members = list(ArchiveReader(stream, "gzip", "Security.evtx.gz").iter_members())
+
+        assert [(member.path, member.size) for member in members] == [("Security.evtx", 7)]
+        assert members[0].open().read() == b"content"
+
+
+class TestArchiveParseRunner:
+    """Tests for ArchiveParseRunner."""
+
+    @pytest.fixture(autouse=True)
+    def builtin_parsers(self):
+        from app.parsers.registry import load_builtin_parsers
+
+        load_builtin_parsers()
+
+    async def _run(self, path: Path, **kwargs) -> tuple[list[tuple[str, int, dict]], object]:
+        from app.parsers.archive import ArchiveParseRunner, ArchiveReader, detect_archive
+
+        reader = ArchiveReader(path, detect_archive(path.read_bytes()[:4096]))
+        runner = ArchiveParseRunner(reader, "case-1", "evidence-1", max_workers=2, **kwargs)
+        docs = [
+            (member, record, json.loads(doc))
+            async for member, record, doc in runner.iter_documents()
+        ]
+        return docs, runner
+
+    @pytest.mark.parametrize("fixture", ["zip_path", "tar_path", "seven_zip_path"])
+    async def test_members_parsed(self, fixture, request):
+        """Test that every recognised member is parsed and attributed."""
+        path = request.getfixturevalue(fixture)
+        docs, runner = await self._run(path)
+
+        assert len(docs) == 50
+        auth = sorted(
+            (record, doc) for member, record, doc in docs if member == "C/logs/auth.jsonl"
+        )
+        assert [record for record, _ in auth] == list(range(30))
+        assert auth[0][1]["user"] == {"name": "auth0"}
+        assert auth[0][1]["evidence_id"] == "evidence-1"
+        assert auth[0][1]["_source"]["archive"] == path.name
+        assert auth[0][1]["_source"]["member"] == "C/logs/auth.jsonl"
+
+        assert runner.completed == {"C/logs/auth.jsonl", "C/logs/app.jsonl", "C/notes.xyz"}
+        assert runner.records_completed == 50
+        assert runner.stats.to_dict() == {
+            "members": 3,
+            "parsed": 2,
+            "skipped": 1,
+            "failed": 0,
+            "parsers": {"json": 2},
+        }
+
+    async def test_members_parsed_in_process(self, zip_path):
+        """Test that members are parsed the same without worker processes."""
+        docs, runner = await self._run(zip_path)
+        in_process, _ = await self._run(zip_path, processes=False)
+
+        def comparable(items):
+            # Records without a timestamp are stamped with the parse time
+            return sorted(
+                (member, record, json.dumps({**doc, "@timestamp": None}))
+                for member, record, doc in items
+            )
+
+        assert comparable(in_process) == comparable(docs)
+        assert runner.stats.parsed == 2
+
+    async def test_completed_members_skipped(self, zip_path):
+        """Test that a resumed run leaves out members already indexed."""
+        docs, runner = await self._run(
+            zip_path, skip_members={"C/logs/auth.jsonl"}, first_record=30, failed_before=3
+        )
+
+        assert {member for member, _, _ in docs} == {"C/logs/app.jsonl"}
+        assert runner.records_completed == 50
+        assert runner.failed_completed == runner.failed_events == 3
+
+    async def test_path_parsers_get_temporary_copy(self, zip_path, monkeypatch):
+        """Test that parsers needing a file path read a copy that is removed."""
+        from app.parsers.formats.json import GenericJSONParser
+
+        sources = []
+        parse = GenericJSONParser.parse
+
+        def record_source(self, source, source_name=None):
+            sources.append(source)
+            return parse(self, source, source_name)
+
+        monkeypatch.setattr(GenericJSONParser, "supports_streaming", property(lambda self: False))
+        monkeypatch.setattr(GenericJSONParser, "parse", record_source)
+
+        docs, _ = await self._run(zip_path, processes=False)
+
+        assert len(docs) == 50
+        assert all(isinstance(source, Path) for source in sources)
+        assert sorted(source.name.split("-", 2)[-1] for source in sources) == [
+            "app.jsonl",
+            "auth.jsonl",
+        ]
+        assert not any(source.exists() for source in sources)
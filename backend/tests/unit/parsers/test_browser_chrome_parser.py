@@ -216,6 +216,19 @@ class TestChromeHistoryParsing:
         assert "web" in example_event.event_category
         assert example_event.url_domain == "example.com"
 
+    def test_parse_in_memory_database(self, chrome_parser, sample_history_db):
+        """Test that a database held in a BytesIO stream can be opened."""
+        import io
+
+        stream = io.BytesIO(sample_history_db.read_bytes())
+
+        with chrome_parser._db_context(stream) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0] == 2
+
+        stream.seek(0)
+        events = list(chrome_parser.parse(stream, "History"))
+        assert len(events) >= 2
+
     def test_visit_event_fields(self, chrome_parser, sample_history_db):
         """Test visit event has correct ECS fields."""
         events = list(chrome_parser.parse(sample_history_db, "History"))
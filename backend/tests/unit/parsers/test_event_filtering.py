@@ -0,0 +1,142 @@
+"""Unit tests for ingest-time event filtering and field projection.
+
+Tests building filters from job config, matching and projecting events,
+filtering in the parser executor, and the Zeek log-type pushdown.
+"""
+
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _event(**kwargs):
+    from app.parsers.base import ParsedEvent
+
+    return ParsedEvent(timestamp=datetime(2024, 1, 15, tzinfo=UTC), **kwargs)
+
+
+def _zeek_log(path: str, rows: int) -> list[str]:
+    return [
+        "#separator \\x09",
+        f"#path {path}",
+        "#fields ts\tuid\tid.orig_h\tid.orig_p\tid.resp_h\tid.resp_p\tproto",
+        "#types time\tstring\taddr\tport\taddr\tport\tenum",
+    ] + [f"1705314600.{i:06d}\tC{i}\t10.0.0.1\t{40000 + i}\t10.0.1.1\t53\tudp" for i in range(rows)]
+
+
+class TestEventFilter:
+    """Tests for EventFilter."""
+
+    def test_from_config(self):
+        """Test that the job config's filter spec is read and validated."""
+        from app.parsers.filtering import EventFilter
+
+        event_filter = EventFilter.from_config(
+            {"filter": {"event_ids": [4624, "4625"], "fields": ["user.name"], "drop_raw": True}}
+        )
+
+        assert event_filter.event_ids == {"4624", "4625"}
+        assert event_filter.fields == ("user.name",)
+        assert event_filter.projects
+        assert EventFilter.from_config({}) is None
+        with pytest.raises(ValueError, match="Unknown filter keys"):
+            EventFilter.from_config({"filter": {"event_id": ["4624"]}})
+        with pytest.raises(ValueError, match="must be a list"):
+            EventFilter.from_config({"filter": {"categories": "network"}})
+
+    def test_matches(self):
+        """Test event ID, category and source type checks."""
+        from app.parsers.filtering import EventFilter
+
+        logon = _event(
+            source_type="windows_evtx",
+            event_category=["authentication"],
+            labels={"event_id": "4624"},
+        )
+        firewall = _event(
+            source_type="windows_evtx", event_category=["network"], labels={"event_id": "5156"}
+        )
+
+        assert EventFilter(event_ids=frozenset({"4624"})).matches(logon)
+        assert not EventFilter(event_ids=frozenset({"4624"})).matches(firewall)
+        assert not EventFilter(exclude_event_ids=frozenset({"5156"})).matches(firewall)
+        assert not EventFilter(categories=frozenset({"authentication"})).matches(firewall)
+        assert not EventFilter(source_types=frozenset({"zeek:conn"})).matches(logon)
+        assert EventFilter().matches(firewall)
+
+    def test_project(self):
+        """Test that documents keep only the listed fields and metadata."""
+        from app.parsers.filtering import EventFilter
+
+        doc = _event(
+            message="logon",
+            host_name="ws01",
+            user_name="alice",
+            user_domain="CORP",
+            raw={"LogonType": "3"},
+        ).to_dict()
+        doc["case_id"] = "case-1"
+
+        projected = EventFilter(fields=("user.name", "host", "missing.path")).project(doc)
+
+        assert set(projected) == {"@timestamp", "_source", "case_id", "user", "host"}
+        assert projected["user"] == {"name": "alice"}
+        assert "_raw" not in EventFilter(drop_raw=True).project(dict(doc))
+
+
+class TestFilteredExecution:
+    """Tests for filtering in ParserExecutor and parser pushdown."""
+
+    async def test_executor_filters_and_projects(self, tmp_path: Path):
+        """Test that rejected events are counted and kept ones projected."""
+        from app.parsers.execution import ParserExecutor
+        from app.parsers.filtering import EventFilter
+        from app.parsers.formats.zeek import ZeekParser
+
+        file_path = tmp_path / "zeek.log"
+        file_path.write_text("\n".join(_zeek_log("conn", 10) + _zeek_log("dns", 5)) + "\n")
+        event_filter = EventFilter(source_types=frozenset({"zeek:dns"}), fields=("source",))
+        executor = ParserExecutor(
+            ZeekParser(),
+            file_path,
+            file_path.name,
+            case_id="case-1",
+            encode=True,
+            event_filter=event_filter,
+        )
+
+        docs = [json.loads(doc) async for doc in executor.iter_documents()]
+
+        assert len(docs) == 5
+        assert set(docs[0]) == {"@timestamp", "_source", "case_id", "source"}
+        assert docs[0]["_source"]["type"] == "zeek:dns"
+        # conn records were skipped by the parser itself
+        assert executor.filtered_events == 0
+
+    def test_zeek_skips_unwanted_log_types(self, tmp_path: Path, monkeypatch):
+        """Test that the Zeek parser never decodes records of rejected log types."""
+        from app.parsers.filtering import EventFilter
+        from app.parsers.formats.zeek import ZeekParser
+
+        file_path = tmp_path / "zeek.log"
+        file_path.write_text("\n".join(_zeek_log("conn", 10) + _zeek_log("dns", 5)) + "\n")
+        parser = ZeekParser()
+        parser.event_filter = EventFilter(categories=frozenset({"network"}))
+        paths = []
+        parse_record = ZeekParser._parse_record
+
+        def record(self, record, types, fields, log_path, *args):
+            paths.append(log_path)
+            return parse_record(self, record, types, fields, log_path, *args)
+
+        monkeypatch.setattr(ZeekParser, "_parse_record", record)
+        assert len(list(parser.parse(file_path))) == 15
+
+        parser.event_filter = EventFilter(source_types=frozenset({"zeek:conn"}))
+        paths.clear()
+        assert len(list(parser.parse(file_path))) == 10
+        assert set(paths) == {"conn"}
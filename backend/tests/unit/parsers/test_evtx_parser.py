@@ -4,7 +4,8 @@ Tests the WindowsEvtxParser class for correct parsing behavior,
 magic byte detection, and ECS field mapping.
 """
 
-from datetime import datetime, timezone
+import struct
+from datetime import UTC, datetime, timedelta, timezone
 from io import BytesIO
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -467,3 +468,406 @@ class TestEvtxToDictConversion:
         assert "name" in result["user"]
         assert "source" in result
         assert "ip" in result["source"]
+
+
+SAMPLE_XML_4624 = """<Event xmlns="http://schemas.microsoft.com/win/2004/08/events/event">
+    <System>
+        <Provider Name="Microsoft-Windows-Security-Auditing"/>
+        <EventID>4624</EventID>
+        <TimeCreated SystemTime="2026-01-15T10:30:00.000000Z"/>
+        <Computer>WORKSTATION01</Computer>
+        <Channel>Security</Channel>
+    </System>
+    <EventData>
+        <Data Name="TargetUserName">jsmith</Data>
+        <Data Name="TargetDomainName">CORP</Data>
+        <Data Name="LogonType">10</Data>
+    </EventData>
+</Event>"""
+
+
+class TestEvtxBinaryXmlDecoding:
+    """Tests for decoding records from binary XML templates."""
+
+    @pytest.fixture
+    def e_nodes(self):
+        """Import python-evtx node types."""
+        pytest.importorskip("Evtx")
+        from Evtx import Nodes
+
+        return Nodes
+
+    @pytest.fixture
+    def evtx_parser(self):
+        """Create an EVTX parser instance."""
+        from app.parsers.formats.evtx import WindowsEvtxParser
+
+        return WindowsEvtxParser()
+
+    def _element(self, e_nodes, tag, *children):
+        node = MagicMock(spec=e_nodes.OpenStartElementNode)
+        node.tag_name.return_value = tag
+        node.children.return_value = [*children, MagicMock(spec=e_nodes.CloseElementNode)]
+        return node
+
+    def _attribute(self, e_nodes, name, value):
+        node = MagicMock(spec=e_nodes.AttributeNode)
+        node.attribute_name.return_value.string.return_value = name
+        node.attribute_value.return_value = value
+        return node
+
+    def _literal(self, e_nodes, text):
+        node = MagicMock(spec=e_nodes.ValueNode)
+        node.children.return_value = [MagicMock(string=MagicMock(return_value=text))]
+        return node
+
+    def _sub(self, e_nodes, index, node_type=0x01):
+        node = MagicMock(spec=e_nodes.NormalSubstitutionNode)
+        # Declared binary fields are not part of the class spec
+        node.index = MagicMock(return_value=index)
+        node.type = MagicMock(return_value=node_type)
+        return node
+
+    def _value(self, e_nodes, text):
+        node = MagicMock(spec=e_nodes.WstringTypeNode)
+        node.string.return_value = text
+        return node
+
+    def _template_4624(self, e_nodes, data_value=None):
+        """Template equivalent to SAMPLE_XML_4624 with values substituted."""
+        lit = lambda text: self._literal(e_nodes, text)  # noqa: E731
+        sub = lambda index: self._sub(e_nodes, index)  # noqa: E731
+        el = lambda tag, *children: self._element(e_nodes, tag, *children)  # noqa: E731
+        attr = lambda name, value: self._attribute(e_nodes, name, value)  # noqa: E731
+
+        event = el(
+            "Event",
+            el(
+                "System",
+                el("Provider", attr("Name", lit("Microsoft-Windows-Security-Auditing"))),
+                el("EventID", sub(0)),
+                el("TimeCreated", attr("SystemTime", sub(1))),
+                el("Computer", sub(2)),
+                el("Channel", lit("Security")),
+            ),
+            el(
+                "EventData",
+                el("Data", attr("Name", lit("TargetUserName")), data_value or sub(3)),
+                el("Data", attr("Name", lit("TargetDomainName")), sub(4)),
+                el("Data", attr("Name", lit("LogonType")), sub(5)),
+            ),
+        )
+        template = MagicMock()
+        template.children.return_value = [event]
+        return template
+
+    def _record(self, e_nodes, template, record_num=1, template_offset=0x200):
+        timestamp = MagicMock(spec=e_nodes.FiletimeTypeNode)
+        timestamp.filetime = MagicMock(
+            return_value=datetime(2026, 1, 15, 10, 30, tzinfo=UTC)
+        )
+
+        root = MagicMock()
+        root.template_instance.return_value.template_offset.return_value = template_offset
+        root.template.return_value = template
+        root.substitutions.return_value = [
+            self._value(e_nodes, "4624"),
+            timestamp,
+            self._value(e_nodes, "WORKSTATION01"),
+            self._value(e_nodes, "jsmith"),
+            self._value(e_nodes, "CORP"),
+            self._value(e_nodes, "10"),
+        ]
+
+        record = MagicMock()
+        record.root.return_value = root
+        record.record_num.return_value = record_num
+        record.xml.return_value = SAMPLE_XML_4624
+        return record
+
+    def test_decode_record(self, e_nodes):
+        """Test that fields are read from template literals and substitutions."""
+        from app.parsers.formats.evtx_binxml import ChunkDecoder
+
+        decoded = ChunkDecoder().decode(self._record(e_nodes, self._template_4624(e_nodes)))
+
+        assert decoded.event_id == "4624"
+        assert decoded.system_time == datetime(2026, 1, 15, 10, 30, tzinfo=UTC)
+        assert decoded.computer == "WORKSTATION01"
+        assert decoded.channel == "Security"
+        assert decoded.provider_name == "Microsoft-Windows-Security-Auditing"
+        assert decoded.data_fields == {
+            "TargetUserName": "jsmith",
+            "TargetDomainName": "CORP",
+            "LogonType": "10",
+        }
+
+    def test_matches_xml_path(self, e_nodes, evtx_parser):
+        """Test that the fast path builds the same event as the XML path."""
+        import xml.etree.ElementTree as ET
+
+        from app.parsers.formats.evtx_binxml import ChunkDecoder
+
+        decoded = ChunkDecoder().decode(self._record(e_nodes, self._template_4624(e_nodes)))
+        fast = evtx_parser._build_event(decoded, "Security.evtx", 1)
+        slow = evtx_parser._parse_record(ET.fromstring(SAMPLE_XML_4624), "Security.evtx", 1)
+
+        assert fast.to_dict() == slow.to_dict()
+
+    def test_template_compiled_once_per_chunk(self, e_nodes):
+        """Test that records sharing a template reuse its compiled plan."""
+        from app.parsers.formats.evtx_binxml import ChunkDecoder
+
+        template = self._template_4624(e_nodes)
+        decoder = ChunkDecoder()
+        records = [self._record(e_nodes, template, record_num=i) for i in range(3)]
+        for record in records:
+            decoder.decode(record)
+
+        assert decoder.templates_compiled == 1
+        assert not records[1].root.return_value.template.called
+
+    def test_nested_binxml_falls_back(self, e_nodes, evtx_parser):
+        """Test that unsupported templates are decoded through the XML path."""
+        from app.parsers.formats.evtx_binxml import ChunkDecoder, UnsupportedRecordError
+
+        nested = self._sub(e_nodes, 3, node_type=e_nodes.NODE_TYPES.BXML)
+        record = self._record(e_nodes, self._template_4624(e_nodes, data_value=nested))
+
+        with pytest.raises(UnsupportedRecordError):
+            ChunkDecoder().decode(record)
+
+        log = MagicMock()
+        log.chunks.return_value = [MagicMock(records=MagicMock(return_value=[record]))]
+        events = list(evtx_parser._parse_log(log, "Security.evtx"))
+
+        assert len(events) == 1
+        assert events[0].user_name == "jsmith"
+        record.xml.assert_called_once()
+
+    def test_fast_decode_disabled(self, e_nodes, evtx_parser):
+        """Test that the XML path can be forced."""
+        record = self._record(e_nodes, self._template_4624(e_nodes))
+        log = MagicMock()
+        log.chunks.return_value = [MagicMock(records=MagicMock(return_value=[record]))]
+
+        evtx_parser.fast_decode = False
+        events = list(evtx_parser._parse_log(log, "Security.evtx"))
+
+        assert events[0].event_action == "user_logon"
+        record.xml.assert_called_once()
+        assert not record.root.called
+
+
+# Substitution value types of the hand-built EVTX files below
+WSTRING, UINT16, UINT32, FILETIME = 0x01, 0x06, 0x08, 0x11
+
+EVENT_NS = "http://schemas.microsoft.com/win/2004/08/events/event"
+
+
+def _el(name: str, attributes=(), *children) -> tuple:
+    return ("el", name, list(attributes), list(children))
+
+
+def _sub(index: int, value_type: int) -> tuple:
+    return (0x0D, index, value_type)
+
+
+def _cond_sub(index: int, value_type: int) -> tuple:
+    return (0x0E, index, value_type)
+
+
+# A logon event template: literals, normal substitutions of several types and
+# a conditional substitution that is null in some records
+LOGON_TEMPLATE = _el(
+    "Event",
+    [("xmlns", EVENT_NS)],
+    _el(
+        "System",
+        [],
+        _el("Provider", [("Name", "Microsoft-Windows-Security-Auditing")]),
+        _el("EventID", [], _sub(0, UINT16)),
+        _el("TimeCreated", [("SystemTime", _sub(1, FILETIME))]),
+        _el("Channel", [], "Security"),
+        _el("Computer", [], _sub(2, WSTRING)),
+    ),
+    _el(
+        "EventData",
+        [],
+        _el("Data", [("Name", "TargetUserName")], _sub(3, WSTRING)),
+        _el("Data", [("Name", "LogonType")], _sub(4, UINT32)),
+        _el("Data", [("Name", "IpAddress")], _cond_sub(5, WSTRING)),
+    ),
+)
+
+
+class _BinXmlWriter:
+    """Writes binary XML at a known chunk offset, inlining each name once."""
+
+    def __init__(self, offset: int, names: dict[str, int]):
+        self.out = bytearray()
+        self.offset = offset
+        self.names = names
+
+    def name(self, name: str, header: int = 0) -> None:
+        # A new name is written inline, after the reference and header bytes
+        at = self.offset + len(self.out) + 4 + header
+        if name in self.names:
+            self.out += struct.pack("<I", self.names[name]) + bytes(header)
+            return
+        self.names[name] = at
+        self.out += struct.pack("<I", at) + bytes(header)
+        self.out += struct.pack("<IHH", 0, 0, len(name)) + name.encode("utf-16-le") + bytes(2)
+
+    def value(self, value: str | tuple) -> None:
+        if isinstance(value, str):
+            self.out += b"\x05\x01" + struct.pack("<H", len(value)) + value.encode("utf-16-le")
+        else:
+            self.out += struct.pack("<BHB", *value)
+
+    def element(self, name: str, attributes: list, children: list) -> None:
+        start = len(self.out)
+        self.out += struct.pack("<BHI", 0x41 if attributes else 0x01, 0xFFFF, 0)
+        self.name(name, header=4 if attributes else 0)
+        attributes_start = len(self.out)
+        for i, (attribute, value) in enumerate(attributes):
+            self.out.append(0x46 if i < len(attributes) - 1 else 0x06)
+            self.name(attribute)
+            self.value(value)
+        if attributes:
+            struct.pack_into("<I", self.out, start + 11, len(self.out) - attributes_start)
+
+        if children:
+            self.out.append(0x02)
+            for child in children:
+                if child[0] == "el":
+                    self.element(*child[1:])
+                else:
+                    self.value(child)
+            self.out.append(0x04)
+        else:
+            self.out.append(0x03)
+        struct.pack_into("<I", self.out, start + 3, len(self.out) - start - 7)
+
+
+def _substitutions(values: list[tuple[int, object]]) -> bytes:
+    declarations, data = bytearray(), bytearray()
+    for value_type, value in values:
+        if value is None:
+            value_type, encoded = 0x00, b""
+        elif value_type == WSTRING:
+            encoded = value.encode("utf-16-le")
+        elif value_type == UINT16:
+            encoded = struct.pack("<H", value)
+        elif value_type == UINT32:
+            encoded = struct.pack("<I", value)
+        else:
+            ticks = (value - datetime(1601, 1, 1, tzinfo=UTC)) // timedelta(microseconds=1)
+            encoded = struct.pack("<Q", ticks * 10)
+        declarations += struct.pack("<HBB", len(encoded), value_type, 0)
+        data += encoded
+    return struct.pack("<I", len(values)) + declarations + data
+
+
+def _build_evtx(template: tuple, records: list[list[tuple[int, object]]]) -> bytes:
+    """Build a one-chunk EVTX file of template instances.
+
+    The first record defines the template inline, the others reference it.
+    """
+    chunk = bytearray(0x10000)
+    names: dict[str, int] = {}
+    offset = 0x200
+    template_offset = None
+    for number, values in enumerate(records, 1):
+        root = bytearray(b"\x0f\x01\x01\x00")
+        resident = template_offset is None
+        if resident:
+            # The definition follows the 10-byte template instance token
+            template_offset = offset + 0x18 + len(root) + 10
+            struct.pack_into("<I", chunk, 0x180 + 4, template_offset)
+        root += b"\x0c\x01" + struct.pack("<II", 1, template_offset)
+        if resident:
+            writer = _BinXmlWriter(template_offset + 0x18, names)
+            writer.out += b"\x0f\x01\x01\x00"
+            writer.element(*template[1:])
+            writer.out.append(0x00)
+            root += struct.pack("<II12xI", 0, 1, len(writer.out)) + writer.out
+        root += _substitutions(values)
+
+        size = (0x18 + len(root) + 4 + 7) // 8 * 8
+        record = struct.pack("<IIQQ", 0x2A2A, size, number, 0) + root
+        chunk[offset : offset + size] = record.ljust(size - 4, b"\x00") + struct.pack("<I", size)
+        last_offset = offset
+        offset += size
+
+    count = len(records)
+    struct.pack_into(
+        "<8sQQQQIII", chunk, 0, b"ElfChnk\x00", 1, count, 1, count, 0x80, last_offset, offset
+    )
+    header = struct.pack("<8sQQQIHHHH", b"ElfFile\x00", 0, 0, count + 1, 0x80, 1, 3, 0x1000, 1)
+    return header.ljust(0x1000, b"\x00") + bytes(chunk)
+
+
+class TestEvtxFastPathEquivalence:
+    """Tests that the binary XML fast path matches the XML path on real records."""
+
+    @pytest.fixture
+    def evtx_file(self, tmp_path) -> Path:
+        """A hand-built EVTX file of logon events sharing one template."""
+        pytest.importorskip("Evtx")
+
+        created = datetime(2026, 1, 15, 10, 30, tzinfo=UTC)
+        records = [
+            [
+                (UINT16, 4624),
+                (FILETIME, created + timedelta(seconds=i)),
+                (WSTRING, "WORKSTATION01"),
+                (WSTRING, user),
+                (UINT32, logon_type),
+                (WSTRING, address),
+            ]
+            for i, (user, logon_type, address) in enumerate(
+                [("jsmith", 10, "10.0.0.5"), ("admin", 3, None), ("svc_backup", 5, "::1")]
+            )
+        ]
+        path = tmp_path / "Security.evtx"
+        path.write_bytes(_build_evtx(LOGON_TEMPLATE, records))
+        return path
+
+    def test_fast_path_matches_xml_path(self, evtx_file):
+        """Test that every record decoded from its template equals the rendered XML parse."""
+        from Evtx.Evtx import Record
+
+        from app.parsers.formats.evtx import WindowsEvtxParser
+
+        parser = WindowsEvtxParser()
+        # The fast path must handle every record on its own
+        with patch.object(Record, "xml", side_effect=AssertionError("XML path used")):
+            fast = [event.to_dict() for event in parser.parse(evtx_file, "Security.evtx")]
+
+        parser.fast_decode = False
+        slow = [event.to_dict() for event in parser.parse(evtx_file, "Security.evtx")]
+
+        assert fast == slow
+        assert len(fast) == 3
+        assert fast[0]["@timestamp"] == "2026-01-15T10:30:00+00:00"
+        assert fast[0]["user"]["name"] == "jsmith"
+        assert fast[1]["_raw"]["IpAddress"] is None
+
+    def test_template_compiled_once(self, evtx_file):
+        """Test that records sharing a template reuse one compiled plan."""
+        from Evtx.Evtx import FileHeader
+
+        from app.parsers.formats.evtx_binxml import ChunkDecoder
+
+        log = FileHeader(evtx_file.read_bytes(), 0)
+        decoder = ChunkDecoder()
+        decoded = [decoder.decode(record) for record in next(log.chunks()).records()]
+
+        assert decoder.templates_compiled == 1
+        assert [record.event_id for record in decoded] == ["4624", "4624", "4624"]
+        assert decoded[2].data_fields == {
+            "TargetUserName": "svc_backup",
+            "LogonType": "5",
+            "IpAddress": "::1",
+        }
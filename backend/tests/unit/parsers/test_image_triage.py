@@ -0,0 +1,184 @@
+"""Unit tests for triaging disk images artifact by artifact.
+
+Tests disk image detection, walking the artifacts of an opened target,
+and parsing them through the archive runner. The target is a stand-in for
+a dissect Target, so no image needs to be built.
+"""
+
+import io
+import json
+from fnmatch import fnmatch
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _jsonl(prefix: str, count: int) -> bytes:
+    lines = [json.dumps({"user": f"{prefix}{i}", "action": "login"}) for i in range(count)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+class _Entry:
+    def __init__(self, path: str, content: bytes | None):
+        self.path = path
+        self.content = content
+
+    def is_file(self) -> bool:
+        return self.content is not None
+
+    def open(self) -> io.BytesIO:
+        return io.BytesIO(self.content)
+
+
+class _Filesystem:
+    def __init__(self, files: dict[str, bytes | None]):
+        self.files = files
+
+    def exists(self, path: str) -> bool:
+        return any(name == path or name.startswith(f"{path}/") for name in self.files)
+
+    def get(self, path: str) -> _Entry:
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return _Entry(path, self.files[path])
+
+    def glob_ext(self, pattern: str):
+        for name in sorted(self.files):
+            if fnmatch(name, pattern) and name.count("/") == pattern.count("/"):
+                yield _Entry(name, self.files[name])
+
+
+class _Target:
+    def __init__(self, files: dict[str, bytes | None]):
+        self.fs = _Filesystem(files)
+
+
+@pytest.fixture
+def files() -> dict[str, bytes | None]:
+    """Files on the system volume of a small image."""
+    return {
+        "sysvol/Windows/Logs/auth.jsonl": _jsonl("auth", 30),
+        "sysvol/Windows/Logs/app.jsonl": _jsonl("app", 20),
+        "sysvol/Windows/Logs/archive.jsonl": None,
+        "sysvol/Windows/Logs/notes.xyz": b"\x00\x01\x02 not evidence",
+        "sysvol/$Extend/$UsnJrnl:$J": b"\x00" * 3000 + b"journal" + b"\x00" * 500,
+    }
+
+
+@pytest.fixture
+def reader_factory(files):
+    from app.parsers.image import ImageReader
+
+    def make(artifacts: list[tuple[str, str]], **kwargs) -> ImageReader:
+        reader = ImageReader(Path("disk.E01"), artifacts=artifacts, **kwargs)
+        reader._target = _Target(files)
+        return reader
+
+    return make
+
+
+class TestDetectImage:
+    """Tests for detect_image."""
+
+    def test_image_types(self):
+        """Test that image containers and raw disks are told apart."""
+        from app.parsers.image import detect_image
+
+        mbr = bytearray(1024)
+        mbr[446] = 0x80
+        mbr[450] = 0x07
+        mbr[510:512] = b"\x55\xaa"
+        gpt = bytearray(1024)
+        gpt[512:520] = b"EFI PART"
+
+        assert detect_image(b"EVF\x09\x0d\x0a\xff\x00\x01") == "ewf"
+        assert detect_image(b"KDMV\x01\x00\x00\x00") == "vmdk"
+        assert detect_image(b"vhdxfile") == "vhdx"
+        assert detect_image(b"QFI\xfb\x00\x00\x00\x03") == "qcow2"
+        assert detect_image(bytes(mbr)) == "raw"
+        assert detect_image(bytes(gpt)) == "raw"
+        assert detect_image(b"\xebR\x90NTFS    \x00\x02") == "raw"
+
+    def test_non_images(self):
+        """Test that evidence files and stray boot signatures are not images."""
+        from app.parsers.image import detect_image
+
+        empty_table = bytearray(1024)
+        empty_table[510:512] = b"\x55\xaa"
+
+        assert detect_image(b'{"a": 1}\n') is None
+        assert detect_image(b"regf" + bytes(1020)) is None
+        assert detect_image(bytes(empty_table)) is None
+
+
+class TestImageReader:
+    """Tests for walking image artifacts."""
+
+    def test_members_carry_parser_hints(self, reader_factory, files):
+        """Test that matching files are yielded with their artifact's parser."""
+        reader = reader_factory([("Windows/Logs/*.jsonl", "json"), ("Missing", "json")])
+
+        members = list(reader.iter_members())
+
+        assert [member.path for member in members] == [
+            "sysvol/Windows/Logs/app.jsonl",
+            "sysvol/Windows/Logs/auth.jsonl",
+        ]
+        assert all(member.hint == "json" for member in members)
+        assert members[1].open().read() == files["sysvol/Windows/Logs/auth.jsonl"]
+        assert members[1].size == len(files["sysvol/Windows/Logs/auth.jsonl"])
+
+    def test_sparse_stream_keeps_content(self, reader_factory, files, monkeypatch):
+        """Test that all-zero blocks are skipped without changing the content."""
+        from app.parsers import image
+
+        monkeypatch.setattr(image, "COPY_BUFFER_BYTES", 1000)
+        reader = reader_factory([("$Extend/$UsnJrnl:$J", "usn_journal")], spool_bytes=100)
+
+        (member,) = reader.iter_members()
+
+        assert member.path == "sysvol/$Extend/$UsnJrnl:$J"
+        assert member.size == 3507
+        assert member.open().read() == files["sysvol/$Extend/$UsnJrnl:$J"]
+
+    def test_skip_and_missing_volume(self, reader_factory):
+        """Test that skipped artifacts are left out and non-Windows images yield nothing."""
+        from app.parsers.image import ImageReader
+
+        reader = reader_factory([("Windows/Logs/*.jsonl", "json")])
+        members = list(reader.iter_members(skip={"sysvol/Windows/Logs/app.jsonl"}))
+        assert [member.path for member in members] == ["sysvol/Windows/Logs/auth.jsonl"]
+
+        empty = ImageReader(Path("disk.raw"))
+        empty._target = _Target({"fs0/etc/passwd": b"root"})
+        assert list(empty.iter_members()) == []
+
+
+class TestImageParsing:
+    """Tests for parsing image artifacts through ArchiveParseRunner."""
+
+    @pytest.fixture(autouse=True)
+    def builtin_parsers(self):
+        from app.parsers.registry import load_builtin_parsers
+
+        load_builtin_parsers()
+
+    async def test_artifacts_parsed(self, reader_factory):
+        """Test that artifacts are parsed and attributed to the image."""
+        from app.parsers.archive import ArchiveParseRunner
+
+        reader = reader_factory([("Windows/Logs/*", "json")])
+        runner = ArchiveParseRunner(reader, "case-1", "evidence-1", max_workers=2)
+        docs = [
+            (member, record, json.loads(doc))
+            async for member, record, doc in runner.iter_documents()
+        ]
+
+        assert len(docs) == 50
+        doc = next(doc for member, record, doc in docs if record == 0 and "auth" in member)
+        assert doc["_source"]["image"] == "disk.E01"
+        assert doc["_source"]["member"] == "sysvol/Windows/Logs/auth.jsonl"
+        assert runner.stats.parsed == 2
+        assert runner.stats.skipped == 1
@@ -0,0 +1,185 @@
+"""Unit tests for the shared JSON-lines reader.
+
+Tests block-wise line splitting, incremental decoding of JSON arrays,
+compressed input, and the JSON-based parsers that read through it.
+"""
+
+import gzip
+import io
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _events(count: int) -> list[dict]:
+    return [
+        {"user": f"user{i}", "action": "login", "note": "a, ] } \\" + "x" * i} for i in range(count)
+    ]
+
+
+class TestLineReader:
+    """Tests for iter_lines and decode_lines."""
+
+    def test_lines_split_across_blocks(self):
+        """Test that lines spanning block boundaries are reassembled."""
+        from app.parsers.jsonl import iter_lines
+
+        lines = [b"short", b"", b"x" * 50, b"last"]
+        stream = io.BytesIO(b"\n".join(lines))
+
+        assert list(iter_lines(stream, block_size=8)) == lines
+
+    def test_decode_lines_numbers_and_skips(self):
+        """Test that blank, comment and malformed lines keep line numbers."""
+        from app.parsers.jsonl import decode_lines
+
+        lines = [b'{"a": 1}', b"", b"# comment", b"{broken", '{"b": 2}\r']
+
+        assert list(decode_lines(lines, start_line=10, comments=True)) == [
+            (10, {"a": 1}),
+            (14, {"b": 2}),
+        ]
+
+    def test_stdlib_fallback(self):
+        """Test that values orjson rejects are still decoded."""
+        from app.parsers.jsonl import loads
+
+        assert math.isnan(loads(b'{"count": NaN}')["count"])
+        assert loads(b'{"name": "caf\xe9"}') == {"name": "caf\ufffd"}
+
+
+class TestJsonArray:
+    """Tests for incremental array decoding."""
+
+    def test_elements_streamed(self):
+        """Test that elements are decoded across many small blocks."""
+        from app.parsers.jsonl import iter_json_array
+
+        events = _events(40)
+        content = json.dumps(events, indent=2).encode()
+
+        assert list(iter_json_array(io.BytesIO(content), block_size=16)) == events
+
+    def test_numbers_and_bom(self):
+        """Test scalars split across blocks and a leading byte order mark."""
+        from app.parsers.jsonl import iter_json_array
+
+        content = '\ufeff  [12345678, 2.5, "x", null, []]'.encode()
+
+        assert list(iter_json_array(io.BytesIO(content), block_size=3)) == [
+            12345678,
+            2.5,
+            "x",
+            None,
+            [],
+        ]
+
+    def test_truncated_array(self):
+        """Test that a truncated array raises after its complete elements."""
+        from app.parsers.jsonl import iter_json_array
+
+        elements = iter_json_array(io.BytesIO(b'[{"a": 1}, {"b": '), block_size=4)
+
+        assert next(elements) == {"a": 1}
+        with pytest.raises(ValueError):
+            next(elements)
+
+
+class TestJsonRecords:
+    """Tests for iter_json_records."""
+
+    def test_formats(self, tmp_path):
+        """Test that arrays, JSONL and pretty-printed documents are told apart."""
+        from app.parsers.jsonl import iter_json_records
+
+        events = _events(5)
+        array = tmp_path / "array.json"
+        array.write_text(json.dumps(events))
+        lines = tmp_path / "events.jsonl"
+        lines.write_text("\n\n".join(json.dumps(event) for event in events))
+        document = tmp_path / "trail.json"
+        document.write_text(json.dumps({"Records": events}, indent=2))
+
+        assert list(iter_json_records(array, block_size=64)) == list(enumerate(events, 1))
+        assert [number for number, _ in iter_json_records(lines)] == [1, 3, 5, 7, 9]
+        assert list(iter_json_records(document, wrappers=("Records",))) == list(
+            enumerate(events, 1)
+        )
+
+    def test_compressed_input(self, tmp_path):
+        """Test that gzip files and streams are decompressed transparently."""
+        from app.parsers.jsonl import iter_json_records
+
+        events = _events(20)
+        content = gzip.compress(json.dumps(events).encode())
+        path = tmp_path / "events.json.gz"
+        path.write_bytes(content)
+
+        assert [record for _, record in iter_json_records(path)] == events
+        assert [record for _, record in iter_json_records(io.BytesIO(content))] == events
+
+    def test_zstd_input(self):
+        """Test that zstd streams are decompressed when zstandard is installed."""
+        zstandard = pytest.importorskip("zstandard")
+        from app.parsers.jsonl import iter_json_records
+
+        content = zstandard.ZstdCompressor().compress(b'{"a": 1}\n{"a": 2}\n')
+
+        assert list(iter_json_records(io.BytesIO(content))) == [(1, {"a": 1}), (2, {"a": 2})]
+
+
+class TestParsersUseReader:
+    """Tests for parsers reading through the shared reader."""
+
+    def test_generic_parser_gzip(self, tmp_path):
+        """Test that compressed JSONL is detected and parsed."""
+        from app.parsers.formats.json import GenericJSONParser
+        from app.parsers.signatures import HeaderSniff
+
+        content = gzip.compress("\n".join(json.dumps(event) for event in _events(30)).encode())
+        path = tmp_path / "events.gz"
+        path.write_bytes(content)
+        parser = GenericJSONParser()
+
+        assert parser.can_parse(Path("events.gz"), HeaderSniff(content[:512]))
+        events = list(parser.parse(path))
+        assert len(events) == 30
+        assert events[-1].source_line == 30
+
+    def test_cloudtrail_array_of_wrappers(self, tmp_path, sample_cloudtrail_events):
+        """Test that CloudTrail wrappers inside an array are expanded."""
+        from app.parsers.formats.json import GenericJSONParser
+
+        path = tmp_path / "trails.json"
+        path.write_text(json.dumps([{"Records": sample_cloudtrail_events}] * 2))
+
+        events = list(GenericJSONParser().parse(path))
+
+        assert len(events) == 2 * len(sample_cloudtrail_events)
+        assert {event.source_type for event in events} == {"aws_cloudtrail"}
+
+    def test_suricata_eve_stream(self):
+        """Test that EVE JSON is read from a binary stream."""
+        from app.parsers.formats.suricata import SuricataParser
+
+        records = [
+            {
+                "timestamp": "2026-01-15T10:30:00.000000+0000",
+                "event_type": "dns",
+                "src_ip": "10.0.0.1",
+            },
+            {
+                "timestamp": "2026-01-15T10:30:01.000000+0000",
+                "event_type": "flow",
+                "src_ip": "10.0.0.2",
+            },
+        ]
+        stream = io.BytesIO("\n".join(json.dumps(record) for record in records).encode())
+
+        events = list(SuricataParser().parse(stream, "eve.json"))
+
+        assert [event.source_line for event in events] == [1, 2]
@@ -0,0 +1,150 @@
+"""Unit tests for the Volatility 3 memory parser.
+
+Tests concurrent plugin runs, OS detection, and the on-disk cache of plugin
+output, using a stand-in for the vol executable.
+"""
+
+import json
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+FAKE_VOL = """#!{python}
+import json, sys, time
+
+args = sys.argv[1:]
+plugin = args[args.index("json") + 1]
+log = {log!r}
+
+with open(log, "a") as f:
+    f.write(json.dumps({{"event": "start", "plugin": plugin, "args": args}}) + "\\n")
+
+time.sleep(0.2)
+if plugin in ("linux.boottime.Boottime", "mac.pslist.PsList"):
+    rows = None
+elif plugin == "windows.pslist.PsList":
+    rows = [{{"PID": 4, "PPID": 0, "ImageFileName": "System"}}]
+elif plugin == "windows.info.Info":
+    rows = [{{"Variable": "NtMajorVersion", "Value": "10"}}]
+else:
+    rows = []
+
+with open(log, "a") as f:
+    f.write(json.dumps({{"event": "end", "plugin": plugin}}) + "\\n")
+if rows is None:
+    sys.exit(1)
+print(json.dumps(rows))
+"""
+
+
+@pytest.fixture
+def vol(tmp_path) -> tuple[Path, Path]:
+    """A fake vol executable and the log of its runs."""
+    log = tmp_path / "vol.log"
+    script = tmp_path / "vol"
+    script.write_text(FAKE_VOL.format(python=sys.executable, log=str(log)))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return script, log
+
+
+@pytest.fixture
+def image(tmp_path) -> Path:
+    path = tmp_path / "memory.raw"
+    path.write_bytes(b"\x00" * 4096)
+    return path
+
+
+def _runs(log: Path) -> list[dict]:
+    if not log.exists():
+        return []
+    return [json.loads(line) for line in log.read_text().splitlines()]
+
+
+def _parser(vol: Path, cache_dir: Path, max_workers: int = 3):
+    from app.parsers.formats.memory import MemoryParser
+
+    parser = MemoryParser(max_workers=max_workers, cache_dir=cache_dir)
+    parser.volatility_path = str(vol)
+    return parser
+
+
+class TestMemoryParser:
+    """Tests for MemoryParser."""
+
+    async def test_plugins_run_concurrently_within_bound(self, vol, image, tmp_path):
+        """Test that plugins overlap but never exceed max_workers."""
+        from app.parsers.formats.memory import PLUGINS
+
+        script, log = vol
+        parser = _parser(script, tmp_path / "cache", max_workers=3)
+
+        events = [event async for event in parser.parse(image, "case-1", "evidence-1")]
+
+        assert parser._os_type == "windows"
+        assert [event.raw_data["PID"] for event in events if event.raw_data.get("PID")] == [4]
+
+        running = peak = 0
+        for run in _runs(log):
+            running += 1 if run["event"] == "start" else -1
+            peak = max(peak, running)
+        assert 1 < peak <= 3
+
+        started = [run for run in _runs(log) if run["event"] == "start"]
+        plugins = {run["plugin"] for run in started}
+        assert {plugin.name for plugin in PLUGINS["windows"]} <= plugins
+        cache_paths = {run["args"][run["args"].index("--cache-path") + 1] for run in started}
+        assert cache_paths == {str(tmp_path / "cache" / "symbols")}
+
+    async def test_cached_output_reused(self, vol, image, tmp_path):
+        """Test that parsing the same image again does not run Volatility."""
+        script, log = vol
+        first = [event.raw_data async for event in _parser(script, tmp_path / "cache").parse(image)]
+        runs = len(_runs(log))
+
+        second = [
+            event.raw_data async for event in _parser(script, tmp_path / "cache").parse(image)
+        ]
+
+        assert second == first
+        assert len(_runs(log)) == runs
+
+    async def test_failed_runs_not_cached(self, vol, image, tmp_path):
+        """Test that plugin failures are retried on the next run."""
+        from app.parsers.formats.memory import OS_PROBES
+
+        script, log = vol
+        parser = _parser(script, tmp_path / "cache")
+        _, probe = OS_PROBES[1]
+
+        for _ in range(2):
+            result = await parser._run_plugin(str(image), "abc", probe)
+            assert "error" in result
+
+        assert [run["plugin"] for run in _runs(log) if run["event"] == "start"] == [probe.name] * 2
+
+    def test_cache_key_includes_version_and_args(self, tmp_path):
+        """Test that cache entries differ by plugin arguments and version."""
+        from app.parsers.formats.memory import PLUGINS
+
+        parser = _parser(Path("vol"), tmp_path)
+        files, keys = PLUGINS["windows"][5], PLUGINS["windows"][6]
+
+        path = parser._result_path("abc", files)
+        assert path != parser._result_path("abc", keys)
+        parser.volatility_version = "9.9.9"
+        assert path != parser._result_path("abc", files)
+
+    def test_image_hash_remembered(self, image, tmp_path):
+        """Test that the image is hashed once per file version."""
+        import hashlib
+
+        parser = _parser(Path("vol"), tmp_path / "cache")
+        expected = hashlib.sha256(image.read_bytes()).hexdigest()
+
+        assert parser._image_hash(str(image)) == expected
+        assert len(list((tmp_path / "cache" / "images").iterdir())) == 1
+        assert parser._image_hash(str(image)) == expected
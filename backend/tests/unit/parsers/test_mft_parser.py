@@ -0,0 +1,172 @@
+"""Unit tests for parallel NTFS MFT parsing.
+
+Tests decoding MFT records without dissect, the precomputed directory path
+map, and parsing record ranges through the split parse runner.
+"""
+
+import struct
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+RECORD_SIZE = 1024
+FILETIME = 133500000000000000  # 2024-01-21
+
+
+def _attribute(attr_type: int, content: bytes) -> bytes:
+    length = (0x18 + len(content) + 7) // 8 * 8
+    header = struct.pack("<IIBBHHHIH", attr_type, length, 0, 0, 0, 0, 0, len(content), 0x18)
+    return (header + b"\x00\x00" + content).ljust(length, b"\x00")
+
+
+def _record(
+    segment: int,
+    name: str,
+    parent: int,
+    directory: bool = False,
+    in_use: bool = True,
+    size: int = 0,
+) -> bytes:
+    """Build an MFT record with SI, FN and DATA attributes and fixups applied."""
+    times = struct.pack("<QQQQ", FILETIME, FILETIME + 10_000_000, FILETIME, FILETIME)
+    encoded = name.encode("utf-16-le")
+    file_name = (
+        struct.pack("<Q", parent | (1 << 48))
+        + times
+        + struct.pack("<QQII", 0, 0, 0, 0)
+        + bytes([len(name), 1])
+        + encoded
+    )
+    attributes = (
+        _attribute(0x10, times + bytes(0x28))
+        + _attribute(0x30, file_name)
+        + _attribute(0x80, bytes(size))
+        + struct.pack("<I", 0xFFFFFFFF)
+    )
+    flags = (0x01 if in_use else 0) | (0x02 if directory else 0)
+    header = struct.pack(
+        "<4sHHQHHHHIIQHHI",
+        b"FILE",
+        0x30,
+        3,
+        0,
+        1,
+        1,
+        0x38,
+        flags,
+        0x38 + len(attributes),
+        RECORD_SIZE,
+        0,
+        0,
+        0,
+        segment,
+    )
+    record = bytearray((header.ljust(0x38, b"\x00") + attributes).ljust(RECORD_SIZE, b"\x00"))
+
+    # Save the last two bytes of each sector and stamp the update sequence number
+    record[0x30:0x32] = b"\x07\x00"
+    for i in (1, 2):
+        end = i * 512
+        record[0x30 + 2 * i : 0x32 + 2 * i] = record[end - 2 : end]
+        record[end - 2 : end] = b"\x07\x00"
+    return bytes(record)
+
+
+@pytest.fixture
+def mft_path(tmp_path) -> Path:
+    """A small MFT: system records, a directory tree, files and an orphan."""
+    records = [_record(0, "$MFT", 5)]
+    records += [bytes(RECORD_SIZE)] * 4
+    records.append(_record(5, ".", 5, directory=True))
+    records.append(_record(6, "Windows", 5, directory=True))
+    records.append(_record(7, "System32", 6, directory=True))
+    records.append(_record(8, "cmd.exe", 7, size=48))
+    records.append(_record(9, "deleted.txt", 6, in_use=False))
+    records.append(_record(10, "orphan.txt", 99))
+    records += [_record(11 + i, f"log{i}.txt", 6, size=16) for i in range(13)]
+
+    path = tmp_path / "$MFT"
+    path.write_bytes(b"".join(records))
+    return path
+
+
+class TestMftRecords:
+    """Tests for decoding MFT records."""
+
+    def test_read_entry(self, mft_path):
+        """Test that a record's attributes are decoded after fixups."""
+        from app.parsers.formats.mft import read_mft_entry
+
+        content = mft_path.read_bytes()
+        entry = read_mft_entry(bytearray(content[8 * RECORD_SIZE : 9 * RECORD_SIZE]), 8)
+
+        assert entry.filename.name == "cmd.exe"
+        assert entry.filename.parent == 7
+        assert entry.data.size == 48
+        assert entry.standard_information.creation_time.year == 2024
+        assert read_mft_entry(bytearray(content[9 * RECORD_SIZE : 10 * RECORD_SIZE]), 9) is None
+
+    def test_directory_paths(self, mft_path):
+        """Test that directory paths are resolved from parent references."""
+        from app.parsers.formats.mft import build_directory_paths
+
+        with open(mft_path, "rb") as f:
+            paths = build_directory_paths(f, RECORD_SIZE)
+
+        assert paths == {5: "", 6: "\\Windows", 7: "\\Windows\\System32"}
+
+
+class TestParallelMft:
+    """Tests for parsing MFT record ranges in a process pool."""
+
+    async def test_ranges_match_full_paths(self, mft_path):
+        """Test that records parsed by range get full paths and keep their numbers."""
+        from app.parsers.formats.mft import NTFSMftParser
+        from app.parsers.split import SplitParseRunner, plan_split
+
+        parser = NTFSMftParser()
+        plan = plan_split(parser, mft_path, 4 * RECORD_SIZE)
+
+        assert [(r.start, r.end) for r in plan.ranges[:2]] == [(0, 4096), (4096, 8192)]
+        map_path = Path(plan.context["directory_paths"])
+
+        runner = SplitParseRunner(parser, plan, mft_path.name, max_workers=2)
+        docs = [doc async for doc in runner.iter_documents()]
+
+        by_name = {doc["file"]["name"]: doc for doc in docs}
+        assert by_name["cmd.exe"]["file"]["path"] == "\\Windows\\System32\\cmd.exe"
+        assert by_name["orphan.txt"]["file"]["path"] == "\\$OrphanFiles\\orphan.txt"
+        assert "deleted.txt" not in by_name
+        assert "$MFT" not in by_name
+        assert [doc["_source"]["line"] for doc in docs] == sorted(
+            doc["_source"]["line"] for doc in docs
+        )
+        assert by_name["log12.txt"]["_source"]["line"] == 23
+        assert not map_path.exists()
+
+    async def test_serial_matches_ranges(self, mft_path):
+        """Test that a serial parse emits the same documents as a split parse."""
+        from app.parsers.formats.mft import NTFSMftParser
+        from app.parsers.split import SplitParseRunner, plan_split
+
+        parser = NTFSMftParser()
+        plan = plan_split(parser, mft_path, 4 * RECORD_SIZE)
+        runner = SplitParseRunner(parser, plan, mft_path.name, max_workers=2)
+        split_docs = [doc async for doc in runner.iter_documents()]
+
+        serial_docs = [event.to_dict() for event in parser.parse(mft_path, mft_path.name)]
+
+        assert serial_docs == split_docs
+        assert {doc["_raw"]["timestamps"]["fn_created"] for doc in serial_docs} != {None}
+
+    def test_non_mft_not_split(self, tmp_path):
+        """Test that files without a FILE signature are parsed serially."""
+        from app.parsers.formats.mft import NTFSMftParser
+        from app.parsers.split import plan_split
+
+        path = tmp_path / "$MFT"
+        path.write_bytes(bytes(16 * RECORD_SIZE))
+
+        assert plan_split(NTFSMftParser(), path, 4 * RECORD_SIZE) is None
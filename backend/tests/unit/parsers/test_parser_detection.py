@@ -0,0 +1,202 @@
+"""Unit tests for parser auto-detection.
+
+Tests the magic byte signature trie, the shared header sniff, and how the
+parser registry uses them and its per-evidence-hash cache to pick a parser.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _make_parser(parser_name: str, magic: list[tuple[int, bytes]], calls: list[str]):
+    """Create a parser class that records can_parse calls and matches its magic."""
+    from app.parsers.base import BaseParser
+
+    class CountingParser(BaseParser):
+        @property
+        def name(self) -> str:
+            return parser_name
+
+        @property
+        def supported_extensions(self) -> list[str]:
+            return [f".{parser_name}"]
+
+        @property
+        def magic_signatures(self) -> list[tuple[int, bytes]]:
+            return magic
+
+        def can_parse(self, file_path: Path | None = None, content: bytes | None = None) -> bool:
+            calls.append(parser_name)
+            if content and magic:
+                return any(content[o : o + len(m)] == m for o, m in magic)
+            return bool(file_path and file_path.suffix == f".{parser_name}")
+
+        def parse(self, source, source_name=None):
+            return iter(())
+
+    return CountingParser
+
+
+class TestSignatureTrie:
+    """Tests for SignatureTrie."""
+
+    def test_match_prefers_longest_signature(self):
+        """Test that longer, more specific signatures are returned first."""
+        from app.parsers.signatures import SignatureTrie
+
+        trie = SignatureTrie()
+        trie.add(0, b"AB", "short")
+        trie.add(0, b"ABCD", "long")
+        trie.add(0, b"XY", "other")
+
+        assert trie.match(b"ABCDEF") == ["long", "short"]
+        assert trie.match(b"ABZ") == ["short"]
+        assert trie.match(b"Q") == []
+
+    def test_match_at_offset(self):
+        """Test that signatures are matched at their declared offset."""
+        from app.parsers.signatures import SignatureTrie
+
+        trie = SignatureTrie()
+        trie.add(4, b"SCCA", "prefetch")
+
+        assert trie.match(b"\x1e\x00\x00\x00SCCA") == ["prefetch"]
+        assert trie.match(b"SCCA") == []
+
+    def test_remove(self):
+        """Test that removing a parser drops all its signatures."""
+        from app.parsers.signatures import SignatureTrie
+
+        trie = SignatureTrie()
+        trie.add(0, b"\xd4\xc3\xb2\xa1", "pcap")
+        trie.add(0, b"\x0a\x0d\x0d\x0a", "pcap")
+        trie.remove("pcap")
+
+        assert trie.match(b"\x0a\x0d\x0d\x0a") == []
+
+
+class TestHeaderSniff:
+    """Tests for the shared header sniff."""
+
+    def test_json_lines_probe(self):
+        """Test that JSON objects are found among the first lines only."""
+        from app.parsers.signatures import HeaderSniff, json_lines
+
+        lines = ["", '{"a": 1}', "not json", "[1, 2]", '{"b": 2}', '{"c": 3}', '{"trunc']
+        sniff = HeaderSniff("\n".join(lines).encode())
+
+        # Leading blank lines are stripped, as the parsers' own checks did
+        assert json_lines(sniff, max_lines=4) == [{"a": 1}, {"b": 2}]
+        assert json_lines(sniff, max_lines=10) == [{"a": 1}, {"b": 2}, {"c": 3}]
+        assert json_lines(bytes(sniff), max_lines=4) == [{"a": 1}, {"b": 2}]
+
+    def test_probe_is_cached(self, monkeypatch):
+        """Test that the header is json-parsed once for every caller."""
+        from app.parsers import signatures
+
+        sniff = signatures.HeaderSniff(b'{"a": 1}\n{"b": 2}\n')
+        signatures.json_lines(sniff)
+
+        monkeypatch.setattr(signatures.json, "loads", pytest.fail)
+        assert signatures.json_lines(sniff, max_lines=1) == [{"a": 1}]
+        assert sniff == b'{"a": 1}\n{"b": 2}\n'
+
+
+class TestRegistryDetection:
+    """Tests for ParserRegistry.find_parser."""
+
+    @pytest.fixture
+    def calls(self) -> list[str]:
+        return []
+
+    @pytest.fixture
+    def registry(self, calls):
+        """Create a registry with one text parser and two magic-byte parsers."""
+        from app.parsers.registry import ParserRegistry
+
+        registry = ParserRegistry()
+        registry.register(_make_parser("text", [], calls))
+        registry.register(_make_parser("alpha", [(0, b"ALPHA")], calls))
+        registry.register(_make_parser("beta", [(0, b"BETA"), (8, b"B2")], calls))
+        return registry
+
+    def test_magic_match_checked_first(self, registry, calls):
+        """Test that a magic byte match is found without asking other parsers."""
+        parser = registry.find_parser(Path("evidence.bin"), b"BETA" + b"\x00" * 100)
+
+        assert parser.name == "beta"
+        assert calls == ["beta"]
+
+    def test_falls_back_to_extension_and_scan(self, registry, calls):
+        """Test that parsers without matching magic are still detected."""
+        assert registry.find_parser(Path("events.text"), b"plain").name == "text"
+        assert calls == ["text"]
+
+        calls.clear()
+        assert registry.find_parser(Path("unknown"), b"nothing") is None
+        assert sorted(calls) == ["alpha", "beta", "text"]
+
+    def test_result_cached_by_evidence_hash(self, registry, calls):
+        """Test that identical evidence is not detected twice."""
+        first = registry.find_parser(Path("a.bin"), b"ALPHA...", evidence_hash="abc")
+        second = registry.find_parser(Path("b.bin"), b"ALPHA...", evidence_hash="abc")
+
+        assert first.name == second.name == "alpha"
+        assert first is not second
+        assert calls == ["alpha"]
+
+    def test_unregister_drops_signatures(self, registry, calls):
+        """Test that unregistered parsers are no longer detected."""
+        registry.unregister("alpha")
+
+        assert registry.find_parser(Path("a.bin"), b"ALPHA...") is None
+        assert "alpha" not in calls
+
+
+class TestBuiltinDetection:
+    """Tests for detecting built-in formats through the global registry."""
+
+    @pytest.fixture(autouse=True)
+    def builtin_parsers(self):
+        from app.parsers.registry import load_builtin_parsers
+
+        load_builtin_parsers()
+
+    def test_binary_formats(self):
+        """Test that binary formats are detected by their magic bytes."""
+        from app.parsers.registry import get_parser
+
+        evtx = get_parser(Path("upload.bin"), b"ElfFile\x00" + b"\x00" * 120)
+        pcap = get_parser(Path("upload.bin"), b"\xd4\xc3\xb2\xa1" + b"\x00" * 20)
+
+        assert evtx.name == "windows_evtx"
+        assert pcap.name == "pcap"
+
+    def test_json_formats(self, monkeypatch):
+        """Test that JSON-line formats are told apart from one shared probe."""
+        from app.parsers import signatures
+        from app.parsers.formats.gcp_audit import GCPAuditLogParser
+        from app.parsers.formats.okta import OktaParser
+
+        line = {
+            "uuid": "1",
+            "published": "2026-01-15T10:30:00Z",
+            "eventType": "user.session.start",
+            "actor": {"alternateId": "admin@example.com"},
+            "outcome": {"result": "SUCCESS"},
+        }
+        sniff = signatures.HeaderSniff((json.dumps(line) + "\n").encode())
+
+        probes = []
+        probe = signatures._probe_json
+        monkeypatch.setattr(
+            signatures, "_probe_json", lambda lines: probes.append(lines) or probe(lines)
+        )
+
+        assert OktaParser().can_parse(Path("export"), sniff)
+        assert not GCPAuditLogParser().can_parse(Path("export"), sniff)
+        assert len(probes) == 1
@@ -0,0 +1,252 @@
+"""Unit tests for the parser execution layer.
+
+Tests that sync and async parsers both run through ParserExecutor, that
+parser errors reach the consumer, and that pre-normalized events from
+get_metadata()-style parsers convert to ECS documents.
+"""
+
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.parsers.base import BaseParser, ParsedEvent, ParserMetadata
+
+pytestmark = pytest.mark.unit
+
+
+class _AsyncStubParser(BaseParser):
+    """Async parser in the style of MemoryParser."""
+
+    def __init__(self, count: int = 3, fail_after: int | None = None):
+        self.count = count
+        self.fail_after = fail_after
+        self.kwargs: dict[str, Any] = {}
+
+    @classmethod
+    def get_metadata(cls) -> ParserMetadata:
+        return ParserMetadata(
+            name="async_stub",
+            display_name="Async Stub",
+            description="Async stub parser",
+            category="memory",
+        )
+
+    async def parse(
+        self,
+        file_path: Path,
+        case_id: str | None = None,
+        evidence_id: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ParsedEvent]:
+        self.kwargs = kwargs
+        for i in range(self.count):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("plugin failed")
+            yield ParsedEvent(
+                timestamp=datetime(2026, 1, 15, 10, 0, i, tzinfo=UTC),
+                message=f"Process {i}",
+                source="volatility3",
+                raw_data={"PID": i},
+                normalized={
+                    "event": {"kind": "event", "category": ["process"], "type": ["info"]},
+                    "process": {"pid": i},
+                    "user": None,
+                },
+                case_id=case_id,
+                evidence_id=evidence_id,
+            )
+
+
+class TestParsedEventNormalized:
+    """Tests for pre-normalized ParsedEvent conversion."""
+
+    def test_normalized_fields_merged(self):
+        """Test that normalized fields are merged and None values dropped."""
+        event = ParsedEvent(
+            timestamp=datetime(2026, 1, 15, tzinfo=UTC),
+            message="Process: cmd.exe",
+            source="volatility3",
+            raw_data={"PID": 4},
+            normalized={"process": {"pid": 4}, "user": None},
+        )
+        doc = event.to_dict()
+
+        assert doc["process"] == {"pid": 4}
+        assert "user" not in doc
+        assert doc["_raw"] == {"PID": 4}
+        assert doc["_source"]["type"] == "volatility3"
+
+    def test_flat_event_unchanged(self):
+        """Test that events without normalized output convert as before."""
+        event = ParsedEvent(
+            timestamp=datetime(2026, 1, 15, tzinfo=UTC),
+            source_type="json",
+            user_name="admin",
+        )
+        doc = event.to_dict()
+
+        assert doc["user"] == {"name": "admin"}
+        assert doc["_source"]["type"] == "json"
+
+
+class TestParsedEventEncoding:
+    """Tests for encoding ParsedEvent to JSON."""
+
+    def test_to_json_matches_to_dict(self):
+        """Test that the encoded document equals to_dict() plus the extra fields."""
+        event = ParsedEvent(
+            timestamp=datetime(2026, 1, 15, 10, 30, tzinfo=UTC),
+            message="login",
+            source_type="json",
+            user_name="admin",
+            raw={"blob": b"\x01\x02", "ids": {7}},
+        )
+
+        doc = json.loads(event.to_json({"case_id": "c1", "evidence_id": "e1"}))
+
+        expected = json.loads(json.dumps(event.to_dict(), default=str))
+        expected["_raw"] = {"blob": "0102", "ids": [7]}
+        assert doc == {**expected, "case_id": "c1", "evidence_id": "e1"}
+        assert doc["@timestamp"] == "2026-01-15T10:30:00+00:00"
+
+    def test_to_json_faster_than_stdlib_encoding(self):
+        """Test that to_json beats encoding to_dict() plus the extra fields with json."""
+        import timeit
+
+        from app.parsers.base import _json_default
+
+        pytest.importorskip("orjson")
+        event = ParsedEvent(
+            timestamp=datetime(2026, 1, 15, 10, 30, tzinfo=UTC),
+            message="Process created",
+            source_type="evtx",
+            source_line=5,
+            event_action="4688",
+            host_name="ws01",
+            user_name="admin",
+            process_name="cmd.exe",
+            process_pid=4242,
+            raw={"EventID": 4688, "Data": {"CommandLine": "cmd /c whoami"}},
+        )
+        extra = {"case_id": "c1", "evidence_id": "e1"}
+
+        def stdlib() -> bytes:
+            doc = event.to_dict()
+            doc.update(extra)
+            return json.dumps(doc, default=_json_default, separators=(",", ":")).encode()
+
+        def best(func) -> float:
+            return min(timeit.repeat(func, number=2000, repeat=5))
+
+        assert json.loads(event.to_json(extra)) == json.loads(stdlib())
+        assert best(lambda: event.to_json(extra)) < best(stdlib) / 1.5
+
+    def test_encode_falls_back_for_wide_integers(self):
+        """Test that values orjson rejects are encoded by the stdlib encoder."""
+        from app.parsers.base import encode_document
+
+        assert json.loads(encode_document({"n": 2**70})) == {"n": 2**70}
+
+    def test_events_are_slotted(self):
+        """Test that events carry no per-instance dict."""
+        event = ParsedEvent(timestamp=datetime(2026, 1, 15, tzinfo=UTC))
+
+        assert not hasattr(event, "__dict__")
+        with pytest.raises(AttributeError):
+            event.undeclared_field = "x"
+
+
+class TestParserExecutor:
+    """Tests for ParserExecutor."""
+
+    async def test_encoded_documents(self, sample_jsonl_file):
+        """Test that encode=True yields JSON bytes carrying the case and evidence IDs."""
+        from app.parsers.execution import ParserExecutor
+        from app.parsers.formats.json import GenericJSONParser
+
+        executor = ParserExecutor(
+            GenericJSONParser(),
+            sample_jsonl_file,
+            sample_jsonl_file.name,
+            case_id="c1",
+            evidence_id="e1",
+            encode=True,
+        )
+        docs = [json.loads(doc) async for doc in executor.iter_documents()]
+
+        assert len(docs) == 3
+        assert {(doc["case_id"], doc["evidence_id"]) for doc in docs} == {("c1", "e1")}
+
+    async def test_sync_parser(self, sample_jsonl_file):
+        """Test that a sync parser runs in a thread and yields documents."""
+        from app.parsers.execution import ParserExecutor
+        from app.parsers.formats.json import GenericJSONParser
+
+        executor = ParserExecutor(
+            GenericJSONParser(), sample_jsonl_file, sample_jsonl_file.name, chunk_size=2
+        )
+        docs = [doc async for doc in executor.iter_documents()]
+
+        assert len(docs) == 3
+        assert docs[0]["_source"]["file"] == sample_jsonl_file.name
+        assert executor.failed_events == 0
+
+    async def test_async_parser(self, tmp_path):
+        """Test that an async parser runs natively and yields documents."""
+        from app.parsers.execution import ParserExecutor, is_async_parser
+
+        parser = _AsyncStubParser(count=5)
+        assert is_async_parser(parser)
+
+        executor = ParserExecutor(
+            parser, tmp_path / "memory.raw", "memory.raw", case_id="c1", evidence_id="e1"
+        )
+        docs = [doc async for doc in executor.iter_documents()]
+
+        assert [doc["process"]["pid"] for doc in docs] == [0, 1, 2, 3, 4]
+
+    async def test_evidence_hash_passed_to_async_parser(self, tmp_path):
+        """Test that the known evidence hash reaches the parser."""
+        from app.parsers.execution import ParserExecutor
+
+        parser = _AsyncStubParser()
+        executor = ParserExecutor(
+            parser, tmp_path / "memory.raw", "memory.raw", evidence_sha256="ab" * 32
+        )
+        docs = [doc async for doc in executor.iter_documents()]
+
+        assert len(docs) == 3
+        assert parser.kwargs["evidence_sha256"] == "ab" * 32
+
+    async def test_parser_error_propagates(self, tmp_path):
+        """Test that an exception raised by the parser reaches the consumer."""
+        from app.parsers.execution import ParserExecutor
+
+        executor = ParserExecutor(
+            _AsyncStubParser(count=5, fail_after=2), tmp_path / "memory.raw", "memory.raw"
+        )
+
+        with pytest.raises(RuntimeError, match="plugin failed"):
+            async for _ in executor.iter_documents():
+                pass
+
+    async def test_early_stop(self, tmp_path, large_json_events):
+        """Test that abandoning iteration stops a blocked sync producer."""
+        from app.parsers.execution import ParserExecutor
+        from app.parsers.formats.json import GenericJSONParser
+
+        file_path = tmp_path / "events.jsonl"
+        file_path.write_text("\n".join(json.dumps(event) for event in large_json_events))
+        executor = ParserExecutor(
+            GenericJSONParser(), file_path, file_path.name, queue_size=1, chunk_size=10
+        )
+
+        documents = executor.iter_documents()
+        first = await documents.__anext__()
+        await documents.aclose()
+
+        assert first["_source"]["line"] == 1
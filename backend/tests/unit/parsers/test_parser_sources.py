@@ -0,0 +1,116 @@
+"""Unit tests for local file access to parser sources.
+
+Tests that streams over local files are used in place, that in-memory
+buffers and other streams are copied from their current position, and
+that temporary copies are cleaned up.
+"""
+
+import gzip
+import io
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+class TestSourcePath:
+    """Tests for source_path."""
+
+    def test_path_is_passed_through(self, tmp_path: Path):
+        """Test that a Path source is yielded unchanged."""
+        from app.parsers.sources import source_path
+
+        path = tmp_path / "evidence.db"
+        path.write_bytes(b"content")
+
+        with source_path(path) as result:
+            assert result == path
+
+    def test_file_stream_uses_its_name(self, tmp_path: Path):
+        """Test that a stream over a regular file is not copied."""
+        from app.parsers.sources import source_path
+
+        path = tmp_path / "evidence.db"
+        path.write_bytes(b"content")
+
+        with open(path, "rb") as f, source_path(f) as result:
+            assert result == path
+
+    def test_buffer_content_from_position(self):
+        """Test that an in-memory buffer is readable through the path."""
+        from app.parsers.sources import source_path
+
+        stream = io.BytesIO(b"skip:content")
+        stream.seek(5)
+
+        with source_path(stream, suffix=".db") as result:
+            assert result.read_bytes() == b"content"
+
+    def test_named_path_for_buffer(self):
+        """Test that a named path is a real file rather than a /proc/self/fd link."""
+        from app.parsers.sources import source_path
+
+        with source_path(io.BytesIO(b"content"), suffix=".db", named=True) as result:
+            assert result.suffix == ".db"
+            assert result.resolve() == result
+            assert result.read_bytes() == b"content"
+
+        assert not result.exists()
+
+    def test_wrapped_stream_is_copied(self, tmp_path: Path):
+        """Test that a decompressing stream yields its decoded content."""
+        from app.parsers.sources import source_path
+
+        path = tmp_path / "evidence.gz"
+        path.write_bytes(gzip.compress(b"decoded"))
+
+        with gzip.open(path, "rb") as f, source_path(f) as result:
+            assert result != path
+            assert result.read_bytes() == b"decoded"
+
+
+class TestSourceMmap:
+    """Tests for source_fd and source_mmap."""
+
+    def test_maps_file_and_buffer(self, tmp_path: Path):
+        """Test that paths and buffers map to the same content."""
+        from app.parsers.sources import source_mmap
+
+        path = tmp_path / "evidence.bin"
+        path.write_bytes(b"ElfFile\x00" * 4)
+
+        with source_mmap(path) as mapped:
+            assert mapped[:8] == b"ElfFile\x00"
+        with source_mmap(io.BytesIO(path.read_bytes())) as mapped:
+            assert len(mapped) == 32
+
+    def test_chunked_stream_copy(self, monkeypatch):
+        """Test that non-buffer streams are copied in bounded chunks."""
+        from app.parsers import sources
+
+        class Reader(io.RawIOBase):
+            def __init__(self, data: bytes):
+                self._data = io.BytesIO(data)
+                self.sizes: list[int] = []
+
+            def readable(self) -> bool:
+                return True
+
+            def read(self, size: int = -1) -> bytes:
+                self.sizes.append(size)
+                return self._data.read(size)
+
+        monkeypatch.setattr(sources, "COPY_BUFFER_BYTES", 4)
+        reader = Reader(b"0123456789")
+
+        with sources.source_mmap(reader) as mapped:
+            assert mapped[:] == b"0123456789"
+        assert all(0 < size <= 4 for size in reader.sizes)
+
+    def test_empty_source_rejected(self):
+        """Test that an empty source cannot be mapped."""
+        from app.parsers.sources import source_mmap
+
+        with pytest.raises(ValueError), source_mmap(io.BytesIO(b"")):
+            pass
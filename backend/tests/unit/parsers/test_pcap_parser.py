@@ -0,0 +1,110 @@
+"""Unit tests for the PCAP parser.
+
+Tests streaming packet parsing, parsing from file-like streams, and the
+bounded flow table that summarizes idle and excess connections.
+"""
+
+from io import BytesIO
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _tcp_session(client_port: int, start: float) -> list:
+    """Build a SYN, SYN-ACK, data, FIN exchange for one TCP connection."""
+    from scapy.all import IP, TCP, Ether
+
+    client = Ether() / IP(src="10.0.0.5", dst="10.0.1.1")
+    server = Ether() / IP(src="10.0.1.1", dst="10.0.0.5")
+    packets = [
+        client / TCP(sport=client_port, dport=443, flags="S"),
+        server / TCP(sport=443, dport=client_port, flags="SA"),
+        client / TCP(sport=client_port, dport=443, flags="A"),
+        client / TCP(sport=client_port, dport=443, flags="FA"),
+    ]
+    for offset, pkt in enumerate(packets):
+        pkt.time = start + offset
+    return packets
+
+
+@pytest.fixture
+def pcap_parser():
+    """Create a PCAP parser instance."""
+    pytest.importorskip("scapy")
+    from app.parsers.formats.pcap import PcapParser
+
+    return PcapParser()
+
+
+@pytest.fixture
+def sample_pcap(tmp_path):
+    """Write a capture with three sequential TCP connections."""
+    pytest.importorskip("scapy")
+    from scapy.all import wrpcap
+
+    packets = []
+    for i in range(3):
+        packets.extend(_tcp_session(50000 + i, 1705314600 + i * 1000))
+
+    file_path = tmp_path / "capture.pcap"
+    wrpcap(str(file_path), packets)
+    return file_path
+
+
+def _summaries(events) -> list:
+    return [e for e in events if e.event_action == "tcp_connection_summary"]
+
+
+class TestPcapParser:
+    """Tests for PcapParser."""
+
+    def test_parse_file(self, pcap_parser, sample_pcap):
+        """Test that packets and connection summaries are parsed from a file."""
+        events = list(pcap_parser.parse(sample_pcap))
+
+        actions = [e.event_action for e in events]
+        assert actions.count("tcp_connection_start") == 3
+        assert actions.count("tcp_connection_end") == 3
+
+        summaries = _summaries(events)
+        assert len(summaries) == 3
+        assert all(s.raw["packet_count"] == 4 for s in summaries)
+        assert all(s.raw["summary_reason"] == "end_of_capture" for s in summaries)
+
+    def test_parse_stream(self, pcap_parser, sample_pcap):
+        """Test that a stream is parsed without a temp file copy."""
+        from_file = list(pcap_parser.parse(sample_pcap, "capture.pcap"))
+        from_stream = list(pcap_parser.parse(BytesIO(sample_pcap.read_bytes()), "capture.pcap"))
+
+        assert [e.event_action for e in from_stream] == [e.event_action for e in from_file]
+
+    def test_idle_flows_summarized_during_parse(self, pcap_parser, sample_pcap, monkeypatch):
+        """Test that idle flows are emitted before the end of the capture."""
+        monkeypatch.setattr("app.parsers.formats.pcap.FLOW_SWEEP_INTERVAL", 1)
+        pcap_parser.flow_idle_timeout = 60
+
+        events = list(pcap_parser.parse(sample_pcap))
+        summaries = _summaries(events)
+
+        assert [s.raw["summary_reason"] for s in summaries] == ["idle", "idle", "end_of_capture"]
+        # The first connection is summarized before the third one starts
+        first_summary = events.index(summaries[0])
+        last_start = max(
+            i for i, e in enumerate(events) if e.event_action == "tcp_connection_start"
+        )
+        assert first_summary < last_start
+
+    def test_flow_table_bounded(self, pcap_parser, sample_pcap):
+        """Test that the oldest flows are summarized when the table is full."""
+        pcap_parser.max_tracked_flows = 1
+
+        summaries = _summaries(pcap_parser.parse(sample_pcap))
+
+        assert len(summaries) == 3
+        assert [s.raw["summary_reason"] for s in summaries] == [
+            "flow_limit",
+            "flow_limit",
+            "end_of_capture",
+        ]
+        assert [s.source_port for s in summaries] == [50000, 50001, 50002]
@@ -0,0 +1,308 @@
+"""Unit tests for split parsing of large line-oriented files.
+
+Tests range planning, record alignment, and that parsing a file range by
+range produces the same events as a serial parse.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _write_jsonl(path: Path, count: int) -> Path:
+    lines = [
+        json.dumps(
+            {
+                "timestamp": "2026-01-15T10:30:00Z",
+                "user": f"user{i}",
+                "action": "login",
+                "ip": "10.0.0.1",
+            }
+        )
+        for i in range(count)
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def _parse_split(parser, file_path: Path, range_bytes: int) -> list[dict]:
+    """Parse every range in-process, shifting line numbers like the runner does."""
+    from app.parsers.split import RangeLines, plan_split
+
+    plan = plan_split(parser, file_path, range_bytes)
+    assert plan is not None
+
+    docs = []
+    line_offset = 0
+    for split_range in plan.ranges:
+        lines = RangeLines(file_path, split_range.start, split_range.end)
+        for event in parser.parse_lines(lines, file_path.name, 1, plan.context):
+            doc = event.to_dict()
+            if "line" in doc["_source"]:
+                doc["_source"]["line"] += line_offset
+            docs.append(doc)
+        line_offset += lines.line_count
+    return docs
+
+
+class TestFindRangeBoundaries:
+    """Tests for record-aligned range planning."""
+
+    def test_ranges_cover_file(self, tmp_path):
+        """Test that ranges are contiguous and cover the whole file."""
+        from app.parsers.split import find_range_boundaries
+
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 200)
+        ranges = find_range_boundaries(file_path, 1000)
+
+        assert len(ranges) > 1
+        assert ranges[0].start == 0
+        assert ranges[-1].end == file_path.stat().st_size
+        for previous, current in zip(ranges, ranges[1:]):
+            assert previous.end == current.start
+
+    def test_ranges_start_on_line(self, tmp_path):
+        """Test that every range starts at the beginning of a line."""
+        from app.parsers.split import find_range_boundaries
+
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 200)
+        data = file_path.read_bytes()
+
+        for split_range in find_range_boundaries(file_path, 777)[1:]:
+            assert data[split_range.start - 1 : split_range.start] == b"\n"
+
+    def test_small_file_single_range(self, tmp_path):
+        """Test that a file smaller than the range size is one range."""
+        from app.parsers.split import find_range_boundaries
+
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 3)
+        assert len(find_range_boundaries(file_path, 1024 * 1024)) == 1
+
+    def test_count_lines_matches_range_lines(self, tmp_path):
+        """Test that counting a range's lines agrees with iterating them."""
+        from app.parsers.split import RangeLines, count_lines, find_range_boundaries
+
+        file_path = tmp_path / "events.log"
+        file_path.write_bytes(b"first\n\nthird line\n" * 40 + b"no newline")
+
+        for split_range in find_range_boundaries(file_path, 37):
+            lines = RangeLines(file_path, split_range.start, split_range.end)
+            list(lines)
+            assert (
+                count_lines(file_path, split_range.start, split_range.end, block_size=16)
+                == lines.line_count
+            )
+
+
+class TestPlanSplit:
+    """Tests for deciding whether a file can be split."""
+
+    @pytest.fixture
+    def json_parser(self):
+        """Create a JSON parser instance."""
+        from app.parsers.formats.json import GenericJSONParser
+
+        return GenericJSONParser()
+
+    def test_jsonl_is_split(self, json_parser, tmp_path):
+        """Test that JSONL files are planned into ranges."""
+        from app.parsers.split import plan_split
+
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 200)
+        plan = plan_split(json_parser, file_path, 1000)
+
+        assert plan is not None
+        assert len(plan.ranges) > 1
+
+    def test_json_array_not_split(self, json_parser, tmp_path, sample_json_events):
+        """Test that a whole JSON array document is parsed serially."""
+        from app.parsers.split import plan_split
+
+        file_path = tmp_path / "events.json"
+        file_path.write_text(json.dumps(sample_json_events * 50, indent=2))
+
+        assert plan_split(json_parser, file_path, 100) is None
+
+    def test_gzip_not_split(self, json_parser, tmp_path):
+        """Test that compressed files are parsed serially."""
+        import gzip
+
+        from app.parsers.split import plan_split
+
+        source = _write_jsonl(tmp_path / "events.jsonl", 200)
+        file_path = tmp_path / "events.jsonl.gz"
+        file_path.write_bytes(gzip.compress(source.read_bytes()))
+
+        assert plan_split(json_parser, file_path, 100) is None
+
+    def test_unsupported_parser_not_split(self, tmp_path):
+        """Test that parsers without split support are parsed serially."""
+        from app.parsers.formats.evtx import WindowsEvtxParser
+        from app.parsers.split import plan_split
+
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 200)
+        assert plan_split(WindowsEvtxParser(), file_path, 1000) is None
+
+
+class TestSplitMatchesSerial:
+    """Tests that split parsing yields the same events as serial parsing."""
+
+    def test_jsonl(self, tmp_path):
+        """Test JSONL split parsing matches a serial parse."""
+        from app.parsers.formats.json import GenericJSONParser
+
+        parser = GenericJSONParser()
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 300)
+
+        serial = [event.to_dict() for event in parser.parse(file_path, file_path.name)]
+        split = _parse_split(parser, file_path, 2000)
+
+        assert len(split) == 300
+        assert [d["_source"]["line"] for d in split] == [d["_source"]["line"] for d in serial]
+        assert [d["user"] for d in split] == [d["user"] for d in serial]
+
+    def test_zeek_uses_header(self, tmp_path):
+        """Test that Zeek ranges are decoded with the file's header block."""
+        from app.parsers.formats.zeek import ZeekParser
+
+        header = [
+            "#separator \\x09",
+            "#set_separator ,",
+            "#empty_field (empty)",
+            "#unset_field -",
+            "#path conn",
+            "#fields ts\tuid\tid.orig_h\tid.orig_p\tid.resp_h\tid.resp_p\tproto",
+            "#types time\tstring\taddr\tport\taddr\tport\tenum",
+        ]
+        rows = [
+            f"1705314600.{i:06d}\tC{i}\t10.0.0.{i % 250}\t{40000 + i}\t10.0.1.1\t443\ttcp"
+            for i in range(300)
+        ]
+        file_path = tmp_path / "conn.log"
+        file_path.write_text("\n".join(header + rows) + "\n")
+
+        parser = ZeekParser()
+        serial = [event.to_dict() for event in parser.parse(file_path, file_path.name)]
+        split = _parse_split(parser, file_path, 2000)
+
+        assert len(serial) == 300
+        assert [d["source"]["port"] for d in split] == [d["source"]["port"] for d in serial]
+        assert [d["_source"]["line"] for d in split] == [d["_source"]["line"] for d in serial]
+
+
+class TestSplitParseRunner:
+    """Tests for the process pool runner."""
+
+    async def test_runner_yields_documents_in_order(self, tmp_path):
+        """Test that the runner yields every document in file order."""
+        from app.parsers.formats.json import GenericJSONParser
+        from app.parsers.split import SplitParseRunner, plan_split
+
+        parser = GenericJSONParser()
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 500)
+        plan = plan_split(parser, file_path, 4000)
+
+        runner = SplitParseRunner(parser, plan, file_path.name, max_workers=2)
+        docs = [doc async for doc in runner.iter_documents()]
+
+        assert len(docs) == 500
+        assert [d["_source"]["line"] for d in docs] == list(range(1, 501))
+        assert runner.ranges_parsed == len(plan.ranges)
+        assert runner.failed_events == 0
+
+    async def test_runner_encodes_documents(self, tmp_path):
+        """Test that encoding runners yield JSON bytes with the case and evidence IDs."""
+        from app.parsers.formats.json import GenericJSONParser
+        from app.parsers.split import SplitParseRunner, plan_split
+
+        parser = GenericJSONParser()
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 500)
+        plan = plan_split(parser, file_path, 4000)
+
+        runner = SplitParseRunner(
+            parser,
+            plan,
+            file_path.name,
+            max_workers=2,
+            case_id="case-1",
+            evidence_id="evidence-1",
+            encode=True,
+        )
+        docs = [doc async for doc in runner.iter_documents()]
+
+        assert all(isinstance(doc, bytes) for doc in docs)
+        decoded = [json.loads(doc) for doc in docs]
+        assert [d["_source"]["line"] for d in decoded] == list(range(1, 501))
+        assert {(d["case_id"], d["evidence_id"]) for d in decoded} == {("case-1", "evidence-1")}
+
+    async def test_runner_resumes_from_position(self, tmp_path):
+        """Test that a runner built from a saved position yields the rest of the file."""
+        from app.parsers.formats.json import GenericJSONParser
+        from app.parsers.split import SplitParseRunner, plan_split
+
+        parser = GenericJSONParser()
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 500)
+        plan = plan_split(parser, file_path, 4000)
+
+        runner = SplitParseRunner(parser, plan, file_path.name, max_workers=2)
+        position = None
+        async for _ in runner.iter_documents():
+            if runner.position["records"] > 0:
+                position = dict(runner.position)
+                break
+        assert position["offset"] == plan.ranges[1].start
+
+        resumed_plan = plan_split(parser, file_path, 4000, start=position["offset"])
+        resumed = SplitParseRunner(
+            parser,
+            resumed_plan,
+            file_path.name,
+            max_workers=2,
+            line_offset=position["line_offset"],
+            first_record=position["records"],
+        )
+        docs = [doc async for doc in resumed.iter_documents()]
+
+        assert resumed_plan.ranges[0].start == position["offset"]
+        assert len(docs) == 500 - position["records"]
+        assert docs[0]["_source"]["line"] == position["line_offset"] + 1
+        assert docs[-1]["_source"]["line"] == 500
+
+    def test_runner_in_daemon_process(self, tmp_path):
+        """Test that the runner can start its pool from a daemonic worker process.
+
+        Celery prefork workers are daemonic, and multiprocessing refuses to
+        start children from them.
+        """
+        import asyncio
+
+        import billiard
+
+        from app.parsers.formats.json import GenericJSONParser
+        from app.parsers.split import SplitParseRunner, plan_split
+
+        parser = GenericJSONParser()
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 500)
+        plan = plan_split(parser, file_path, 4000)
+        context = billiard.get_context("fork")
+        results = context.Queue()
+
+        def run_in_worker() -> None:
+            async def count() -> int:
+                runner = SplitParseRunner(parser, plan, file_path.name, max_workers=2)
+                return len([doc async for doc in runner.iter_documents()])
+
+            try:
+                results.put(asyncio.run(count()))
+            except BaseException as e:
+                results.put(repr(e))
+
+        worker = context.Process(target=run_in_worker, daemon=True)
+        worker.start()
+        try:
+            assert results.get(timeout=60) == 500
+        finally:
+            worker.join(timeout=10)
@@ -0,0 +1,122 @@
+"""Unit tests for the USN journal parser.
+
+Tests the buffered record scanner: skipping sparse regions, resynchronising
+after garbage, records spanning read blocks, and V2/V3 record decoding.
+"""
+
+import io
+import struct
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+FILETIME = 133500000000000000  # 2024-01-21
+
+
+def _record(name: str, usn: int, version: int = 2, reason: int = 0x100) -> bytes:
+    """Build a USN_RECORD_V2/V3 padded to an 8-byte boundary."""
+    encoded = name.encode("utf-16-le")
+    reference = 16 if version == 3 else 8
+    header_size = 60 + 2 * (reference - 8)
+    length = (header_size + len(encoded) + 7) // 8 * 8
+    header = struct.pack(
+        f"<IHH{reference}s{reference}sQQIIIIHH",
+        length,
+        version,
+        0,
+        b"\x01" * reference,
+        b"\x02" * reference,
+        usn,
+        FILETIME,
+        reason,
+        0,
+        0,
+        0x20,
+        len(encoded),
+        header_size,
+    )
+    return (header + encoded).ljust(length, b"\x00")
+
+
+@pytest.fixture
+def journal() -> bytes:
+    """A journal with a sparse head, garbage, and V2 and V3 records."""
+    return b"".join(
+        [
+            bytes(3 * 1024 * 1024 + 4096),
+            _record("first.txt", 1),
+            _record("second.txt", 2, version=3),
+            b"\xff" * 24,
+            bytes(64),
+            _record("third.txt", 3, reason=0x200),
+            bytes(16),
+        ]
+    )
+
+
+class TestUsnScanner:
+    """Tests for UsnScanner."""
+
+    def test_mapped_file(self, tmp_path, journal):
+        """Test that a file is scanned through a memory map."""
+        from app.parsers.formats.usn_journal import UsnScanner
+
+        path = tmp_path / "$J"
+        path.write_bytes(journal)
+        scanner = UsnScanner()
+
+        with open(path, "rb") as f:
+            lengths = [len(record) for record in scanner.scan(f)]
+
+        assert len(lengths) == 3
+        assert scanner.stats.records == 3
+        assert scanner.stats.bytes_scanned == len(journal)
+        assert scanner.stats.sparse_bytes >= 3 * 1024 * 1024 + 4096
+        assert scanner.stats.invalid_bytes == 24
+
+    @pytest.mark.parametrize("block_size", [8, 100, 4096])
+    def test_records_across_blocks(self, journal, block_size):
+        """Test that records split between read blocks are reassembled."""
+        from app.parsers.formats.usn_journal import UsnScanner
+
+        scanner = UsnScanner(block_size=block_size)
+        records = [bytes(record) for record in scanner.scan(io.BytesIO(journal))]
+
+        assert records == [
+            _record("first.txt", 1),
+            _record("second.txt", 2, version=3),
+            _record("third.txt", 3, reason=0x200),
+        ]
+        assert scanner.stats.bytes_scanned == len(journal)
+
+    def test_records_released(self, journal):
+        """Test that yielded views are released once the scan moves on."""
+        from app.parsers.formats.usn_journal import UsnScanner
+
+        records = list(UsnScanner().scan(io.BytesIO(journal)))
+
+        with pytest.raises(ValueError):
+            bytes(records[0])
+
+
+class TestUsnJournalParser:
+    """Tests for UsnJournalParser manual parsing."""
+
+    def test_events(self, tmp_path, journal):
+        """Test that V2 and V3 records become events with scan stats."""
+        from app.parsers.formats.usn_journal import UsnJournalParser
+
+        path = tmp_path / "$J"
+        path.write_bytes(journal)
+        parser = UsnJournalParser()
+
+        events = list(parser.parse(path))
+
+        assert [event.file_name for event in events] == ["first.txt", "second.txt", "third.txt"]
+        assert [event.raw["usn"] for event in events] == [1, 2, 3]
+        assert [event.raw["version"] for event in events] == ["2.0", "3.0", "2.0"]
+        assert events[0].event_action == "file_created"
+        assert events[2].event_action == "file_deleted"
+        assert events[0].timestamp.year == 2024
+        assert parser.scan_stats.to_dict()["records"] == 3
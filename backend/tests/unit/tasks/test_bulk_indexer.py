@@ -0,0 +1,252 @@
+"""Unit tests for the pipelined bulk indexer.
+
+Tests batching by count and size, per-item retry of rejected documents,
+adaptive batch sizing, request-level error handling, and draining for
+checkpoints.
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _bulk_response(statuses: list[int]) -> dict:
+    """Build a bulk API response with one item per status."""
+    items = []
+    for status in statuses:
+        outcome = {"status": status}
+        if status >= 300:
+            outcome["error"] = {"type": "es_rejected_execution_exception"}
+        items.append({"index": outcome})
+    return {"errors": any(status >= 300 for status in statuses), "items": items}
+
+
+def _docs_in_request(call) -> list[dict]:
+    """Decode the source documents of one bulk request."""
+    lines = call.kwargs["operations"].decode().splitlines()
+    return [json.loads(line) for line in lines[1::2]]
+
+
+def _accept_all(operations: bytes) -> dict:
+    return _bulk_response([201] * (operations.count(b"\n") // 2))
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Skip retry backoff sleeps."""
+    monkeypatch.setattr("app.tasks.bulk_indexer.BACKOFF_BASE_SECONDS", 0)
+
+
+@pytest.fixture
+def es():
+    """Create a mock Elasticsearch client that accepts every document."""
+    client = AsyncMock()
+    client.bulk = AsyncMock(side_effect=lambda operations: _accept_all(operations))
+    return client
+
+
+class TestBulkIndexer:
+    """Tests for BulkIndexer."""
+
+    async def test_indexes_all_documents(self, es):
+        """Test that documents are sent in count-bounded batches."""
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        async with BulkIndexer(es, "eleanor-events-test", initial_batch_docs=10) as indexer:
+            for i in range(25):
+                await indexer.add({"event": {"sequence": i}})
+
+        assert indexer.indexed == 25
+        assert indexer.failed == 0
+        assert es.bulk.call_count == 3
+
+        sent = [doc for call in es.bulk.call_args_list for doc in _docs_in_request(call)]
+        assert sorted(doc["event"]["sequence"] for doc in sent) == list(range(25))
+
+    async def test_action_line_targets_index(self, es):
+        """Test that the action line names the index and optional document ID."""
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        async with BulkIndexer(es, "eleanor-events-test") as indexer:
+            await indexer.add({"message": "a"}, doc_id="doc-1")
+
+        action = json.loads(es.bulk.call_args.kwargs["operations"].splitlines()[0])
+        assert action == {"index": {"_index": "eleanor-events-test", "_id": "doc-1"}}
+
+    async def test_batch_bounded_by_bytes(self, es):
+        """Test that a batch is flushed once it reaches the byte limit."""
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        async with BulkIndexer(
+            es, "eleanor-events-test", initial_batch_docs=1000, max_batch_bytes=2048
+        ) as indexer:
+            for _ in range(10):
+                await indexer.add({"message": "x" * 500})
+
+        assert indexer.indexed == 10
+        assert es.bulk.call_count >= 3
+        for call in es.bulk.call_args_list:
+            assert len(call.kwargs["operations"]) < 2048 + 600
+
+    async def test_rejected_items_retried(self, es):
+        """Test that documents rejected with 429 are resent, not counted as failed."""
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        es.bulk.side_effect = [_bulk_response([201, 429, 201, 429]), _bulk_response([201, 201])]
+
+        async with BulkIndexer(es, "eleanor-events-test", initial_batch_docs=400) as indexer:
+            for i in range(4):
+                await indexer.add({"event": {"sequence": i}})
+
+        assert indexer.indexed == 4
+        assert indexer.failed == 0
+        assert indexer.retried == 2
+        assert [d["event"]["sequence"] for d in _docs_in_request(es.bulk.call_args)] == [1, 3]
+        # Rejections shrink the batch size
+        assert indexer.batch_docs < 400
+        assert indexer.throttled == 1
+
+    async def test_permanent_item_failure_counted(self, es):
+        """Test that non-retryable item errors are counted as failed."""
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        es.bulk.side_effect = [_bulk_response([201, 400, 201])]
+
+        async with BulkIndexer(es, "eleanor-events-test") as indexer:
+            for i in range(3):
+                await indexer.add({"event": {"sequence": i}})
+
+        assert indexer.indexed == 2
+        assert indexer.failed == 1
+        assert es.bulk.call_count == 1
+
+    async def test_gives_up_after_max_retries(self, es):
+        """Test that persistently rejected documents are eventually failed."""
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        es.bulk.side_effect = lambda operations: _bulk_response([429])
+
+        async with BulkIndexer(es, "eleanor-events-test", max_retries=2) as indexer:
+            await indexer.add({"message": "a"})
+
+        assert indexer.indexed == 0
+        assert indexer.failed == 1
+        assert es.bulk.call_count == 3
+
+    async def test_request_rejection_retried(self, es):
+        """Test that a whole request rejected with 429 is retried."""
+        from elastic_transport import ApiResponseMeta, HttpHeaders, NodeConfig
+        from elasticsearch import ApiError
+
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        meta = ApiResponseMeta(
+            status=429,
+            http_version="1.1",
+            headers=HttpHeaders(),
+            duration=0.0,
+            node=NodeConfig("http", "localhost", 9200),
+        )
+        es.bulk.side_effect = [
+            ApiError("rejected", meta, {}),
+            _bulk_response([201, 201]),
+        ]
+
+        async with BulkIndexer(es, "eleanor-events-test") as indexer:
+            await indexer.add({"message": "a"})
+            await indexer.add({"message": "b"})
+
+        assert indexer.indexed == 2
+        assert indexer.throttled == 1
+
+    async def test_unexpected_error_counted_as_failed(self, es):
+        """Test that an unexpected client error fails the batch without breaking drain()."""
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        es.bulk.side_effect = [RuntimeError("boom"), _bulk_response([201])]
+
+        async with BulkIndexer(es, "eleanor-events-test", initial_batch_docs=2) as indexer:
+            await indexer.add({"message": "a"})
+            await indexer.add({"message": "b"})
+            await indexer.add({"message": "c"})
+            await indexer.drain()
+
+            assert indexer.failed == 2
+            assert indexer.indexed == 1
+
+    async def test_fast_responses_grow_batch(self, es):
+        """Test that the batch size grows while the cluster keeps up."""
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        async with BulkIndexer(
+            es, "eleanor-events-test", initial_batch_docs=10, max_batch_docs=12
+        ) as indexer:
+            for _ in range(100):
+                await indexer.add({"message": "a"})
+
+        assert indexer.indexed == 100
+        assert indexer.batch_docs == 12
+
+    async def test_requests_overlap(self, es):
+        """Test that several bulk requests are in flight at once."""
+        import asyncio
+
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        in_flight = 0
+        peak = 0
+
+        async def slow_bulk(operations):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _accept_all(operations)
+
+        es.bulk.side_effect = slow_bulk
+
+        async with BulkIndexer(
+            es, "eleanor-events-test", max_in_flight=3, initial_batch_docs=5, max_batch_docs=5
+        ) as indexer:
+            for _ in range(50):
+                await indexer.add({"message": "a"})
+
+        assert indexer.indexed == 50
+        assert peak == 3
+
+    async def test_drain_waits_for_requests(self, es):
+        """Test that drain() returns only once every document is acknowledged."""
+        import asyncio
+
+        from app.tasks.bulk_indexer import BulkIndexer
+
+        async def slow_bulk(operations):
+            await asyncio.sleep(0.01)
+            return _accept_all(operations)
+
+        es.bulk.side_effect = slow_bulk
+
+        async with BulkIndexer(es, "eleanor-events-test", initial_batch_docs=5) as indexer:
+            for _ in range(12):
+                await indexer.add({"message": "a"})
+            await indexer.drain()
+
+            assert indexer.indexed == 12
+            assert indexer.batches == 3
+
+
+class TestDocumentId:
+    """Tests for deterministic document IDs."""
+
+    def test_stable_and_distinct(self):
+        """Test that IDs depend only on the identifying parts."""
+        from app.tasks.bulk_indexer import document_id
+
+        assert document_id("evidence-1", 7) == document_id("evidence-1", 7)
+        assert document_id("evidence-1", 7) != document_id("evidence-1", 8)
+        assert document_id("evidence-1", 7) != document_id("evidence-2", 7)
+        assert len(document_id("evidence-1", 7)) == 32
@@ -0,0 +1,195 @@
+"""Unit tests for resuming parsing jobs from checkpoints.
+
+Tests which checkpoints are reused and that resumed parsing skips the
+records a previous run already indexed, in serial and split mode.
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.parsers.formats.json import GenericJSONParser
+
+pytestmark = pytest.mark.unit
+
+
+def _write_jsonl(path: Path, count: int, fail_every: int = 0) -> Path:
+    lines = [
+        json.dumps(
+            {
+                "user": f"user{i}",
+                "action": "fail" if fail_every and i % fail_every == 0 else "login",
+            }
+        )
+        for i in range(count)
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+class _FailingJSONParser(GenericJSONParser):
+    """JSON parser whose events with action "fail" cannot be converted."""
+
+    def _parse_record(self, record: dict, source_name: str, line_num: int):
+        event = super()._parse_record(record, source_name, line_num)
+        if record.get("action") == "fail":
+            event.timestamp = None
+        return event
+
+
+async def _collect(parser, file_path: Path, config: dict, checkpoint: dict | None) -> list[dict]:
+    from app.tasks._parsing_impl import _iter_documents
+
+    documents = _iter_documents(
+        parser,
+        file_path,
+        file_path.name,
+        "case-1",
+        "evidence-1",
+        config,
+        {"count": 0},
+        checkpoint,
+        {},
+    )
+    return [json.loads(doc) async for doc in documents]
+
+
+class TestResumeCheckpoint:
+    """Tests for choosing the checkpoint to resume from."""
+
+    def _job(self, checkpoint: dict) -> MagicMock:
+        job = MagicMock()
+        job.checkpoint = checkpoint
+        return job
+
+    def test_matching_checkpoint_reused(self):
+        """Test that a checkpoint from the same parser and evidence is used."""
+        from app.parsers.formats.json import GenericJSONParser
+        from app.tasks._parsing_impl import _resume_checkpoint
+
+        parser = GenericJSONParser()
+        evidence = MagicMock(sha256="abc")
+        checkpoint = {"parser": parser.name, "evidence_sha256": "abc", "records": 100}
+
+        assert _resume_checkpoint(self._job(checkpoint), parser.name, evidence, {}) == checkpoint
+
+    @pytest.mark.parametrize(
+        "changes, config",
+        [
+            ({"parser": "windows_evtx"}, {}),
+            ({"evidence_sha256": "changed"}, {}),
+            ({}, {"resume": False}),
+            ({}, {"filter": {"event_ids": ["4624"]}}),
+        ],
+    )
+    def test_stale_checkpoint_discarded(self, changes, config):
+        """Test that checkpoints for other parsers or content are dropped."""
+        from app.parsers.formats.json import GenericJSONParser
+        from app.tasks._parsing_impl import _resume_checkpoint
+
+        parser = GenericJSONParser()
+        checkpoint = {"parser": parser.name, "evidence_sha256": "abc", "records": 100}
+        job = self._job({**checkpoint, **changes})
+
+        assert _resume_checkpoint(job, parser.name, MagicMock(sha256="abc"), config) == {}
+        assert job.checkpoint == {}
+
+
+class TestResumedDocuments:
+    """Tests for skipping already indexed records."""
+
+    async def test_serial_resume_skips_records(self, tmp_path):
+        """Test that a serial parse drops the records before the checkpoint."""
+        from app.parsers.formats.json import GenericJSONParser
+
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 50)
+        docs = await _collect(
+            GenericJSONParser(), file_path, {"split_parsing": False}, {"records": 20}
+        )
+
+        assert len(docs) == 30
+        assert docs[0]["user"] == {"name": "user20"}
+
+    async def test_split_resume_seeks_to_range(self, tmp_path, monkeypatch):
+        """Test that a split parse starts at the checkpoint's range."""
+        from app.parsers.formats.json import GenericJSONParser
+        from app.parsers.split import find_range_boundaries
+        from app.tasks import _parsing_impl
+
+        monkeypatch.setattr(_parsing_impl.settings, "parsing_split_range_bytes", 1000)
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 300)
+        second = find_range_boundaries(file_path, 1000)[1]
+
+        # The checkpoint was taken 5 records into the second range
+        lines_before = file_path.read_bytes()[: second.start].count(b"\n")
+        checkpoint = {
+            "records": lines_before + 5,
+            "split": {"offset": second.start, "line_offset": lines_before, "records": lines_before},
+        }
+        docs = await _collect(
+            GenericJSONParser(), file_path, {"split_parsing": True, "split_workers": 2}, checkpoint
+        )
+
+        assert len(docs) == 300 - lines_before - 5
+        assert docs[0]["user"] == {"name": f"user{lines_before + 5}"}
+        assert docs[0]["_source"]["line"] == lines_before + 6
+
+
+class TestResumedFailureCounts:
+    """Tests for counting conversion failures across a resumed job."""
+
+    async def _run(self, file_path: Path, config: dict, checkpoint: dict, stop_after=None):
+        from app.tasks._parsing_impl import _iter_documents
+
+        failures = {"count": 0}
+        cursor: dict = {}
+        documents = _iter_documents(
+            _FailingJSONParser(),
+            file_path,
+            file_path.name,
+            "case-1",
+            "evidence-1",
+            config,
+            failures,
+            checkpoint,
+            cursor,
+        )
+        count = 0
+        async for _ in documents:
+            count += 1
+            if count == stop_after:
+                await documents.aclose()
+                break
+        return count, failures["count"], cursor
+
+    async def test_serial_resume_counts_earlier_failures(self, tmp_path):
+        """Test that a serial resume counts the failures before the checkpoint."""
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 50, fail_every=10)
+
+        count, failed, _ = await self._run(file_path, {"split_parsing": False}, {"records": 20})
+
+        assert count == 45 - 20
+        assert failed == 5
+
+    async def test_split_resume_carries_earlier_failures(self, tmp_path, monkeypatch):
+        """Test that a split resume adds the failures of the ranges it skips."""
+        from app.tasks import _parsing_impl
+
+        monkeypatch.setattr(_parsing_impl.settings, "parsing_split_range_bytes", 1000)
+        file_path = _write_jsonl(tmp_path / "events.jsonl", 300, fail_every=10)
+        config = {"split_parsing": True, "split_workers": 2}
+
+        # Interrupt the first run a few ranges in, as a checkpoint would
+        count, _, cursor = await self._run(file_path, config, {}, stop_after=100)
+        position = dict(cursor["split"])
+        assert position["offset"] > 0
+        assert position["failed"] > 0
+
+        resumed, failed, _ = await self._run(
+            file_path, config, {"records": count, "split": position}
+        )
+
+        assert count + resumed == 270
+        assert failed == 30
@@ -0,0 +1,258 @@
+"""Unit tests for real-time correlation state stores.
+
+Tests windowed step counting, bounded event retention, claiming and expiry
+in the in-process and Redis stores, and sequence completion in the
+correlation engine.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _ref(event_id: str, step: str) -> dict:
+    return {"event_id": event_id, "step": step, "timestamp": None}
+
+
+class TestInMemoryStateStore:
+    """Tests for InMemoryStateStore."""
+
+    async def test_counts_and_retention(self):
+        """Test that counts are exact while retained events are bounded."""
+        from app.services.correlation_state import InMemoryStateStore
+
+        store = InMemoryStateStore(max_events=3)
+        window = timedelta(minutes=5)
+
+        for i in range(5):
+            state = await store.record(
+                "rule", "user:bob", "failed", _ref(f"e{i}", "failed"), window
+            )
+        state = await store.record("rule", "user:bob", "success", _ref("e5", "success"), window)
+        other = await store.record("rule", "user:eve", "failed", _ref("e6", "failed"), window)
+
+        assert state.counts == {"failed": 5, "success": 1}
+        assert state.first_event_id == "e0"
+        assert state.window_end - state.window_start == window
+        assert other.counts == {"failed": 1}
+
+        events = await store.complete("rule", "user:bob")
+        assert [event["event_id"] for event in events] == ["e3", "e4", "e5"]
+        assert await store.complete("rule", "user:bob") is None
+        assert store.get_stats()["open_windows"] == 1
+
+    async def test_claim_and_release(self):
+        """Test that a window is claimed once and can be claimed again after release."""
+        from app.services.correlation_state import InMemoryStateStore
+
+        store = InMemoryStateStore()
+        window = timedelta(minutes=5)
+        await store.record("rule", "user:bob", "failed", _ref("e0", "failed"), window)
+
+        assert [event["event_id"] for event in await store.claim("rule", "user:bob")] == ["e0"]
+        assert await store.claim("rule", "user:bob") is None
+        assert await store.claim("rule", "user:eve") is None
+
+        # A claimed window stays open and keeps counting
+        state = await store.record("rule", "user:bob", "failed", _ref("e1", "failed"), window)
+        assert state.counts == {"failed": 2}
+
+        await store.release("rule", "user:bob")
+        assert len(await store.claim("rule", "user:bob")) == 2
+
+    async def test_repeated_event_counted_once(self):
+        """Test that recording an event ID again leaves the window unchanged."""
+        from app.services.correlation_state import InMemoryStateStore
+
+        store = InMemoryStateStore()
+        window = timedelta(minutes=5)
+
+        for _ in range(2):
+            await store.record("rule", "user:bob", "failed", _ref("e0", "failed"), window)
+            state = await store.record("rule", "user:bob", "failed", _ref("e1", "failed"), window)
+        await store.record("rule", "user:bob", "failed", _ref(None, "failed"), window)
+        state = await store.record("rule", "user:bob", "failed", _ref(None, "failed"), window)
+
+        assert state.counts == {"failed": 4}
+        events = await store.complete("rule", "user:bob")
+        assert [event["event_id"] for event in events] == ["e0", "e1", None, None]
+
+    async def test_expiry(self):
+        """Test that expired windows restart and are cleaned up."""
+        from app.services.correlation_state import InMemoryStateStore
+
+        store = InMemoryStateStore()
+        await store.record("rule", "user:bob", "failed", _ref("e0", "failed"), timedelta(0))
+        await store.record("rule", "user:eve", "failed", _ref("e1", "failed"), timedelta(0))
+
+        state = await store.record("rule", "user:bob", "failed", _ref("e2", "failed"), timedelta(0))
+        assert state.counts == {"failed": 1}
+        assert state.first_event_id == "e2"
+
+        assert await store.cleanup() == 2
+        assert store.get_stats()["open_windows"] == 0
+
+
+class TestRedisStateStore:
+    """Tests for RedisStateStore."""
+
+    async def test_record(self):
+        """Test that events are recorded by one script call per event."""
+        from app.services.correlation_state import RedisStateStore
+
+        script = AsyncMock(
+            return_value=[
+                b"window_start",
+                b"1700000000000",
+                b"first_event_id",
+                b"e0",
+                b"count:failed",
+                b"4",
+            ]
+        )
+        redis = MagicMock()
+        redis.register_script.return_value = script
+        store = RedisStateStore(redis, max_events=10)
+
+        state = await store.record(
+            "rule", "user:bob", "failed", _ref("e3", "failed"), timedelta(minutes=5)
+        )
+
+        keys = script.await_args.kwargs["keys"]
+        assert keys == [
+            "eleanor:correlation:{rule:user:bob}:counts",
+            "eleanor:correlation:{rule:user:bob}:events",
+            "eleanor:correlation:{rule:user:bob}:seen",
+        ]
+        args = script.await_args.kwargs["args"]
+        assert args[1:3] == [300000, "failed"]
+        assert args[4:] == ["e3", 10]
+
+        assert state.counts == {"failed": 4}
+        assert state.first_event_id == "e0"
+        assert state.window_start == datetime(2023, 11, 14, 22, 13, 20)
+        assert state.window_end == state.window_start + timedelta(minutes=5)
+
+    async def test_claim_and_release(self):
+        """Test that claims are made by one script call and released by clearing the flag."""
+        import json
+
+        from app.services.correlation_state import RedisStateStore
+
+        script = AsyncMock(side_effect=[[json.dumps(_ref("e0", "failed")).encode()], None])
+        redis = MagicMock()
+        redis.register_script.return_value = script
+        redis.hdel = AsyncMock()
+        store = RedisStateStore(redis)
+
+        events = await store.claim("rule", "user:bob")
+        assert [event["event_id"] for event in events] == ["e0"]
+        assert script.await_args.kwargs["keys"][0] == "eleanor:correlation:{rule:user:bob}:counts"
+        assert await store.claim("rule", "user:bob") is None
+
+        await store.release("rule", "user:bob")
+        redis.hdel.assert_awaited_once_with("eleanor:correlation:{rule:user:bob}:counts", "claimed")
+
+    def test_create_state_store(self):
+        """Test backend selection and validation."""
+        from app.services.correlation_state import (
+            InMemoryStateStore,
+            RedisStateStore,
+            create_state_store,
+        )
+
+        assert isinstance(create_state_store("memory"), InMemoryStateStore)
+        assert isinstance(create_state_store("redis", redis=MagicMock()), RedisStateStore)
+        with pytest.raises(ValueError):
+            create_state_store("redis")
+        with pytest.raises(ValueError):
+            create_state_store("postgres")
+
+
+class TestRealtimeSequence:
+    """Tests for real-time sequence rules in the correlation engine."""
+
+    async def test_sequence_completion(self):
+        """Test that a completed sequence is audited once and the window reset."""
+        from app.models.analytics import CorrelationStateStatus, DetectionRule, RuleType
+        from app.services.correlation_engine import CorrelationEngine
+
+        rule = DetectionRule(
+            id=uuid4(),
+            name="Brute force then success",
+            rule_type=RuleType.CORRELATION,
+            query="*",
+            correlation_config={
+                "realtime": True,
+                "pattern_type": "sequence",
+                "window": "5m",
+                "events": [
+                    {"id": "failed", "query": "event.outcome:failure"},
+                    {"id": "success", "query": "event.outcome:success"},
+                ],
+                "join_on": [{"field": "user.name"}],
+                "sequence": {"order": ["failed", "success"]},
+                "thresholds": [{"event": "failed", "count": ">=3"}],
+            },
+        )
+        engine = CorrelationEngine(MagicMock())
+        db = MagicMock()
+
+        def event(i: int, outcome: str) -> dict:
+            return {"_id": f"e{i}", "event": {"outcome": outcome}, "user": {"name": "bob"}}
+
+        events = [event(0, "failure"), event(1, "failure"), event(2, "success")]
+        for e in events:
+            assert await engine.process_realtime_event(e, db, rules=[rule]) == []
+        db.add.assert_not_called()
+
+        match = await engine.process_realtime_event(event(3, "failure"), db, rules=[rule])
+        assert match[0]["event_counts"] == {"failed": 3, "success": 1}
+        assert match[0]["total_events"] == 4
+        assert match[0]["entity_key"] == "user.name:bob"
+
+        audit = db.add.call_args.args[0]
+        assert audit.status == CorrelationStateStatus.COMPLETED
+        assert [e["event_id"] for e in audit.state["matched_events"]] == ["e0", "e1", "e2", "e3"]
+
+        # The claimed window does not complete again before it is closed
+        assert await engine.process_realtime_event(event(4, "failure"), db, rules=[rule]) == []
+        assert db.add.call_count == 1
+
+        # The window restarts once closed
+        await engine.close_realtime_windows(match)
+        assert await engine.process_realtime_event(event(5, "success"), db, rules=[rule]) == []
+        assert engine.state_store.get_stats()["open_windows"] == 1
+
+    async def test_released_sequence_completes_again(self):
+        """Test that a window released after a failed commit completes again."""
+        from app.models.analytics import DetectionRule, RuleType
+        from app.services.correlation_engine import CorrelationEngine
+
+        rule = DetectionRule(
+            id=uuid4(),
+            name="Two failures",
+            rule_type=RuleType.CORRELATION,
+            query="*",
+            correlation_config={
+                "realtime": True,
+                "window": "5m",
+                "events": [{"id": "failed", "query": "event.outcome:failure"}],
+                "join_on": [{"field": "user.name"}],
+                "sequence": {"order": ["failed"]},
+                "thresholds": [{"event": "failed", "count": ">=2"}],
+            },
+        )
+        engine = CorrelationEngine(MagicMock())
+        event = {"event": {"outcome": "failure"}, "user": {"name": "bob"}}
+
+        assert await engine.process_realtime_event(event, MagicMock(), rules=[rule]) == []
+        match = await engine.process_realtime_event(event, MagicMock(), rules=[rule])
+        assert len(match) == 1
+
+        await engine.release_realtime_windows(match)
+        assert len(await engine.process_realtime_event(event, MagicMock(), rules=[rule])) == 1
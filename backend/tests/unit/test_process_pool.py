@@ -0,0 +1,42 @@
+"""Unit tests for the billiard process pool awaited from asyncio."""
+
+import asyncio
+import operator
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+class TestProcessPool:
+    """Tests for ProcessPool."""
+
+    async def test_submit_resolves_results(self):
+        """Test that each job's future resolves with its result."""
+        from app.utils.process_pool import ProcessPool
+
+        async with ProcessPool(2) as pool:
+            results = await asyncio.gather(*(pool.submit(pow, n, 2) for n in range(6)))
+
+        assert results == [0, 1, 4, 9, 16, 25]
+
+    async def test_submit_rejects_errors(self):
+        """Test that a job's exception is raised from its future."""
+        from app.utils.process_pool import ProcessPool
+
+        async with ProcessPool(1) as pool:
+            with pytest.raises(ZeroDivisionError):
+                await pool.submit(operator.truediv, 1, 0)
+
+    async def test_exit_cancels_unfinished_jobs(self):
+        """Test that leaving the pool early cancels unfinished jobs without waiting."""
+        import time
+
+        from app.utils.process_pool import ProcessPool
+
+        started = time.monotonic()
+        async with ProcessPool(2) as pool:
+            futures = [pool.submit(time.sleep, 30) for _ in range(4)]
+
+        assert all(future.cancelled() for future in futures)
+        assert time.monotonic() - started < 20
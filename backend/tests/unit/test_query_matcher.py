@@ -0,0 +1,148 @@
+"""Unit tests for the compiled query matcher.
+
+Tests compiling real-time rule queries and matching them against events.
+"""
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+EVENT = {
+    "_index": "logs-windows",
+    "event": {"module": "sysmon", "code": 4625, "outcome": "failure"},
+    "process": {"name": "powershell.exe", "command_line": "powershell -enc AAAA", "pid": 4242},
+    "user": {"name": "Administrator"},
+    "tags": ["lateral", "brute force"],
+    "threat": [{"technique": {"id": "T1110"}}],
+    "host.name": "dc01",
+    "network": {"encrypted": False},
+    "@timestamp": "2024-01-15T10:00:00Z",
+}
+
+
+def _matches(query: str, event: dict | None = None) -> bool:
+    from app.services.query_matcher import compile_query
+
+    return compile_query(query).matches(EVENT if event is None else event)
+
+
+class TestTerms:
+    """Tests for field terms."""
+
+    @pytest.mark.parametrize(
+        "query,expected",
+        [
+            ("process.name:powershell.exe", True),
+            ('process.name:"powershell.exe"', True),
+            ("process.name:cmd.exe", False),
+            ("process.name:POWERSHELL.EXE", False),
+            ("event.code:4625", True),
+            ("network.encrypted:false", True),
+            ("tags:lateral", True),
+            ('tags:"brute force"', True),
+            ("threat.technique.id:T1110", True),
+            ("host.name:dc01", True),
+            ("missing.field:x", False),
+        ],
+    )
+    def test_exact(self, query, expected):
+        """Test exact comparisons on nested, flattened, array and typed values."""
+        assert _matches(query) is expected
+
+    @pytest.mark.parametrize(
+        "query,expected",
+        [
+            ("process.name:power*", True),
+            ("process.name:*shell.exe", True),
+            ("process.name:powershell.ex?", True),
+            ('process.command_line:*"-enc AAAA"*', True),
+            ('process.command_line:*"-enc BBBB"*', False),
+            ("process.name:*", True),
+            ("process.parent:*", False),
+            ("_exists_:user.name", True),
+            ("process.name:/power[a-z]+\\.exe/", True),
+            ("process.name:/power/", False),
+        ],
+    )
+    def test_wildcards_and_regexes(self, query, expected):
+        """Test wildcard, existence and regular expression terms."""
+        assert _matches(query) is expected
+
+    @pytest.mark.parametrize(
+        "query,expected",
+        [
+            ("process.pid:>4000", True),
+            ("process.pid:>=4242", True),
+            ("process.pid:<4242", False),
+            ("process.pid:[4000 TO 5000]", True),
+            ("process.pid:{4242 TO 5000]", False),
+            ("process.pid:[* TO 4242]", True),
+            ("@timestamp:[2024-01-01 TO 2024-02-01]", True),
+            ("@timestamp:>2024-02-01", False),
+        ],
+    )
+    def test_ranges(self, query, expected):
+        """Test numeric and string ranges."""
+        assert _matches(query) is expected
+
+    def test_unfielded_terms(self):
+        """Test that terms without a field search all values but metadata."""
+        assert _matches("Administrator")
+        assert _matches("*dmin*")
+        assert not _matches("logs-windows")
+        assert _matches("*")
+        assert _matches("")
+
+
+class TestBooleans:
+    """Tests for boolean operators."""
+
+    @pytest.mark.parametrize(
+        "query,expected",
+        [
+            ("event.module:sysmon AND process.name:powershell.exe", True),
+            ("event.module:sysmon AND process.name:cmd.exe", False),
+            ("event.module:zeek OR process.name:powershell.exe", True),
+            ("event.module:zeek process.name:powershell.exe", True),
+            ("event.module:sysmon && NOT user.name:Administrator", False),
+            ("event.module:sysmon AND -process.name:cmd.exe", True),
+            ("!process.name:cmd.exe", True),
+            ("event.module:zeek OR event.module:sysmon AND event.code:1", False),
+            ("(event.module:zeek OR event.module:sysmon) AND event.code:4625", True),
+            ("process.name:(cmd.exe OR powershell.exe)", True),
+            ("process.name:(cmd.exe wscript.exe)", False),
+            ("event.outcome:(failure AND NOT success)", True),
+        ],
+    )
+    def test_operators(self, query, expected):
+        """Test AND, OR, NOT, precedence, grouping and field groups."""
+        assert _matches(query) is expected
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "(process.name:cmd.exe",
+            "process.name:cmd.exe)",
+            "AND user.name:x",
+            "field:[1 TO",
+            'a:"b',
+        ],
+    )
+    def test_syntax_errors(self, query):
+        """Test that malformed queries are rejected."""
+        from app.services.query_matcher import QuerySyntaxError, compile_query
+
+        with pytest.raises(QuerySyntaxError):
+            compile_query(query)
+
+
+class TestCompiledQueryCache:
+    """Tests for get_compiled_query."""
+
+    def test_reuses_compilations(self):
+        """Test that queries are compiled once, and malformed ones never match."""
+        from app.services.query_matcher import get_compiled_query
+
+        assert get_compiled_query("user.name:root") is get_compiled_query("user.name:root")
+        assert not get_compiled_query("(user.name:root").matches(EVENT)
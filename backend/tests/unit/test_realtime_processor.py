@@ -0,0 +1,184 @@
+"""Unit tests for the real-time processor's batch handling.
+
+Tests that alerts raised by a batch of events are inserted, published and
+notified once per batch, that completed correlation windows are closed only
+once the batch is committed, and that failed events are dead-lettered
+together.
+"""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _rule(name: str, query: str):
+    from app.models.analytics import DetectionRule, RuleSeverity, RuleStatus, RuleType
+
+    return DetectionRule(
+        id=uuid4(),
+        name=name,
+        rule_type=RuleType.REALTIME,
+        status=RuleStatus.ENABLED,
+        severity=RuleSeverity.HIGH,
+        query=query,
+        indices=[],
+        data_sources=[],
+    )
+
+
+@pytest.fixture
+def processor():
+    """Processor with a mocked event buffer and preloaded rules."""
+    from app.services.realtime_processor import RealtimeProcessor
+    from app.services.rule_cache import RuleSet
+
+    event_buffer = MagicMock()
+    event_buffer.publish_events_batch = AsyncMock()
+    event_buffer.acknowledge = AsyncMock()
+    event_buffer.move_to_dlq_batch = AsyncMock()
+
+    correlation_engine = MagicMock()
+    correlation_engine.close_realtime_windows = AsyncMock()
+    correlation_engine.release_realtime_windows = AsyncMock()
+
+    processor = RealtimeProcessor(event_buffer, correlation_engine)
+    processor.rule_cache.get = AsyncMock(
+        return_value=RuleSet([_rule("root login", "user.name:root"), _rule("any", "*")])
+    )
+    return processor
+
+
+@pytest.fixture
+def db():
+    """Database session used by the processor."""
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+
+    @asynccontextmanager
+    async def session_maker():
+        yield db
+
+    with patch("app.services.realtime_processor.async_session_maker", session_maker):
+        yield db
+
+
+class TestProcessBatch:
+    """Tests for RealtimeProcessor._process_batch."""
+
+    async def test_alerts_written_once_per_batch(self, processor, db):
+        """Test that a batch's alerts are inserted, published and notified together."""
+        messages = [
+            ("1-0", {"user": {"name": "root"}}),
+            ("2-0", {"user": {"name": "alice"}}),
+            ("3-0", {"user": {"name": "root"}}),
+        ]
+
+        with patch("app.services.realtime_processor.publish_alert", AsyncMock()) as notify:
+            await processor._process_batch(messages, "worker-0")
+
+        # One bulk insert of the alerts and one hit count update
+        assert db.execute.await_count == 2
+        alert_rows = db.execute.await_args_list[0].args[1]
+        assert [row["rule_name"] for row in alert_rows] == [
+            "root login",
+            "any",
+            "any",
+            "root login",
+            "any",
+        ]
+        hit_counts = db.execute.await_args_list[1].args[1]
+        assert sorted(row["hits"] for row in hit_counts) == [2, 3]
+        db.commit.assert_awaited_once()
+
+        processor.event_buffer.publish_events_batch.assert_awaited_once()
+        notifications = processor.event_buffer.publish_events_batch.await_args.args[0]
+        assert len(notifications) == 5
+        notify.assert_awaited_once()
+        assert notify.await_args.args[1]["count"] == 5
+
+        processor.event_buffer.acknowledge.assert_awaited_once_with(["1-0", "2-0", "3-0"])
+        processor.event_buffer.move_to_dlq_batch.assert_not_awaited()
+        assert processor.alerts_generated == 5
+
+    async def test_correlation_windows_closed_after_commit(self, processor, db):
+        """Test that completed windows are closed after the commit, or released if it fails."""
+        from app.models.analytics import RuleType
+
+        correlation = _rule("brute force", "*")
+        correlation.rule_type = RuleType.CORRELATION
+        processor._get_matching_rules = AsyncMock(return_value=[correlation])
+        match = {"rule_id": str(correlation.id), "entity_key": "user.name:root"}
+        engine = processor.correlation_engine
+        engine.process_realtime_event = AsyncMock(return_value=[match])
+        engine.close_realtime_windows.side_effect = lambda matches: db.commit.assert_awaited()
+        messages = [("1-0", {"user": {"name": "root"}})]
+
+        with patch("app.services.realtime_processor.publish_alert", AsyncMock()):
+            await processor._process_batch(messages, "worker-0")
+
+        engine.close_realtime_windows.assert_awaited_once_with([match])
+        engine.release_realtime_windows.assert_not_awaited()
+
+        engine.close_realtime_windows.reset_mock()
+        db.commit.side_effect = RuntimeError("connection lost")
+        with pytest.raises(RuntimeError):
+            await processor._process_batch(messages, "worker-0")
+
+        engine.release_realtime_windows.assert_awaited_once_with([match])
+        engine.close_realtime_windows.assert_not_awaited()
+        # Not acknowledged, so the events are redelivered
+        processor.event_buffer.acknowledge.assert_awaited_once()
+
+    async def test_redelivered_batch_counted_once(self, processor, db):
+        """Test that a batch redelivered after a failed commit is not counted twice."""
+        from app.models.analytics import RuleType
+        from app.services.correlation_engine import CorrelationEngine
+
+        correlation = _rule("brute force", "*")
+        correlation.rule_type = RuleType.CORRELATION
+        correlation.correlation_config = {
+            "realtime": True,
+            "window": "5m",
+            "events": [{"id": "failed", "query": "event.outcome:failure"}],
+            "join_on": [{"field": "user.name"}],
+            "sequence": {"order": ["failed"]},
+            "thresholds": [{"event": "failed", "count": ">=3"}],
+        }
+        processor._get_matching_rules = AsyncMock(return_value=[correlation])
+        processor.correlation_engine = CorrelationEngine(MagicMock())
+        event = {"event": {"outcome": "failure"}, "user": {"name": "root"}}
+        messages = [("1-0", event), ("2-0", event)]
+
+        db.commit.side_effect = RuntimeError("connection lost")
+        with pytest.raises(RuntimeError):
+            await processor._process_batch(messages, "worker-0")
+
+        db.commit.side_effect = None
+        with patch("app.services.realtime_processor.publish_alert", AsyncMock()):
+            await processor._process_batch(messages, "worker-0")
+            assert processor.correlations_matched == 0
+
+            await processor._process_batch([("3-0", event)], "worker-0")
+
+        assert processor.correlations_matched == 1
+        alert_rows = db.execute.await_args_list[-2].args[1]
+        assert alert_rows[0]["rule_name"] == "brute force"
+
+    async def test_failures_dead_lettered_together(self, processor, db):
+        """Test that failed events are moved to the DLQ in one call."""
+        processor._get_matching_rules = AsyncMock(side_effect=[[], RuntimeError("boom")])
+        messages = [("1-0", {"user": {"name": "root"}}), ("2-0", {"user": {"name": "root"}})]
+
+        with patch("app.services.realtime_processor.publish_alert", AsyncMock()) as notify:
+            await processor._process_batch(messages, "worker-0")
+
+        db.execute.assert_not_awaited()
+        notify.assert_not_awaited()
+        processor.event_buffer.acknowledge.assert_awaited_once_with(["1-0"])
+        failures = processor.event_buffer.move_to_dlq_batch.await_args.args[0]
+        assert [(message_id, error) for message_id, _, error in failures] == [("2-0", "boom")]
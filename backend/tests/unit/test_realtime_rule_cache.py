@@ -0,0 +1,116 @@
+"""Unit tests for the real-time processor's rule cache.
+
+Tests selecting rules by index and data source, loading and invalidating
+the cache, and publishing rule change notifications.
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _rule(name: str, rule_type=None, indices=None, data_sources=None, realtime=True):
+    from app.models.analytics import DetectionRule, RuleStatus, RuleType
+
+    rule_type = rule_type or RuleType.REALTIME
+    return DetectionRule(
+        id=uuid4(),
+        name=name,
+        rule_type=rule_type,
+        status=RuleStatus.ENABLED,
+        query="*",
+        indices=indices or [],
+        data_sources=data_sources or [],
+        correlation_config={"realtime": realtime} if rule_type == RuleType.CORRELATION else None,
+    )
+
+
+def _session(rules: list) -> MagicMock:
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = rules
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+class TestRuleSet:
+    """Tests for RuleSet selection."""
+
+    def test_rules_for(self):
+        """Test selection by exact and wildcard index patterns and data sources."""
+        from app.services.rule_cache import RuleSet
+
+        anywhere = _rule("anywhere")
+        windows = _rule("windows", indices=["winlogbeat-*"])
+        exact = _rule("exact", indices=["logs-2024.01"], data_sources=["sysmon"])
+        zeek = _rule("zeek", data_sources=["zeek"])
+        rule_set = RuleSet([anywhere, windows, exact, zeek])
+
+        assert rule_set.rules_for("winlogbeat-2024.01", "sysmon") == [anywhere, windows]
+        assert rule_set.rules_for("logs-2024.01", "sysmon") == [anywhere, exact]
+        assert rule_set.rules_for("logs-2024X01", "sysmon") == [anywhere]
+        assert rule_set.rules_for("logs-2024.01", "zeek") == [anywhere, zeek]
+        assert rule_set.rules_for("winlogbeat-1", "sysmon") is rule_set.rules_for(
+            "winlogbeat-1", "sysmon"
+        )
+
+
+class TestRealtimeRuleCache:
+    """Tests for RealtimeRuleCache."""
+
+    async def test_loads_once_until_invalidated(self):
+        """Test that rules are queried once and reloaded after invalidation."""
+        from app.models.analytics import RuleType
+        from app.services.rule_cache import RealtimeRuleCache
+
+        realtime = _rule("realtime")
+        correlation = _rule("correlation", rule_type=RuleType.CORRELATION)
+        batch_only = _rule("batch only", rule_type=RuleType.CORRELATION, realtime=False)
+        db = _session([realtime, correlation, batch_only])
+        cache = RealtimeRuleCache()
+
+        first = await cache.get(db)
+        second = await cache.get(db)
+
+        assert first is second
+        assert first.rules == [realtime, correlation]
+        assert db.execute.await_count == 1
+        assert db.expunge.call_count == 3
+
+        cache.invalidate()
+        assert await cache.get(db) is not first
+        assert db.execute.await_count == 2
+        assert cache.get_stats() == {"rules": 2, "loads": 2, "invalidations": 1}
+
+    async def test_ttl(self):
+        """Test that rules are reloaded once the TTL has passed."""
+        from app.services.rule_cache import RealtimeRuleCache
+
+        db = _session([_rule("realtime")])
+        cache = RealtimeRuleCache(ttl=0)
+
+        await cache.get(db)
+        await cache.get(db)
+
+        assert db.execute.await_count == 2
+
+    async def test_notify_rules_changed(self):
+        """Test that changes are published, and publish failures swallowed."""
+        from app.services.rule_cache import RULE_CHANGES_CHANNEL, notify_rules_changed
+
+        redis = MagicMock()
+        redis.publish = AsyncMock()
+        rule_id = uuid4()
+
+        await notify_rules_changed(redis, rule_id, "enabled")
+
+        channel, message = redis.publish.await_args.args
+        assert channel == RULE_CHANGES_CHANNEL
+        assert json.loads(message) == {"rule_id": str(rule_id), "action": "enabled"}
+
+        redis.publish = AsyncMock(side_effect=ConnectionError("down"))
+        await notify_rules_changed(redis, rule_id, "deleted")
@@ -0,0 +1,422 @@
+"""Unit tests for the Sigma engine's compiled matching.
+
+Tests compiling rule detections into matcher trees, field modifiers,
+condition parsing, the prefilter index, batch matching, cached rule
+loading, and matching events through SigmaEngine.
+"""
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _matches(detection: dict, event: dict) -> bool:
+    from app.detection.sigma_compiler import EventContext, compile_rule
+
+    return compile_rule("rule-1", detection).matches(EventContext(event))
+
+
+class TestCompileRule:
+    """Tests for compile_rule."""
+
+    def test_field_modifiers(self):
+        """Test the value modifiers written after the field name."""
+        event = {"process": {"command_line": "C:\\Windows\\cmd.exe /c whoami", "pid": 4120}}
+
+        assert _matches(
+            {"sel": {"process.command_line|contains": "WHOAMI"}, "condition": "sel"}, event
+        )
+        assert _matches(
+            {"sel": {"process.command_line|endswith": ["/c dir", "whoami"]}, "condition": "sel"},
+            event,
+        )
+        assert not _matches(
+            {"sel": {"process.command_line|contains|all": ["cmd", "dir"]}, "condition": "sel"},
+            event,
+        )
+        assert _matches(
+            {"sel": {"process.command_line|re": r"\\cmd\.EXE\s"}, "condition": "sel"}, event
+        )
+        assert not _matches(
+            {"sel": {"process.command_line|cased|contains": "WHOAMI"}, "condition": "sel"}, event
+        )
+        assert _matches({"sel": {"process.pid|gte": 4000}, "condition": "sel"}, event)
+        assert _matches({"sel": {"user.name|exists": False}, "condition": "sel"}, event)
+
+    def test_values_and_wildcards(self):
+        """Test exact values, wildcards, escapes, nulls and list-valued fields."""
+        event = {
+            "EventID": 4624,
+            "TargetUserName": "Admin*",
+            "source.ip": "10.1.2.3",
+            "event": {"category": ["authentication", "session"]},
+        }
+
+        assert _matches({"sel": {"EventID": [4624, 4625]}, "condition": "sel"}, event)
+        assert _matches({"sel": {"TargetUserName": "adm?n\\*"}, "condition": "sel"}, event)
+        assert not _matches({"sel": {"TargetUserName": "admin\\*x"}, "condition": "sel"}, event)
+        assert _matches({"sel": {"source.ip|cidr": "10.0.0.0/8"}, "condition": "sel"}, event)
+        assert _matches({"sel": {"event.category": "session"}, "condition": "sel"}, event)
+        assert _matches({"sel": {"LogonType": None}, "condition": "sel"}, event)
+        assert _matches({"keywords": ["*dmin*"], "condition": "keywords"}, event)
+
+    def test_conditions(self):
+        """Test boolean operators, precedence and x of patterns."""
+        event = {"a": "1", "b": "2"}
+        detection = {
+            "sel_a": {"a": "1"},
+            "sel_b": {"b": "2"},
+            "filter": {"b": "3"},
+        }
+
+        def check(condition: str) -> bool:
+            return _matches({**detection, "condition": condition}, event)
+
+        assert check("sel_a and not filter")
+        assert check("filter or sel_a and sel_b")
+        assert not check("(filter or sel_a) and not sel_b")
+        assert check("all of sel_* and not filter")
+        assert check("1 of them")
+        assert not check("all of them")
+        assert check(["filter", "sel_b"])
+
+    def test_unsupported(self):
+        """Test that unsupported constructs are rejected at compile time."""
+        from app.detection.sigma_compiler import SigmaCompileError, compile_rule
+
+        with pytest.raises(SigmaCompileError, match="aggregation"):
+            compile_rule("r", {"sel": {"a": "1"}, "condition": "sel | count() > 5"})
+        with pytest.raises(SigmaCompileError, match="Unknown selection"):
+            compile_rule("r", {"sel": {"a": "1"}, "condition": "selection"})
+        with pytest.raises(SigmaCompileError, match="modifier"):
+            compile_rule("r", {"sel": {"a|base64": "x"}, "condition": "sel"})
+
+    def test_compiled_rules_pickle(self):
+        """Test that compiled rules survive pickling."""
+        from app.detection.sigma_compiler import EventContext, compile_rule
+
+        compiled = compile_rule(
+            "rule-1",
+            {"sel": {"a|re": "^x+$", "b|contains": "y*z"}, "condition": "sel"},
+        )
+        restored = pickle.loads(pickle.dumps(compiled))
+
+        assert restored.matches(EventContext({"a": "XX", "b": "ayyz"}))
+        assert [field.name for field in restored.fields] == ["a", "b"]
+
+
+class TestSigmaEngine:
+    """Tests for matching events through SigmaEngine."""
+
+    async def test_load_and_match(self, tmp_path: Path):
+        """Test that loaded rules are compiled and matched with their fields."""
+        from app.detection.sigma_engine import SigmaEngine
+
+        (tmp_path / "rules.yml").write_text(
+            """
+title: Whoami
+id: rule-whoami
+detection:
+    selection:
+        process.name|endswith: whoami.exe
+    condition: selection
+---
+title: Counted
+id: rule-count
+detection:
+    selection:
+        event.code: "4625"
+    condition: selection | count() > 10
+"""
+        )
+        engine = SigmaEngine(rules_path=tmp_path)
+
+        assert await engine.load_rules() == 2
+        assert engine._compiled_rules["rule-count"] is None
+
+        matches = await engine.match_event(
+            {"process": {"name": "C:\\Windows\\System32\\WHOAMI.EXE"}, "event": {"code": "4625"}}
+        )
+
+        assert [match.rule.rule_id for match in matches] == ["rule-whoami"]
+        assert matches[0].matched_fields == {"process.name": "C:\\Windows\\System32\\WHOAMI.EXE"}
+
+
+class TestSigmaRuleIndex:
+    """Tests for prefiltering candidate rules."""
+
+    def test_rule_anchors(self):
+        """Test that anchors are literals every match must contain."""
+        from app.detection.sigma_compiler import compile_rule
+        from app.detection.sigma_index import rule_anchors
+
+        def anchors(detection: dict):
+            return rule_anchors(compile_rule("r", detection))
+
+        assert anchors(
+            {
+                "sel": {"EventID": 1, "Image|endswith": "\\whoami.exe"},
+                "condition": "sel",
+            }
+        ) == [("exact", "EventID", "1")]
+        assert anchors(
+            {
+                "a": {"CommandLine|contains": "-enc"},
+                "b": {"Image": "*\\powershell*.exe"},
+                "condition": "a or b",
+            }
+        ) == [("substring", "CommandLine", "-enc"), ("substring", "Image", "\\powershell")]
+        assert anchors({"sel": {"CommandLine|re": "x+"}, "condition": "sel"}) is None
+        assert anchors({"sel": {"a": "1"}, "condition": "not sel"}) is None
+
+    @pytest.mark.parametrize("native", [True, False])
+    def test_automaton(self, native, monkeypatch):
+        """Test substring matching with and without pyahocorasick."""
+        from app.detection import sigma_index
+
+        if native and not sigma_index.AHOCORASICK_AVAILABLE:
+            pytest.skip("pyahocorasick not installed")
+        monkeypatch.setattr(sigma_index, "AHOCORASICK_AVAILABLE", native)
+        automaton = sigma_index.SubstringAutomaton(
+            {"he": {1}, "she": {2}, "hers": {3}, "his": {4}, "xyz": {5}}
+        )
+
+        found = set()
+        for payload in automaton.iter_matches("ushers"):
+            found |= payload
+
+        assert found == {1, 2, 3}
+
+    async def test_candidates_and_stats(self, tmp_path: Path):
+        """Test that only candidate rules are evaluated, with the same results."""
+        from app.detection.sigma_compiler import EventContext
+        from app.detection.sigma_engine import SigmaEngine
+
+        (tmp_path / "rules.yml").write_text(
+            """
+title: Logon
+id: logon
+logsource: {product: windows, service: security}
+detection:
+    selection: {event.code: "4624"}
+    condition: selection
+---
+title: Encoded
+id: encoded
+logsource: {product: windows, category: process_creation}
+detection:
+    selection: {process.command_line|contains: " -enc "}
+    condition: selection
+---
+title: Not system
+id: not-system
+logsource: {product: linux}
+detection:
+    selection: {user.name: root}
+    condition: not selection
+"""
+        )
+        engine = SigmaEngine(rules_path=tmp_path)
+        await engine.load_rules()
+        event = {
+            "event": {"code": "4688"},
+            "process": {"command_line": "powershell.exe -ENC SQBFAFgA"},
+            "user": {"name": "alice"},
+        }
+
+        index = engine._get_index()
+        positions = index.candidates_for(EventContext(event))
+        assert [index.rule_ids[position] for position in positions] == ["encoded", "not-system"]
+
+        matches = await engine.match_event(event)
+        assert [match.rule.rule_id for match in matches] == ["encoded", "not-system"]
+        matches = await engine.match_event(event, logsource={"product": "windows"})
+        assert [match.rule.rule_id for match in matches] == ["encoded"]
+
+        stats = engine.get_index_stats()
+        assert stats["indexed_rules"] == 2
+        assert stats["unindexed_rules"] == 1
+        assert stats["events"] == 3
+        assert stats["candidates"] == 5
+
+
+class TestBatchMatching:
+    """Tests for column-wise batch matching."""
+
+    async def test_batch_agrees_with_events(self, tmp_path: Path):
+        """Test that batch bitmaps equal matching the events one by one."""
+        from app.detection.sigma_compiler import bitmap_rows
+        from app.detection.sigma_engine import SigmaEngine
+
+        (tmp_path / "rules.yml").write_text(
+            """
+title: Encoded PowerShell
+id: encoded
+detection:
+    image: {process.name|endswith: powershell.exe}
+    flags: {process.command_line|contains|all: [" -nop", " -enc"]}
+    condition: image and flags
+---
+title: Logon without domain
+id: no-domain
+detection:
+    logon: {event.code: ["4624", "4625"]}
+    domain: {user.domain: null}
+    condition: logon and domain
+---
+title: Not alice
+id: not-alice
+detection:
+    selection: {user.name|exists: true}
+    alice: {user.name: alice}
+    condition: selection and not alice
+---
+title: Mimikatz
+id: keywords
+detection:
+    keywords: ["*sekurlsa::*"]
+    condition: keywords
+"""
+        )
+        engine = SigmaEngine(rules_path=tmp_path)
+        await engine.load_rules()
+        events = [
+            {"event": {"code": "4624"}, "user": {"name": "alice", "domain": "CORP"}},
+            {"event": {"code": "4625"}, "user": {"name": "bob"}},
+            {
+                "process": {
+                    "name": "PowerShell.exe",
+                    "command_line": "powershell -NoP -NonI -Enc SQBFAFgA",
+                }
+            },
+            {"process": {"name": "powershell.exe", "command_line": "powershell -enc x"}},
+            {"message": "mimikatz # sekurlsa::logonpasswords", "user": {"name": "Alice"}},
+        ] * 30
+
+        bitmaps = await engine.match_batch(events)
+
+        expected: dict[str, list[int]] = {}
+        for row, event in enumerate(events):
+            for match in await engine.match_event(event):
+                expected.setdefault(match.rule.rule_id, []).append(row)
+        assert {rule_id: bitmap_rows(bitmap) for rule_id, bitmap in bitmaps.items()} == expected
+        assert bitmap_rows(bitmaps["encoded"])[:2] == [2, 7]
+        assert engine.get_index_stats()["batches"] == 1
+        assert await engine.match_batch([]) == {}
+
+
+def _rule_yaml(rule_id: str, value: str) -> str:
+    return f"""
+title: Rule {rule_id}
+id: {rule_id}
+detection:
+    selection: {{process.name: {value}}}
+    condition: selection
+"""
+
+
+class TestRuleLoading:
+    """Tests for cached and incremental rule loading."""
+
+    async def test_incremental_reload(self, tmp_path: Path, monkeypatch):
+        """Test that only added or changed files are parsed on reload."""
+        import os
+
+        from app.detection import sigma_engine
+        from app.detection.sigma_engine import SigmaEngine
+
+        rules = tmp_path / "rules"
+        rules.mkdir()
+        (rules / "a.yml").write_text(_rule_yaml("a", "a.exe"))
+        (rules / "b.yaml").write_text(_rule_yaml("b", "b.exe"))
+        (rules / "broken.yml").write_text("title: [unclosed")
+        parsed: list[str] = []
+        parse = sigma_engine._parse_rule_files
+
+        def tracking_parse(files):
+            parsed.extend(Path(path).name for path, *_ in files)
+            return parse(files)
+
+        monkeypatch.setattr(sigma_engine, "_parse_rule_files", tracking_parse)
+        engine = SigmaEngine(rules_path=rules)
+
+        assert await engine.load_rules() == 2
+        assert sorted(parsed) == ["a.yml", "b.yaml", "broken.yml"]
+
+        parsed.clear()
+        (rules / "b.yaml").write_text(_rule_yaml("b", "c.exe"))
+        stat = (rules / "a.yml").stat()
+        os.utime(rules / "a.yml", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        (rules / "broken.yml").unlink()
+
+        assert await engine.load_rules() == 2
+        assert sorted(parsed) == ["a.yml", "b.yaml"]
+        assert engine.get_rule("b").detection["selection"] == {"process.name": "c.exe"}
+        assert [
+            m.rule.rule_id for m in await engine.match_event({"process": {"name": "c.exe"}})
+        ] == ["b"]
+        assert engine.get_info()["rule_files"] == 2
+
+    async def test_cache_across_engines(self, tmp_path: Path, monkeypatch):
+        """Test that a new engine loads unchanged rules from the cache file."""
+        from app.detection import sigma_engine
+        from app.detection.sigma_engine import SigmaEngine
+
+        rules = tmp_path / "rules"
+        rules.mkdir()
+        (rules / "a.yml").write_text(_rule_yaml("a", "a.exe"))
+        cache_path = tmp_path / "cache" / "sigma.pickle"
+
+        assert await SigmaEngine(rules_path=rules, cache_path=cache_path).load_rules() == 1
+        assert cache_path.exists()
+
+        def fail(files):
+            raise AssertionError(f"parsed {files}")
+
+        monkeypatch.setattr(sigma_engine, "_parse_rule_files", fail)
+        engine = SigmaEngine(rules_path=rules, cache_path=cache_path)
+
+        assert await engine.load_rules() == 1
+        matches = await engine.match_event({"process": {"name": "A.EXE"}})
+        assert [match.rule.rule_id for match in matches] == ["a"]
+
+        cache_path.write_bytes(b"not a pickle")
+        monkeypatch.undo()
+        assert await SigmaEngine(rules_path=rules, cache_path=cache_path).load_rules() == 1
+
+    async def test_parallel_load(self, tmp_path: Path, monkeypatch):
+        """Test that many cold files are parsed in worker processes."""
+        from app.detection import sigma_engine
+        from app.detection.sigma_engine import SigmaEngine
+
+        monkeypatch.setattr(sigma_engine, "PARALLEL_LOAD_MIN_FILES", 4)
+        for i in range(10):
+            (tmp_path / f"rule{i}.yml").write_text(_rule_yaml(f"r{i}", f"p{i}.exe"))
+        engine = SigmaEngine(rules_path=tmp_path, load_workers=2)
+
+        assert await engine.load_rules() == 10
+        matches = await engine.match_event({"process": {"name": "p7.exe"}})
+        assert [match.rule.rule_id for match in matches] == ["r7"]
+        assert engine.get_rule("r3").source_file == str(tmp_path / "rule3.yml")
+
+    def test_factory_defaults_from_settings(self, tmp_path: Path, monkeypatch):
+        """Test that create_sigma_engine falls back to the sigma settings."""
+        from app.config import get_settings
+        from app.detection.sigma_engine import create_sigma_engine
+
+        settings = get_settings()
+        monkeypatch.setattr(settings, "sigma_rules_path", str(tmp_path / "rules"))
+        monkeypatch.setattr(settings, "sigma_cache_path", str(tmp_path / "sigma.pickle"))
+        monkeypatch.setattr(settings, "sigma_load_workers", 2)
+
+        engine = create_sigma_engine({})
+        assert engine.rules_path == tmp_path / "rules"
+        assert engine.cache_path == tmp_path / "sigma.pickle"
+        assert engine.load_workers == 2
+
+        engine = create_sigma_engine({"cache_path": None, "load_workers": 1})
+        assert engine.cache_path is None
+        assert engine.load_workers == 1
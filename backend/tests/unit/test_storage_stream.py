@@ -0,0 +1,261 @@
+"""Unit tests for reading stored evidence without a full local copy.
+
+Tests ranged reads, the read-ahead RangeReader stream, the on-disk
+evidence cache, and how parsing jobs open evidence held in storage.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Create a local storage adapter rooted in a temp directory."""
+    from app.adapters.storage.base import StorageConfig
+    from app.adapters.storage.local import LocalStorageAdapter
+
+    return LocalStorageAdapter(StorageConfig(local_path=str(tmp_path / "evidence")))
+
+
+@pytest.fixture
+def stored_file(storage, tmp_path):
+    """Store a 10,000 byte file and return its key and content."""
+    data = bytes(i % 251 for i in range(10_000))
+    path = tmp_path / "evidence" / "case-1" / "blob.bin"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(data)
+    return "case-1/blob.bin", data
+
+
+class TestDownloadRange:
+    """Tests for ranged downloads."""
+
+    async def test_local_range(self, storage, stored_file):
+        """Test that the local backend reads just the requested range."""
+        key, data = stored_file
+
+        assert await storage.download_range(key, 100, 50) == data[100:150]
+        assert await storage.download_range(key, 9_990, 50) == data[9_990:]
+
+    async def test_default_range_from_stream(self, storage, stored_file):
+        """Test the stream-based fallback for backends without ranged reads."""
+        from app.adapters.storage.base import StorageAdapter
+
+        key, data = stored_file
+
+        assert await StorageAdapter.download_range(storage, key, 4_000, 3_000) == data[4_000:7_000]
+
+    async def test_s3_range_off_event_loop(self):
+        """Test that the blocking S3 request runs outside the event loop thread."""
+        import threading
+
+        from app.adapters.storage.base import StorageConfig
+        from app.adapters.storage.s3 import S3StorageAdapter
+
+        threads = []
+
+        def get_object(**kwargs):
+            threads.append(threading.current_thread())
+            body = MagicMock()
+            body.read.return_value = b"abc"
+            return {"Body": body}
+
+        adapter = S3StorageAdapter(StorageConfig(bucket="evidence"))
+        adapter._client = MagicMock()
+        adapter._client.get_object.side_effect = get_object
+
+        assert await adapter.download_range("case-1/blob.bin", 10, 3) == b"abc"
+        assert adapter._client.get_object.call_args.kwargs["Range"] == "bytes=10-12"
+        assert threads != [threading.current_thread()]
+
+    def test_local_path(self, storage, stored_file):
+        """Test that local keys resolve to a filesystem path."""
+        key, data = stored_file
+
+        assert storage.local_path(key).read_bytes() == data
+        assert storage.local_path("case-1/missing.bin") is None
+
+
+class TestRangeReader:
+    """Tests for the read-ahead stream over stored files."""
+
+    async def test_sequential_read(self, storage, stored_file):
+        """Test that reading the stream returns the whole file."""
+        from app.adapters.storage.stream import open_range_stream
+
+        key, data = stored_file
+        stream = open_range_stream(
+            storage, key, len(data), asyncio.get_running_loop(), block_size=1_000
+        )
+
+        content = await asyncio.to_thread(stream.read)
+        stream.close()
+
+        assert content == data
+
+    async def test_seek_and_bounded_blocks(self, storage, stored_file):
+        """Test random access and that only a window of blocks is held."""
+        from app.adapters.storage.stream import RangeReader
+
+        key, data = stored_file
+        reader = RangeReader(
+            storage, key, len(data), asyncio.get_running_loop(), block_size=1_000, read_ahead=2
+        )
+
+        def read_at(offset: int, size: int) -> bytes:
+            reader.seek(offset)
+            return reader.read(size)
+
+        assert await asyncio.to_thread(read_at, 8_500, 300) == data[8_500:8_800]
+        assert await asyncio.to_thread(read_at, 1_200, 100) == data[1_200:1_300]
+        assert reader.seek(-10, 2) == 9_990
+        assert len(reader._blocks) <= reader.read_ahead + 2
+        reader.close()
+
+    async def test_parser_reads_stream(self, storage, tmp_path):
+        """Test that a streaming parser consumes evidence from the stream."""
+        from app.adapters.storage.stream import open_range_stream
+        from app.parsers.execution import ParserExecutor
+        from app.parsers.formats.json import GenericJSONParser
+
+        lines = [json.dumps({"user": f"user{i}", "action": "login"}) for i in range(200)]
+        content = ("\n".join(lines) + "\n").encode()
+        path = tmp_path / "evidence" / "case-1" / "events.jsonl"
+        path.parent.mkdir(parents=True)
+        path.write_bytes(content)
+
+        stream = open_range_stream(
+            storage,
+            "case-1/events.jsonl",
+            len(content),
+            asyncio.get_running_loop(),
+            block_size=512,
+        )
+        executor = ParserExecutor(GenericJSONParser(), stream, "events.jsonl")
+        docs = [doc async for doc in executor.iter_documents()]
+        stream.close()
+
+        assert len(docs) == 200
+        assert docs[-1]["user"] == {"name": "user199"}
+
+
+class TestEvidenceCache:
+    """Tests for the on-disk evidence cache."""
+
+    async def test_download_and_hit(self, storage, stored_file, tmp_path):
+        """Test that a file is downloaded once and then served from disk."""
+        from app.adapters.storage.stream import EvidenceCache
+
+        key, data = stored_file
+        cache = EvidenceCache(tmp_path / "cache", max_bytes=1_000_000)
+
+        async with cache.lease(storage, key, len(data)) as path:
+            assert path.read_bytes() == data
+            assert path.suffix == ".bin"
+
+        storage.stream_download = MagicMock(side_effect=AssertionError("downloaded twice"))
+        async with cache.lease(storage, key, len(data)) as hit:
+            assert hit == path
+
+    async def test_least_recently_used_evicted(self, storage, tmp_path):
+        """Test that old copies are deleted to stay within the size bound."""
+        import os
+
+        from app.adapters.storage.stream import EvidenceCache
+
+        base = tmp_path / "evidence" / "case-1"
+        base.mkdir(parents=True)
+        for name in ("a.bin", "b.bin", "c.bin"):
+            (base / name).write_bytes(b"x" * 400)
+
+        cache = EvidenceCache(tmp_path / "cache", max_bytes=1_000)
+        async with cache.lease(storage, "case-1/a.bin", 400) as first:
+            pass
+        async with cache.lease(storage, "case-1/b.bin", 400) as second:
+            pass
+        os.utime(first, (1, 1))
+        os.utime(second, (2, 2))
+
+        async with cache.lease(storage, "case-1/c.bin", 400) as third:
+            pass
+
+        assert not first.exists()
+        assert second.exists()
+        assert third.exists()
+
+    async def test_leased_copy_not_evicted(self, storage, tmp_path):
+        """Test that a copy in use is skipped by eviction and stays readable."""
+        import os
+
+        from app.adapters.storage.stream import EvidenceCache
+
+        base = tmp_path / "evidence" / "case-1"
+        base.mkdir(parents=True)
+        for name in ("a.bin", "b.bin", "c.bin"):
+            (base / name).write_bytes(name.encode() * 100)
+
+        cache = EvidenceCache(tmp_path / "cache", max_bytes=1_000)
+        async with cache.lease(storage, "case-1/a.bin", 500) as first:
+            async with cache.lease(storage, "case-1/b.bin", 500) as second:
+                pass
+            os.utime(first, (1, 1))
+            os.utime(second, (2, 2))
+
+            async with cache.lease(storage, "case-1/c.bin", 500) as third:
+                assert first.read_bytes() == b"a.bin" * 100
+                assert not second.exists()
+                assert third.exists()
+
+        async with cache.lease(storage, "case-1/b.bin", 500):
+            pass
+
+        assert not first.exists()
+
+
+class TestOpenRemoteEvidence:
+    """Tests for choosing how a parsing job reads stored evidence."""
+
+    async def test_streaming_parser_gets_stream(self, storage, stored_file):
+        """Test that sequential parsers read a ranged stream."""
+        import io
+        from contextlib import AsyncExitStack
+
+        from app.adapters.storage.base import StorageFile
+        from app.parsers.formats.json import GenericJSONParser
+        from app.tasks._parsing_impl import _open_remote_evidence
+
+        key, data = stored_file
+        async with AsyncExitStack() as leases:
+            source = await _open_remote_evidence(
+                GenericJSONParser(), storage, StorageFile(key=key, size=len(data)), leases
+            )
+
+        assert isinstance(source, io.BufferedReader)
+        source.close()
+
+    async def test_random_access_parser_gets_cached_copy(
+        self, storage, stored_file, tmp_path, monkeypatch
+    ):
+        """Test that random-access parsers get a local copy from the cache."""
+        from contextlib import AsyncExitStack
+
+        from app.adapters.storage.base import StorageFile
+        from app.parsers.formats.evtx import WindowsEvtxParser
+        from app.tasks import _parsing_impl
+
+        monkeypatch.setattr(_parsing_impl.settings, "parsing_cache_dir", str(tmp_path / "cache"))
+
+        key, data = stored_file
+        async with AsyncExitStack() as leases:
+            source = await _parsing_impl._open_remote_evidence(
+                WindowsEvtxParser(), storage, StorageFile(key=key, size=len(data)), leases
+            )
+
+            assert isinstance(source, Path)
+            assert source.read_bytes() == data